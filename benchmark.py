@@ -0,0 +1,780 @@
+"""
+Micro-benchmarks for the simulation engine.
+
+Usage:
+    python benchmark.py assembly [--net circuits/opamp_rectifier.net ...] [--stages 50]
+    python benchmark.py sparse [--side 30 70] [--dense-max 5000]
+    python benchmark.py factor [--net circuits/oscilator.net] [--side 50 100]
+    python benchmark.py newton [--net circuits/dc_source.net ...]
+    python benchmark.py adaptive [--net circuits/pulse.net ...] [--reltol 1e-3]
+    python benchmark.py methods [--net circuits/lc.net ...] [--stages 5] [--factor 1 5 10]
+    python benchmark.py sources [--stages 5 20] [--steps 20000]
+    python benchmark.py diodes [--stages 2 10 100] [--steps 1000]
+    python benchmark.py pwl [--net circuits/chua.net] [--stages 2 10 100] [--points 200]
+    python benchmark.py columnar [--side 100 300] [--steps 5]
+    python benchmark.py netlist [--side 100 300]
+    python benchmark.py stamping [--side 30 100] [--repeats 20] [--steps 50]
+    python benchmark.py sweep [--net circuits/opamp_rectifier.net] [--param R1006] [--points 32]
+    python benchmark.py batch [--net circuits/opamp_rectifier.net] [--param R1006] [--batch 8 64]
+    python benchmark.py dcsweep [--points 301]
+    python benchmark.py montecarlo [--net circuits/opamp_rectifier.net] [--runs 64] [--target 10000]
+    python benchmark.py ac [--net circuits/opamp_lowpass.net] [--stages 10 100] [--points 50]
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import tempfile
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from simulator.parser import parse_netlist
+from simulator.circuit import NetlistOOP
+from simulator.elements.base import TimeMethod
+from simulator.elements.resistor import Resistor
+from simulator.elements.capacitor import Capacitor
+from simulator.elements.inductor import Inductor
+from simulator.elements.voltage_source import VoltageSource
+from simulator.elements.controlled_sources import VCVS
+from simulator.elements.diode import Diode
+from simulator.elements.nonlinear_resistor import NonLinearResistor
+from simulator.engine import _build_mna_system, solve_dc, solve_tran
+from simulator.assembly import CompiledCircuit, STAMPING_BACKENDS
+from simulator.state import StateStore
+from simulator import engine, linsolve, netlist_cache
+from simulator.circuit import Circuit
+from simulator.builder import CircuitBuilder
+from simulator.batch import solve_batch_tran
+from simulator.sweep import with_param
+
+DEFAULT_NETLISTS = [
+    "circuits/opamp_rectifier.net",
+    "circuits/oscilator.net",
+    "circuits/lc.net",
+]
+
+
+def _timeit(fn: Callable[[], object], repeats: int) -> float:
+    """Mean wall time of fn() in seconds."""
+    fn()  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - t0) / repeats
+
+
+def _load(path: str) -> NetlistOOP:
+    # parse_netlist prints a banner; keep the benchmark output clean
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parse_netlist(path)
+
+
+def make_buffer_chain(stages: int) -> NetlistOOP:
+    """
+    Synthetic netlist with many MNA elements: each stage is a SIN source
+    driving an RC into a unity VCVS buffer.
+    """
+    elements = []
+    node = 0
+    for k in range(stages):
+        n_in, n_rc, n_out = node + 1, node + 2, node + 3
+        elements.append(VoltageSource(f"V{k}", n_in, 0, dc=0.0, source_type="SIN",
+                                      sin_params={"amplitude": 1.0, "freq": 1e3}))
+        elements.append(Resistor(f"R{k}", n_in, n_rc, 1e3))
+        elements.append(Capacitor(f"C{k}", n_rc, 0, 1e-6))
+        elements.append(VCVS(f"E{k}", n_out, 0, n_rc, 0, 1.0))
+        elements.append(Resistor(f"RL{k}", n_out, 0, 1e4))
+        node = n_out
+    return NetlistOOP(elements, node)
+
+
+def make_rc_mesh(side: int) -> NetlistOOP:
+    """
+    Power-grid-like mesh: side x side nodes connected by resistors, each
+    node with a decoupling capacitor to ground, fed by a DC source at one
+    corner and loaded by a resistor at the opposite one.
+    """
+    def node(r: int, c: int) -> int:
+        return r * side + c + 1
+
+    elements = [VoltageSource("V1", node(0, 0), 0, dc=1.0)]
+    for r in range(side):
+        for c in range(side):
+            if c + 1 < side:
+                elements.append(Resistor(f"RH{r}_{c}", node(r, c), node(r, c + 1), 0.1))
+            if r + 1 < side:
+                elements.append(Resistor(f"RV{r}_{c}", node(r, c), node(r + 1, c), 0.1))
+            elements.append(Capacitor(f"C{r}_{c}", node(r, c), 0, 1e-9))
+    elements.append(Resistor("RLOAD", node(side - 1, side - 1), 0, 10.0))
+    return NetlistOOP(elements, side * side)
+
+
+def make_lc_ladder(stages: int) -> NetlistOOP:
+    """
+    LC low-pass ladder (L series, C shunt per stage) between a 100 ohm
+    source and load, driven by a 5 kHz SIN from rest, so t = 0 is exact
+    for every integration method.
+    """
+    elements = [VoltageSource("V1", 1, 0, dc=0.0, source_type="SIN",
+                              sin_params={"amplitude": 1.0, "freq": 5e3}),
+                Resistor("RS", 1, 2, 100.0)]
+    for k in range(stages):
+        a, b = k + 2, k + 3
+        elements.append(Inductor(f"L{k}", a, b, 1e-3))
+        elements.append(Capacitor(f"C{k}", b, 0, 1e-6))
+    elements.append(Resistor("RL", stages + 2, 0, 100.0))
+    data = NetlistOOP(elements, stages + 2)
+    data.transient.t_stop, data.transient.dt = 1e-3, 1e-6
+    return data
+
+
+def make_clamp_chain(stages: int) -> NetlistOOP:
+    """
+    Diode-heavy netlist: a 5 V SIN source into a chain of RC sections,
+    each clamped to ground by a pair of antiparallel diodes.
+    """
+    elements = [VoltageSource("V1", 1, 0, dc=0.0, source_type="SIN",
+                              sin_params={"amplitude": 5.0, "freq": 1e3})]
+    for k in range(stages):
+        node = k + 2
+        elements.append(Resistor(f"R{k}", node - 1, node, 10.0))
+        elements.append(Capacitor(f"C{k}", node, 0, 1e-8))
+        elements.append(Diode(f"DA{k}", node, 0))
+        elements.append(Diode(f"DB{k}", 0, node))
+    data = NetlistOOP(elements, stages + 1)
+    data.has_nonlinear_elements = True
+    return data
+
+
+def make_pwl_ladder(stages: int, points: int) -> NetlistOOP:
+    """
+    RC ladder shunted at every node by a nonlinear resistor whose I-V
+    table (a cubic with negative slope near 0) has the given length.
+    """
+    V_points = np.linspace(-4.0, 4.0, points)
+    I_points = 0.05 * V_points**3 - 0.2 * V_points
+    elements = [VoltageSource("V1", 1, 0, dc=0.0, source_type="SIN",
+                              sin_params={"amplitude": 3.0, "freq": 1e3})]
+    for k in range(stages):
+        node = k + 2
+        elements.append(Resistor(f"R{k}", node - 1, node, 2.0))
+        elements.append(Capacitor(f"C{k}", node, 0, 1e-6))
+        elements.append(NonLinearResistor(f"N{k}", node, 0, V_points, I_points))
+    data = NetlistOOP(elements, stages + 1)
+    data.has_nonlinear_elements = True
+    return data
+
+
+# ------------------------------------------------------------
+#      ASSEMBLY: reference _build_mna_system vs compiled
+# ------------------------------------------------------------
+def bench_assembly(data: NetlistOOP, label: str, repeats: int) -> None:
+    compiled = CompiledCircuit(data)
+    x_red = np.random.default_rng(0).uniform(-0.1, 0.1, compiled.n_total - 1)
+    states = [dict() for _ in data.elements]
+    kwargs = dict(analysis_context="TRAN", t=1e-4, dt=1e-6,
+                  method=TimeMethod.BACKWARD_EULER, states=states)
+
+    G_ref, I_ref = _build_mna_system(data, x_red, **kwargs)
+    G_new, I_new = compiled.build(x_red, **kwargs)
+    assert np.allclose(G_ref, G_new) and np.allclose(I_ref, I_new), label
+
+    t_ref = _timeit(lambda: _build_mna_system(data, x_red, **kwargs), repeats)
+    t_new = _timeit(lambda: compiled.build(x_red, **kwargs), repeats)
+    print(f"{label:32s} n={compiled.n_total:5d}  reference={t_ref * 1e6:10.1f} us"
+          f"  compiled={t_new * 1e6:10.1f} us  speedup={t_ref / t_new:6.2f}x")
+
+
+# ------------------------------------------------------------
+#          SPARSE vs DENSE: DC + a few transient steps
+# ------------------------------------------------------------
+def bench_sparse(data: NetlistOOP, label: str, dense_max: int, tran_steps: int) -> None:
+    nodes = [data.max_node]
+    v0 = np.zeros(data.max_node + 1)
+    runs = {}
+    for sparse in (False, True):
+        if not sparse and data.max_node > dense_max:
+            continue
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            v_dc = solve_dc(data, 1e-8, v0, nodes, sparse=sparse)
+            t_dc = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            solve_tran(data, 1e-9 * tran_steps, 1e-9, 1e-8, v0, nodes,
+                       TimeMethod.BACKWARD_EULER, sparse=sparse)
+            t_tran = time.perf_counter() - t0
+        runs["sparse" if sparse else "dense"] = (t_dc, t_tran, v_dc[0])
+
+    line = f"{label:20s} nodes={data.max_node:7d}"
+    for name, (t_dc, t_tran, v) in runs.items():
+        line += f"  {name}: dc={t_dc:8.3f}s tran[{tran_steps}]={t_tran:8.3f}s"
+    print(line)
+
+
+# ------------------------------------------------------------
+#     FACTOR: stateless solve vs LinearSolver (pattern reuse)
+# ------------------------------------------------------------
+def bench_factor(data: NetlistOOP, label: str, repeats: int, sparse: bool) -> None:
+    compiled = CompiledCircuit(data, sparse=sparse)
+    rng = np.random.default_rng(0)
+    x_red = rng.uniform(-0.1, 0.1, compiled.n_total - 1)
+    states = [dict() for _ in data.elements]
+    G, I = compiled.build(x_red, analysis_context="TRAN", t=1e-6, dt=1e-9,
+                          method=TimeMethod.BACKWARD_EULER, states=states)
+
+    solver = linsolve.LinearSolver()
+    x_ref = linsolve.solve(G, I)
+    assert np.allclose(solver.solve(G, I), x_ref), label
+
+    t_ref = _timeit(lambda: linsolve.solve(G, I), repeats)
+    t_new = _timeit(lambda: solver.solve(G, I), repeats)
+    print(f"{label:32s} n={compiled.n_total:6d}  stateless={t_ref * 1e6:10.1f} us"
+          f"  reused={t_new * 1e6:10.1f} us  speedup={t_ref / t_new:6.2f}x"
+          f"  analyses={solver.n_analyze}/{solver.n_factor}")
+
+
+# ------------------------------------------------------------
+#   NEWTON: factorizations per strategy in a transient run
+# ------------------------------------------------------------
+def bench_newton(data: NetlistOOP, label: str, strategies: List[str]) -> None:
+    made = []
+
+    class CountingSolver(linsolve.LinearSolver):
+        def __init__(self):
+            super().__init__()
+            made.append(self)
+
+    original = engine.LinearSolver
+    engine.LinearSolver = CountingSolver
+    try:
+        for strategy in strategies:
+            made.clear()
+            with contextlib.redirect_stdout(io.StringIO()):
+                t0 = time.perf_counter()
+                Circuit(data).run_tran(nr_strategy=strategy)
+                elapsed = time.perf_counter() - t0
+            print(f"{label:32s} {strategy:8s} factorizations={made[0].n_factor:7d}"
+                  f"  time={elapsed:7.3f}s")
+    finally:
+        engine.LinearSolver = original
+
+
+# ------------------------------------------------------------
+#      ADAPTIVE: time steps + wall time, fixed vs adaptive dt
+# ------------------------------------------------------------
+def bench_adaptive(path: str, reltol: float) -> None:
+    steps = []
+    original = StateStore.update
+
+    def counting(*args, **kwargs):
+        steps.append(1)
+        return original(*args, **kwargs)
+
+    StateStore.update = counting
+    try:
+        runs = {}
+        for adaptive in (False, True):
+            data = _load(path)
+            steps.clear()
+            with contextlib.redirect_stdout(io.StringIO()):
+                t0 = time.perf_counter()
+                _, out = Circuit(data).run_tran(adaptive=adaptive, reltol=reltol)
+                elapsed = time.perf_counter() - t0
+            runs[adaptive] = (len(steps), elapsed, out)
+    finally:
+        StateStore.update = original
+
+    (n_fix, t_fix, ref), (n_ad, t_ad, out) = runs[False], runs[True]
+    err = np.max(np.abs(out - ref)) if ref.size else 0.0
+    print(f"{path:32s} steps fixed={n_fix:7d} adaptive={n_ad:7d} ({n_fix / n_ad:6.1f}x)"
+          f"  time fixed={t_fix:7.3f}s adaptive={t_ad:7.3f}s  max|dv|={err:.2e}")
+
+
+# ------------------------------------------------------------
+#     METHODS: error vs step size of BE / TRAP / GEAR2
+# ------------------------------------------------------------
+def bench_methods(data: NetlistOOP, path: str, factors: List[int]) -> None:
+    tr = data.transient
+    nodes = list(range(1, data.max_node + 1))
+    with contextlib.redirect_stdout(io.StringIO()):
+        t_ref, ref, _ = solve_tran(data, tr.t_stop, tr.dt / 8, 1e-9, None, nodes,
+                                   TimeMethod.TRAPEZOIDAL)
+    for method in (TimeMethod.BACKWARD_EULER, TimeMethod.TRAPEZOIDAL, TimeMethod.GEAR2):
+        for factor in factors:
+            with contextlib.redirect_stdout(io.StringIO()):
+                t0 = time.perf_counter()
+                t, out, _ = solve_tran(data, tr.t_stop, tr.dt * factor, 1e-9, None, nodes, method)
+                elapsed = time.perf_counter() - t0
+            err = max(np.max(np.abs(row - np.interp(t, t_ref, r)))
+                      for row, r in zip(out, ref)) if nodes else 0.0
+            print(f"{path:32s} {method.name:15s} dt={tr.dt * factor:9.2e}"
+                  f"  max|dv|={err:.2e}  time={elapsed:7.3f}s")
+
+
+# ------------------------------------------------------------
+#   SOURCES: tabulated vs per-step source waveform evaluation
+# ------------------------------------------------------------
+def bench_sources(data: NetlistOOP, label: str, steps: int) -> None:
+    runs = {}
+    original = CompiledCircuit.tabulate_sources
+    try:
+        for tabulated in (False, True):
+            if not tabulated:
+                CompiledCircuit.tabulate_sources = lambda self, times: None
+            else:
+                CompiledCircuit.tabulate_sources = original
+            with contextlib.redirect_stdout(io.StringIO()):
+                t0 = time.perf_counter()
+                _, out, _ = solve_tran(data, steps * 1e-6, 1e-6, 1e-9, None, [data.max_node],
+                                       TimeMethod.BACKWARD_EULER)
+                runs[tabulated] = (time.perf_counter() - t0, out)
+    finally:
+        CompiledCircuit.tabulate_sources = original
+
+    (t_ref, ref), (t_new, out) = runs[False], runs[True]
+    print(f"{label:32s} steps={steps:7d}  per-step={t_ref:7.3f}s  tabulated={t_new:7.3f}s"
+          f"  speedup={t_ref / t_new:5.2f}x  max|dv|={np.max(np.abs(out - ref)):.1e}")
+
+
+# ------------------------------------------------------------
+#   BANKS: vectorized device bank vs per-element linearization
+# ------------------------------------------------------------
+def bench_bank(data: NetlistOOP, label: str, steps: int, cls: type) -> None:
+    runs = {}
+    bank = cls.bank
+    try:
+        for banked in (False, True):
+            cls.bank = bank if banked else None
+            with contextlib.redirect_stdout(io.StringIO()):
+                t0 = time.perf_counter()
+                _, out = Circuit(data).run_tran(total_time=steps * 1e-6, dt=1e-6)
+                runs[banked] = (time.perf_counter() - t0, out)
+    finally:
+        cls.bank = bank
+
+    (t_ref, ref), (t_new, out) = runs[False], runs[True]
+    n_dev = sum(isinstance(e, cls) for e in data.elements)
+    print(f"{label:32s} devices={n_dev:5d}  per-element={t_ref:7.3f}s  bank={t_new:7.3f}s"
+          f"  speedup={t_ref / t_new:5.2f}x  max|dv|={np.max(np.abs(out - ref)):.1e}")
+
+
+# ------------------------------------------------------------
+#   COLUMNAR: R/C objects vs columns (parse, DC, transient)
+# ------------------------------------------------------------
+def bench_columnar(side: int, steps: int) -> None:
+    mesh = make_rc_mesh(side)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "mesh.net")
+        CircuitBuilder(max_node=mesh.max_node, elements=mesh.elements).save_netlist(path)
+        n_elem = len(mesh.elements)
+        del mesh
+        runs = {}
+        for columnar in (False, True):
+            with contextlib.redirect_stdout(io.StringIO()):
+                t0 = time.perf_counter()
+                data = parse_netlist(path, columnar=columnar)
+                t_parse = time.perf_counter() - t0
+                t0 = time.perf_counter()
+                Circuit(data).run_dc(sparse=True)
+                t_dc = time.perf_counter() - t0
+                t0 = time.perf_counter()
+                _, out = Circuit(data).run_tran(total_time=steps * 1e-9, dt=1e-9, sparse=True)
+                t_tran = time.perf_counter() - t0
+            runs[columnar] = (t_parse, t_dc, t_tran, out)
+
+    line = f"rc_mesh[{side}x{side}]".ljust(20) + f" elements={n_elem:8d}"
+    for columnar, (t_parse, t_dc, t_tran, _) in runs.items():
+        line += (f"  {'columns' if columnar else 'objects'}: parse={t_parse:6.2f}s"
+                 f" dc={t_dc:6.2f}s tran[{steps}]={t_tran:6.2f}s")
+    print(line + f"  max|dv|={np.max(np.abs(runs[True][3] - runs[False][3])):.1e}")
+
+
+# ------------------------------------------------------------
+#   NETLIST CACHE: parsing vs loading the parsed netlist
+# ------------------------------------------------------------
+def bench_netlist_cache(side: int) -> None:
+    mesh = make_rc_mesh(side)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "mesh.net")
+        CircuitBuilder(max_node=mesh.max_node, elements=mesh.elements).save_netlist(path)
+        line = f"rc_mesh[{side}x{side}]".ljust(20) + f" {os.path.getsize(path) / 2 ** 20:6.1f} MiB"
+        del mesh
+        cache = netlist_cache.NetlistCache(os.path.join(tmp, "cache"))
+        for columnar in (False, True):
+            source = netlist_cache.NetlistSource.read(path)
+            with contextlib.redirect_stdout(io.StringIO()):
+                t0 = time.perf_counter()
+                data = parse_netlist(path, columnar=columnar, cache=False)
+                t_parse = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            cache.store(source, columnar, data)
+            t_store = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            source = netlist_cache.NetlistSource.read(path)
+            assert cache.load(source, columnar) is not None
+            t_load = time.perf_counter() - t0
+            line += (f"  {'columns' if columnar else 'objects'}: parse={t_parse:5.2f}s"
+                     f" store={t_store:5.2f}s load={t_load:5.2f}s ({t_parse / t_load:4.1f}x)")
+        print(line + f"  cache={cache.entries.size() / 2 ** 20:5.1f} MiB")
+
+
+# ------------------------------------------------------------
+#   STAMPING: per-element vs vectorized R/C stamps
+# ------------------------------------------------------------
+def bench_stamping(data: NetlistOOP, label: str, repeats: int, steps: int) -> None:
+    states = StateStore(data)
+    runs = {}
+    for backend in STAMPING_BACKENDS:
+        compiled = CompiledCircuit(data, sparse=True, stamping=backend)
+        x_red = np.random.default_rng(0).uniform(-0.1, 0.1, compiled.n_total - 1)
+        ticks = itertools.count(1)
+        kwargs = dict(analysis_context="TRAN", dt=1e-9, method=TimeMethod.TRAPEZOIDAL, states=states)
+
+        def analysis():
+            # CONSTANT base + first step
+            compiled.invalidate()
+            compiled.build(x_red, t=0.0, **kwargs)
+
+        def step():
+            # New time point: TIME stamps (capacitors) again
+            compiled.build(x_red, t=next(ticks) * 1e-9, **kwargs)
+
+        t_analysis = _timeit(analysis, repeats)
+        t_step = _timeit(step, repeats)
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            _, out = Circuit(data).run_tran(total_time=steps * 1e-9, dt=1e-9, method="TRAP",
+                                            sparse=True, stamping=backend)
+            t_tran = time.perf_counter() - t0
+        runs[backend] = (t_analysis, t_step, t_tran, out)
+
+    line = f"{label:20s} elements={len(data.elements):7d}"
+    for backend, (t_analysis, t_step, t_tran, _) in runs.items():
+        line += (f"  {backend}: first build={t_analysis * 1e3:8.2f} ms"
+                 f" step={t_step * 1e3:7.2f} ms tran[{steps}]={t_tran:6.2f}s")
+    out_ref, out_vec = runs["elements"][3], runs["vectorized"][3]
+    print(line + f"  max|dv|={np.max(np.abs(out_vec - out_ref)):.1e}")
+
+
+# ------------------------------------------------------------
+#   SWEEP: .STEP points serially vs over a process pool
+# ------------------------------------------------------------
+def bench_sweep(data: NetlistOOP, label: str, param: str, points: int, workers: List[int]) -> None:
+    elem = next(e for e in data.elements if e.name == param)
+    values = getattr(elem, elem.value_attr) * np.linspace(0.5, 2.0, points)
+    line = f"{label:32s} {param}[{points}]"
+    ref = None
+    for w in workers:
+        t0 = time.perf_counter()
+        result = Circuit(data).sweep(param, values, workers=w)
+        t = time.perf_counter() - t0
+        ref = result.out if ref is None else ref
+        line += f"  workers={w}: {t:7.2f}s"
+    print(line + f"  max|dv|={np.max(np.abs(result.out - ref)):.1e}")
+
+
+# ------------------------------------------------------------
+#   BATCH: one run_tran per instance vs lockstep batched solve
+# ------------------------------------------------------------
+def bench_batch(data: NetlistOOP, label: str, param: str, size: int, total_time: float) -> None:
+    elem = next(e for e in data.elements if e.name == param)
+    values = getattr(elem, elem.value_attr) * np.linspace(0.5, 2.0, size)
+    instances = [with_param(data, param, v) for v in values]
+    total_time, dt, method, internal_steps = Circuit(data).tran_settings(total_time=total_time)
+    nodes = list(range(1, data.max_node + 1))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        ref = np.stack([Circuit(d).run_tran(total_time=total_time)[1] for d in instances])
+        t_one = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        _, out = solve_batch_tran(instances, total_time, dt, 1e-8, nodes, method,
+                                  internal_steps=internal_steps)
+        t_batch = time.perf_counter() - t0
+    print(f"{label:32s} batch={size:4d}  one-by-one={t_one:7.2f}s  batched={t_batch:7.2f}s  "
+          f"x{t_one / t_batch:5.1f}  max|dv|={np.max(np.abs(out - ref)):.1e}")
+
+
+# ------------------------------------------------------------
+#   DC SWEEP: continuation vs one cold run_dc per point
+# ------------------------------------------------------------
+def make_dc_curve(device: str) -> NetlistOOP:
+    """Source V1 -> 1 ohm -> diode or Chua PWL resistor (.DC characteristic curve)."""
+    elems = [VoltageSource("V1", 1, 0, dc=0.0), Resistor("R1", 1, 2, 1.0)]
+    if device == "diode":
+        elems.append(Diode("D1", 2, 0))
+    else:
+        elems.append(NonLinearResistor("N1", 2, 0, np.array([-2.0, -1.0, 1.0, 2.0]),
+                                       np.array([1.1, 0.7, -0.7, -1.1])))
+    return NetlistOOP(elems, 2, has_nonlinear_elements=True)
+
+
+def bench_dcsweep(device: str, points: int) -> None:
+    data = make_dc_curve(device)
+    values = np.linspace(-3.0, 3.0, points)
+    builds = []
+    build = CompiledCircuit.build
+
+    def counted(self, *args, **kwargs):
+        builds.append(1)
+        return build(self, *args, **kwargs)
+
+    CompiledCircuit.build = counted
+    try:
+        line = f"{device + f'[{points}]':32s}"
+        for label, run in [
+            ("cold", lambda: [Circuit(with_param(data, "V1", v)).run_dc() for v in values]),
+            ("previous", lambda: Circuit(data).run_dc_sweep("V1", -3.0, 3.0, 6.0 / (points - 1),
+                                                            extrapolate=False)),
+            ("extrapolated", lambda: Circuit(data).run_dc_sweep("V1", -3.0, 3.0, 6.0 / (points - 1))),
+        ]:
+            builds.clear()
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                run()
+            t = time.perf_counter() - t0
+            line += f"  {label}={t:6.3f}s ({len(builds) / points:4.1f} NR/pt)"
+        print(line)
+    finally:
+        CompiledCircuit.build = build
+
+
+# ------------------------------------------------------------
+#   MONTE CARLO: runs/s (pool, batched) and time of a yield run
+# ------------------------------------------------------------
+def bench_montecarlo(data: NetlistOOP, label: str, runs: int, target: int, workers: List[int]) -> None:
+    tolerances = {"R*": 0.01, "C*": 0.1}
+    for w, batched in itertools.product(workers, (False, True)):
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = Circuit(data).montecarlo(tolerances, runs, seed=0, workers=w, batched=batched,
+                                              metrics=("max",))
+        t = time.perf_counter() - t0
+        print(f"{label:32s} runs={runs} workers={w} batched={batched!s:5s} {runs / t:7.1f} runs/s  "
+              f"{target} runs ~{target * t / runs / 60:6.1f} min  failed={int(result.failed.sum())}")
+
+
+# ------------------------------------------------------------
+#   .AC: stacked vs per-frequency solves vs transients
+# ------------------------------------------------------------
+def make_ac_ladder(stages: int) -> NetlistOOP:
+    """make_lc_ladder driven by a 1 V AC source instead of the SIN."""
+    data = make_lc_ladder(stages)
+    data.elements[0] = VoltageSource("V1", 1, 0, amp=1.0, freq=5e3, is_ac=True, source_type="AC")
+    return data
+
+
+def bench_ac(data: NetlistOOP, label: str, points: int, tran_freqs: int) -> None:
+    """
+    One .AC decade sweep (10 Hz to 1 MHz) with stacked and with one-by-one
+    solves, against a Bode plot made of transients: 20 periods of 200
+    steps per frequency, timed on tran_freqs of them and extrapolated.
+    """
+    source = next(e.name for e in data.elements if getattr(e, "is_ac", False))
+    sweep = ("DEC", points, 10.0, 1e6)
+    n_freqs = len(engine.ac_frequencies(*sweep))
+
+    def per_frequency():
+        stack = engine.AC_STACK_ENTRIES
+        engine.AC_STACK_ENTRIES = 1
+        try:
+            Circuit(data).run_ac(*sweep)
+        finally:
+            engine.AC_STACK_ENTRIES = stack
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        t_stack = _timeit(lambda: Circuit(data).run_ac(*sweep), 3)
+        t_loop = _timeit(per_frequency, 3)
+        t_tran = 0.0
+        for f in np.geomspace(10.0, 1e6, tran_freqs):
+            data_f = with_param(data, f"{source}.freq", f)
+            t_tran += _timeit(lambda: Circuit(data_f).run_tran(total_time=20.0 / f,
+                                                               dt=1.0 / (200.0 * f)), 1)
+    t_tran *= n_freqs / tran_freqs
+    print(f"{label:32s} freqs={n_freqs}  stacked={t_stack * 1e3:8.2f}ms  "
+          f"per-frequency={t_loop * 1e3:8.2f}ms  transients~{t_tran:8.2f}s  "
+          f"(x{t_tran / t_stack:,.0f})")
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Engine micro-benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p_asm = sub.add_parser("assembly", help="MNA assembly: reference vs compiled")
+    p_asm.add_argument("--net", nargs="+", default=DEFAULT_NETLISTS)
+    p_asm.add_argument("--stages", nargs="+", type=int, default=[10, 50])
+    p_asm.add_argument("--repeats", type=int, default=200)
+
+    p_sp = sub.add_parser("sparse", help="Dense vs sparse engine on RC meshes")
+    p_sp.add_argument("--side", nargs="+", type=int, default=[20, 50, 100])
+    p_sp.add_argument("--dense-max", type=int, default=3000,
+                      help="Skip the dense engine above this many nodes")
+    p_sp.add_argument("--tran-steps", type=int, default=5)
+
+    p_fac = sub.add_parser("factor", help="Stateless solve vs reused factorization")
+    p_fac.add_argument("--net", nargs="+", default=["circuits/oscilator.net"])
+    p_fac.add_argument("--side", nargs="+", type=int, default=[20, 50, 100])
+    p_fac.add_argument("--repeats", type=int, default=50)
+
+    p_nr = sub.add_parser("newton", help="Full vs chord vs Broyden Newton (transient)")
+    p_nr.add_argument("--net", nargs="+", default=[
+        "circuits/opamp_rectifier.net", "circuits/dc_source.net", "circuits/chua.net"])
+    p_nr.add_argument("--strategy", nargs="+", default=["newton", "chord", "broyden"])
+
+    p_ad = sub.add_parser("adaptive", help="Fixed vs adaptive (LTE) time step")
+    p_ad.add_argument("--net", nargs="+", default=[
+        "circuits/oscilator.net", "circuits/pulse.net", "circuits/dc_source.net",
+        "circuits/opamp_rectifier.net", "circuits/example_rl_ic.net"])
+    p_ad.add_argument("--reltol", type=float, default=1e-3)
+
+    p_me = sub.add_parser("methods", help="Accuracy vs dt of BE, TRAP and GEAR2")
+    p_me.add_argument("--net", nargs="+", default=["circuits/lc.net"])
+    p_me.add_argument("--stages", nargs="+", type=int, default=[5])
+    p_me.add_argument("--factor", nargs="+", type=int, default=[1, 5, 10],
+                      help="Multiples of the netlist dt")
+
+    p_src = sub.add_parser("sources", help="Tabulated vs per-step source evaluation")
+    p_src.add_argument("--stages", nargs="+", type=int, default=[5, 20])
+    p_src.add_argument("--steps", type=int, default=20000)
+
+    p_di = sub.add_parser("diodes", help="DiodeBank vs per-diode linearization")
+    p_di.add_argument("--stages", nargs="+", type=int, default=[2, 10, 100])
+    p_di.add_argument("--steps", type=int, default=1000)
+
+    p_pwl = sub.add_parser("pwl", help="PWL resistors: Chua run, bank vs per-element")
+    p_pwl.add_argument("--net", nargs="+", default=["circuits/chua.net"])
+    p_pwl.add_argument("--stages", nargs="+", type=int, default=[2, 10, 100])
+    p_pwl.add_argument("--points", type=int, default=200)
+    p_pwl.add_argument("--steps", type=int, default=1000)
+
+    p_col = sub.add_parser("columnar", help="R/C element objects vs columnar netlist")
+    p_col.add_argument("--side", nargs="+", type=int, default=[100, 300])
+    p_col.add_argument("--steps", type=int, default=5)
+
+    p_nc = sub.add_parser("netlist", help="Parsing vs loading from the netlist cache")
+    p_nc.add_argument("--side", nargs="+", type=int, default=[100, 300])
+
+    p_st = sub.add_parser("stamping", help="Per-element vs vectorized R/C stamping backend")
+    p_st.add_argument("--side", nargs="+", type=int, default=[30, 100])
+    p_st.add_argument("--repeats", type=int, default=20)
+    p_st.add_argument("--steps", type=int, default=50)
+
+    p_sw = sub.add_parser("sweep", help=".STEP sweep: serial vs process pool")
+    p_sw.add_argument("--net", nargs="+", default=["circuits/opamp_rectifier.net"])
+    p_sw.add_argument("--param", default="R1006")
+    p_sw.add_argument("--points", type=int, default=32)
+    p_sw.add_argument("--workers", nargs="+", type=int, default=[1, os.cpu_count() or 1])
+
+    p_ba = sub.add_parser("batch", help="One run_tran per instance vs batched lockstep solve")
+    p_ba.add_argument("--net", nargs="+", default=["circuits/opamp_rectifier.net"])
+    p_ba.add_argument("--param", default="R1006")
+    p_ba.add_argument("--batch", nargs="+", type=int, default=[8, 64])
+    p_ba.add_argument("--total-time", type=float, default=1e-3)
+
+    p_dcs = sub.add_parser("dcsweep", help=".DC sweep: continuation vs cold run_dc per point")
+    p_dcs.add_argument("--points", type=int, default=301)
+
+    p_mc = sub.add_parser("montecarlo", help="Monte Carlo throughput: pool vs batched chunks")
+    p_mc.add_argument("--net", nargs="+", default=["circuits/opamp_rectifier.net"])
+    p_mc.add_argument("--runs", type=int, default=64)
+    p_mc.add_argument("--target", type=int, default=10000, help="Runs of the extrapolated yield run")
+    p_mc.add_argument("--workers", nargs="+", type=int, default=[1, os.cpu_count() or 1])
+
+    p_ac = sub.add_parser("ac", help=".AC: stacked vs per-frequency solves vs one transient per frequency")
+    p_ac.add_argument("--net", nargs="+", default=["circuits/opamp_lowpass.net"])
+    p_ac.add_argument("--stages", nargs="+", type=int, default=[10, 100])
+    p_ac.add_argument("--points", type=int, default=50, help="Points per decade")
+    p_ac.add_argument("--tran-freqs", type=int, default=3)
+
+    args = parser.parse_args(argv)
+
+    if args.bench == "assembly":
+        for path in args.net:
+            bench_assembly(_load(path), path, args.repeats)
+        for stages in args.stages:
+            bench_assembly(make_buffer_chain(stages), f"buffer_chain[{stages}]", args.repeats)
+
+    elif args.bench == "sparse":
+        for side in args.side:
+            bench_sparse(make_rc_mesh(side), f"rc_mesh[{side}x{side}]",
+                         args.dense_max, args.tran_steps)
+
+    elif args.bench == "factor":
+        for path in args.net:
+            bench_factor(_load(path), path, args.repeats * 100, sparse=False)
+        for side in args.side:
+            bench_factor(make_rc_mesh(side), f"rc_mesh[{side}x{side}]",
+                         args.repeats, sparse=True)
+
+    elif args.bench == "newton":
+        for path in args.net:
+            bench_newton(_load(path), path, args.strategy)
+
+    elif args.bench == "adaptive":
+        for path in args.net:
+            bench_adaptive(path, args.reltol)
+
+    elif args.bench == "methods":
+        for path in args.net:
+            bench_methods(_load(path), path, args.factor)
+        for stages in args.stages:
+            bench_methods(make_lc_ladder(stages), f"lc_ladder[{stages}]", args.factor)
+
+    elif args.bench == "sources":
+        for stages in args.stages:
+            bench_sources(make_buffer_chain(stages), f"buffer_chain[{stages}]", args.steps)
+
+    elif args.bench == "diodes":
+        for stages in args.stages:
+            bench_bank(make_clamp_chain(stages), f"clamp_chain[{stages}]", args.steps, Diode)
+
+    elif args.bench == "pwl":
+        for path in args.net:
+            data = _load(path)
+            t = _timeit(lambda: Circuit(data).run_tran(), 1)
+            print(f"{path:32s} tran={t:7.3f}s")
+        for stages in args.stages:
+            bench_bank(make_pwl_ladder(stages, args.points), f"pwl_ladder[{stages}x{args.points}]",
+                       args.steps, NonLinearResistor)
+
+    elif args.bench == "columnar":
+        for side in args.side:
+            bench_columnar(side, args.steps)
+
+    elif args.bench == "sweep":
+        for path in args.net:
+            bench_sweep(_load(path), path, args.param, args.points, args.workers)
+
+    elif args.bench == "batch":
+        for path in args.net:
+            for size in args.batch:
+                bench_batch(_load(path), path, args.param, size, args.total_time)
+
+    elif args.bench == "dcsweep":
+        for device in ("diode", "chua"):
+            bench_dcsweep(device, args.points)
+
+    elif args.bench == "montecarlo":
+        for path in args.net:
+            bench_montecarlo(_load(path), path, args.runs, args.target, sorted(set(args.workers)))
+
+    elif args.bench == "netlist":
+        for side in args.side:
+            bench_netlist_cache(side)
+
+    elif args.bench == "ac":
+        for path in args.net:
+            bench_ac(_load(path), path, args.points, args.tran_freqs)
+        for stages in args.stages:
+            bench_ac(make_ac_ladder(stages), f"lc_ladder[{stages}]", args.points, args.tran_freqs)
+
+    elif args.bench == "stamping":
+        for side in args.side:
+            bench_stamping(make_rc_mesh(side), f"rc_mesh[{side}x{side}]", args.repeats, args.steps)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,9 @@ fi
 
 PLOT_SCRIPT="plot.py"
 OUTPUT_DIR="comparisons"
+# Extra arguments go to every plot.py call (e.g. --no-cache to re-simulate
+# instead of reusing the results stored in the cache)
+PLOT_ARGS=("$@")
 
 # Create output directory if it doesn't exist
 mkdir -p "$OUTPUT_DIR"
@@ -36,31 +39,31 @@ echo ""
 
 # Chua Circuit (Oscilador caótico)
 echo "[1/7] Gerando: comparison_chua.png"
-$PYTHON_CMD $PLOT_SCRIPT --net circuits/chua.net --output "$OUTPUT_DIR/comparison_chua.png"
+$PYTHON_CMD $PLOT_SCRIPT --net circuits/chua.net --output "$OUTPUT_DIR/comparison_chua.png" "${PLOT_ARGS[@]}"
 
 # DC Source com Diodo (Retificador)
 echo "[2/7] Gerando: comparison_dc_source.png"
-$PYTHON_CMD $PLOT_SCRIPT --net circuits/dc_source.net --output "$OUTPUT_DIR/comparison_dc_source.png"
+$PYTHON_CMD $PLOT_SCRIPT --net circuits/dc_source.net --output "$OUTPUT_DIR/comparison_dc_source.png" "${PLOT_ARGS[@]}"
 
 # LC Oscillator
 echo "[3/7] Gerando: comparison_lc.png"
-$PYTHON_CMD $PLOT_SCRIPT --net circuits/lc.net --output "$OUTPUT_DIR/comparison_lc.png"
+$PYTHON_CMD $PLOT_SCRIPT --net circuits/lc.net --output "$OUTPUT_DIR/comparison_lc.png" "${PLOT_ARGS[@]}"
 
 # OpAmp Rectifier (Retificador de precisão)
 echo "[4/7] Gerando: comparison_opamp_rectifier.png"
-$PYTHON_CMD $PLOT_SCRIPT --net circuits/opamp_rectifier.net --output "$OUTPUT_DIR/comparison_opamp_rectifier.png"
+$PYTHON_CMD $PLOT_SCRIPT --net circuits/opamp_rectifier.net --output "$OUTPUT_DIR/comparison_opamp_rectifier.png" "${PLOT_ARGS[@]}"
 
 # Oscilador com OpAmp e Diodos
 echo "[5/7] Gerando: comparison_oscilator.png"
-$PYTHON_CMD $PLOT_SCRIPT --net circuits/oscilator.net --output "$OUTPUT_DIR/comparison_oscilator.png"
+$PYTHON_CMD $PLOT_SCRIPT --net circuits/oscilator.net --output "$OUTPUT_DIR/comparison_oscilator.png" "${PLOT_ARGS[@]}"
 
 # Fonte PULSE
 echo "[6/7] Gerando: comparison_pulse.png"
-$PYTHON_CMD $PLOT_SCRIPT --net circuits/pulse.net --output "$OUTPUT_DIR/comparison_pulse.png"
+$PYTHON_CMD $PLOT_SCRIPT --net circuits/pulse.net --output "$OUTPUT_DIR/comparison_pulse.png" "${PLOT_ARGS[@]}"
 
 # Fonte Sinusoidal
 echo "[7/7] Gerando: comparison_sinusoidal.png"
-$PYTHON_CMD $PLOT_SCRIPT --net circuits/sinusoidal.net --output "$OUTPUT_DIR/comparison_sinusoidal.png"
+$PYTHON_CMD $PLOT_SCRIPT --net circuits/sinusoidal.net --output "$OUTPUT_DIR/comparison_sinusoidal.png" "${PLOT_ARGS[@]}"
 
 echo ""
 echo "=========================================="
@@ -7,6 +7,7 @@ from datetime import datetime
 
 from simulator.parser import parse_netlist
 from simulator.circuit import Circuit
+from simulator import result_cache, netlist_cache
 from simulator.builder import CircuitBuilder
 from plot import find_sim_file, load_sim_file, plot_all 
 
@@ -307,7 +308,7 @@ def build_circuit() -> Tuple[Circuit, str, str]:
             if new_type == "TRAN":
                 t_stop_str = input("\tTempo de simulação (s): ")
                 dt_str = input("\tPasso de tempo (s): ")
-                method = input("\tMétodo de integração (BE, FE, TRAP): ").strip().upper()
+                method = input("\tMétodo de integração (BE, FE, TRAP, GEAR2): ").strip().upper()
                 internal_steps_str = input(
                     "\tPassos internos (1 se nenhum): "
                 ).strip()
@@ -446,10 +447,15 @@ def _cli():
     parser.add_argument("--nodes", nargs="+", type=int, default=None)
     parser.add_argument("--guide", type=str, default=None) # existing .sim file path to print alongsige
     parser.add_argument("--create_sim", action="store_true", default=True) # create .sim file after simulating
+    parser.add_argument("--workers", type=int, default=None) # processes of a .STEP sweep (default: one per CPU)
+    parser.add_argument("--no-cache", action="store_true") # always parse and simulate (skip the netlist and result caches)
 
     
     args = parser.parse_args()
     netlist_path: Optional[str] = None
+    if not args.no_cache:
+        result_cache.enable()
+        netlist_cache.enable()
 
     # Built or open existing circuit
     if args.netlist is None:
@@ -460,6 +466,8 @@ def _cli():
         netlist = parse_netlist(args.netlist)
         circuit = Circuit(netlist)
         print(f"\n[INFO] Netlist carregada de: {netlist_name}.net")
+        if netlist_cache.active() is not None and netlist_cache.active().hits:
+            print(f"[Netlist Cache] Reusing parsed netlist {args.netlist}")
         if args.guide:
             sim_file = args.guide
 
@@ -473,6 +481,45 @@ def _cli():
     if __debug__:
         circuit.print()
     # ---------------------------------------------------- #
+    #          .STEP sweep: one run per value              #
+    # ---------------------------------------------------- #
+    if circuit.data.step is not None:
+        result = circuit.sweep(desired_nodes=args.nodes, nr_tol=args.nr_tol, workers=args.workers)
+        print(f"\n==> .STEP {result.param}: {len(result.values)} pontos")
+        for value, out in zip(result.values, result.out):
+            # Transient: last time point of each node
+            final = out[:, -1] if result.times is not None else out
+            print(f"- {result.param} = {value:g}:", final.tolist())
+        return
+
+    # ---------------------------------------------------- #
+    #         .DC sweep: transfer curve of a source        #
+    # ---------------------------------------------------- #
+    if circuit.data.dc_sweep is not None:
+        values, out = circuit.run_dc_sweep(desired_nodes=desired_nodes, nr_tol=args.nr_tol)
+        print(f"\n==> .DC {circuit.data.dc_sweep.source}: {len(values)} pontos"
+              f" ({values[0]:g} a {values[-1]:g})")
+        for i, node in enumerate(desired_nodes):
+            print(f"- Node {node} first results:", out[i, :10].tolist())
+            print(f"- Node {node} last results:", out[i, -10:].tolist())
+        return
+
+    # ---------------------------------------------------- #
+    #     .AC analysis: small-signal frequency response    #
+    # ---------------------------------------------------- #
+    if circuit.data.ac is not None:
+        freqs, out = circuit.run_ac(desired_nodes=desired_nodes, nr_tol=args.nr_tol)
+        print(f"\n==> .AC {circuit.data.ac.sweep}: {len(freqs)} frequências"
+              f" ({freqs[0]:g} a {freqs[-1]:g} Hz)")
+        with np.errstate(divide="ignore"):
+            gain_db = 20.0 * np.log10(np.abs(out))
+        phase_deg = np.degrees(np.angle(out))
+        for i, node in enumerate(desired_nodes):
+            for k in (0, len(freqs) - 1):
+                print(f"- Node {node} @ {freqs[k]:g} Hz: {gain_db[i, k]:.2f} dB, {phase_deg[i, k]:.1f}°")
+        return
+
+    # ---------------------------------------------------- #
     #      Transient or DC based on netlist settings       #
     # ---------------------------------------------------- #
     if circuit.data.transient.enabled:
@@ -6,6 +6,7 @@ from io import StringIO
 import matplotlib.pyplot as plt
 from simulator.circuit import Circuit
 from simulator.parser import parse_netlist
+from simulator import result_cache, netlist_cache
 from simulator.elements.base import TimeMethod
 from typing import Tuple, Optional, List, Dict, Any
 
@@ -153,14 +154,21 @@ def main():
     parser.add_argument("--nodes", nargs="+", type=int, default=None,
                         help="Nós a serem plotados (padrão: todos os nós)")
     parser.add_argument("--output", "-o", help="Caminho para salvar o gráfico (PNG)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Sempre lê e simula (ignora os caches de netlist e de resultados)")
 
     args = parser.parse_args()
+    if not args.no_cache:
+        result_cache.enable()
+        netlist_cache.enable()
 
     abs_path = os.path.abspath(args.net)
     print(f"[DEBUG] Lendo netlist: {abs_path}")
 
     # Parse da netlist para criar NetlistOOP
     netlist_oop = parse_netlist(abs_path)
+    if netlist_cache.active() is not None and netlist_cache.active().hits:
+        print(f"[Netlist Cache] Reusing parsed netlist {abs_path}")
     
     # Se nodes não especificado, usar todos os nós (exceto ground)
     if args.nodes is None:
@@ -0,0 +1,685 @@
+from __future__ import annotations
+import numpy as np
+from scipy import sparse as sp
+from typing import Tuple, Optional, List, Dict, Any, Union, Sequence, Callable
+
+from .elements.base import TimeMethod, StampKind
+from .elements.capacitor import Capacitor
+from .elements.resistor import Resistor
+
+# Elements that add extra variables in MNA (new line in matrix and vector)
+
+def _get_mna_var_count(elem) -> int:
+    """Quantas variáveis MNA extras esse elemento adiciona."""
+    if not getattr(elem, "is_mna", False):
+        return 0
+
+    # Caso especial: CCVS costuma adicionar 2 variáveis (corrente de controle + de saída)
+    if elem.__class__.__name__ == "CCVS":
+        return 2
+
+    # Se o elemento expõe explicitamente quantas variáveis MNA usa
+    if hasattr(elem, "mna_variables"):
+        try:
+            n = int(elem.mna_variables())
+            if n > 0:
+                return n
+        except Exception:
+            pass
+
+    # Caso padrão: 1 variável MNA
+    return 1
+
+def _get_total_var_count(data):
+    """
+    Calculates the total number of variables in the MNA system
+    (max_node + 1) + (extra MNA variables).
+    
+    Note: Most MNA elements add 1 variable, but CCVS adds 2 variables.
+    """
+    n_extra = 0
+    for elem in data.elements:
+        n_extra += _get_mna_var_count(elem)
+    return data.max_node + 1 + n_extra
+
+
+def build_mna_index_map(data) -> Dict[Tuple[int, str], int]:
+    """
+    Maps (element_index, variable_type) -> global index in x_full.
+
+    variable_type:
+      - "i"      : single current variable for the element (default MNA current)
+      - "i_out"  : output current (CCVS)
+      - "i_ctrl" : control current (CCVS)
+    """
+    mna_map: Dict[Tuple[int, str], int] = {}
+
+    # In x_full we have:
+    #   index 0           -> ground (node 0)
+    #   indices 1..max_node -> node voltages
+    #   indices max_node+1.. -> MNA extra variables (currents, etc.)
+    idx = data.max_node + 1
+
+    for elem_idx, elem in enumerate(data.elements):
+        if not getattr(elem, "is_mna", False):
+            continue
+
+        cls_name = elem.__class__.__name__
+
+        if cls_name == "CCVS":
+            # First index: control current
+            mna_map[(elem_idx, "i_ctrl")] = idx
+            # Second index: output current
+            mna_map[(elem_idx, "i_out")] = idx + 1
+            idx += 2
+        else:
+            n_vars = _get_mna_var_count(elem)
+            if n_vars == 1:
+                mna_map[(elem_idx, "i")] = idx
+            else:
+                # Generic case if any element uses more than 1 MNA variable
+                for k in range(n_vars):
+                    mna_map[(elem_idx, f"i{k}")] = idx + k
+            idx += n_vars
+
+    return mna_map
+
+
+# Above this many nodes, solvers pick the sparse mode when not told otherwise
+SPARSE_NODE_THRESHOLD = 200
+
+# Smallest group of same-class SOLUTION elements linearized as one bank;
+# below it the fixed cost of the vectorized path beats the per-element one
+BANK_MIN_SIZE = 8
+
+# Stamping backends of CompiledCircuit: "elements" calls the stamp of each
+# Resistor/Capacitor object, "vectorized" stamps them all with one
+# precomputed scatter per class (as the columnar netlist)
+STAMPING_BACKENDS = ("elements", "vectorized")
+
+
+def use_sparse(data, sparse: Optional[bool] = None) -> bool:
+    """Resolves the sparse flag: None means auto (by node count)."""
+    if sparse is None:
+        return data.max_node > SPARSE_NODE_THRESHOLD
+    return bool(sparse)
+
+
+# ============================================================
+#                   SPARSE STAMP TARGET
+# ============================================================
+class TripletMatrix:
+    """
+    Write-only stand-in for G used by the sparse mode.
+
+    Element stamps (G[i, j] += v, G[i, j] -= v, G[i, j] = v) are recorded
+    as COO triplets. Reads always return 0.0, so '+=' records the increment
+    itself; duplicated entries are summed when converting to CSC.
+
+    Vectorized stamps (columnar elements, device banks) add whole NumPy
+    blocks of triplets instead (add_block); their row/column arrays must
+    be the same objects on every build, as they are compared by identity.
+
+    The elements stamp the same positions in the same order on every build
+    of an analysis, so the COO -> CSC mapping (the sparsity pattern) is
+    computed once and reused: later conversions are a single bincount, and
+    the returned matrices share their index arrays (which LinearSolver uses
+    to recognize the pattern and reuse its pivot sequence).
+    """
+    __slots__ = ("shape", "rows", "cols", "vals", "blocks", "_n_blocked", "_pattern")
+
+    def __init__(self, n: int):
+        self.shape = (n, n)
+        self.rows: List[int] = []
+        self.cols: List[int] = []
+        self.vals: List[float] = []
+        # (position in the stamp sequence, rows, cols, vals)
+        self.blocks: List[Tuple[int, np.ndarray, np.ndarray, np.ndarray]] = []
+        self._n_blocked = 0
+        # (block rows/cols, list rows, list cols, slot of each triplet, csc indices, csc indptr)
+        self._pattern: Optional[Tuple[Any, ...]] = None
+
+    def __len__(self) -> int:
+        """Number of recorded triplets (lists + blocks)."""
+        return len(self.rows) + self._n_blocked
+
+    def __getitem__(self, key) -> float:
+        return 0.0
+
+    def __setitem__(self, key, value: float):
+        i, j = key
+        self.rows.append(i)
+        self.cols.append(j)
+        self.vals.append(value)
+
+    def add_block(self, rows: np.ndarray, cols: np.ndarray, vals: np.ndarray) -> None:
+        """Records G[rows[k], cols[k]] += vals[k] for every k."""
+        self.blocks.append((len(self), rows, cols, vals))
+        self._n_blocked += len(rows)
+
+    def clear(self):
+        self.rows.clear()
+        self.cols.clear()
+        self.vals.clear()
+        self.blocks.clear()
+        self._n_blocked = 0
+
+    def truncate(self, n: int):
+        """Keeps only the first n recorded triplets."""
+        while self.blocks and self.blocks[-1][0] >= n:
+            self._n_blocked -= len(self.blocks.pop()[1])
+        n -= self._n_blocked
+        del self.rows[n:]
+        del self.cols[n:]
+        del self.vals[n:]
+
+    def add_diagonal(self, indices: range, value: float):
+        """Records G[i, i] += value for every i in indices."""
+        self.rows.extend(indices)
+        self.cols.extend(indices)
+        self.vals.extend([value] * len(indices))
+
+    def to_csc(self) -> sp.csc_matrix:
+        """CSC matrix of the recorded stamps, with row/column 0 (ground) removed."""
+        rows = np.asarray(self.rows, dtype=np.int64)
+        cols = np.asarray(self.cols, dtype=np.int64)
+        vals = np.asarray(self.vals, dtype=float)
+        n = self.shape[0] - 1
+        block_idx = [(r, c) for _, r, c, _ in self.blocks]
+
+        pattern = self._pattern
+        if (pattern is None or len(pattern[1]) != len(rows)
+                or len(pattern[0]) != len(block_idx)
+                or any(r is not pr or c is not pc for (r, c), (pr, pc) in zip(block_idx, pattern[0]))
+                or not np.array_equal(pattern[1], rows)
+                or not np.array_equal(pattern[2], cols)):
+            all_rows = np.concatenate([r for r, _ in block_idx] + [rows]).astype(np.int64)
+            all_cols = np.concatenate([c for _, c in block_idx] + [cols]).astype(np.int64)
+            pattern = self._pattern = (block_idx, rows, cols) + self._compile_pattern(all_rows, all_cols, n)
+
+        slot, indices, indptr = pattern[3:]
+        if self.blocks:
+            vals = np.concatenate([v for _, _, _, v in self.blocks] + [vals])
+        data = np.bincount(slot, weights=vals, minlength=len(indices))
+        # Ground stamps were sent to the extra last slot; drop it
+        return sp.csc_matrix((data[:len(indices)], indices, indptr), shape=(n, n))
+
+    @staticmethod
+    def _compile_pattern(rows: np.ndarray, cols: np.ndarray, n: int) -> Tuple[np.ndarray, ...]:
+        """Maps every triplet to its position in CSC data (ground -> extra slot)."""
+        keep = (rows > 0) & (cols > 0)
+        key = (cols[keep] - 1) * n + (rows[keep] - 1)  # column-major -> CSC order
+        uniq, inverse = np.unique(key, return_inverse=True)
+
+        slot = np.full(len(rows), len(uniq), dtype=np.int64)
+        slot[keep] = inverse
+        indices = (uniq % n).astype(np.int32)
+        counts = np.bincount(uniq // n, minlength=n)
+        indptr = np.concatenate(([0], np.cumsum(counts))).astype(np.int32)
+        return slot, indices, indptr
+
+
+class _Scatter:
+    """
+    Scatter pattern of m two-terminal stamps (a[k], b[k]): conductance g
+    at (a,a) (b,b) and -g at (a,b) (b,a), current +i into a and -i into b.
+    The positions shared by several stamps (e.g. ground) are summed with
+    bincount first, so a dense G or I is updated with plain fancy indexing.
+    """
+    __slots__ = ("rows", "cols", "g_slot", "g_rows", "g_cols", "i_slot", "i_rows")
+
+    def __init__(self, a: np.ndarray, b: np.ndarray):
+        # (a,a) (b,b) (a,b) (b,a), matching the values [g, g, -g, -g]
+        self.rows = np.concatenate((a, b, a, b))
+        self.cols = np.concatenate((a, b, b, a))
+
+        n = int(max(self.rows.max(initial=0), self.cols.max(initial=0))) + 1
+        pos, self.g_slot = np.unique(self.rows * n + self.cols, return_inverse=True)
+        self.g_rows, self.g_cols = pos // n, pos % n
+        self.i_rows, self.i_slot = np.unique(np.concatenate((a, b)), return_inverse=True)
+
+    def add_G(self, G, g: np.ndarray) -> None:
+        vals = np.concatenate((g, g, -g, -g))
+        if isinstance(G, TripletMatrix):
+            G.add_block(self.rows, self.cols, vals)
+        else:
+            G[self.g_rows, self.g_cols] += np.bincount(self.g_slot, vals, len(self.g_rows))
+
+    def add_I(self, I: np.ndarray, i: np.ndarray) -> None:
+        vals = np.concatenate((i, -i))
+        I[self.i_rows] += np.bincount(self.i_slot, vals, len(self.i_rows))
+
+
+class _Bank:
+    """A device bank with its element indices and scatter pattern."""
+    __slots__ = ("bank", "members", "scatter")
+
+    def __init__(self, bank, members: List[int]):
+        self.bank = bank
+        self.members = members
+        self.scatter = _Scatter(bank.a, bank.b)
+
+
+class _DiscardMatrix:
+    """Stamp target that drops every write to G (used by build_rhs)."""
+    __slots__ = ()
+
+    def __getitem__(self, key) -> float:
+        return 0.0
+
+    def __setitem__(self, key, value: float):
+        pass
+
+
+_DISCARD = _DiscardMatrix()
+
+
+# ============================================================
+#                   COMPILED MNA SYSTEM
+# ============================================================
+class CompiledCircuit:
+    """
+    MNA system with a fixed variable layout, built once per analysis.
+
+    The layout (node voltages + extra MNA variables) comes from
+    build_mna_index_map, and every MNA element receives its pre-assigned
+    extra-variable index (mna_idx), so elements stamp in place into one
+    preallocated (G, I) pair instead of growing a copy of the matrix.
+
+    Node 0 (ground) keeps its row/column in the buffer and simply absorbs
+    the stamps that touch it. The reduced system is returned as a view
+    (G[1:, 1:], I[1:]), so no slice copy is made per assembly.
+
+    With sparse=True, G is never allocated densely: elements stamp into a
+    TripletMatrix and build() returns a scipy.sparse CSC matrix instead.
+
+    Resistors and capacitors of a columnar netlist (data.columns) are
+    stamped per column with one vectorized scatter-add each, into the
+    constant base (R) and the per-step base (C companion model). With
+    stamping="vectorized" the Resistor and Capacitor objects are stamped
+    the same way instead of one stamp call per element.
+
+    Two knobs serve the DC continuation methods (see engine.solve_dc):
+    gmin adds a shunt conductance from every node to ground, and
+    source_scale multiplies the independent sources (elements with
+    is_source). The defaults (0.0 and 1.0) leave the circuit unchanged.
+
+    Note: build() always returns the same buffers, so the result is only
+    valid until the next call.
+    """
+
+    def __init__(self, data, sparse: bool = False, stamping: str = "elements"):
+        if stamping not in STAMPING_BACKENDS:
+            raise ValueError(f"Backend de estampagem desconhecido: {stamping!r}. "
+                             f"Opções: {list(STAMPING_BACKENDS)}")
+        self.data = data
+        self.sparse = sparse
+        self.stamping = stamping
+        self.n_nodes = data.max_node + 1
+        self.n_total = _get_total_var_count(data)
+        self.mna_map = build_mna_index_map(data)
+
+        # First extra MNA variable of each element (None if not MNA)
+        self.mna_idx: List[Optional[int]] = [None] * len(data.elements)
+        for (elem_idx, _), global_idx in self.mna_map.items():
+            first = self.mna_idx[elem_idx]
+            if first is None or global_idx < first:
+                self.mna_idx[elem_idx] = global_idx
+
+        # Elements split by what their stamps depend on (StampKind)
+        kinds = [getattr(elem, "stamp_kind", StampKind.SOLUTION) for elem in data.elements]
+        self._const_idx = [i for i, kind in enumerate(kinds) if kind == StampKind.CONSTANT]
+        self._time_idx = [i for i, kind in enumerate(kinds) if kind == StampKind.TIME]
+        self._nl_idx = [i for i, kind in enumerate(kinds) if kind == StampKind.SOLUTION]
+        # TIME elements split again: independent sources are stamped apart
+        # so their right-hand side can be scaled (source stepping)
+        is_source = [getattr(data.elements[i], "is_source", False) for i in self._time_idx]
+        self._src_idx = [i for i, src in zip(self._time_idx, is_source) if src]
+        self._time_idx = [i for i, src in zip(self._time_idx, is_source) if not src]
+        # SOLUTION elements of classes with a bank (e.g. DiodeBank) are
+        # linearized together, one bank per class, and leave _nl_idx
+        groups: Dict[type, List[int]] = {}
+        for i in self._nl_idx:
+            if getattr(data.elements[i], "bank", None) is not None:
+                groups.setdefault(type(data.elements[i]), []).append(i)
+        groups = {cls: m for cls, m in groups.items() if len(m) >= BANK_MIN_SIZE}
+        self._banks = [_Bank(cls.bank([data.elements[i] for i in members]), members)
+                       for cls, members in groups.items()]
+        banked = {i for members in groups.values() for i in members}
+        self._nl_idx = [i for i in self._nl_idx if i not in banked]
+
+        # Linear two-terminal groups stamped with one vectorized scatter
+        # each: R with the CONSTANT stamps (conductance getter), C with the
+        # TIME ones (getter of their StateBlock in the StateStore)
+        self._lin_R: List[Tuple[_Scatter, Callable[[], np.ndarray]]] = []
+        self._lin_C: List[Tuple[_Scatter, Callable[[Any], Any]]] = []
+        # Columnar resistors/capacitors (data.columns)
+        self.columns = getattr(data, "columns", None)
+        if self.columns is not None:
+            R, C = self.columns["R"], self.columns["C"]
+            if len(R):
+                self._lin_R.append((_Scatter(R.a, R.b), lambda: 1.0 / R.value))
+            if len(C):
+                self._lin_C.append((_Scatter(C.a, C.b),
+                                    lambda states: getattr(states, "column_blocks", {}).get("C")))
+        # Vectorized backend: the plain Resistor/Capacitor objects leave the
+        # per-element lists (subclasses keep their own stamps)
+        if stamping == "vectorized":
+            elements = data.elements
+            r_idx = [i for i in self._const_idx if type(elements[i]) is Resistor]
+            c_idx = [i for i in self._time_idx if type(elements[i]) is Capacitor]
+            if r_idx:
+                self._const_idx = [i for i in self._const_idx if type(elements[i]) is not Resistor]
+                scatter = _Scatter(np.array([elements[i].a for i in r_idx], dtype=int),
+                                   np.array([elements[i].b for i in r_idx], dtype=int))
+                self._lin_R.append((scatter, lambda: 1.0 / np.array([elements[i].R for i in r_idx])))
+            if c_idx:
+                # Same rows as the Capacitor block of the StateStore
+                self._time_idx = [i for i in self._time_idx if type(elements[i]) is not Capacitor]
+                scatter = _Scatter(np.array([elements[i].a for i in c_idx], dtype=int),
+                                   np.array([elements[i].b for i in c_idx], dtype=int))
+                self._lin_C.append((scatter,
+                                    lambda states: getattr(states, "class_blocks", {}).get(Capacitor)))
+
+        # Continuation knobs (DC homotopy)
+        self.gmin = 0.0
+        self.source_scale = 1.0
+        self._node_range = range(1, self.n_nodes)
+
+        # Newton step limiting state of the elements with has_limiting
+        # (previous linearization voltages), kept across iterations and steps
+        self.lim_states: List[Optional[Dict[str, Any]]] = [
+            {} if getattr(elem, "has_limiting", False) else None for elem in data.elements
+        ]
+        # (banked elements keep their entry only as the limiting switch)
+        self._lim_idx = [i for i, st in enumerate(self.lim_states)
+                         if st is not None and i not in banked]
+
+        # Full buffers (with ground) and reduced views (without ground)
+        self._G: Union[np.ndarray, TripletMatrix]
+        if sparse:
+            # One triplet list: [CONSTANT | TIME | SOLUTION] stamps, truncated
+            # back to the cached prefix on every build
+            self._G = TripletMatrix(self.n_total)
+            self.G = None
+            self._n_const = 0
+            self._n_step = 0
+        else:
+            self._G = np.zeros((self.n_total, self.n_total))
+            self._G_const = np.zeros((self.n_total, self.n_total))
+            self._G_step = np.zeros((self.n_total, self.n_total))
+            self.G = self._G[1:, 1:]
+        self._I = np.zeros(self.n_total)
+        self._I_const = np.zeros(self.n_total)
+        self._I_step = np.zeros(self.n_total)
+        self._I_src = np.zeros(self.n_total)
+        # Precomputed source values (tabulate_sources): one row per source
+        # in _src_idx, one column per time point
+        self._src_table = np.zeros((len(self._src_idx), 0))
+        self._src_col: Dict[float, int] = {}
+        self._src_rhs = np.zeros((self.n_total, 0))
+        self._src_G = TripletMatrix(self.n_total)
+        self._const_key: Optional[str] = None
+        self._step_key: Optional[tuple] = None
+        self._x_full = np.zeros(self.n_total)
+        self.I = self._I[1:]
+
+    def build(
+        self,
+        x_guess_red: np.ndarray,
+        analysis_context: str,
+        t: float = 0.0,
+        dt: float = 0.0,
+        method: Optional[TimeMethod] = None,
+        states: Optional[Sequence[Any]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Same contract as engine._build_mna_system, but stamping in place.
+        Used as callback for newton_solve. states is indexed by element
+        (a StateStore in the solvers; a list of dicts also works).
+
+        Only the SOLUTION elements are stamped here; the rest comes from
+        the cached step base (see _step_base).
+        """
+        self._step_base(analysis_context, t, dt, method, states, with_G=True)
+        G, I = self._G, self._I
+        if self.sparse:
+            G.truncate(self._n_step)
+        else:
+            np.copyto(G, self._G_step)
+        np.copyto(I, self._I_step)
+
+        self._x_full[1:] = x_guess_red
+        for idx in self._lim_idx:
+            self.lim_states[idx]["limited"] = False
+        self._stamp(G, self._nl_idx, analysis_context, t, dt, method, states)
+        self._stamp_banks(G, self._I)
+
+        if self.gmin:
+            if self.sparse:
+                G.add_diagonal(self._node_range, self.gmin)
+            else:
+                nodes = self._node_range
+                G[nodes, nodes] += self.gmin
+
+        if self.sparse:
+            return G.to_csc(), self.I
+        return self.G, self.I
+
+    def build_rhs(
+        self,
+        x_guess_red: np.ndarray,
+        analysis_context: str,
+        t: float = 0.0,
+        dt: float = 0.0,
+        method: Optional[TimeMethod] = None,
+        states: Optional[Sequence[Any]] = None,
+    ) -> np.ndarray:
+        """
+        Only the right-hand side I of build(): G stamps are discarded.
+
+        For linear circuits with a fixed dt, G does not change between time
+        steps; only sources and element history (I) do, so the factorization
+        of the first G can be reused (see engine.solve_tran).
+        """
+        self._step_base(analysis_context, t, dt, method, states, with_G=False)
+        np.copyto(self._I, self._I_step)
+        self._x_full[1:] = x_guess_red
+        self._stamp(_DISCARD, self._nl_idx, analysis_context, t, dt, method, states)
+        self._stamp_banks(_DISCARD, self._I)
+        return self.I
+
+    def build_ac(self, x_op_red: np.ndarray):
+        """
+        Small-signal model at the DC operating point x_op_red (.AC): the
+        DC Jacobian G, the matrix C of the reactive stamps (stamp_ac) and
+        the complex excitation b of the AC sources, all without ground.
+        At angular frequency omega the system is (G + j*omega*C) x = b.
+        Dense arrays, or CSC matrices in sparse mode; G is a copy.
+        """
+        self.reset_limiting()
+        G, _ = self.build(x_op_red, analysis_context="DC")
+        G = G.copy()
+
+        C = TripletMatrix(self.n_total) if self.sparse else np.zeros((self.n_total, self.n_total))
+        b = np.zeros(self.n_total, dtype=complex)
+        for idx, elem in enumerate(self.data.elements):
+            k = self.mna_idx[idx]
+            if k is None:
+                elem.stamp_ac(C, b)
+            else:
+                elem.stamp_ac(C, b, mna_idx=k)
+        if self.columns is not None and len(self.columns["C"]):
+            cols = self.columns["C"]
+            _Scatter(cols.a, cols.b).add_G(C, cols.value)
+
+        C = C.to_csc() if self.sparse else C[1:, 1:]
+        return G, C, b[1:]
+
+    def limited(self) -> bool:
+        """True if the last build() limited any element's step (SPICE 'noncon')."""
+        return (any(self.lim_states[idx]["limited"] for idx in self._lim_idx)
+                or any(b.bank.limited for b in self._banks))
+
+    def reset_limiting(self) -> None:
+        """Forgets the previous linearization voltages (e.g. on a new guess)."""
+        for idx in self._lim_idx:
+            self.lim_states[idx].clear()
+        for b in self._banks:
+            b.bank.reset_limiting()
+
+    def invalidate(self) -> None:
+        """
+        Drops the cached CONSTANT/TIME stamps. Call it after changing
+        element parameters (values, gains, source levels) in place.
+        """
+        self._const_key = None
+        self._step_key = None
+        self._src_col = {}
+
+    def tabulate_sources(self, times) -> None:
+        """
+        Evaluates the independent sources at all the given TRAN time points
+        at once (get_values_at). Steps built at exactly one of these times
+        then stamp the sources from the table instead of evaluating each
+        waveform in Python.
+        """
+        times = np.asarray(times, dtype=float)
+        elements = self.data.elements
+        self._src_table = np.array(
+            [elements[idx].get_values_at(times) for idx in self._src_idx]
+        ).reshape(len(self._src_idx), len(times))
+        self._src_col = {t: j for j, t in enumerate(times.tolist())}
+
+        # Source stamps are linear in the value: a fixed G part, recorded
+        # once, plus value * (right-hand side of a unit source)
+        self._src_rhs = np.zeros((self.n_total, len(self._src_idx)))
+        self._src_G = TripletMatrix(self.n_total)
+        for row, idx in enumerate(self._src_idx):
+            elements[idx].stamp_value(self._src_G, self._src_rhs[:, row], 1.0, self.mna_idx[idx])
+        self._src_G_idx = (np.asarray(self._src_G.rows, dtype=int),
+                           np.asarray(self._src_G.cols, dtype=int))
+
+    # ------------------------------------------------------------
+    #        CACHED BASES: CONSTANT part, then CONSTANT + TIME
+    # ------------------------------------------------------------
+    def _const_base(self, analysis_context: str, dt, method, states) -> None:
+        """Stamps of the CONSTANT elements, once per analysis context."""
+        if self._const_key == analysis_context:
+            return
+        self._const_key = analysis_context
+        self._step_key = None
+
+        G = self._G
+        if self.sparse:
+            G.clear()
+        else:
+            G = self._G_const
+            G.fill(0.0)
+        I = self._I_const
+        I.fill(0.0)
+        self._stamp(G, self._const_idx, analysis_context, 0.0, dt, method, states, I=I)
+        for scatter, conductance in self._lin_R:
+            scatter.add_G(G, conductance())
+        if self.sparse:
+            self._n_const = len(G)
+
+    def _step_base(self, analysis_context: str, t, dt, method, states, with_G: bool) -> None:
+        """
+        CONSTANT + TIME stamps for one (t, dt, method): computed on the
+        first build of a time step and reused by every Newton iteration.
+        with_G=False only updates I (G stamps discarded).
+        """
+        if analysis_context == "TRAN" and (method is None or states is None):
+            raise ValueError("Análise TRAN requer 'method' e 'states'.")
+
+        self._const_base(analysis_context, dt, method, states)
+        key = (analysis_context, t, dt, method, id(states), with_G, self.source_scale)
+        if self._step_key == key:
+            return
+        self._step_key = key
+
+        if not with_G:
+            G = _DISCARD
+        elif self.sparse:
+            G = self._G
+            G.truncate(self._n_const)
+        else:
+            G = self._G_step
+            np.copyto(G, self._G_const)
+        I = self._I_step
+        np.copyto(I, self._I_const)
+        self._stamp(G, self._time_idx, analysis_context, t, dt, method, states, I=I)
+        if analysis_context == "TRAN":
+            # (capacitors are open circuits in DC)
+            for scatter, state_block in self._lin_C:
+                block = state_block(states)
+                if block is None:
+                    raise ValueError("Capacitores vetorizados requerem um StateStore em 'states'.")
+                Gc, Ieq = Capacitor.companion(block, dt, method)
+                scatter.add_I(I, Ieq)
+                if Gc is not None and G is not _DISCARD:
+                    scatter.add_G(G, Gc)
+        I_src = self._I_src
+        I_src.fill(0.0)
+        col = self._src_col.get(t) if analysis_context == "TRAN" else None
+        if col is None:
+            self._stamp(G, self._src_idx, analysis_context, t, dt, method, states, I=I_src)
+        else:
+            np.dot(self._src_rhs, self._src_table[:, col], out=I_src)
+            if with_G and self.sparse:
+                G.rows.extend(self._src_G.rows)
+                G.cols.extend(self._src_G.cols)
+                G.vals.extend(self._src_G.vals)
+            elif with_G:
+                np.add.at(G, self._src_G_idx, self._src_G.vals)
+        if self.source_scale != 1.0:
+            I_src *= self.source_scale
+        I += I_src
+        if with_G and self.sparse:
+            self._n_step = len(G)
+
+    def _stamp_banks(self, G, I) -> None:
+        """
+        Linearizes every bank at the current guess and scatters it: each
+        member is a two-terminal conductance Gd (a, b) with a Norton
+        current I_eq flowing from a to b.
+        """
+        for b in self._banks:
+            limit = self.lim_states[b.members[0]] is not None
+            g, i_eq = b.bank.linearize(self._x_full, limit)
+            # Norton current I_eq flows from a to b
+            b.scatter.add_I(I, -i_eq)
+            if G is not _DISCARD:
+                b.scatter.add_G(G, g)
+
+    def _stamp(self, G, indices, analysis_context, t, dt, method, states, I=None) -> None:
+        """Stamps the elements in indices into (G, I); I defaults to the output buffer."""
+        if I is None:
+            I = self._I
+        x_full = self._x_full
+        elements = self.data.elements
+
+        for idx in indices:
+            elem = elements[idx]
+            k = self.mna_idx[idx]
+
+            # Extra keyword arguments only for the elements that take them
+            kwargs = {}
+            if k is not None:
+                kwargs["mna_idx"] = k
+            lim_state = self.lim_states[idx]
+            if lim_state is not None:
+                kwargs["lim_state"] = lim_state
+
+            if analysis_context == "TRAN":
+                # Redundant, but for the Type Checker.
+                if method is None or states is None:
+                    raise ValueError("Análise TRAN requer 'method' e 'states'.")
+
+                # The history is advanced by the StateStore after each
+                # accepted step, never by the stamps
+                elem.stamp_transient(G, I, states[idx], t, dt, method, x_full, **kwargs)
+
+            elif analysis_context == "DC":
+                elem.stamp_dc(G, I, x_full, **kwargs)
@@ -0,0 +1,389 @@
+from __future__ import annotations
+import dataclasses
+import numpy as np
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .assembly import CompiledCircuit, build_mna_index_map, _get_total_var_count
+from .circuit import NetlistOOP
+from .columnar import ColumnarNetlist
+from .elements.base import Element, TimeMethod
+from .engine import (
+    solve_dc,
+    _companion_key,
+    _fixed_schedule,
+    _source_breakpoints,
+    _LINEAR_LU_CACHE,
+)
+from .linsolve import DenseLU
+from .state import StateStore
+
+# Element fields holding node numbers, renumbered per instance when merging
+_NODE_FIELDS = ("a", "b", "c", "d")
+
+
+def merge_instances(instances: Sequence[NetlistOOP]) -> NetlistOOP:
+    """
+    One netlist holding all the instances side by side: instance k keeps
+    its elements, with every node j > 0 renumbered to k * max_node + j
+    (ground is shared). The instances must have the same element classes
+    in the same order (columnar rows included) and the same node count.
+    """
+    first = instances[0]
+    classes = [type(e) for e in first.elements]
+    rows = _column_rows(first)
+    for k, data in enumerate(instances[1:], 1):
+        if ([type(e) for e in data.elements] != classes or data.max_node != first.max_node
+                or _column_rows(data) != rows):
+            raise ValueError(f"A instância {k} do lote não tem a topologia da instância 0 "
+                             f"(mesmos elementos, na mesma ordem, e mesmo número de nós).")
+
+    n = first.max_node
+    elements: List[Element] = []
+    columns = None if first.columns is None else ColumnarNetlist()
+    for k, data in enumerate(instances):
+        offset = k * n
+        elements.extend(_renumber(elem, offset) for elem in data.elements)
+        if columns is not None:
+            for kind, table in data.columns.tables.items():
+                columns[kind].extend(table.names, _shift(table.a, offset), _shift(table.b, offset),
+                                     table.value, table.ic)
+
+    return dataclasses.replace(
+        first, elements=elements, max_node=n * len(instances), columns=columns, step=None,
+        has_nonlinear_elements=any(data.has_nonlinear_elements for data in instances),
+    )
+
+
+def _column_rows(data: NetlistOOP) -> Optional[Tuple[int, ...]]:
+    if data.columns is None:
+        return None
+    return tuple(len(table) for table in data.columns.tables.values())
+
+
+def _renumber(elem: Element, offset: int) -> Element:
+    nodes = {f: getattr(elem, f) + offset for f in _NODE_FIELDS if getattr(elem, f, 0)}
+    return dataclasses.replace(elem, **nodes) if nodes else elem
+
+
+def _shift(nodes: np.ndarray, offset: int) -> np.ndarray:
+    return np.where(nodes > 0, nodes + offset, 0)
+
+
+class BatchedCircuit:
+    """
+    Several instances of one circuit topology (e.g. the points of a
+    parameter sweep) assembled and solved together.
+
+    The instances are merged into one netlist (merge_instances), compiled
+    once in sparse mode with the vectorized R/C stamping, so a single
+    build stamps every instance; the device banks (diodes, PWL resistors)
+    then linearize the same device of all the instances in one call. The
+    merged system is block diagonal, and build() scatters its blocks into
+    a (batch, n, n) stack of dense matrices (n = unknowns per instance,
+    ground excluded) that np.linalg.solve factors in one batched call.
+
+    Per-instance vectors are (batch, n) arrays in the local MNA layout of
+    the instances (build_mna_index_map of instance 0).
+    """
+
+    def __init__(self, instances: Sequence[NetlistOOP]):
+        if not len(instances):
+            raise ValueError("Lote sem instâncias.")
+        self.instances = list(instances)
+        self.n_batch = len(self.instances)
+        self.data = merge_instances(self.instances)
+        self.compiled = CompiledCircuit(self.data, sparse=True, stamping="vectorized")
+        self.n_total = _get_total_var_count(self.instances[0])
+
+        # Merged (reduced) index of every local (reduced) index of each instance
+        self.index = self._layout()[:, 1:] - 1
+        n = self.n_total - 1
+        self._inst = np.empty(self.n_batch * n, dtype=np.int64)
+        self._local = np.empty(self.n_batch * n, dtype=np.int64)
+        self._inst[self.index] = np.arange(self.n_batch)[:, None]
+        self._local[self.index] = np.arange(n)
+        self._x = np.zeros(self.n_batch * n)
+        # (CSC indices of the merged G, their positions in the flat stack)
+        self._pattern: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._G = np.zeros((self.n_batch, n, n))
+
+    def _layout(self) -> np.ndarray:
+        """(batch, n_total) merged full index of each local full index."""
+        first = self.instances[0]
+        n_nodes, n_elems = first.max_node, len(first.elements)
+        layout = np.zeros((self.n_batch, self.n_total), dtype=np.int64)
+        layout[:, 1:n_nodes + 1] = np.arange(self.n_batch)[:, None] * n_nodes + np.arange(1, n_nodes + 1)
+        merged = self.compiled.mna_map
+        for (elem_idx, key), idx in build_mna_index_map(first).items():
+            layout[:, idx] = [merged[(k * n_elems + elem_idx, key)] for k in range(self.n_batch)]
+        return layout
+
+    def merged(self, x: np.ndarray) -> np.ndarray:
+        """Merged full vector (with ground) of the (batch, n) vectors x."""
+        x_full = np.zeros(len(self._x) + 1)
+        x_full[1:][self.index] = x
+        return x_full
+
+    def build(self, x: np.ndarray, analysis_context: str, **kwargs) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (G, I) stacks, (batch, n, n) and (batch, n), linearized at the
+        (batch, n) guesses x. kwargs (t, dt, method, states) go to
+        CompiledCircuit.build. G is a buffer reused by the next call.
+        """
+        self._x[self.index] = x
+        G, I = self.compiled.build(self._x, analysis_context=analysis_context, **kwargs)
+        return self._stack(G), I[self.index]
+
+    def build_rhs(self, x: np.ndarray, analysis_context: str, **kwargs) -> np.ndarray:
+        """Only the I stack of build() (see CompiledCircuit.build_rhs)."""
+        self._x[self.index] = x
+        return self.compiled.build_rhs(self._x, analysis_context=analysis_context, **kwargs)[self.index]
+
+    def limited(self) -> bool:
+        return self.compiled.limited()
+
+    def reset_limiting(self) -> None:
+        self.compiled.reset_limiting()
+
+    def _stack(self, G) -> np.ndarray:
+        # The CSC index arrays are shared while the sparsity pattern holds,
+        # so the scatter positions are only recomputed when it changes
+        if self._pattern is None or self._pattern[0] is not G.indices:
+            n = self.n_total - 1
+            rows = G.indices
+            cols = np.repeat(np.arange(G.shape[1]), np.diff(G.indptr))
+            inst = self._inst[rows]
+            flat = (inst * n + self._local[rows]) * n + self._local[cols]
+            self._pattern = (G.indices, flat)
+            self._G = np.zeros_like(self._G)
+        self._G.reshape(-1)[self._pattern[1]] = G.data
+        return self._G
+
+
+def _residual(G: np.ndarray, x: np.ndarray, I: np.ndarray) -> np.ndarray:
+    return np.matmul(G, x[..., None])[..., 0] - I
+
+
+def newton_batch(
+    build_mna: Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]],
+    x0: np.ndarray,
+    tol: float = 1e-6,
+    max_iter: int = 50,
+    is_limited: Optional[Callable[[], bool]] = None,
+    damping: bool = True,
+    max_backtracks: int = 8,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Newton-Raphson on a batch of systems in lockstep (see newton_solve).
+
+    build_mna maps the (batch, n) guesses to the (G, I) stacks. Every
+    iteration builds all the instances, but only those not yet converged
+    (inf-norm of G x - I below tol, no element limited) take a step; their
+    Newton systems are solved with one batched np.linalg.solve. With
+    damping, each instance halves its own step until its residual 2-norm
+    decreases.
+
+    Returns (x, converged mask). There are no random retries: the caller
+    decides what to do with the instances left unconverged.
+    """
+    x = x0.copy()
+    done = np.zeros(len(x), dtype=bool)
+    pending = None  # (G, I, R) already built at x by the line search
+    for _ in range(max_iter):
+        if pending is not None:
+            G, I, R = pending
+        else:
+            G, I = build_mna(x)
+            R = _residual(G, x, I)
+        if not (is_limited is not None and is_limited()):
+            done |= np.max(np.abs(R), axis=1, initial=0.0) < tol
+        if done.all():
+            break
+
+        active = np.flatnonzero(~done)
+        try:
+            delta = np.linalg.solve(G[active], -R[active][..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            break  # a singular instance: the active ones stay unconverged
+
+        if damping:
+            pending = _backtrack_batch(build_mna, x, active, delta, R, max_backtracks, is_limited)
+        else:
+            x[active] += delta
+            pending = None
+    return x, done
+
+
+def _backtrack_batch(
+    build_mna: Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]],
+    x: np.ndarray,
+    active: np.ndarray,
+    delta: np.ndarray,
+    R: np.ndarray,
+    max_backtracks: int,
+    is_limited: Optional[Callable[[], bool]],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per-instance backtracking (see newton._backtrack): x[active] is moved
+    in place; an instance stops halving once its residual decreases, and
+    takes the full step if no step length does. The (G, I, R) built at
+    the final x is returned.
+    """
+    norm_k = np.linalg.norm(R[active], axis=1)
+    x_k = x[active]
+    alpha = np.ones(len(active))
+    searching = np.ones(len(active), dtype=bool)
+    for _ in range(max_backtracks + 1):
+        x[active[searching]] = x_k[searching] + alpha[searching, None] * delta[searching]
+        G, I = build_mna(x)
+        R_new = _residual(G, x, I)
+        if is_limited is not None and is_limited():
+            return G, I, R_new
+        searching &= np.linalg.norm(R_new[active], axis=1) > (1.0 - 1e-4 * alpha) * norm_k
+        if not searching.any():
+            return G, I, R_new
+        alpha[searching] *= 0.5
+    x[active[searching]] = x_k[searching] + delta[searching]
+    G, I = build_mna(x)
+    return G, I, _residual(G, x, I)
+
+
+def _solve(G: np.ndarray, I: np.ndarray) -> np.ndarray:
+    return np.linalg.solve(G, I[..., None])[..., 0]
+
+
+class _StackLU:
+    """
+    LU factors (LAPACK getrf) of every matrix of a (batch, n, n) stack,
+    for repeated solves with new right-hand sides (getrs per instance).
+    """
+
+    def __init__(self, G: np.ndarray):
+        self.factors = [DenseLU(g) for g in G]
+
+    def solve(self, I: np.ndarray) -> np.ndarray:
+        return np.stack([lu.solve(b) for lu, b in zip(self.factors, I)])
+
+
+def solve_batch_dc(instances: Sequence[NetlistOOP], nr_tol: float = 1e-8, desired_nodes=None,
+                   max_nr_iter: int = 50, max_nr_guesses: int = 100) -> np.ndarray:
+    """
+    DC operating point of every instance (see BatchedCircuit), as a
+    (batch, len(desired_nodes)) array; desired_nodes defaults to all the
+    nodes but ground.
+
+    Nonlinear circuits run newton_batch from zero; an instance that does
+    not converge there is solved alone by engine.solve_dc, with its
+    homotopy and random guesses.
+    """
+    batch = BatchedCircuit(instances)
+    if desired_nodes is None:
+        desired_nodes = list(range(1, instances[0].max_node + 1))
+    x = np.zeros((batch.n_batch, batch.n_total))
+
+    if batch.data.has_nonlinear_elements:
+        print(f"[DC Analysis] Using lockstep Newton-Raphson ({batch.n_batch} instances)")
+
+        def build_mna(x_red: np.ndarray):
+            return batch.build(x_red, "DC")
+
+        x[:, 1:], done = newton_batch(build_mna, x[:, 1:], tol=nr_tol, max_iter=max_nr_iter,
+                                      is_limited=batch.limited)
+        for k in np.flatnonzero(~done):
+            try:
+                x[k] = solve_dc(instances[k], nr_tol, None, None, max_nr_iter, max_nr_guesses)
+            except RuntimeError as e:
+                raise RuntimeError(f"Instância {k} do lote: {e}") from e
+    else:
+        print(f"[DC Analysis] Using batched direct solve ({batch.n_batch} instances)")
+        try:
+            x[:, 1:] = _solve(*batch.build(x[:, 1:], "DC"))
+        except np.linalg.LinAlgError as e:
+            raise RuntimeError(f"Solução direta falhou na análise DC do lote: {e}") from e
+
+    return x[:, np.asarray(desired_nodes, dtype=int)]
+
+
+def solve_batch_tran(
+    instances: Sequence[NetlistOOP],
+    total_time: float,
+    dt: float,
+    nr_tol: float,
+    desired_nodes,
+    method: TimeMethod,
+    max_nr_iter: int = 50,
+    internal_steps: int = 1,
+    breakpoints: bool = True,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fixed-step transient of every instance (see BatchedCircuit and
+    engine.solve_tran), stepped together on one time grid.
+
+    Returns (times, out), out being (batch, len(desired_nodes), steps).
+    The steps land on the breakpoints of all the instances, so instances
+    whose sources differ in timing get a few extra points compared with a
+    run of their own.
+
+    Nonlinear circuits take every time point with newton_batch; an
+    instance left unconverged raises RuntimeError (no random retries).
+    Linear ones factor the G stack once per companion key and only rebuild
+    the right-hand side and back-substitute.
+    """
+    if total_time <= 0.0 or dt <= 0.0:
+        raise ValueError("total_time and dt must be positive for TRAN analysis.")
+    if internal_steps < 1:
+        raise ValueError(f"internal_steps deve ser >= 1 (recebido: {internal_steps}).")
+    h = dt / internal_steps
+    steps = int(total_time / dt) + 1
+    times = np.linspace(0.0, total_time, steps)
+
+    batch = BatchedCircuit(instances)
+    states = StateStore(batch.data)
+    bps = _source_breakpoints(batch.data, total_time) if breakpoints else np.empty(0)
+    desired_idx = np.asarray(desired_nodes, dtype=int)
+    nonlinear = batch.data.has_nonlinear_elements
+    print(f"[TRAN Analysis] {batch.n_batch} instances in lockstep "
+          f"({'Newton-Raphson' if nonlinear else 'direct solve'})")
+
+    x = np.zeros((batch.n_batch, batch.n_total))
+    out = np.zeros((batch.n_batch, len(desired_idx), steps))
+    schedule = _fixed_schedule(times, internal_steps, h, bps)
+    batch.compiled.tabulate_sources([t for t, _, _ in schedule])
+    # LU factors of the G stack of a linear circuit by companion key (as the LU cache of solve_tran)
+    linear_lus: Dict[object, _StackLU] = {}
+
+    for t, h_step, ti in schedule:
+        step = dict(t=t, dt=h_step, method=method, states=states)
+        if nonlinear:
+            def build_mna(x_red: np.ndarray):
+                return batch.build(x_red, "TRAN", **step)
+
+            x[:, 1:], done = newton_batch(build_mna, x[:, 1:], tol=nr_tol, max_iter=max_nr_iter,
+                                          is_limited=batch.limited)
+            if not done.all():
+                raise RuntimeError(f"NR não convergiu em t={t:.5e}s na análise transiente do lote "
+                                   f"(instâncias {np.flatnonzero(~done).tolist()}).")
+        else:
+            key = _companion_key(states, h_step, method)
+            try:
+                linear_lu = linear_lus.pop(key, None)
+                if linear_lu is None:
+                    G, I = batch.build(x[:, 1:], "TRAN", **step)
+                    linear_lu = _StackLU(G)
+                    if len(linear_lus) >= _LINEAR_LU_CACHE:
+                        del linear_lus[next(iter(linear_lus))]
+                else:
+                    I = batch.build_rhs(x[:, 1:], "TRAN", **step)
+                linear_lus[key] = linear_lu  # most recently used last
+                x[:, 1:] = linear_lu.solve(I)
+            except np.linalg.LinAlgError as e:
+                raise RuntimeError(
+                    f"Solução direta falhou em t={t:.5e}s na análise transiente do lote: {e}"
+                ) from e
+
+        states.update(batch.merged(x[:, 1:]), h_step, method)
+        if ti >= 0:
+            out[:, :, ti] = x[:, desired_idx]
+
+    return times, out
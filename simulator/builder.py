@@ -6,6 +6,7 @@ from typing import List
 import numpy as np  # para NonLinearResistor
 
 from .parser import NetlistOOP, TransientSettings
+from .columnar import ColumnarNetlist
 
 from .elements.base import Element
 from .elements.resistor import Resistor
@@ -42,6 +43,8 @@ class CircuitBuilder:
 
     elements: List[Element] = field(default_factory=list)
     transient: TransientSettings = field(default_factory=TransientSettings)
+    # Resistors/capacitors added in bulk (add_resistors/add_capacitors)
+    columns: ColumnarNetlist = field(default_factory=ColumnarNetlist)
 
     def rename(self, new_name: str):
         self.name = new_name
@@ -66,6 +69,26 @@ class CircuitBuilder:
         self.elements.append(Capacitor("C"+str(self.C_count), a, b, C, ic))
         self._update_max_node(a, b)
 
+    def add_resistors(self, a, b, R):
+        """Many resistors at once (arrays a, b, R), stored as columns: no object per element."""
+        self._add_columns("R", a, b, R, None)
+
+    def add_capacitors(self, a, b, C, ic=None):
+        """Many capacitors at once (arrays a, b, C[, ic]), stored as columns."""
+        self._add_columns("C", a, b, C, ic)
+
+    def _add_columns(self, kind: str, a, b, value, ic):
+        a = np.atleast_1d(np.asarray(a, dtype=int))
+        b = np.atleast_1d(np.asarray(b, dtype=int))
+        n = len(a)
+        if n == 0:
+            return
+        count = getattr(self, kind + "_count")
+        names = [kind + str(count + k) for k in range(1, n + 1)]
+        self.columns[kind].extend(names, a, b, value, ic)
+        setattr(self, kind + "_count", count + n)
+        self._update_max_node(int(a.max()), int(b.max()))
+
     def add_inductor(self, a: int, b: int, L: float, ic: float = 0.0):
         """Inductor: L [<node a> <node b> <L> <ic>"""
         self.L_count += 1
@@ -292,13 +315,14 @@ class CircuitBuilder:
 
         self.elements.pop(index - 1)
 
-        # Recalcula max_node com base nos elementos restantes
+        # Recalcula max_node com base nos elementos restantes (e nas colunas)
         if self.elements:
             self.max_node = max(
                 max(getattr(e, "a", 0), getattr(e, "b", 0)) for e in self.elements
             )
         else:
             self.max_node = 0
+        self.max_node = max(self.max_node, self.columns.max_node())
 
         return True
 
@@ -538,6 +562,15 @@ class CircuitBuilder:
                 # Não impede salvar o arquivo, só documenta o elemento
                 lines.append(f"* Elemento não suportado na exportação: {elem}")
 
+        # ----------------- RESISTORES/CAPACITORES EM COLUNAS -----------------
+        R = self.columns["R"]
+        for name, a, b, val in zip(R.names, R.a.tolist(), R.b.tolist(), R.value.tolist()):
+            lines.append(f"{name} {a} {b} {val}")
+        C = self.columns["C"]
+        for name, a, b, val, ic in zip(C.names, C.a.tolist(), C.b.tolist(), C.value.tolist(),
+                                       C.ic.tolist()):
+            lines.append(f"{name} {a} {b} {val}" + (f" IC={ic}" if ic else ""))
+
         # ----------------- LINHA .TRAN (se transiente habilitado) -----------------
         if self.transient.enabled:
             t_stop = self.transient.t_stop
@@ -562,4 +595,5 @@ class CircuitBuilder:
             elements=self.elements.copy(),
             max_node=self.max_node,
             transient=self.transient,
+            columns=self.columns.copy() if len(self.columns) else None,
         )
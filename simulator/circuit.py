@@ -2,27 +2,54 @@ from __future__ import annotations
 import numpy as np
 
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional, TYPE_CHECKING
 
-from .engine import solve_dc, solve_tran
+from .engine import solve_ac, solve_dc, solve_dc_sweep, solve_tran, ac_frequencies, DC_HOMOTOPY
+from . import result_cache
 from .elements.base import TimeMethod
 from .elements.base import Element
 
+if TYPE_CHECKING:
+    from .columnar import ColumnarNetlist
+
 @dataclass
 class TransientSettings:
     enabled: bool = False   # [1]
     t_stop: float = 0.0     # [2]
     dt: float = 0.0         # [3]
-    method: str = "BE"      # [4] BE, FE or TRAP
+    method: str = "BE"      # [4] BE, FE, TRAP or GEAR2
     intetnal_steps: int = 0 # [5] 
     uic: bool = True        # [6] use initial conditions: Optional
 
+@dataclass
+class StepSettings:
+    param: str = ""         # "R1" (its value_attr) or "V1.amp", "V1.amplitude", ...
+    values: List[float] = field(default_factory=list)
+
+@dataclass
+class DCSweepSettings:
+    source: str = ""        # swept independent source (V1, I2, ...)
+    start: float = 0.0
+    stop: float = 0.0
+    step: float = 0.0
+
+@dataclass
+class ACSettings:
+    sweep: str = "DEC"      # DEC, OCT (points per decade/octave) or LIN (points in total)
+    points: int = 10
+    fstart: float = 1.0
+    fstop: float = 1.0
+
 @dataclass
 class NetlistOOP:
     elements: List[Element]
     max_node: int
     transient: TransientSettings = field(default_factory=TransientSettings)
     has_nonlinear_elements: bool = False  # True if circuit contains nonlinear elements
+    columns: Optional[ColumnarNetlist] = None  # Resistors/capacitors kept as arrays (large netlists)
+    step: Optional[StepSettings] = None  # .STEP parameter sweep (Circuit.sweep)
+    dc_sweep: Optional[DCSweepSettings] = None  # .DC source sweep (Circuit.run_dc_sweep)
+    ac: Optional[ACSettings] = None  # .AC small-signal analysis (Circuit.run_ac)
 
 class Circuit:
     def __init__(self, data: NetlistOOP):
@@ -32,7 +59,9 @@ class Circuit:
 
     # ------------------------ DC ------------------------
     def run_dc(self, desired_nodes=None, nr_tol: float = 1e-8, v0_vector=None,
-               max_nr_iter: int = 50, max_nr_guesses: int = 100):
+               max_nr_iter: int = 50, max_nr_guesses: int = 100,
+               sparse: bool | None = None, nr_strategy: str = "newton",
+               homotopy=DC_HOMOTOPY, stamping: str = "elements", cache: bool = True):
         """        
         desired_nodes : List[int], optional
             Nodes to include in output
@@ -44,6 +73,22 @@ class Circuit:
             Maximum NR iterations per guess (N, typically 20-50)
         max_nr_guesses : int
             Maximum number of random guess attempts (M, typically 100)
+        sparse : bool | None
+            Use sparse MNA matrices + sparse LU. None chooses automatically
+            from the node count (large netlists go sparse).
+        nr_strategy : str
+            "newton" (full Newton), "chord" (reuses the LU of an earlier
+            Jacobian) or "broyden" (chord + rank-1 updates)
+        homotopy : sequence of str
+            Continuation methods tried, in order, before random guesses
+            when Newton fails: "gmin" and/or "source" (default: both)
+        stamping : str
+            "elements" (stamp call per Resistor/Capacitor) or "vectorized"
+            (all of them in one scatter per class)
+        cache : bool
+            Reuse the stored result of an identical run (same netlist,
+            arguments and engine) when the result cache is enabled (see
+            result_cache.enable). False always solves.
         """
         n = self.data.max_node + 1
         
@@ -53,14 +98,141 @@ class Circuit:
         if v0_vector is None:
             v0_vector = np.zeros(n)
 
-        return solve_dc(
+        store, key, hit = self._cache_lookup("dc", cache, dict(
+            desired_nodes=list(desired_nodes), nr_tol=nr_tol,
+            v0_vector=np.asarray(v0_vector, dtype=float), max_nr_iter=max_nr_iter,
+            max_nr_guesses=max_nr_guesses, sparse=sparse, nr_strategy=nr_strategy,
+            homotopy=tuple(homotopy), stamping=stamping))
+        if hit is not None:
+            return hit["out"]
+
+        out = solve_dc(
             self.data,
             nr_tol,
             v0_vector,
             desired_nodes,
             max_nr_iter,
-            max_nr_guesses
+            max_nr_guesses,
+            sparse=sparse,
+            nr_strategy=nr_strategy,
+            homotopy=homotopy,
+            stamping=stamping,
+        )
+        if store is not None:
+            store.store(key, {"out": out})
+        return out
+
+    def run_dc_sweep(self, source: str | None = None, start: float | None = None,
+                     stop: float | None = None, step: float | None = None,
+                     desired_nodes=None, nr_tol: float = 1e-8,
+                     max_nr_iter: int = 50, max_nr_guesses: int = 100,
+                     sparse: bool | None = None, nr_strategy: str = "newton",
+                     homotopy=DC_HOMOTOPY, stamping: str = "elements",
+                     extrapolate: bool = True):
+        """
+        DC sweep (transfer curve): the operating point for each value of
+        an independent source, from start to stop (included) by step.
+        Missing arguments come from the netlist .DC line.
+
+        The circuit is compiled once for the whole sweep and each point's
+        Newton starts from the previous solution, linearly extrapolated
+        through the last two points when extrapolate=True. Other
+        parameters as in run_dc.
+
+        Returns
+        -------
+        values : np.ndarray
+            Source values of the points.
+        out : np.ndarray
+            Matrix of node voltages (len(desired_nodes) x points).
+        """
+        settings = self.data.dc_sweep
+        if source is None:
+            if settings is None:
+                raise ValueError("Sem varredura DC: passe 'source', 'start', 'stop' e 'step' "
+                                 "ou inclua uma linha .DC na netlist.")
+            source = settings.source
+        if settings is not None and source.upper() == settings.source.upper():
+            start = settings.start if start is None else start
+            stop = settings.stop if stop is None else stop
+            step = settings.step if step is None else step
+        if start is None or stop is None or step is None:
+            raise ValueError(f"Varredura DC de '{source}' requer start, stop e step.")
+        if step == 0.0 or (stop - start) / step < 0.0:
+            raise ValueError(f"Passo {step:g} não leva {start:g} a {stop:g} na varredura DC.")
+
+        if desired_nodes is None:
+            desired_nodes = list(range(1, self.data.max_node + 1))
+        values = start + step * np.arange(int(np.floor((stop - start) / step + 1e-9)) + 1)
+
+        out = solve_dc_sweep(
+            self.data,
+            source,
+            values,
+            nr_tol,
+            desired_nodes,
+            max_nr_iter,
+            max_nr_guesses,
+            sparse=sparse,
+            nr_strategy=nr_strategy,
+            homotopy=homotopy,
+            stamping=stamping,
+            extrapolate=extrapolate,
         )
+        return values, out
+
+    # ------------------------ AC ------------------------
+    def run_ac(self, sweep: str | None = None, points: int | None = None,
+               fstart: float | None = None, fstop: float | None = None,
+               desired_nodes=None, source: str | None = None, nr_tol: float = 1e-8,
+               max_nr_iter: int = 50, max_nr_guesses: int = 100,
+               sparse: bool | None = None, nr_strategy: str = "newton",
+               homotopy=DC_HOMOTOPY, stamping: str = "elements"):
+        """
+        Small-signal AC analysis (frequency response) at the DC operating
+        point. The sweep ("DEC", "OCT" or "LIN"), points, fstart and fstop
+        default to the netlist .AC line.
+
+        The AC sources (amplitude and phase) drive the circuit; with
+        source="V1" only that independent source does, with amplitude 1,
+        so out is the transfer function from it. Other parameters as in
+        run_dc.
+
+        Returns
+        -------
+        frequencies : np.ndarray
+            Frequencies of the points (Hz).
+        out : np.ndarray
+            Complex matrix of node voltage phasors (len(desired_nodes) x points).
+        """
+        settings = self.data.ac
+        if settings is None and None in (sweep, points, fstart, fstop):
+            raise ValueError("Sem análise AC: passe 'sweep', 'points', 'fstart' e 'fstop' "
+                             "ou inclua uma linha .AC na netlist.")
+        if settings is not None:
+            sweep = settings.sweep if sweep is None else sweep
+            points = settings.points if points is None else points
+            fstart = settings.fstart if fstart is None else fstart
+            fstop = settings.fstop if fstop is None else fstop
+
+        if desired_nodes is None:
+            desired_nodes = list(range(1, self.data.max_node + 1))
+        frequencies = ac_frequencies(sweep, points, fstart, fstop)
+
+        out = solve_ac(
+            self.data,
+            frequencies,
+            nr_tol,
+            desired_nodes,
+            source,
+            max_nr_iter,
+            max_nr_guesses,
+            sparse=sparse,
+            nr_strategy=nr_strategy,
+            homotopy=homotopy,
+            stamping=stamping,
+        )
+        return frequencies, out
 
     # --------------------- TRANSIENT ---------------------
     def run_tran(
@@ -71,6 +243,17 @@ class Circuit:
         method: str | TimeMethod | None = None,
         nr_tol: float = 1e-8,
         v0_vector=None,
+        sparse: bool | None = None,
+        nr_strategy: str = "newton",
+        adaptive: bool = False,
+        reltol: float = 1e-3,
+        abstol: float = 1e-6,
+        dt_min: float | None = None,
+        dt_max: float | None = None,
+        internal_steps: int | None = None,
+        breakpoints: bool = True,
+        stamping: str = "elements",
+        cache: bool = True,
     ):
         """
         Run transient analysis using the netlist's transient settings
@@ -91,6 +274,35 @@ class Circuit:
             Newton-Raphson tolerance.
         v0_vector : np.ndarray | None
             Initial guess for node voltages + MNA variables (optional).
+        sparse : bool | None
+            Use sparse MNA matrices + sparse LU. None chooses automatically
+            from the node count (large netlists go sparse).
+        nr_strategy : str
+            "newton" (full Newton), "chord" or "broyden". Chord and Broyden
+            keep the factorized Jacobian across time steps, refreshing it
+            when convergence slows down.
+        adaptive : bool
+            Adaptive internal time step controlled by the local truncation
+            error of capacitors/inductors. The result is still reported on
+            the dt grid (interpolated).
+        reltol, abstol : float
+            Relative/absolute LTE tolerances of the adaptive step.
+        dt_min, dt_max : float | None
+            Bounds of the adaptive step (default: dt/1000 and
+            total_time/50).
+        internal_steps : int | None
+            Integration steps per output sample: the circuit is integrated
+            with dt/internal_steps, but only every internal_steps-th point
+            is stored. If None, uses self.data.transient.intetnal_steps.
+        breakpoints : bool
+            End a time step exactly on every corner of the PULSE/SIN
+            sources (the output grid is unchanged).
+        stamping : str
+            Assembly backend of the Resistor/Capacitor objects: "elements"
+            or "vectorized" (see run_dc).
+        cache : bool
+            Reuse the stored result of an identical run when the result
+            cache is enabled (see run_dc).
 
         Returns
         -------
@@ -105,6 +317,87 @@ class Circuit:
             # by default, use all physical nodes except ground (0)
             desired_nodes = list(range(1, self.data.max_node + 1))
 
+        total_time, dt, method, internal_steps = self.tran_settings(
+            total_time, dt, method, internal_steps)
+
+        # --------- stored result of an identical run ---------
+        store, key, hit = self._cache_lookup("tran", cache, dict(
+            desired_nodes=list(desired_nodes), total_time=total_time, dt=dt, method=method,
+            internal_steps=internal_steps, nr_tol=nr_tol,
+            v0_vector=None if v0_vector is None else np.asarray(v0_vector, dtype=float),
+            sparse=sparse, nr_strategy=nr_strategy, adaptive=adaptive, reltol=reltol,
+            abstol=abstol, dt_min=dt_min, dt_max=dt_max, breakpoints=breakpoints,
+            stamping=stamping))
+
+        # --------- call engine solver ---------
+        if hit is not None:
+            times, out = hit["times"], hit["out"]
+            current_traces = dict(zip(hit["trace_names"].tolist(), hit["traces"]))
+        else:
+            times, out, current_traces = solve_tran(
+                self.data,
+                total_time=total_time,
+                dt=dt,
+                nr_tol=nr_tol,
+                v0_vector=v0_vector,
+                desired_nodes=desired_nodes,
+                method=method,
+                sparse=sparse,
+                nr_strategy=nr_strategy,
+                adaptive=adaptive,
+                reltol=reltol,
+                abstol=abstol,
+                dt_min=dt_min,
+                dt_max=dt_max,
+                internal_steps=internal_steps,
+                breakpoints=breakpoints,
+                stamping=stamping,
+            )
+            if store is not None:
+                store.store(key, {
+                    "times": times, "out": out,
+                    "trace_names": np.array(list(current_traces), dtype=str),
+                    "traces": np.array(list(current_traces.values()), dtype=float).reshape(
+                        len(current_traces), len(times)),
+                })
+
+        # --------- build signal dictionary: nodes + currents ---------
+        signals: dict[str, np.ndarray] = {}
+
+        # Node voltages
+        for j, node in enumerate(desired_nodes):
+            signals[f"Node_{node}"] = out[j, :]
+
+        # Currents from engine (inductors, voltage sources, controlled sources, opamp, etc.)
+        signals.update(current_traces)
+
+        # --------- store for later use (.sim export, plotting, etc.) ---------
+        self.last_tran_time = times
+        self.last_tran_signals = signals
+
+        return times, out
+
+    def _cache_lookup(self, analysis: str, cache: bool, settings: dict):
+        """
+        (cache, key, stored arrays) of a run: the arrays are None on a miss,
+        and everything is None when the result cache is off.
+        """
+        store = result_cache.active() if cache else None
+        if store is None:
+            return None, None, None
+        key = result_cache.result_key(analysis, self.data, settings)
+        hit = store.load(key)
+        if hit is not None:
+            print(f"[Result Cache] Reusing stored {analysis.upper()} result {key[:12]}")
+        return store, key, hit
+
+    def tran_settings(self, total_time: float | None = None, dt: float | None = None,
+                      method: str | TimeMethod | None = None, internal_steps: int | None = None):
+        """
+        (total_time, dt, method, internal_steps) of a transient run: the
+        given values, or the netlist .TRAN settings for those left as None
+        (see run_tran). method is returned as a TimeMethod.
+        """
         # --------- resolve transient settings (use netlist defaults when None) ---------
         tran = getattr(self.data, "transient", None)
 
@@ -117,11 +410,13 @@ class Circuit:
             if tran is None or tran.dt is None:
                 raise ValueError("dt not provided and no transient.dt defined in netlist.")
             dt = tran.dt
-        
+
         method_map = {
             "BE": TimeMethod.BACKWARD_EULER,
             "FE": TimeMethod.FORWARD_EULER,
             "TRAP": TimeMethod.TRAPEZOIDAL,
+            "GEAR2": TimeMethod.GEAR2,
+            "BDF2": TimeMethod.GEAR2,
         }
 
         if method is None:
@@ -130,41 +425,96 @@ class Circuit:
             else:
                 method = "BE"
 
+        if internal_steps is None:
+            # 0 means "not given" in the netlist
+            internal_steps = getattr(tran, "intetnal_steps", 0) or 1
+
         # Convert method string to TimeMethod enum if needed
         if isinstance(method, str):
-            method = method_map.get(self.data.transient.method.upper(), TimeMethod.BACKWARD_EULER)
+            method = method_map.get(method.upper(), TimeMethod.BACKWARD_EULER)
 
-        # --------- call engine solver ---------
-        times, out, current_traces = solve_tran(
-            self.data,
-            total_time=total_time,
-            dt=dt,
-            nr_tol=nr_tol,
-            v0_vector=v0_vector,
-            desired_nodes=desired_nodes,
-            method=method,
-        )
+        return total_time, dt, method, internal_steps
 
-        # --------- build signal dictionary: nodes + currents ---------
-        signals: dict[str, np.ndarray] = {}
+    # ---------------------- SWEEP ----------------------
+    def sweep(self, param: str | None = None, values=None, analysis: str | None = None,
+              workers: int | None = None, batched: bool = False, **kwargs):
+        """
+        Parameter sweep: reruns the DC or transient analysis for each
+        value of param on a copy of the netlist, spread over a process pool.
 
-        # Node voltages
-        for j, node in enumerate(desired_nodes):
-            signals[f"Node_{node}"] = out[j, :]
+        param, values : str, sequence of float | None
+            Swept parameter ("R1" sets its main value, "V1.amp",
+            "V1.amplitude" ... an attribute or waveform parameter) and its
+            values. If None, uses the netlist .STEP line.
+        analysis : str | None
+            "dc" or "tran". If None, "tran" when the netlist has .TRAN.
+        workers : int | None
+            Worker processes (None: one per CPU, 1: run serially here).
+        batched : bool
+            Solve all the points together instead, as one batch of
+            identical topologies (see batch.BatchedCircuit); workers is
+            then ignored and only the fixed-step analyses are available.
+        kwargs
+            Passed to run_dc/run_tran (desired_nodes, nr_tol, method, ...).
 
-        # Currents from engine (inductors, voltage sources, controlled sources, opamp, etc.)
-        signals.update(current_traces)
+        Returns a sweep.SweepResult (values, stacked out and times).
+        """
+        # sweep imports Circuit: imported here to avoid the cycle
+        from .sweep import run_sweep
 
-        # --------- store for later use (.sim export, plotting, etc.) ---------
-        self.last_tran_time = times
-        self.last_tran_signals = signals
+        if param is None:
+            if self.data.step is None:
+                raise ValueError("Sem parâmetro de varredura: passe 'param' e 'values' "
+                                 "ou inclua uma linha .STEP na netlist.")
+            param = self.data.step.param
+            if values is None:
+                values = self.data.step.values
+        if values is None:
+            raise ValueError(f"Varredura de '{param}' sem valores.")
+        return run_sweep(self.data, param, values, analysis=analysis, workers=workers,
+                         batched=batched, **kwargs)
+
+    # -------------------- MONTE CARLO --------------------
+    def montecarlo(self, tolerances, runs: int, analysis: str | None = None,
+                   metrics=("final",), seed: int | None = None, workers: int | None = None,
+                   **kwargs):
+        """
+        Monte Carlo tolerance analysis: runs the DC or transient analysis
+        runs times, each on a copy of the netlist with its values drawn
+        from tolerances, over a process pool.
+
+        tolerances : dict
+            Element name pattern ("R*", "C2006", "D1.Is") -> relative
+            tolerance (uniform) or montecarlo.Tolerance(rel, "gauss").
+        metrics : sequence of str | dict
+            Summary kept per run: montecarlo.STATS names ("final", "max",
+            "min", "mean", "pp", "rms") for every desired node, or
+            name -> f(times, out).
+        seed : int | None
+            Seed of the whole analysis (each run gets its own child seed).
+        workers : int | None
+            Worker processes (None: one per CPU, 1: run serially here).
+        kwargs
+            chunk_size, batched, keep_waveforms, on_result (see
+            montecarlo.run_montecarlo) and the run_dc/run_tran arguments.
+
+        Returns a montecarlo.MonteCarloResult (metrics per run, drawn
+        values, failed runs; summary() and yield_fraction()).
+        """
+        # montecarlo imports Circuit: imported here to avoid the cycle
+        from .montecarlo import run_montecarlo
+
+        return run_montecarlo(self.data, tolerances, runs, analysis=analysis, metrics=metrics,
+                              seed=seed, workers=workers, **kwargs)
 
-        return times, out
-    
     def print(self):
         print(f"\n==> CIRCUIT ELEMENTS - MAX NODES={self.data.max_node}")
         for elem in self.data.elements:
             print("  -", elem)
+        if self.data.columns is not None:
+            for kind, table in self.data.columns.tables.items():
+                if len(table):
+                    print(f"  - {len(table)} x {kind} (colunar)")
         # Se quiser, pode imprimir também as configs de transiente:
         ts = self.data.transient
         if ts.enabled:
@@ -0,0 +1,167 @@
+from __future__ import annotations
+import dataclasses
+import numpy as np
+
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .circuit import NetlistOOP
+from .elements.base import Element
+from .elements.resistor import Resistor
+from .elements.capacitor import Capacitor
+
+
+class TwoTerminalColumns:
+    """
+    All the elements of one two-terminal type as columns: names, node
+    pairs (a, b), values and initial conditions, one row per element.
+
+    Rows are appended to Python lists (append/extend) and turned into
+    NumPy arrays on the first read of a column, so a parser can fill it
+    one line at a time. The arrays may be edited in place (e.g. value);
+    call CompiledCircuit.invalidate() afterwards, as for element objects.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._a = np.zeros(0, dtype=int)
+        self._b = np.zeros(0, dtype=int)
+        self._value = np.zeros(0)
+        self._ic = np.zeros(0)
+        self._pending: Tuple[List[int], List[int], List[float], List[float]] = ([], [], [], [])
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def append(self, name: str, a: int, b: int, value: float, ic: float = 0.0) -> None:
+        self.names.append(name)
+        pa, pb, pv, pic = self._pending
+        pa.append(a); pb.append(b); pv.append(value); pic.append(ic)
+
+    def extend(self, names: Sequence[str], a, b, value, ic=None) -> None:
+        """Appends many rows at once (node and value arrays of equal length)."""
+        self._flush()
+        n = len(names)
+        self.names.extend(names)
+        self._a = np.concatenate((self._a, np.asarray(a, dtype=int).reshape(n)))
+        self._b = np.concatenate((self._b, np.asarray(b, dtype=int).reshape(n)))
+        self._value = np.concatenate((self._value, np.asarray(value, dtype=float).reshape(n)))
+        ic = np.zeros(n) if ic is None else np.asarray(ic, dtype=float).reshape(n)
+        self._ic = np.concatenate((self._ic, ic))
+
+    def _flush(self) -> None:
+        pa, pb, pv, pic = self._pending
+        if pa:
+            self._a = np.concatenate((self._a, np.array(pa, dtype=int)))
+            self._b = np.concatenate((self._b, np.array(pb, dtype=int)))
+            self._value = np.concatenate((self._value, np.array(pv, dtype=float)))
+            self._ic = np.concatenate((self._ic, np.array(pic, dtype=float)))
+            self._pending = ([], [], [], [])
+
+    @property
+    def a(self) -> np.ndarray:
+        self._flush()
+        return self._a
+
+    @property
+    def b(self) -> np.ndarray:
+        self._flush()
+        return self._b
+
+    @property
+    def value(self) -> np.ndarray:
+        self._flush()
+        return self._value
+
+    @property
+    def ic(self) -> np.ndarray:
+        self._flush()
+        return self._ic
+
+    def max_node(self) -> int:
+        if not len(self):
+            return 0
+        return int(max(self.a.max(), self.b.max()))
+
+
+class ColumnarNetlist:
+    """
+    Linear two-terminal elements stored by type as columns instead of one
+    object each: resistors ("R": value R) and capacitors ("C": value C,
+    ic = initial voltage). Kept in NetlistOOP.columns, next to the element
+    objects of everything else; the assembler stamps each column with
+    vectorized scatter-adds.
+    """
+
+    # Kind -> element class (constructor arguments: name, a, b, value[, ic])
+    KINDS: Dict[str, type] = {"R": Resistor, "C": Capacitor}
+
+    def __init__(self):
+        self.tables: Dict[str, TwoTerminalColumns] = {kind: TwoTerminalColumns() for kind in self.KINDS}
+
+    def __getitem__(self, kind: str) -> TwoTerminalColumns:
+        return self.tables[kind]
+
+    def __len__(self) -> int:
+        return sum(len(t) for t in self.tables.values())
+
+    def add(self, kind: str, name: str, a: int, b: int, value: float, ic: float = 0.0) -> None:
+        self.tables[kind].append(name, a, b, value, ic)
+
+    def max_node(self) -> int:
+        return max(t.max_node() for t in self.tables.values())
+
+    def copy(self) -> "ColumnarNetlist":
+        other = ColumnarNetlist()
+        other.extend(self)
+        return other
+
+    def extend(self, other: "ColumnarNetlist") -> None:
+        """Appends all the rows of other, table by table."""
+        for kind, table in other.tables.items():
+            self[kind].extend(table.names, table.a, table.b, table.value, table.ic)
+
+    def to_elements(self) -> List[Element]:
+        """One element object per row (resistors first, then capacitors)."""
+        elements: List[Element] = []
+        for name, a, b, R in zip(self["R"].names, self["R"].a.tolist(), self["R"].b.tolist(),
+                                 self["R"].value.tolist()):
+            elements.append(Resistor(name, a, b, R))
+        C = self["C"]
+        for name, a, b, c, ic in zip(C.names, C.a.tolist(), C.b.tolist(), C.value.tolist(),
+                                     C.ic.tolist()):
+            elements.append(Capacitor(name, a, b, c, ic))
+        return elements
+
+    @classmethod
+    def from_elements(cls, elements: Iterable[Element]) -> Tuple["ColumnarNetlist", List[Element]]:
+        """
+        Moves the plain Resistor/Capacitor objects into columns. Returns
+        the columns and the other elements, in their original order
+        (subclasses stay objects: they may change the model).
+        """
+        columns = cls()
+        rest: List[Element] = []
+        for elem in elements:
+            if type(elem) is Resistor:
+                columns.add("R", elem.name, elem.a, elem.b, elem.R)
+            elif type(elem) is Capacitor:
+                columns.add("C", elem.name, elem.a, elem.b, elem.C, elem.v0)
+            else:
+                rest.append(elem)
+        return columns, rest
+
+
+def to_columnar(data: NetlistOOP) -> NetlistOOP:
+    """Copy of the NetlistOOP data with its resistors and capacitors in columns."""
+    columns, rest = ColumnarNetlist.from_elements(data.elements)
+    if data.columns is not None:
+        columns.extend(data.columns)
+    return dataclasses.replace(data, elements=rest, columns=columns)
+
+
+def to_elements(data: NetlistOOP) -> NetlistOOP:
+    """Copy of the NetlistOOP data with every column row as an element object."""
+    elements = list(data.elements)
+    if data.columns is not None:
+        elements += data.columns.to_elements()
+    return dataclasses.replace(data, elements=elements, columns=None)
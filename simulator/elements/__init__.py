@@ -1,4 +1,4 @@
-from .base import Element, TimeMethod
+from .base import Element, TimeMethod, StampKind
 from .resistor import Resistor
 from .capacitor import Capacitor
 from .inductor import Inductor
@@ -11,6 +11,7 @@ from .controlled_sources import VCVS, CCCS, VCCS, CCVS
 __all__ = [
     'Element',
     'TimeMethod',
+    'StampKind',
     'Resistor',
     'Capacitor',
     'Inductor',
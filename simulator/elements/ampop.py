@@ -1,10 +1,10 @@
 # simulator/elements/opamp.py
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import ClassVar
+from typing import ClassVar, Optional
 import numpy as np
 
-from .base import Element
+from .base import Element, StampKind
 
 
 @dataclass
@@ -17,6 +17,8 @@ class OpAmp(Element):
 
     # Diz ao engine que este elemento adiciona equação MNA
     is_mna: ClassVar[bool] = True
+    stamp_kind: ClassVar[StampKind] = StampKind.CONSTANT
+    value_attr: ClassVar[str] = "gain"
 
     def max_node(self) -> int:
         return max(self.a, self.b, self.c, self.d)
@@ -25,17 +27,14 @@ class OpAmp(Element):
         
         return 1
     #Estampa um opamp como um VCVS com ganho alto.
-    def stamp_dc(self, G: np.ndarray, I: np.ndarray, x_guess=None):
-        
-        n = G.shape[0]
-        x_idx = n  # índice da nova variável MNA
-
-        # Expande as matrizes
-        G_new = np.zeros((n + 1, n + 1))
-        G_new[:n, :n] = G
+    def stamp_dc(self, G: np.ndarray, I: np.ndarray, x_guess=None, mna_idx: Optional[int] = None):
 
-        I_new = np.zeros(n + 1)
-        I_new[:n] = I
+        # Expande as matrizes, a menos que o índice MNA já tenha sido atribuído
+        if mna_idx is None:
+            G, I = self._augment(G, I)
+            mna_idx = G.shape[0] - 1
+        x_idx = mna_idx  # índice da nova variável MNA
+        G_new, I_new = G, I
 
         # KCL nos nós de saída (corrente da fonte de tensão interna)
         G_new[self.a, x_idx] += 1.0
@@ -50,7 +49,7 @@ class OpAmp(Element):
 
         return G_new, I_new
 
-    def stamp_transient(self, G, I, state, t, dt, method, x_guess=None):
+    def stamp_transient(self, G, I, state, t, dt, method, x_guess=None, mna_idx: Optional[int] = None):
 
-        G_new, I_new = self.stamp_dc(G, I, x_guess)
+        G_new, I_new = self.stamp_dc(G, I, x_guess, mna_idx)
         return G_new, I_new, state
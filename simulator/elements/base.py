@@ -1,19 +1,105 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Dict, Any, Tuple, Optional, ClassVar
+from typing import Dict, Any, List, Tuple, Optional, ClassVar
+import math
 import numpy as np
 
 class TimeMethod(Enum):
     BACKWARD_EULER = auto()
     FORWARD_EULER = auto()
     TRAPEZOIDAL = auto()
+    GEAR2 = auto()          # Second-order BDF (Gear), variable step
+
+def gear2_coefficients(dt: float, h_prev: Optional[float]) -> Tuple[float, float, float]:
+    """
+    Variable-step BDF2 derivative weights: x'(t_n) ~ a0 x_n + a1 x_(n-1) + a2 x_(n-2),
+    with dt = t_n - t_(n-1) and h_prev = t_(n-1) - t_(n-2). Without a second
+    point of history (h_prev None, first step) it is backward Euler.
+    """
+    if h_prev is None:
+        return 1.0 / dt, -1.0 / dt, 0.0
+    w = dt / h_prev
+    return ((1.0 + 2.0 * w) / (dt * (1.0 + w)),
+            -(1.0 + w) / dt,
+            w * w / (dt * (1.0 + w)))
+
+def pulse_breakpoints(params: Dict[str, float], t_stop: float) -> List[float]:
+    """
+    Corners of a PULSE waveform in (0, t_stop): start and end of the rise
+    and of the fall, repeated every period.
+    """
+    delay = params.get("delay", 0.0)
+    rise = params.get("rise_time", 0.0)
+    width = params.get("pulse_width", 0.0)
+    fall = params.get("fall_time", 0.0)
+    period = params.get("period", 0.0)
+
+    offsets = np.array([0.0, rise, rise + width, rise + width + fall])
+    if period > 0:
+        offsets = offsets[offsets < period]
+        starts = delay + period * np.arange(max(int(np.ceil((t_stop - delay) / period)), 0) + 1)
+    else:
+        starts = np.array([delay])
+    points = np.unique((starts[:, None] + offsets[None, :]).ravel())
+    return points[(points > 0.0) & (points < t_stop)].tolist()
+
+def sin_breakpoints(params: Dict[str, float], t_stop: float) -> List[float]:
+    """Corner of a SIN waveform in (0, t_stop): the end of its delay."""
+    delay = params.get("delay", 0.0)
+    return [delay] if 0.0 < delay < t_stop else []
+
+def sin_values(params: Dict[str, float], times: np.ndarray) -> np.ndarray:
+    """SIN waveform (see VoltageSource._sin_value) over an array of times."""
+    offset = params.get("offset", 0.0)
+    amplitude = params.get("amplitude", 0.0)
+    freq = params.get("freq", 0.0)
+    delay = params.get("delay", 0.0)
+    damping = params.get("damping", 0.0)
+    phase_rad = math.radians(params.get("phase", 0.0))
+
+    t_eff = times - delay
+    damping_factor = np.exp(-damping * t_eff) if damping > 0 else 1.0
+    running = offset + amplitude * damping_factor * np.sin(2 * math.pi * freq * t_eff + phase_rad)
+    return np.where(times < delay, offset + amplitude * math.sin(phase_rad), running)
+
+def pulse_values(low: float, high: float, params: Dict[str, float], times: np.ndarray) -> np.ndarray:
+    """PULSE waveform (see VoltageSource._pulse_value) over an array of times."""
+    delay = params.get("delay", 0.0)
+    rise = params.get("rise_time", 0.0)
+    fall = params.get("fall_time", 0.0)
+    width = params.get("pulse_width", 0.0)
+    period = params.get("period", 0.0)
+
+    t_local = times - delay
+    if period > 0:
+        t_local = t_local % period
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rising = low + (high - low) * (t_local / rise)
+        falling = high - (high - low) * ((t_local - rise - width) / fall)
+    return np.select(
+        [times < delay, t_local < rise, t_local < rise + width, t_local < rise + width + fall],
+        [low, rising, high, falling],
+        default=low,
+    )
+
+class StampKind(Enum):
+    """What an element's stamp depends on, within one analysis."""
+    CONSTANT = auto()  # Same G/I in every build (resistors, controlled sources, opamp)
+    TIME = auto()      # Depends on t, dt, method or element state, never on x (sources, C, L)
+    SOLUTION = auto()  # Depends on the Newton guess x: restamped every iteration
 
 @dataclass
 class Element:
     name: str
     is_mna: ClassVar[bool] = False # Tells if the element adds MNA variables (new lines in matrix and vector)
     is_nonlinear: ClassVar[bool] = False # Tells if the element is nonlinear (requires Newton-Raphson)
+    stamp_kind: ClassVar[StampKind] = StampKind.SOLUTION # Conservative default: restamped on every build
+    has_limiting: ClassVar[bool] = False # Tells if the element limits its Newton steps (receives lim_state)
+    is_source: ClassVar[bool] = False # Tells if the element is an independent source (scaled by DC source stepping)
+    bank: ClassVar[Optional[type]] = None # Vectorized evaluator of all instances of the class (e.g. DiodeBank); a subclass that changes the model must reset it
+    state_vars: ClassVar[Tuple[str, ...]] = () # Transient history kept by the StateStore (read in stamp_transient); empty: stateless
+    value_attr: ClassVar[Optional[str]] = None # Attribute swept by .STEP/Circuit.sweep when only the element name is given
 
     def max_node(self) -> int:
         raise NotImplementedError
@@ -23,3 +109,68 @@ class Element:
 
     def stamp_transient(self, G: np.ndarray, I: np.ndarray, state: Dict[str, Any], t: float, dt: float, method: TimeMethod):
         return G, I, state
+
+    def stamp_ac(self, C, b: np.ndarray, mna_idx: Optional[int] = None) -> None:
+        """
+        Frequency-domain part of the small-signal model (.AC): the
+        coefficients of j*omega in the MNA matrix go into C (the system is
+        (G + j*omega*C) x = b, G being the DC Jacobian) and the complex
+        amplitude of an AC source into b. Resistive elements add nothing.
+        """
+        pass
+
+    def initial_state(self) -> Dict[str, float]:
+        """Values of state_vars before the first time point."""
+        return {key: 0.0 for key in self.state_vars}
+
+    @classmethod
+    def update_state(cls, block, x: np.ndarray, dt: float, method: TimeMethod) -> None:
+        """
+        Advances the history of all the elements of the class after an
+        accepted time step, in place and vectorized: block is their
+        StateBlock (block[key] is the column of state_vars key, block.a /
+        block.b the terminals, block.param(name) an attribute column) and
+        x the full solution vector of the step.
+        """
+        pass
+
+    def breakpoints(self, t_stop: float) -> List[float]:
+        """
+        Times in (0, t_stop) where the element's waveform has a corner.
+        The transient time loop ends a step exactly on each of them.
+        """
+        return []
+
+    def limit(self, value: float, key: str, lim_state: Dict[str, Any], limiter) -> float:
+        """
+        Newton step limiting hook for nonlinear elements (SPICE style).
+
+        Elements with has_limiting = True receive a lim_state dict in
+        stamp_dc/stamp_transient, kept by the assembler across Newton
+        iterations and time steps. Each controlling voltage is passed
+        through this method before the element is linearized:
+        limiter(v_new, v_old) -> v_limited is applied against the value
+        used in the previous iteration (stored under key), and
+        lim_state["limited"] reports whether any value was changed, so
+        newton_solve does not declare convergence on a limited iteration.
+        """
+        old = lim_state.get(key)
+        if old is not None:
+            limited = limiter(value, old)
+            if limited != value:
+                lim_state["limited"] = True
+                value = limited
+        lim_state[key] = value
+        return value
+
+    def _augment(self, G: np.ndarray, I: np.ndarray, n_vars: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns copies of (G, I) grown by n_vars extra MNA rows/columns.
+        Only used by MNA elements stamped without a pre-assigned index
+        (mna_idx=None). The compiled assembler hands out the indices and
+        stamps in place instead.
+        """
+        n = G.shape[0]
+        G2 = np.zeros((n + n_vars, n + n_vars)); G2[:n, :n] = G
+        I2 = np.zeros((n + n_vars,)); I2[:n] = I
+        return G2, I2
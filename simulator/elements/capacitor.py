@@ -1,7 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from typing import ClassVar, Dict, Optional, Tuple
 import numpy as np
-from .base import Element, TimeMethod
+from .base import Element, TimeMethod, StampKind, gear2_coefficients
 
 @dataclass
 class Capacitor(Element):
@@ -9,14 +10,57 @@ class Capacitor(Element):
     b: int
     C: float
     v0: float = 0.0 # initial condition (voltage)
+    stamp_kind: ClassVar[StampKind] = StampKind.TIME
+    value_attr: ClassVar[str] = "C"
+    # Voltage and companion current (TRAP) of the last point, voltage of the one before (GEAR2)
+    state_vars: ClassVar[Tuple[str, ...]] = ("v_prev", "i_prev", "v_prev2")
 
     def max_node(self) -> int:
         return max(self.a, self.b)
 
+    def initial_state(self) -> Dict[str, float]:
+        return {"v_prev": self.v0, "i_prev": 0.0, "v_prev2": 0.0}
+
+    @classmethod
+    def update_state(cls, block, x, dt, method):
+        v = x[block.a] - x[block.b]
+        if method == TimeMethod.TRAPEZOIDAL:
+            # Companion current: i_new = (2C/dt) * (v_new - v_old) - i_old
+            block["i_prev"] = 2.0 * block.param("C") / dt * (v - block["v_prev"]) - block["i_prev"]
+        elif method == TimeMethod.GEAR2 and block.n_points:
+            # Second point of history (t = 0 only leaves v_prev)
+            block["v_prev2"] = block["v_prev"]
+        block["v_prev"] = v
+
+    @classmethod
+    def companion(cls, block, dt, method) -> Tuple[Optional[np.ndarray], np.ndarray]:
+        """
+        stamp_transient of all the capacitors of a StateBlock at once: the
+        companion conductances Gc (None for FE, which has none) and the
+        history currents Ieq injected into a (and drawn from b).
+        """
+        C = block.param("C")
+        v_prev = block["v_prev"]
+        if method == TimeMethod.BACKWARD_EULER:
+            Gc = C / dt
+            return Gc, Gc * v_prev
+        if method == TimeMethod.FORWARD_EULER:
+            return None, C * v_prev / dt
+        if method == TimeMethod.GEAR2:
+            a0, a1, a2 = gear2_coefficients(dt, block.h_prev)
+            return C * a0, -C * (a1 * v_prev + a2 * block["v_prev2"])
+        Gc = 2.0 * C / dt
+        return Gc, block["i_prev"] + Gc * v_prev
+
     def stamp_dc(self, G: np.ndarray, I: np.ndarray, x_guess=None):
         # In DC, capacitor is open circuit
         return G, I
 
+    def stamp_ac(self, C, b, mna_idx=None):
+        # Admittance j*omega*C between a and b
+        C[self.a, self.a] += self.C; C[self.b, self.b] += self.C
+        C[self.a, self.b] -= self.C; C[self.b, self.a] -= self.C
+
     def stamp_transient(self, G, I, state, t, dt, method, x_guess=None):
 
         v_prev = state.get('v_prev', self.v0)
@@ -32,6 +76,16 @@ class Capacitor(Element):
             i_eq = self.C*(0.0 - v_prev)/dt
             I[self.a]-=i_eq; I[self.b]+=i_eq
 
+        elif method == TimeMethod.GEAR2:
+            # i = C (a0 v + a1 v_prev + a2 v_prev2); h_prev only exists
+            # once two points of history do (BE on the first step)
+            a0, a1, a2 = gear2_coefficients(dt, state.get('h_prev'))
+            Gc = self.C * a0
+            G[self.a,self.a]+=Gc; G[self.b,self.b]+=Gc
+            G[self.a,self.b]-=Gc; G[self.b,self.a]-=Gc
+            Ieq = -self.C * (a1 * v_prev + a2 * state.get('v_prev2', 0.0))
+            I[self.a]+=Ieq; I[self.b]-=Ieq
+
         else:  # TRAPEZOIDAL
             Gc = 2.0 * self.C / dt
 
@@ -1,8 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass
 import numpy as np
-from .base import Element
-from typing import ClassVar
+from .base import Element, StampKind
+from typing import ClassVar, Optional
 
 
 @dataclass
@@ -13,20 +13,20 @@ class VCVS(Element):
     d: int  # negative control node
     gain: float  # voltage gain (Av)
     is_mna: ClassVar[bool] = True
+    stamp_kind: ClassVar[StampKind] = StampKind.CONSTANT
+    value_attr: ClassVar[str] = "gain"
 
     def max_node(self) -> int:
         return max(self.a, self.b, self.c, self.d)
 
-    def stamp_dc(self, G: np.ndarray, I: np.ndarray, x_guess=None):
-        
-        n = G.shape[0]
-        x_idx = n  # index for new MNA variable
+    def stamp_dc(self, G: np.ndarray, I: np.ndarray, x_guess=None, mna_idx: Optional[int] = None):
         
-        # Expand matrices
-        G_new = np.zeros((n+1, n+1))
-        G_new[:n, :n] = G
-        I_new = np.zeros(n+1)
-        I_new[:n] = I
+        # Expand matrices, unless an MNA index was already assigned
+        if mna_idx is None:
+            G, I = self._augment(G, I)
+            mna_idx = G.shape[0] - 1
+        x_idx = mna_idx  # index for new MNA variable
+        G_new, I_new = G, I
         
         # Stamp output nodes
         G_new[self.a, x_idx] = 1.0
@@ -41,8 +41,8 @@ class VCVS(Element):
         
         return G_new, I_new
 
-    def stamp_transient(self, G, I, state, t, dt, method, x_guess=None):
-        G, I = self.stamp_dc(G, I)
+    def stamp_transient(self, G, I, state, t, dt, method, x_guess=None, mna_idx: Optional[int] = None):
+        G, I = self.stamp_dc(G, I, mna_idx=mna_idx)
         return G, I, state
 
 
@@ -54,19 +54,19 @@ class CCCS(Element):
     d: int  # negative control node
     gain: float  # current gain (Ai)
     is_mna: ClassVar[bool] = True
+    stamp_kind: ClassVar[StampKind] = StampKind.CONSTANT
+    value_attr: ClassVar[str] = "gain"
 
     def max_node(self) -> int:
         return max(self.a, self.b, self.c, self.d)
 
-    def stamp_dc(self, G: np.ndarray, I: np.ndarray, x_guess=None):
-        n = G.shape[0]
-        x_idx = n
-        
-        # Expand matrices
-        G_new = np.zeros((n+1, n+1))
-        G_new[:n, :n] = G
-        I_new = np.zeros(n+1)
-        I_new[:n] = I
+    def stamp_dc(self, G: np.ndarray, I: np.ndarray, x_guess=None, mna_idx: Optional[int] = None):
+        # Expand matrices, unless an MNA index was already assigned
+        if mna_idx is None:
+            G, I = self._augment(G, I)
+            mna_idx = G.shape[0] - 1
+        x_idx = mna_idx
+        G_new, I_new = G, I
         
         # Output current: i_out = gain * i_control
         G_new[self.a, x_idx] = self.gain
@@ -82,8 +82,8 @@ class CCCS(Element):
         
         return G_new, I_new
 
-    def stamp_transient(self, G, I, state, t, dt, method, x_guess=None):
-        G, I = self.stamp_dc(G, I)
+    def stamp_transient(self, G, I, state, t, dt, method, x_guess=None, mna_idx: Optional[int] = None):
+        G, I = self.stamp_dc(G, I, mna_idx=mna_idx)
         return G, I, state
 
 
@@ -95,6 +95,8 @@ class VCCS(Element):
     d: int  # negative control node
     gm: float  # transconductance (Siemens)
     is_mna: ClassVar[bool] = False
+    stamp_kind: ClassVar[StampKind] = StampKind.CONSTANT
+    value_attr: ClassVar[str] = "gm"
 
     def max_node(self) -> int:
         return max(self.a, self.b, self.c, self.d)
@@ -121,20 +123,20 @@ class CCVS(Element):
     d: int  # negative control node
     rm: float  # transresistance (Ohms)
     is_mna: ClassVar[bool] = True
+    stamp_kind: ClassVar[StampKind] = StampKind.CONSTANT
+    value_attr: ClassVar[str] = "rm"
 
     def max_node(self) -> int:
         return max(self.a, self.b, self.c, self.d)
 
-    def stamp_dc(self, G: np.ndarray, I: np.ndarray, x_guess=None):
-        n = G.shape[0]
-        i_control_idx = n      # control current variable
-        i_output_idx = n + 1   # output current variable
-        
-        # Expand matrices for 2 additional variables
-        G_new = np.zeros((n+2, n+2))
-        G_new[:n, :n] = G
-        I_new = np.zeros(n+2)
-        I_new[:n] = I
+    def stamp_dc(self, G: np.ndarray, I: np.ndarray, x_guess=None, mna_idx: Optional[int] = None):
+        # Expand matrices for 2 additional variables, unless already assigned
+        if mna_idx is None:
+            G, I = self._augment(G, I, 2)
+            mna_idx = G.shape[0] - 2
+        i_control_idx = mna_idx      # control current variable
+        i_output_idx = mna_idx + 1   # output current variable
+        G_new, I_new = G, I
         
         # KCL: Control current enters at c, exits at d
         G_new[self.c, i_control_idx] = 1.0
@@ -155,6 +157,6 @@ class CCVS(Element):
         
         return G_new, I_new
 
-    def stamp_transient(self, G, I, state, t, dt, method, x_guess=None):
-        G, I = self.stamp_dc(G, I)
+    def stamp_transient(self, G, I, state, t, dt, method, x_guess=None, mna_idx: Optional[int] = None):
+        G, I = self.stamp_dc(G, I, mna_idx=mna_idx)
         return G, I, state
\ No newline at end of file
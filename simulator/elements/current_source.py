@@ -1,8 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional, Dict, ClassVar
+from typing import List, Optional, Dict, ClassVar
 import numpy as np, math
-from .base import Element, TimeMethod
+from .base import (Element, TimeMethod, StampKind, pulse_breakpoints, sin_breakpoints,
+                   pulse_values, sin_values)
 
 @dataclass
 class CurrentSource(Element):
@@ -16,6 +17,9 @@ class CurrentSource(Element):
     source_type: str = "DC"  # "DC", "AC", "SIN", "PULSE"
     sin_params: Optional[Dict[str, float]] = None
     pulse_params: Optional[Dict[str, float]] = None
+    is_source: ClassVar[bool] = True
+    stamp_kind: ClassVar[StampKind] = StampKind.TIME
+    value_attr: ClassVar[str] = "dc"
 
     def max_node(self) -> int:
         return max(self.a, self.b)
@@ -114,20 +118,55 @@ class CurrentSource(Element):
             # low state
             return i1
 
+    def get_values_at(self, times: np.ndarray) -> np.ndarray:
+        """
+        Vectorized get_value_at: the current at every time of an array.
+        """
+        times = np.asarray(times, dtype=float)
+        if self.source_type == "AC":
+            return self.dc + self.amp * np.cos(2*math.pi*self.freq*times + math.radians(self.phase_deg))
+        elif self.source_type == "SIN" and self.sin_params is not None:
+            return sin_values(self.sin_params, times)
+        elif self.source_type == "PULSE" and self.pulse_params is not None:
+            return pulse_values(self.pulse_params.get("i1", 0.0),
+                                self.pulse_params.get("i2", 0.0), self.pulse_params, times)
+        else:
+            return np.full(times.shape, self.dc)
+
+    def breakpoints(self, t_stop: float) -> List[float]:
+        """Corners of the PULSE/SIN waveform in (0, t_stop)."""
+        if self.source_type == "PULSE" and self.pulse_params is not None:
+            return pulse_breakpoints(self.pulse_params, t_stop)
+        if self.source_type == "SIN" and self.sin_params is not None:
+            return sin_breakpoints(self.sin_params, t_stop)
+        return []
+
     def _value(self, t: float) -> float:
         """Maintains retrocompatibility"""
         return self.get_value_at(t)
 
+    def stamp_value(self, G, I, val: float, mna_idx: Optional[int] = None):
+        """Stamps the source with a given value (e.g. from a precomputed table)."""
+        I[self.a] -= val       # current leaves node a
+        I[self.b] += val       # current enters node b
+        return G, I
+
     def stamp_dc(self, G, I, x_guess=None):
         val = self._value(0.0)  # current flows from a to b
         I[self.a] -= val        # current leaves node a
         I[self.b] += val        # current enters node b
         return G, I
 
+    def stamp_ac(self, C, b, mna_idx=None):
+        # Small-signal amplitude of an AC source (the rest are opened in .AC)
+        if self.is_ac:
+            phasor = self.amp * np.exp(1j * math.radians(self.phase_deg))
+            b[self.a] -= phasor
+            b[self.b] += phasor
+
     def stamp_transient(self, G, I, state, t, dt, method, x_guess=None):
-        val = self._value(t)   # current flows from a to b
-        I[self.a] -= val       # current leaves node a
-        I[self.b] += val       # current enters node b
+        # current flows from a to b
+        G, I = self.stamp_value(G, I, self._value(t))
         return G, I, state
 
 
@@ -1,11 +1,88 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Dict, Any, Sequence
 import numpy as np
 
-from .base import Element
+from .base import Element, StampKind
 from typing import ClassVar
 
+
+def pnjlim(v_new: float, v_old: float, vt: float, v_crit: float) -> float:
+    """
+    SPICE junction voltage limiting (pnjlim).
+
+    Above v_crit, where the exponential makes a full Newton step overshoot,
+    a forward step of the junction voltage is replaced by the step that
+    produces the same change in current on a logarithmic scale.
+    """
+    if v_new > v_crit and abs(v_new - v_old) > 2.0 * vt:
+        if v_old > 0.0:
+            arg = 1.0 + (v_new - v_old) / vt
+            if arg > 0.0:
+                v_new = v_old + vt * np.log(arg)
+            else:
+                v_new = v_crit
+        else:
+            v_new = vt * np.log(v_new / vt)
+    return v_new
+
+class DiodeBank:
+    """
+    All the diodes of a circuit linearized in one vectorized call.
+
+    Struct of arrays (terminals, Is, Vt, v_crit, v_clamp) with the same
+    model as Diode._get_norton_equivalent and the same pnjlim limiting,
+    whose previous junction voltages are kept here instead of in one
+    lim_state dict per diode. CompiledCircuit scatters the returned
+    conductances and Norton currents into G and I.
+    """
+
+    def __init__(self, diodes: Sequence["Diode"]):
+        self.a = np.array([d.a for d in diodes], dtype=int)
+        self.b = np.array([d.b for d in diodes], dtype=int)
+        self.Is = np.array([d.Is for d in diodes], dtype=float)
+        self.Vt = np.array([d.Vt for d in diodes], dtype=float)
+        self.v_crit = self.Vt * np.log(self.Vt / (np.sqrt(2.0) * self.Is))
+        self.v_clamp = np.array([d.v_clamp for d in diodes], dtype=float)
+        # Junction voltages of the previous linearization (NaN: none yet)
+        self.v_old = np.full(len(diodes), np.nan)
+        self.limited = False
+
+    def reset_limiting(self) -> None:
+        self.v_old.fill(np.nan)
+        self.limited = False
+
+    def _pnjlim(self, v_new: np.ndarray) -> np.ndarray:
+        """pnjlim against v_old, element-wise (NaN v_old: not limited)."""
+        v_old, vt = self.v_old, self.Vt
+        # Comparisons with NaN are False: diodes without history pass through
+        mask = (v_old < self.v_clamp) & (v_new > self.v_crit) & (np.abs(v_new - v_old) > 2.0 * vt)
+        if not mask.any():
+            return v_new
+        with np.errstate(divide="ignore", invalid="ignore"):
+            arg = 1.0 + (v_new - v_old) / vt
+            from_old = np.where(arg > 0.0, v_old + vt * np.log(arg), self.v_crit)
+            from_zero = vt * np.log(v_new / vt)
+        return np.where(mask, np.where(v_old > 0.0, from_old, from_zero), v_new)
+
+    def linearize(self, x_full: np.ndarray, limit: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """Conductances Gd and Norton currents I_eq of all diodes at x_full."""
+        v_d = x_full[self.a] - x_full[self.b]
+        if limit:
+            v_lim = self._pnjlim(v_d)
+            self.limited = bool(np.any(v_lim != v_d))
+            self.v_old = v_d = v_lim
+        else:
+            self.limited = False
+
+        # Above v_clamp the diode continues along its tangent line
+        v_d = np.minimum(v_d, self.v_clamp)
+        exp_val = np.exp(v_d / self.Vt)
+        Gd = self.Is * exp_val / self.Vt
+        I_eq = self.Is * (exp_val - 1) - Gd * v_d
+        return Gd, I_eq
+
+
 @dataclass
 class Diode(Element):
     a: int
@@ -14,25 +91,40 @@ class Diode(Element):
     Is: float = 3.7751345e-14  # Saturation Current
     Vt: float = 0.025          # Termic tension (25mV)
     is_nonlinear: ClassVar[bool] = True  # Diode is nonlinear
+    stamp_kind: ClassVar[StampKind] = StampKind.SOLUTION
+    value_attr: ClassVar[str] = "Is"
+    has_limiting: ClassVar[bool] = True  # Junction voltage limited with pnjlim
+    v_clamp: ClassVar[float] = 0.9       # Above it, the diode follows its tangent line
+    bank: ClassVar[Optional[type]] = DiodeBank  # All diodes linearized together by the assembler
 
     def max_node(self) -> int:
         return max(self.a, self.b)
 
+    @property
+    def v_crit(self) -> float:
+        """Voltage where the diode I-V curve has its minimum radius of curvature."""
+        return self.Vt * np.log(self.Vt / (np.sqrt(2.0) * self.Is))
+
+    def _pnjlim(self, v_new: float, v_old: float) -> float:
+        # Past v_clamp the model is linear, so there is nothing to limit
+        if v_old >= self.v_clamp:
+            return v_new
+        return pnjlim(v_new, v_old, self.Vt, self.v_crit)
+
     def _get_norton_equivalent(self, Vd: float) -> Tuple[float, float]:
         """
         Calculate conductance and equivalent current source for the diode
         Uses Shockley equation of linearization
         """
-        # Safe clamp
-        if Vd > 0.9:
-            Vd = 0.9
-            print("\033[93mWarning:\033[00m Diode voltage clamped to 0.9V for numerical stability.")
+        # Safe clamp: above v_clamp the diode continues along its tangent line
+        if Vd > self.v_clamp:
+            Vd = self.v_clamp
 
         # Conductance calculation
         try:
             exp_val = np.exp(Vd / self.Vt)
         except OverflowError:
-            exp_val = np.exp(0.9 / self.Vt) # Safe Fallback
+            exp_val = np.exp(self.v_clamp / self.Vt) # Safe Fallback
 
         Gd = (self.Is * exp_val) / self.Vt
 
@@ -46,7 +138,8 @@ class Diode(Element):
     def stamp_dc(self, 
                  G: np.ndarray, 
                  I: np.ndarray, 
-                 x_guess: np.ndarray
+                 x_guess: np.ndarray,
+                 lim_state: Optional[Dict[str, Any]] = None
                  ) -> Tuple[np.ndarray, np.ndarray]:
         
         if x_guess is None:
@@ -54,6 +147,8 @@ class Diode(Element):
 
         # Estimate voltage across the diode
         V_d = x_guess[self.a] - x_guess[self.b]
+        if lim_state is not None:
+            V_d = self.limit(V_d, "v_d", lim_state, self._pnjlim)
 
         # Get Norton equivalent parameters
         I_eq, Gd = self._get_norton_equivalent(V_d)
@@ -67,7 +162,8 @@ class Diode(Element):
 
         return G, I
 
-    def stamp_transient(self, G, I, state, t, dt, method, x_guess: np.ndarray):
+    def stamp_transient(self, G, I, state, t, dt, method, x_guess: np.ndarray,
+                        lim_state: Optional[Dict[str, Any]] = None):
         # No memory elements, same as DC
-        G, I = self.stamp_dc(G, I, x_guess)
+        G, I = self.stamp_dc(G, I, x_guess, lim_state)
         return G, I, state
\ No newline at end of file
@@ -1,8 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass
 import numpy as np
-from .base import Element, TimeMethod
-from typing import ClassVar
+from .base import Element, TimeMethod, StampKind, gear2_coefficients
+from typing import ClassVar, Optional, Dict, Tuple
 
 @dataclass
 class Inductor(Element):
@@ -11,32 +11,61 @@ class Inductor(Element):
     L: float
     i0: float = 0.0 # initial condition (current)
     is_mna: ClassVar[bool] = True
+    stamp_kind: ClassVar[StampKind] = StampKind.TIME
+    value_attr: ClassVar[str] = "L"
+    # Current and voltage (TRAP) of the last point, current of the one before (GEAR2)
+    state_vars: ClassVar[Tuple[str, ...]] = ("i_prev", "v_prev", "i_prev2")
 
     def max_node(self) -> int:
         return max(self.a, self.b)
 
-    def _augment(self, G: np.ndarray, I: np.ndarray):
-        n = G.shape[0]
-        G2 = np.zeros((n+1,n+1)); G2[:n,:n]=G
-        I2 = np.zeros((n+1,)); I2[:n]=I
-        return G2, I2
+    def initial_state(self) -> Dict[str, float]:
+        return {"i_prev": self.i0, "v_prev": 0.0, "i_prev2": 0.0}
 
-    def stamp_dc(self, G: np.ndarray, I: np.ndarray, x_guess=None):
+    @classmethod
+    def update_state(cls, block, x, dt, method):
+        v = x[block.a] - x[block.b]
+        L = block.param("L")
+        if method == TimeMethod.BACKWARD_EULER:
+            # i_new = i_old + (dt/L) * v
+            block["i_prev"] += (dt / L) * v
+
+        elif method == TimeMethod.TRAPEZOIDAL:
+            # i_new = i_old + (dt/(2L)) * (v_new + v_old)
+            block["i_prev"] += (dt / (2 * L)) * (v + block["v_prev"])
+            block["v_prev"] = v
+
+        elif method == TimeMethod.GEAR2:
+            # Solve v = L (a0 i_new + a1 i_old + a2 i_old2) for i_new
+            i_old = block["i_prev"]
+            a0, a1, a2 = gear2_coefficients(dt, block.h_prev)
+            i_new = (v / L - a1 * i_old - a2 * block["i_prev2"]) / a0
+            if block.n_points:
+                block["i_prev2"] = i_old
+            block["i_prev"] = i_new
+
+    def stamp_dc(self, G: np.ndarray, I: np.ndarray, x_guess=None, mna_idx: Optional[int] = None):
         # In DC, inductor is short circuit
-        G, I = self._augment(G, I)
-        n = G.shape[0]-1
-        k = n
+        if mna_idx is None:
+            G, I = self._augment(G, I)
+            mna_idx = G.shape[0] - 1
+        k = mna_idx
         G[self.a, k] += 1; G[self.b, k] -= 1
         G[k, self.a] += 1; G[k ,self.b] -= 1
         return G, I
 
-    def stamp_transient(self, G, I, state, t, dt, method, x_guess=None):
+    def stamp_ac(self, C, b, mna_idx: Optional[int] = None):
+        # Branch equation of stamp_dc becomes v_a - v_b - j*omega*L i = 0
+        C[mna_idx, mna_idx] -= self.L
+
+    def stamp_transient(self, G, I, state, t, dt, method, x_guess=None, mna_idx: Optional[int] = None):
         v_prev = state.get('v_prev', 0.0)
         i_prev = state.get('i_prev', self.i0)
 
-        G, I = self._augment(G, I)
-        n = G.shape[0] - 1
-        k = n
+        if mna_idx is None:
+            G, I = self._augment(G, I)
+            mna_idx = G.shape[0] - 1
+        k = mna_idx
         
         G[self.a, k] += 1; G[self.b, k] -= 1
         G[k, self.a] += 1; G[k, self.b] -= 1
@@ -47,6 +76,11 @@ class Inductor(Element):
             I[k] -= R * i_prev
         elif method == TimeMethod.FORWARD_EULER:
             pass
+        elif method == TimeMethod.GEAR2:
+            # v = L (a0 i + a1 i_prev + a2 i_prev2)
+            a0, a1, a2 = gear2_coefficients(dt, state.get('h_prev'))
+            G[k, k] -= self.L * a0
+            I[k] += self.L * (a1 * i_prev + a2 * state.get('i_prev2', 0.0))
         else:
             R = 2.0 * self.L / dt
             G[k, k] -= R 
@@ -1,8 +1,58 @@
+from bisect import bisect_left
 from dataclasses import dataclass
-from typing import Tuple, ClassVar
+from typing import Tuple, ClassVar, Optional, Sequence
 import numpy as np
 
-from .base import Element 
+from .base import Element, StampKind
+
+
+def pwl_segments(V_points: np.ndarray, I_points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Norton equivalent of every segment of a PWL I-V table: on segment k
+    the current is I_nr[k] + G[k] * V, so both are constant per segment.
+    Vertical segments (repeated V) get G = 0.
+    """
+    dV = np.diff(V_points)
+    dI = np.diff(I_points)
+    G = np.divide(dI, dV, out=np.zeros_like(dI), where=dV != 0.0)
+    I_nr = I_points[:-1] - G * V_points[:-1]
+    return I_nr, G
+
+
+class NonLinearResistorBank:
+    """
+    All the nonlinear resistors of a circuit linearized in one vectorized
+    call. The tables, of any lengths, are padded to the longest one: inner
+    breakpoints with +inf (never below a voltage) and segments by repeating
+    the last one, so the segment of each resistor is the count of its inner
+    breakpoints below Vab.
+    """
+
+    def __init__(self, resistors: Sequence["NonLinearResistor"]):
+        self.a = np.array([r.a for r in resistors], dtype=int)
+        self.b = np.array([r.b for r in resistors], dtype=int)
+        n_seg = max(len(r.V_points) - 1 for r in resistors)
+        m = len(resistors)
+        self.V_inner = np.full((m, max(n_seg - 1, 0)), np.inf)
+        self.I_nr = np.empty((m, n_seg))
+        self.G = np.empty((m, n_seg))
+        for k, r in enumerate(resistors):
+            I_nr, G = pwl_segments(r.V_points, r.I_points)
+            self.V_inner[k, :len(G) - 1] = r.V_points[1:-1]
+            self.I_nr[k, :len(G)] = I_nr; self.I_nr[k, len(G):] = I_nr[-1]
+            self.G[k, :len(G)] = G; self.G[k, len(G):] = G[-1]
+        self._rows = np.arange(m)
+        self.limited = False  # PWL steps are never limited
+
+    def reset_limiting(self) -> None:
+        pass
+
+    def linearize(self, x_full: np.ndarray, limit: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Conductances G_eq and Norton currents I_nr of all resistors at x_full."""
+        V_ab = x_full[self.a] - x_full[self.b]
+        seg = np.count_nonzero(self.V_inner < V_ab[:, None], axis=1)
+        return self.G[self._rows, seg], self.I_nr[self._rows, seg]
+
 
 @dataclass
 class NonLinearResistor(Element):
@@ -11,39 +61,35 @@ class NonLinearResistor(Element):
     V_points: np.ndarray 
     I_points: np.ndarray
     is_nonlinear: ClassVar[bool] = True  # NonLinearResistor is nonlinear
+    stamp_kind: ClassVar[StampKind] = StampKind.SOLUTION
+    bank: ClassVar[Optional[type]] = NonLinearResistorBank  # Linearized together by the assembler
+
+    def __post_init__(self):
+        self.V_points = np.asarray(self.V_points, dtype=float)
+        self.I_points = np.asarray(self.I_points, dtype=float)
+        if len(self.V_points) < 2 or len(self.V_points) != len(self.I_points):
+            raise ValueError(
+                f"{self.name}: a tabela PWL precisa de pelo menos 2 pontos (V, I)."
+            )
+        if np.any(np.diff(self.V_points) < 0):
+            raise ValueError(f"{self.name}: as tensões da tabela PWL devem ser crescentes.")
+        # Segment lookup tables; V_points/I_points are fixed from here on
+        I_nr, G = pwl_segments(self.V_points, self.I_points)
+        self._V_inner = self.V_points[1:-1].tolist()
+        self._I_nr = I_nr.tolist()
+        self._G = G.tolist()
 
     def max_node(self) -> int:  
         return max(self.a, self.b)
 
     def _get_current_and_conductance(self, Vab: float) -> Tuple[float, float]:
         """
-        Calculate the equivalent current and conductance for the Non-Linear Resistor
+        Calculate the equivalent current and conductance for the Non-Linear Resistor:
+        the precomputed Norton equivalent of the segment holding Vab (the end
+        segments extend past the table)
         """
-        # Get Vab and find the segment
-        if Vab <= self.V_points[0]:
-            idx = 0
-        elif Vab >= self.V_points[-1]:
-            idx = len(self.V_points) - 2
-        else:
-            idx = np.searchsorted(self.V_points, Vab) - 1
-
-        # Get points of the segment
-        V_i, I_i = self.V_points[idx], self.I_points[idx]
-        V_i1, I_i1 = self.V_points[idx+1], self.I_points[idx+1]
-        
-        # Get the equivalent conductance (G_eq) as the slope of the segment
-        if V_i1 == V_i:
-            G_eq = 0.0
-        else:
-            G_eq = (I_i1 - I_i) / (V_i1 - V_i)
-        
-        # Calculate the equivalent current source (I_eq) for the Norton model
-        I_resistor = I_i + G_eq * (Vab - V_i)
-        
-        # I_NR = I_resistor - G_eq * Vab
-        I_nr = I_resistor - G_eq * Vab
-        
-        return I_nr, G_eq
+        idx = bisect_left(self._V_inner, Vab)
+        return self._I_nr[idx], self._G[idx]
 
     def stamp_dc(self, 
                  G: np.ndarray, 
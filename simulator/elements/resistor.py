@@ -1,13 +1,16 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from typing import ClassVar
 import numpy as np
-from .base import Element, TimeMethod
+from .base import Element, TimeMethod, StampKind
 
 @dataclass
 class Resistor(Element):
     a: int
     b: int
     R: float
+    stamp_kind: ClassVar[StampKind] = StampKind.CONSTANT
+    value_attr: ClassVar[str] = "R"
 
     def max_node(self) -> int:
         return max(self.a, self.b)
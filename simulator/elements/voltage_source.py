@@ -1,8 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 import numpy as np, math
-from .base import Element, TimeMethod
-from typing import ClassVar, Optional, Dict, Any
+from .base import (Element, TimeMethod, StampKind, pulse_breakpoints, sin_breakpoints,
+                   pulse_values, sin_values)
+from typing import ClassVar, List, Optional, Dict, Any
 
 @dataclass
 class VoltageSource(Element):
@@ -17,6 +18,9 @@ class VoltageSource(Element):
     sin_params: Optional[Dict[str, float]] = None
     pulse_params: Optional[Dict[str, float]] = None
     is_mna: ClassVar[bool] = True
+    is_source: ClassVar[bool] = True
+    stamp_kind: ClassVar[StampKind] = StampKind.TIME
+    value_attr: ClassVar[str] = "dc"
 
     def max_node(self) -> int:
         return max(self.a, self.b)
@@ -114,27 +118,52 @@ class VoltageSource(Element):
             # low state
             return v1
 
+    def get_values_at(self, times: np.ndarray) -> np.ndarray:
+        """
+        Vectorized get_value_at: the voltage at every time of an array.
+        """
+        times = np.asarray(times, dtype=float)
+        if self.source_type == "AC":
+            return self.dc + self.amp * np.cos(2*math.pi*self.freq*times + math.radians(self.phase_deg))
+        elif self.source_type == "SIN" and self.sin_params is not None:
+            return sin_values(self.sin_params, times)
+        elif self.source_type == "PULSE" and self.pulse_params is not None:
+            return pulse_values(self.pulse_params.get("v1", 0.0),
+                                self.pulse_params.get("v2", 0.0), self.pulse_params, times)
+        else:
+            return np.full(times.shape, self.dc)
+
+    def breakpoints(self, t_stop: float) -> List[float]:
+        """Corners of the PULSE/SIN waveform in (0, t_stop)."""
+        if self.source_type == "PULSE" and self.pulse_params is not None:
+            return pulse_breakpoints(self.pulse_params, t_stop)
+        if self.source_type == "SIN" and self.sin_params is not None:
+            return sin_breakpoints(self.sin_params, t_stop)
+        return []
+
     def _value(self, t: float) -> float:
         """ Mantains retrocompatibility """
         return self.get_value_at(t)
 
-    def _augment(self, G: np.ndarray, I: np.ndarray):
-        n = G.shape[0]
-        G2 = np.zeros((n+1, n+1)); G2[:n,:n] = G
-        I2 = np.zeros((n+1,)); I2[:n] = I
-        return G2, I2
-
-    def _stamp_common(self, G: np.ndarray, I: np.ndarray, val: float):
-        G, I = self._augment(G, I)
-        n = G.shape[0]-1; k = n
+    def stamp_value(self, G: np.ndarray, I: np.ndarray, val: float, mna_idx: Optional[int] = None):
+        """Stamps the source with a given value (e.g. from a precomputed table)."""
+        if mna_idx is None:
+            G, I = self._augment(G, I)
+            mna_idx = G.shape[0] - 1
+        k = mna_idx
         G[self.a, k] += 1; G[self.b, k] -= 1
         G[k, self.a] += 1; G[k, self.b] -= 1
         I[k] += val
         return G, I
 
-    def stamp_dc(self, G: np.ndarray, I: np.ndarray, x_guess=None):
-        return self._stamp_common(G, I, self._value(0.0))
+    def stamp_dc(self, G: np.ndarray, I: np.ndarray, x_guess=None, mna_idx: Optional[int] = None):
+        return self.stamp_value(G, I, self._value(0.0), mna_idx)
+
+    def stamp_ac(self, C, b, mna_idx: Optional[int] = None):
+        # Small-signal amplitude of an AC source (the rest are shorted in .AC)
+        if self.is_ac:
+            b[mna_idx] += self.amp * np.exp(1j * math.radians(self.phase_deg))
 
-    def stamp_transient(self, G, I, state, t, dt, method, x_guess=None):
-        G, I = self._stamp_common(G, I, self._value(t))
+    def stamp_transient(self, G, I, state, t, dt, method, x_guess=None, mna_idx: Optional[int] = None):
+        G, I = self.stamp_value(G, I, self._value(t), mna_idx)
         return G, I, state
@@ -1,46 +1,21 @@
 from __future__ import annotations
+import dataclasses
+import math
 import numpy as np
 from scipy import linalg
+from scipy.sparse import linalg as sparse_linalg
 from .elements.base import TimeMethod
-from .newton import newton_solve
-from typing import Tuple, Optional, List, Dict, Any
+from .newton import newton_solve, JacobianCache
+from .linsolve import LinearSolver
+from .state import StateStore
+from .assembly import (
+    CompiledCircuit,
+    use_sparse,
+    _get_total_var_count,
+)
+from typing import Tuple, Optional, List, Dict, Any, Callable, Sequence
 from simulator.plotting.plot_utils import load_sim_file, plot_simulation
 
-# Elements that add extra variables in MNA (new line in matrix and vector)
-
-def _get_mna_var_count(elem) -> int:
-    """Quantas variáveis MNA extras esse elemento adiciona."""
-    if not getattr(elem, "is_mna", False):
-        return 0
-
-    # Caso especial: CCVS costuma adicionar 2 variáveis (corrente de controle + de saída)
-    if elem.__class__.__name__ == "CCVS":
-        return 2
-
-    # Se o elemento expõe explicitamente quantas variáveis MNA usa
-    if hasattr(elem, "mna_variables"):
-        try:
-            n = int(elem.mna_variables())
-            if n > 0:
-                return n
-        except Exception:
-            pass
-
-    # Caso padrão: 1 variável MNA
-    return 1
-
-def _get_total_var_count(data):
-    """
-    Calculates the total number of variables in the MNA system
-    (max_node + 1) + (extra MNA variables).
-    
-    Note: Most MNA elements add 1 variable, but CCVS adds 2 variables.
-    """
-    n_extra = 0
-    for elem in data.elements:
-        n_extra += _get_mna_var_count(elem)
-    return data.max_node + 1 + n_extra
-
 def _build_mna_system(
     data, 
     x_guess_red: np.ndarray, 
@@ -53,6 +28,12 @@ def _build_mna_system(
     """
     Build auxiliary MNA matrix (G, I) given a guess vector x_guess
     Used as callback for newton_solve.
+
+    Reference (uncompiled) assembly: allocates a new matrix on every call
+    and lets each MNA element grow it. The solvers use
+    CompiledCircuit.build instead; this is kept for comparison/benchmarks.
+    Only stamps data.elements: convert a columnar netlist with
+    columnar.to_elements first.
     """
 
     # To be sure the correct parameters are passed
@@ -93,55 +74,128 @@ def _build_mna_system(
     # Remove 0th row and column (node 0)
     return G[1:, 1:], I[1:]
 
-from typing import Dict, Tuple, List
+# ============================================================
+#               DC CONTINUATION (HOMOTOPY)
+# ============================================================
+
+# Continuation methods tried by solve_dc, in this order, when Newton
+# from the initial guess fails (before any random restart)
+DC_HOMOTOPY = ("gmin", "source")
 
-def build_mna_index_map(data) -> Dict[Tuple[int, str], int]:
+
+def _gmin_stepping(compiled: CompiledCircuit, newton: Callable[[np.ndarray], np.ndarray],
+                   x0: np.ndarray, gmin_start: float = 1e-2, gmin_stop: float = 1e-12,
+                   gmin_max: float = 1e2, max_steps: int = 100) -> np.ndarray:
+    """
+    Gmin stepping: a shunt conductance gmin from every node to ground
+    keeps the Jacobian diagonally dominant and the junction voltages
+    small. The circuit is solved for a decreasing gmin, each solution
+    being the initial guess of the next step, and finally with gmin = 0.
+    If even gmin_start fails, it is raised tenfold (up to gmin_max); a
+    later failed step is retried closer to the last gmin that converged.
     """
-    Maps (element_index, variable_type) -> global index in x_full.
+    x, good, factor = x0, None, 10.0
+    gmin = gmin_start
+    try:
+        for _ in range(max_steps):
+            compiled.gmin = gmin
+            try:
+                x_new = newton(x)
+            except RuntimeError:
+                if good is None:
+                    gmin *= 10.0
+                    if gmin > gmin_max:
+                        raise
+                    continue
+                factor = np.sqrt(factor)
+                if factor < 1.01:
+                    raise
+                gmin = good / factor
+                continue
+
+            if gmin == 0.0:
+                return x_new
+            x, good = x_new, gmin
+            factor = min(factor * factor, 10.0)
+            gmin = good / factor
+            if gmin < gmin_stop:
+                gmin = 0.0
+        raise RuntimeError("Gmin stepping excedeu o número máximo de passos.")
+    finally:
+        compiled.gmin = 0.0
 
-    variable_type:
-      - "i"      : single current variable for the element (default MNA current)
-      - "i_out"  : output current (CCVS)
-      - "i_ctrl" : control current (CCVS)
+
+def _source_stepping(compiled: CompiledCircuit, newton: Callable[[np.ndarray], np.ndarray],
+                     x0: np.ndarray, step: float = 0.1, min_step: float = 1e-4,
+                     max_steps: int = 200) -> np.ndarray:
+    """
+    Source stepping: every independent source is ramped from 0 to 100%
+    of its value (CompiledCircuit.source_scale), each solution being the
+    initial guess of the next step. With the sources off the operating
+    point is trivial. The step grows after each success and is halved,
+    from the last scale that converged, after a failure.
     """
-    mna_map: Dict[Tuple[int, str], int] = {}
+    x, good, scale = np.zeros_like(x0), None, 0.0
+    try:
+        for _ in range(max_steps):
+            compiled.source_scale = scale
+            try:
+                x_new = newton(x)
+            except RuntimeError:
+                step /= 2.0
+                if good is None or step < min_step:
+                    raise
+                scale = good + step
+                continue
 
-    # In x_full we have:
-    #   index 0           -> ground (node 0)
-    #   indices 1..max_node -> node voltages
-    #   indices max_node+1.. -> MNA extra variables (currents, etc.)
-    idx = data.max_node + 1
+            if scale >= 1.0:
+                return x_new
+            x, good = x_new, scale
+            step *= 1.5
+            scale = min(1.0, good + step)
+        raise RuntimeError("Source stepping excedeu o número máximo de passos.")
+    finally:
+        compiled.source_scale = 1.0
 
-    for elem_idx, elem in enumerate(data.elements):
-        if not getattr(elem, "is_mna", False):
-            continue
 
-        cls_name = elem.__class__.__name__
+_HOMOTOPY_METHODS = {
+    "gmin": _gmin_stepping,
+    "source": _source_stepping,
+}
 
-        if cls_name == "CCVS":
-            # First index: control current
-            mna_map[(elem_idx, "i_ctrl")] = idx
-            # Second index: output current
-            mna_map[(elem_idx, "i_out")] = idx + 1
-            idx += 2
-        else:
-            n_vars = _get_mna_var_count(elem)
-            if n_vars == 1:
-                mna_map[(elem_idx, "i")] = idx
-            else:
-                # Generic case if any element uses more than 1 MNA variable
-                for k in range(n_vars):
-                    mna_map[(elem_idx, f"i{k}")] = idx + k
-            idx += n_vars
 
-    return mna_map
+def _dc_operating_point(compiled: CompiledCircuit, newton: Callable[..., np.ndarray],
+                        x0: np.ndarray, homotopy: Sequence[str], max_guesses: int) -> np.ndarray:
+    """
+    Newton from x0; if it fails, the continuation methods in homotopy,
+    in order; random initial guesses (newton_solve) only as a last resort.
+    """
+    if not homotopy:
+        return newton(x0, max_guesses)
+
+    try:
+        return newton(x0)
+    except RuntimeError:
+        pass
+
+    for name in homotopy:
+        print(f"[DC Analysis] Newton-Raphson did not converge, trying {name} stepping")
+        try:
+            return _HOMOTOPY_METHODS[name](compiled, newton, x0)
+        except RuntimeError:
+            pass
+
+    print("[DC Analysis] Continuation failed, trying random initial guesses")
+    return newton(x0, max_guesses)
 
 
 # ============================================================
 #                      DC SOLVER
 # ============================================================
 def solve_dc(data, nr_tol, v0_vector, desired_nodes, 
-             max_nr_iter: int = 50, max_nr_guesses: int = 100):
+             max_nr_iter: int = 50, max_nr_guesses: int = 100,
+             sparse: Optional[bool] = None, nr_strategy: str = "newton",
+             homotopy: Sequence[str] = DC_HOMOTOPY, stamping: str = "elements"):
     """
     Solve DC analysis.
 
@@ -163,9 +217,31 @@ def solve_dc(data, nr_tol, v0_vector, desired_nodes,
         Maximum NR iterations per guess (N, typically 20-50)
     max_nr_guesses : int
         Maximum number of random guess attempts (M, typically 100)
+    sparse : bool | None
+        Sparse MNA assembly + sparse LU (True), dense (False) or chosen
+        by node count (None, see assembly.SPARSE_NODE_THRESHOLD)
+    nr_strategy : str
+        Newton variant: "newton" (full), "chord" or "broyden"
+        (see newton.NewtonStrategy)
+    homotopy : Sequence[str]
+        Continuation methods tried, in order, when Newton from the initial
+        guess fails: "gmin" (gmin stepping) and/or "source" (source
+        stepping). Random initial guesses are only tried after them; an
+        empty sequence goes straight to the random guesses
+    stamping : str
+        Assembly backend of the Resistor/Capacitor objects: "elements"
+        (one stamp call each) or "vectorized" (one scatter per class), see
+        assembly.STAMPING_BACKENDS
     """
-    # Get system total size, including extra MNA variables
-    n_total = _get_total_var_count(data)
+    unknown = [name for name in homotopy if name not in _HOMOTOPY_METHODS]
+    if unknown:
+        raise ValueError(f"Método de continuação DC desconhecido: {unknown}. "
+                         f"Opções: {list(_HOMOTOPY_METHODS)}")
+
+    # Fixed MNA layout + preallocated buffers for this analysis
+    compiled = CompiledCircuit(data, sparse=use_sparse(data, sparse), stamping=stamping)
+    linear_solver = LinearSolver()
+    n_total = compiled.n_total
     
     # Define initial guess.
     if v0_vector is not None and len(v0_vector) == n_total:
@@ -179,15 +255,19 @@ def solve_dc(data, nr_tol, v0_vector, desired_nodes,
         print("[DC Analysis] Using Newton-Raphson (nonlinear circuit)")
         
         def build_mna(x_guess_red: np.ndarray):
-            return _build_mna_system(
-                data, 
-                x_guess_red, 
-                analysis_context="DC"
-            )
+            return compiled.build(x_guess_red, analysis_context="DC")
+
+        def newton(x_start: np.ndarray, max_guesses: int = 1) -> np.ndarray:
+            # Every attempt starts from its own guess: no stale limiting history
+            compiled.reset_limiting()
+            return newton_solve(build_mna, x_start, tol=nr_tol,
+                                max_iter=max_nr_iter, max_guesses=max_guesses,
+                                linear_solver=linear_solver, strategy=nr_strategy,
+                                is_limited=compiled.limited,
+                                reset_limiting=compiled.reset_limiting)
         
         try:
-            x_red = newton_solve(build_mna, x0_red, tol=nr_tol, 
-                                max_iter=max_nr_iter, max_guesses=max_nr_guesses)
+            x_red = _dc_operating_point(compiled, newton, x0_red, homotopy, max_nr_guesses)
         except Exception as e:
             raise RuntimeError(f"NR falhou na análise DC: {e}")
     else:
@@ -195,8 +275,8 @@ def solve_dc(data, nr_tol, v0_vector, desired_nodes,
         print("[DC Analysis] Using direct solve (linear circuit)")
         
         try:
-            G, I = _build_mna_system(data, x0_red, analysis_context="DC")
-            x_red = linalg.solve(G, I)
+            G, I = compiled.build(x0_red, analysis_context="DC")
+            x_red = linear_solver.solve(G, I)
         except Exception as e:
             raise RuntimeError(f"Solução direta falhou na análise DC: {e}")
 
@@ -211,7 +291,338 @@ def solve_dc(data, nr_tol, v0_vector, desired_nodes,
         return x
 
 # ============================================================
-#              TRANSIENT SOLVER (NR + BE/TRAP/FE)
+#                 DC SWEEP (SOLUTION CONTINUATION)
+# ============================================================
+def _continuation_guess(values: np.ndarray, k: int, x_hist: List[np.ndarray],
+                        x0: np.ndarray, extrapolate: bool) -> np.ndarray:
+    """
+    Initial guess of sweep point k: x0 at the first point, then the
+    previous solution or, with extrapolate and two previous points, the
+    line through them evaluated at values[k].
+    """
+    if not x_hist:
+        return x0.copy()
+    if not extrapolate or len(x_hist) < 2 or values[k - 1] == values[k - 2]:
+        return x_hist[-1].copy()
+    slope = (values[k] - values[k - 1]) / (values[k - 1] - values[k - 2])
+    return x_hist[-1] + slope * (x_hist[-1] - x_hist[-2])
+
+
+def solve_dc_sweep(data, source: str, values, nr_tol, desired_nodes,
+                   max_nr_iter: int = 50, max_nr_guesses: int = 100,
+                   sparse: Optional[bool] = None, nr_strategy: str = "newton",
+                   homotopy: Sequence[str] = DC_HOMOTOPY, stamping: str = "elements",
+                   extrapolate: bool = True) -> np.ndarray:
+    """
+    DC operating point for each value of an independent source (.DC).
+
+    The circuit is compiled once, on a copy of the netlist where the swept
+    source is a plain DC source; only its value changes between points.
+    Linear circuits factor G once (the source only enters I). Nonlinear
+    ones start Newton at each point from the previous solution, linearly
+    extrapolated through the last two points (extrapolate=True), and fall
+    back to the solve_dc continuation (homotopy, random guesses) at a
+    point where that fails.
+
+    Returns a (len(desired_nodes), len(values)) array, one column per
+    point. Other parameters as in solve_dc.
+    """
+    values = np.asarray(values, dtype=float)
+    name = source.upper()
+    idx = next((i for i, elem in enumerate(data.elements)
+                if elem.name.upper() == name and getattr(elem, "is_source", False)), None)
+    if idx is None:
+        raise ValueError(f"Fonte independente '{source}' da varredura DC não existe na netlist.")
+    if not len(values):
+        raise ValueError("Varredura DC sem valores.")
+
+    swept = dataclasses.replace(data.elements[idx], source_type="DC", is_ac=False, dc=float(values[0]))
+    elements = list(data.elements)
+    elements[idx] = swept
+    data = dataclasses.replace(data, elements=elements)
+
+    compiled = CompiledCircuit(data, sparse=use_sparse(data, sparse), stamping=stamping)
+    linear_solver = LinearSolver()
+    desired_idx = np.asarray(desired_nodes, dtype=int)
+    out = np.zeros((len(desired_idx), len(values)))
+    x_zero = np.zeros(compiled.n_total - 1)
+    x_hist: List[np.ndarray] = []  # solutions of the last two points
+    n_builds = 0
+
+    def build_mna(x_guess_red: np.ndarray):
+        nonlocal n_builds
+        n_builds += 1
+        return compiled.build(x_guess_red, analysis_context="DC")
+
+    def newton(x_start: np.ndarray, max_guesses: int = 1) -> np.ndarray:
+        compiled.reset_limiting()
+        return newton_solve(build_mna, x_start, tol=nr_tol,
+                            max_iter=max_nr_iter, max_guesses=max_guesses,
+                            linear_solver=linear_solver, strategy=nr_strategy,
+                            is_limited=compiled.limited,
+                            reset_limiting=compiled.reset_limiting)
+
+    linear_lu = None
+    for k, value in enumerate(values):
+        # In place on the private copy; the cached source stamps are dropped
+        swept.dc = float(value)
+        compiled.invalidate()
+        if data.has_nonlinear_elements:
+            x0 = _continuation_guess(values, k, x_hist, x_zero, extrapolate)
+            try:
+                x_red = _dc_operating_point(compiled, newton, x0, homotopy, max_nr_guesses)
+            except RuntimeError as e:
+                raise RuntimeError(f"NR falhou na varredura DC em {source} = {value:g}: {e}")
+        else:
+            try:
+                if linear_lu is None:
+                    G, I = compiled.build(x_zero, analysis_context="DC")
+                    linear_lu = linear_solver.factor(G)
+                else:
+                    I = compiled.build_rhs(x_zero, analysis_context="DC")
+                x_red = linear_lu.solve(I)
+            except linalg.LinAlgError as e:
+                raise RuntimeError(f"Solução direta falhou na varredura DC: {e}") from e
+        x_hist = x_hist[-1:] + [x_red]
+        out[:, k] = np.concatenate(([0.0], x_red))[desired_idx]
+
+    if data.has_nonlinear_elements:
+        print(f"[DC Sweep] {len(values)} points, {n_builds / len(values):.1f} "
+              f"Newton-Raphson assemblies per point")
+    return out
+
+
+# ============================================================
+#                AC SMALL-SIGNAL ANALYSIS
+# ============================================================
+
+# Frequency sweeps of .AC: points per decade, per octave or in total
+AC_SWEEPS = ("DEC", "OCT", "LIN")
+
+# Largest stack of dense (G + j*omega*C) systems handed to one batched
+# solve, in complex matrix entries (512 kB: larger stacks fall out of cache
+# and run slower than one solve per frequency)
+AC_STACK_ENTRIES = 1 << 15
+
+
+def ac_frequencies(sweep: str, points: int, fstart: float, fstop: float) -> np.ndarray:
+    """
+    Frequencies of an .AC sweep: DEC/OCT with `points` per decade/octave
+    from fstart up to fstop, LIN with `points` in total (both included).
+    """
+    sweep = sweep.upper()
+    if sweep not in AC_SWEEPS:
+        raise ValueError(f"Varredura AC desconhecida: {sweep!r}. Opções: {list(AC_SWEEPS)}")
+    if points < 1 or fstop < fstart or fstart < 0.0 or (sweep != "LIN" and fstart <= 0.0):
+        raise ValueError(f"Varredura AC inválida: {points} pontos de {fstart:g} a {fstop:g} Hz.")
+    if sweep == "LIN":
+        return np.linspace(fstart, fstop, points)
+    base = 10.0 if sweep == "DEC" else 2.0
+    n = int(np.floor(np.log(fstop / fstart) / np.log(base) * points + 1e-9)) + 1
+    return fstart * base ** (np.arange(n) / points)
+
+
+def _solve_ac_dense(G: np.ndarray, C: np.ndarray, b: np.ndarray, omega: np.ndarray) -> np.ndarray:
+    """(G + j*omega*C) x = b for every omega, as stacks of systems solved at once."""
+    n = len(b)
+    x = np.empty((len(omega), n), dtype=complex)
+    chunk = max(1, AC_STACK_ENTRIES // max(n * n, 1))
+    for start in range(0, len(omega), chunk):
+        w = omega[start:start + chunk]
+        A = G + 1j * w[:, None, None] * C
+        rhs = np.broadcast_to(b, (len(w), n))[..., None]
+        x[start:start + chunk] = np.linalg.solve(A, rhs)[..., 0]
+    return x
+
+
+def _solve_ac_sparse(G, C, b: np.ndarray, omega: np.ndarray) -> np.ndarray:
+    """(G + j*omega*C) x = b for every omega, one sparse LU each."""
+    x = np.empty((len(omega), len(b)), dtype=complex)
+    G = G.astype(complex)
+    C = C.astype(complex)
+    for k, w in enumerate(omega):
+        try:
+            lu = sparse_linalg.splu((G + 1j * w * C).tocsc())
+        except RuntimeError as e:
+            # SuperLU reports "Factor is exactly singular" as RuntimeError
+            raise linalg.LinAlgError(str(e)) from e
+        x[k] = lu.solve(b)
+    return x
+
+
+def solve_ac(data, frequencies, nr_tol, desired_nodes, source: Optional[str] = None,
+             max_nr_iter: int = 50, max_nr_guesses: int = 100,
+             sparse: Optional[bool] = None, nr_strategy: str = "newton",
+             homotopy: Sequence[str] = DC_HOMOTOPY, stamping: str = "elements") -> np.ndarray:
+    """
+    Small-signal AC analysis (.AC).
+
+    Every independent source is set to its DC value and the circuit is
+    linearized at that operating point (linear circuits skip the DC
+    solve: their G does not depend on it). G, C and the excitation b are
+    built once (CompiledCircuit.build_ac); then (G + j*omega*C) x = b is
+    solved for all the frequencies: dense systems in stacks, one batched
+    LAPACK call per stack, sparse ones with one LU per frequency.
+
+    The excitation is the amplitude and phase of the AC sources or, when
+    source is given, 1 at 0 degrees on that independent source alone
+    (transfer functions from it). Returns the complex node phasors, a
+    (len(desired_nodes), len(frequencies)) array. Other parameters as in
+    solve_dc.
+    """
+    frequencies = np.asarray(frequencies, dtype=float)
+    if not len(frequencies):
+        raise ValueError("Análise AC sem frequências.")
+    src_idx = None
+    if source is not None:
+        name = source.upper()
+        src_idx = next((i for i, elem in enumerate(data.elements)
+                        if elem.name.upper() == name and getattr(elem, "is_source", False)), None)
+        if src_idx is None:
+            raise ValueError(f"Fonte independente '{source}' da análise AC não existe na netlist.")
+
+    # Private copy: sources at their DC value, excitation on the AC ones
+    elements = list(data.elements)
+    for i, elem in enumerate(elements):
+        if not getattr(elem, "is_source", False):
+            continue
+        if src_idx is None:
+            elements[i] = dataclasses.replace(elem, source_type="DC")
+        elif i == src_idx:
+            elements[i] = dataclasses.replace(elem, source_type="DC", is_ac=True,
+                                              amp=1.0, phase_deg=0.0)
+        else:
+            elements[i] = dataclasses.replace(elem, source_type="DC", is_ac=False)
+    if not any(getattr(elem, "is_source", False) and elem.is_ac for elem in elements):
+        raise ValueError("Análise AC sem excitação: a netlist não tem fonte AC; "
+                         "passe 'source' para excitar uma fonte independente.")
+    data = dataclasses.replace(data, elements=elements)
+
+    compiled = CompiledCircuit(data, sparse=use_sparse(data, sparse), stamping=stamping)
+    x_op = np.zeros(compiled.n_total - 1)
+    if data.has_nonlinear_elements:
+        print("[AC Analysis] Linearizing at the DC operating point")
+        linear_solver = LinearSolver()
+
+        def build_mna(x_guess_red: np.ndarray):
+            return compiled.build(x_guess_red, analysis_context="DC")
+
+        def newton(x_start: np.ndarray, max_guesses: int = 1) -> np.ndarray:
+            compiled.reset_limiting()
+            return newton_solve(build_mna, x_start, tol=nr_tol,
+                                max_iter=max_nr_iter, max_guesses=max_guesses,
+                                linear_solver=linear_solver, strategy=nr_strategy,
+                                is_limited=compiled.limited,
+                                reset_limiting=compiled.reset_limiting)
+
+        try:
+            x_op = _dc_operating_point(compiled, newton, x_op, homotopy, max_nr_guesses)
+        except RuntimeError as e:
+            raise RuntimeError(f"NR falhou no ponto de operação da análise AC: {e}")
+
+    G, C, b = compiled.build_ac(x_op)
+    omega = 2.0 * math.pi * frequencies
+    try:
+        if compiled.sparse:
+            x = _solve_ac_sparse(G, C, b, omega)
+        else:
+            x = _solve_ac_dense(G, C, b, omega)
+    except linalg.LinAlgError as e:
+        raise RuntimeError(f"Solução da análise AC falhou: {e}") from e
+
+    x = np.concatenate((np.zeros((len(omega), 1), dtype=complex), x), axis=1)
+    return x[:, np.asarray(desired_nodes, dtype=int)].T
+
+
+# ============================================================
+#            ADAPTIVE STEP: LOCAL TRUNCATION ERROR
+# ============================================================
+
+# Order and error constant of each integration method (LTE = C h^(k+1) x^(k+1))
+_METHOD_ORDER = {
+    TimeMethod.BACKWARD_EULER: (1, 0.5),
+    TimeMethod.FORWARD_EULER: (1, 0.5),
+    TimeMethod.TRAPEZOIDAL: (2, 1.0 / 12.0),
+    TimeMethod.GEAR2: (2, 2.0 / 9.0),
+}
+
+
+# Breakpoints closer than this fraction of the step to a time point are
+# taken as that point
+_BP_MERGE = 1e-6
+
+# Linear-circuit LU factorizations kept by solve_tran (one per step size)
+_LINEAR_LU_CACHE = 4
+
+
+def _source_breakpoints(data, total_time: float) -> np.ndarray:
+    """Sorted breakpoints of all elements in (0, total_time)."""
+    points = [bp for elem in data.elements for bp in elem.breakpoints(total_time)]
+    return np.unique(np.asarray(points, dtype=float))
+
+
+def _companion_key(states: StateStore, h: float, method: TimeMethod):
+    """
+    What the transient G of a linear circuit depends on besides the
+    topology: the step h and, for GEAR2, the previous step (None on the
+    backward Euler start-up step). All reactive elements share it.
+    """
+    if method != TimeMethod.GEAR2:
+        return h
+    return h, states.h_prev
+
+
+def _lte_variables(states: StateStore, compiled: CompiledCircuit) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Integrated quantities of the elements with state, for the LTE
+    estimate, named by the first of the class's state_vars: "v_prev" is
+    the terminal voltage (capacitors, by object or column), "i_prev" the
+    element's MNA variable (inductors). Returns the terminals (a, b) of
+    the voltages and the solution indices of the currents.
+    """
+    blocks = list(states.class_blocks.values()) + list(states.column_blocks.values())
+    v_blocks = [b for b in blocks if b.cls.state_vars[0] == "v_prev"]
+    a = np.concatenate([b.a for b in v_blocks] + [np.zeros(0, dtype=int)])
+    b = np.concatenate([b.b for b in v_blocks] + [np.zeros(0, dtype=int)])
+    k = np.array([compiled.mna_idx[i] for blk in blocks if blk.cls.state_vars[0] == "i_prev"
+                  for i in blk.indices], dtype=int)
+    return a, b, k
+
+
+def _lte_ratio(t_hist: List[float], s_hist: List[np.ndarray], t_new: float,
+               s_new: np.ndarray, method: TimeMethod, reltol: float, abstol: float) -> float:
+    """
+    Largest local truncation error of the state variables over its tolerance.
+
+    Predictor-corrector estimate (Milne's device): the predictor is the
+    polynomial through the last k+1 accepted points (k = method order),
+    extrapolated to t_new. The corrector (s_new) minus the predictor is
+    DD * prod(t_new - t_j), with DD the divided difference of order k+1,
+    and LTE = C (k+1)! h^(k+1) DD.
+    """
+    k, C = _METHOD_ORDER[method]
+    ts = t_hist[-(k + 1):]
+    ss = s_hist[-(k + 1):]
+
+    # Lagrange extrapolation to t_new
+    s_pred = np.zeros_like(s_new)
+    for j, (tj, sj) in enumerate(zip(ts, ss)):
+        w = 1.0
+        for m, tm in enumerate(ts):
+            if m != j:
+                w *= (t_new - tm) / (tj - tm)
+        s_pred += w * sj
+
+    h = t_new - ts[-1]
+    span = np.prod([t_new - tj for tj in ts])
+    lte = C * math.factorial(k + 1) * h ** (k + 1) / span * (s_new - s_pred)
+
+    tol = reltol * np.maximum(np.abs(s_new), np.abs(ss[-1])) + abstol
+    return float(np.max(np.abs(lte) / tol)) if len(lte) else 0.0
+
+
+# ============================================================
+#          TRANSIENT SOLVER (NR + BE/TRAP/FE/GEAR2)
 # ============================================================
 
 def solve_tran(
@@ -224,10 +635,39 @@ def solve_tran(
     method,
     max_nr_iter: int = 50,
     max_nr_guesses: int = 100,
+    sparse: Optional[bool] = None,
+    nr_strategy: str = "newton",
+    adaptive: bool = False,
+    reltol: float = 1e-3,
+    abstol: float = 1e-6,
+    dt_min: Optional[float] = None,
+    dt_max: Optional[float] = None,
+    internal_steps: int = 1,
+    breakpoints: bool = True,
+    stamping: str = "elements",
 ):
     """
     Solve transient (time-domain) analysis using Newton-Raphson.
 
+    Linear circuits skip Newton-Raphson: with a fixed dt their transient
+    matrix is constant, so it is LU-factored once and every time step only
+    rebuilds the right-hand side and back-substitutes.
+
+    With adaptive=True the internal time step follows the local truncation
+    error (LTE) of the capacitor voltages and inductor currents: a step is
+    rejected and retried shorter when the error exceeds
+    reltol * |value| + abstol, and the step grows through quiet stretches.
+    The solution is then linearly interpolated onto the same output grid
+    as the fixed-step run.
+
+    With internal_steps = N > 1 the circuit is integrated with dt / N, but
+    only every Nth point is stored in out and current_traces, so the
+    accuracy of the integration does not dictate the size of the output.
+
+    Both loops end a step exactly on every breakpoint of the sources
+    (corners of PULSE waveforms, end of a SIN delay) instead of stepping
+    over it; the adaptive loop restarts with a short step after each one.
+
     Parameters
     ----------
     data : NetlistOOP
@@ -235,7 +675,8 @@ def solve_tran(
     total_time : float
         Final simulation time (seconds).
     dt : float
-        Time step (seconds).
+        Time step (seconds). With adaptive=True, the output grid spacing
+        and the first internal step.
     nr_tol : float
         Newton-Raphson tolerance.
     v0_vector : np.ndarray | None
@@ -244,28 +685,64 @@ def solve_tran(
     desired_nodes : list[int]
         Node indices whose voltages will be stored in the output.
     method : TimeMethod
-        Time integration method (BE, FE, TRAP).
+        Time integration method (BE, FE, TRAP, GEAR2).
     max_nr_iter : int
         Maximum NR iterations per guess.
     max_nr_guesses : int
         Maximum number of random guess attempts.
+    sparse : bool | None
+        Sparse MNA assembly + sparse LU (True), dense (False) or chosen
+        by node count (None).
+    nr_strategy : str
+        Newton variant: "newton" (full), "chord" or "broyden". The chord
+        and Broyden factorization is kept across time steps.
+    adaptive : bool
+        Adaptive time step with LTE control (default: fixed dt).
+    reltol, abstol : float
+        Relative and absolute LTE tolerances of the adaptive step (abstol
+        in volts for capacitors, amperes for inductors).
+    dt_min, dt_max : float | None
+        Bounds of the adaptive step. Defaults: dt / 1000 and
+        total_time / 50 (but at least dt).
+    internal_steps : int
+        Integration steps per output sample (.TRAN <internal_steps>). With
+        adaptive=True it only sets the first internal step (dt / N).
+    breakpoints : bool
+        Land time steps on the source breakpoints (Element.breakpoints).
+    stamping : str
+        Assembly backend of the Resistor/Capacitor objects: "elements" or
+        "vectorized" (see solve_dc).
     """
 
     if total_time <= 0.0 or dt <= 0.0:
         raise ValueError("total_time and dt must be positive for TRAN analysis.")
+    if internal_steps < 1:
+        raise ValueError(f"internal_steps deve ser >= 1 (recebido: {internal_steps}).")
+    # Integration step
+    h = dt / internal_steps
 
     # Number of time samples (include t = 0)
     steps = int(total_time / dt) + 1
     times = np.linspace(0.0, total_time, steps)
 
-    # One state dict per element (for capacitors, inductors, etc.)
-    states: List[Dict[str, Any]] = [dict() for _ in data.elements]
+    # History of the reactive elements (capacitors, inductors, ...)
+    states = StateStore(data)
 
-    # Output matrix: each row is a node, each column is a time sample
-    out = np.zeros((len(desired_nodes), steps))
+    # Corners of the source waveforms, where a step must end
+    bps = _source_breakpoints(data, total_time) if breakpoints else np.empty(0)
+
+    desired_idx = np.asarray(desired_nodes, dtype=int)
+
+    # Fixed MNA layout + preallocated buffers, compiled once for the whole run
+    compiled = CompiledCircuit(data, sparse=use_sparse(data, sparse), stamping=stamping)
+
+    # Keeps the sparse ordering/pivot sequence across iterations and steps
+    linear_solver = LinearSolver()
+    # Chord/Broyden Jacobian, reused across time steps
+    jacobian = JacobianCache()
 
     # Total number of unknowns in the MNA system (nodes + extra MNA variables)
-    n_total = _get_total_var_count(data)
+    n_total = compiled.n_total
 
     # ------------------ initial guess vector ------------------
     # x[0] is always ground = 0. Other entries are nodes + MNA variables.
@@ -281,7 +758,7 @@ def solve_tran(
     # ------------------------------------------------------------------
     # Prepare mapping from elements to global MNA indices (currents, etc.)
     # ------------------------------------------------------------------
-    mna_index_map = build_mna_index_map(data)
+    mna_index_map = compiled.mna_map
 
     # Prepare structures to store currents over time:
     #   current_traces: name -> np.array(steps)
@@ -315,13 +792,8 @@ def solve_tran(
                 current_traces[signal_name] = np.zeros(steps)
                 tracked_currents.append((elem_idx, signal_name, mna_key))
 
-    # ============================================================
-    #                       TIME LOOP
-    # ============================================================
-    for ti, t in enumerate(times):
-
-        # Keep previous solution as initial guess for NR
-        x_prev = x.copy()
+    def _newton_step(x_prev: np.ndarray, t: float, h: float, max_guesses: int) -> np.ndarray:
+        """Nonlinear circuit: solves the MNA system at t with Newton-Raphson."""
 
         # ---------- build MNA system for this time step ----------
         def build_mna(x_guess_red: np.ndarray):
@@ -330,26 +802,30 @@ def solve_tran(
             receives x_guess without node 0 (reduced vector) and
             returns (G_red, I_red) for the current time step.
             """
-            G_red, I_red = _build_mna_system(
-                data,
+            G_red, I_red = compiled.build(
                 x_guess_red,
                 analysis_context="TRAN",
                 t=t,
-                dt=dt,
+                dt=h,
                 method=method,   # TimeMethod
-                states=states,   # List[Dict[str, Any]]
+                states=states,   # StateStore
             )
             return G_red, I_red
 
         # ---------- solve non-linear MNA with NR ----------
         try:
             # We remove node 0 (always 0) from the unknown vector
-            x_red = newton_solve(
+            return newton_solve(
                 build_mna,
                 x_prev[1:],
                 tol=nr_tol,
                 max_iter=max_nr_iter,
-                max_guesses=max_nr_guesses,
+                max_guesses=max_guesses,
+                linear_solver=linear_solver,
+                strategy=nr_strategy,
+                jacobian=jacobian,
+                is_limited=compiled.limited,
+                reset_limiting=compiled.reset_limiting,
             )
         except RuntimeError as e:
             # Add time information to the error for easier debugging
@@ -357,72 +833,234 @@ def solve_tran(
                 f"NR não convergiu em t={t:.5e}s na análise transiente.\n{e}"
             ) from e
 
-        # Reconstruct full solution vector including node 0
-        x = np.concatenate(([0.0], x_red))
+    # LU factors of the transient G of a linear circuit (constant for a given
+    # dt), by companion key; a few are kept so that the short steps around a
+    # breakpoint do not evict the factors of the regular step
+    linear_lus: Dict[Any, Any] = {}
 
-        # ---------- update element states (capacitors, inductors, ...) ----------
-        for idx, elem in enumerate(data.elements):
-            st = states[idx]
-
-            # Reactive elements need to store previous voltages/currents
-            # TODO: Generalize this with an interface in the elements in
-            # order to avoid class name checks (better OOP)
-
-            # We avoid importing specific classes here; use class name instead
-            if elem.__class__.__name__ == "Capacitor":
-                # Store capacitor voltage for next step
-                st["v_prev"] = x[elem.a] - x[elem.b]
-
-            elif elem.__class__.__name__ == "Inductor":
-                # Inductor current is stored in "i_prev"
-                if method == TimeMethod.BACKWARD_EULER:
-                    # i_new = i_old + (dt/L) * v
-                    i_old = st.get("i_prev", elem.i0)
-                    v = x[elem.a] - x[elem.b]
-                    i_new = i_old + (dt / elem.L) * v
-                    st["i_prev"] = i_new
-
-                elif method == TimeMethod.TRAPEZOIDAL:
-                    # i_new = i_old + (dt/(2L)) * (v_new + v_old)
-                    i_old = st.get("i_prev", elem.i0)
-                    v_old = st.get("v_prev", 0.0)
-                    v = x[elem.a] - x[elem.b]
-                    i_new = i_old + (dt / (2 * elem.L)) * (v + v_old)
-                    st["i_prev"] = i_new
-                    st["v_prev"] = v
-
-            states[idx] = st
+    def _solve_point(x_prev: np.ndarray, t: float, h: float,
+                     max_guesses: int = max_nr_guesses) -> np.ndarray:
+        """Full solution vector at t, reached from x_prev with a step h."""
+        if not data.has_nonlinear_elements:
+            # ---------- linear circuit: G is constant for a fixed dt ----------
+            # Factor it on the first step (and whenever h changes); otherwise
+            # only the right-hand side (sources + element history) is
+            # rebuilt and back-substituted
+            try:
+                key = _companion_key(states, h, method)
+                linear_lu = linear_lus.pop(key, None)
+                if linear_lu is None:
+                    G_red, I_red = compiled.build(
+                        x_prev[1:], analysis_context="TRAN",
+                        t=t, dt=h, method=method, states=states,
+                    )
+                    linear_lu = linear_solver.factor(G_red)
+                    if len(linear_lus) >= _LINEAR_LU_CACHE:
+                        del linear_lus[next(iter(linear_lus))]
+                else:
+                    I_red = compiled.build_rhs(
+                        x_prev[1:], analysis_context="TRAN",
+                        t=t, dt=h, method=method, states=states,
+                    )
+                linear_lus[key] = linear_lu  # most recently used last
+                x_red = linear_lu.solve(I_red)
+            except linalg.LinAlgError as e:
+                raise RuntimeError(
+                    f"Solução direta falhou em t={t:.5e}s na análise transiente: {e}"
+                ) from e
 
-        # ---------- store desired node voltages ----------
-        for j, node in enumerate(desired_nodes):
-            out[j, ti] = x[node]
+        else:
+            x_red = _newton_step(x_prev, t, h, max_guesses)
 
-        # ---------- store currents (state / MNA) ----------
-        for elem_idx, signal_name, mna_key in tracked_currents:
-            elem = data.elements[elem_idx]
+        # Reconstruct full solution vector including node 0
+        return np.concatenate(([0.0], x_red))
 
+    def _sample_currents(x: np.ndarray) -> np.ndarray:
+        """Tracked currents (state / MNA) at the solution x."""
+        values = np.zeros(len(tracked_currents))
+        for j, (elem_idx, signal_name, mna_key) in enumerate(tracked_currents):
             # State-based current (e.g., Inductor)
             if mna_key is None:
-                st = states[elem_idx]
-                if elem.__class__.__name__ == "Inductor":
-                    i_val = st.get("i_prev", getattr(elem, "i0", 0.0))
-                else:
-                    # Fallback, should not normally happen
-                    v = x[getattr(elem, "a", 0)] - x[getattr(elem, "b", 0)]
-                    i_val = 0.0
-                current_traces[signal_name][ti] = i_val
+                values[j] = states[elem_idx].get("i_prev", 0.0)
 
             # MNA-based current (voltage sources, controlled sources, opamp, etc.)
             else:
                 key = (elem_idx, mna_key)
                 idx_global = mna_index_map.get(key)
                 if idx_global is not None and 0 <= idx_global < len(x):
-                    current_traces[signal_name][ti] = x[idx_global]
-                else:
-                    # If for some reason we cannot map, store 0.0 as a safe default
-                    current_traces[signal_name][ti] = 0.0
+                    values[j] = x[idx_global]
+                # If for some reason we cannot map, 0.0 is a safe default
+        return values
+
+    if adaptive:
+        sample_times, x_samples, i_samples = _adaptive_time_loop(
+            data, compiled, states, x, total_time, h, method,
+            _solve_point, _sample_currents, max_nr_guesses,
+            reltol, abstol, dt_min, dt_max, bps,
+        )
+        # Report on the requested output grid
+        out = np.array([np.interp(times, sample_times, x_samples[:, node])
+                        for node in desired_idx]).reshape(len(desired_idx), steps)
+        for j, (_, signal_name, _) in enumerate(tracked_currents):
+            current_traces[signal_name] = np.interp(times, sample_times, i_samples[:, j])
+        return times, out, current_traces
+
+    # Output matrix: each row is a node, each column is a time sample
+    out = np.zeros((len(desired_idx), steps))
+
+    # All time points are known in advance: evaluate the sources on them
+    # in one vectorized pass
+    schedule = _fixed_schedule(times, internal_steps, h, bps)
+    compiled.tabulate_sources([t for t, _, _ in schedule])
+
+    # ============================================================
+    #                       TIME LOOP
+    # ============================================================
+    for t, h_step, ti in schedule:
+
+        # Keep previous solution as initial guess for NR
+        x = _solve_point(x, t, h_step)
+
+        # ---------- update element states (capacitors, inductors, ...) ----------
+        states.update(x, h_step, method)
+
+        if ti < 0:
+            continue  # internal step: not stored
+
+        # ---------- store desired node voltages ----------
+        out[:, ti] = x[desired_idx]
+
+        # ---------- store currents (state / MNA) ----------
+        for j, value in enumerate(_sample_currents(x)):
+            current_traces[tracked_currents[j][1]][ti] = value
 
     # At this point:
     #   - 'out' contains node voltages vs time
     #   - 'current_traces' contains currents of inductors and MNA elements vs time
-    return times, out, current_traces
\ No newline at end of file
+    return times, out, current_traces
+
+
+def _fixed_schedule(times: np.ndarray, internal_steps: int, h: float,
+                    bps: np.ndarray) -> List[Tuple[float, float, int]]:
+    """
+    Time points of the fixed-step loop as (t, step, output index), the
+    index being -1 for points that are not stored: internal_steps points
+    per output interval (t = 0 is a single one), plus one on every
+    breakpoint not within a tiny fraction of h of another point.
+    """
+    schedule = [(times[0], h, 0)]
+    t_cur = times[0]
+    next_bp = 0
+    for ti in range(1, len(times)):
+        t, t_last = times[ti], times[ti - 1]
+        for j in range(1, internal_steps + 1):
+            t_sub = t if j == internal_steps else t_last + j * (t - t_last) / internal_steps
+
+            h_sub = h
+            while next_bp < len(bps) and bps[next_bp] < t_sub - _BP_MERGE * h:
+                if bps[next_bp] > t_cur + _BP_MERGE * h:
+                    schedule.append((bps[next_bp], bps[next_bp] - t_cur, -1))
+                    t_cur = bps[next_bp]
+                    h_sub = t_sub - t_cur
+                next_bp += 1
+
+            schedule.append((t_sub, h_sub, ti if j == internal_steps else -1))
+            t_cur = t_sub
+    return schedule
+
+
+def _adaptive_time_loop(data, compiled: CompiledCircuit, states, x: np.ndarray,
+                        total_time: float, dt: float, method: TimeMethod,
+                        solve_point, sample_currents, max_nr_guesses: int,
+                        reltol: float, abstol: float,
+                        dt_min: Optional[float], dt_max: Optional[float],
+                        bps: np.ndarray):
+    """
+    Time loop of solve_tran(adaptive=True).
+
+    Steps are clipped to end on the next breakpoint in bps. After one, the
+    error history restarts (the solution has a corner there) and the step
+    is cut to a tenth, growing back once the LTE estimate is available.
+
+    Returns the accepted time points with the full solution vector and
+    the tracked currents at each of them (rows).
+    """
+    if dt_min is None:
+        dt_min = dt * 1e-3
+    if dt_max is None:
+        dt_max = max(dt, total_time / 50.0)
+    k, _ = _METHOD_ORDER[method]
+
+    # Variables of the error estimate: the integrated quantities of the
+    # state blocks for the integration error, plus the node voltages,
+    # whose predictor-corrector difference also bounds the error of the
+    # linear interpolation onto the output grid
+    n_nodes = data.max_node + 1
+    cap_a, cap_b, ind_k = _lte_variables(states, compiled)
+
+    def state_vars(x_full: np.ndarray) -> np.ndarray:
+        return np.concatenate((x_full[1:n_nodes], x_full[cap_a] - x_full[cap_b], x_full[ind_k]))
+
+    # Point t = 0, same as the fixed-step loop
+    x = solve_point(x, 0.0, dt)
+    states.update(x, dt, method)
+    t_acc, x_acc, i_acc = [0.0], [x], [sample_currents(x)]
+    s_hist = [state_vars(x)]
+
+    t = 0.0
+    h = min(dt, dt_max)
+    end = total_time * (1.0 - 1e-12)
+    next_bp = 0
+    while t < end:
+        h_step = min(h, total_time - t)
+
+        # Land on the next breakpoint instead of stepping over it (or
+        # leaving a sliver shorter than dt_min before it)
+        while next_bp < len(bps) and bps[next_bp] <= t + _BP_MERGE * h_step:
+            next_bp += 1
+        on_bp = next_bp < len(bps) and t + h_step >= bps[next_bp] - dt_min
+        if on_bp:
+            h_step = bps[next_bp] - t
+        t_new = bps[next_bp] if on_bp else t + h_step
+
+        # Newton failures are handled by cutting the step; random
+        # guesses are only tried at the smallest step
+        at_min = h_step <= dt_min
+        try:
+            x_new = solve_point(x, t_new, h_step, max_nr_guesses if at_min else 1)
+        except RuntimeError:
+            if at_min:
+                raise
+            h = max(h_step / 8.0, dt_min)
+            continue
+
+        s_new = state_vars(x_new)
+        grow = 1.0
+        if len(s_hist) > k:
+            ratio = _lte_ratio(t_acc, s_hist, t_new, s_new, method, reltol, abstol)
+            factor = 0.9 * ratio ** (-1.0 / (k + 1)) if ratio > 0.0 else 2.0
+            if ratio > 1.0 and not at_min:
+                # Reject: retry from t with a shorter step
+                h = max(h_step * max(factor, 0.2), dt_min)
+                continue
+            grow = min(factor, 2.0)
+
+        # Accept
+        t, x = t_new, x_new
+        states.update(x, h_step, method)
+        t_acc.append(t)
+        x_acc.append(x)
+        i_acc.append(sample_currents(x))
+        s_hist = (s_hist + [s_new])[-(k + 1):]
+
+        if on_bp:
+            # Restart: no predictor across the corner, short first step
+            s_hist = [s_new]
+            h = max(0.1 * h, dt_min)
+        # Only resize on a clear change (a linear circuit refactors G on
+        # every new step size)
+        elif grow < 1.0 or grow >= 1.2:
+            h = min(max(h_step * grow, dt_min), dt_max)
+
+    print(f"[TRAN] Adaptive step: {len(t_acc) - 1} accepted steps")
+    return np.asarray(t_acc), np.array(x_acc), np.array(i_acc).reshape(len(t_acc), -1)
@@ -0,0 +1,213 @@
+from __future__ import annotations
+import numpy as np
+from scipy import linalg, sparse
+from scipy.sparse import linalg as sparse_linalg
+from typing import Optional, Union
+
+Matrix = Union[np.ndarray, sparse.spmatrix]
+
+
+def solve(G: Matrix, b: np.ndarray) -> np.ndarray:
+    """
+    Solves G x = b for either a dense ndarray or a scipy.sparse matrix.
+
+    Dense matrices go to scipy.linalg.solve, sparse ones to a sparse LU
+    (scipy.sparse.linalg.splu, SuperLU). A singular matrix always raises
+    linalg.LinAlgError, whatever the backend, so callers handle one type.
+    """
+    if sparse.issparse(G):
+        try:
+            lu = sparse_linalg.splu(sparse.csc_matrix(G))
+        except RuntimeError as e:
+            # SuperLU reports "Factor is exactly singular" as RuntimeError
+            raise linalg.LinAlgError(str(e)) from e
+        x = lu.solve(np.asarray(b, dtype=float))
+        if not np.all(np.isfinite(x)):
+            raise linalg.LinAlgError("Sparse LU produced a non-finite solution.")
+        return x
+
+    return linalg.solve(G, b)
+
+
+# ============================================================
+#                      FACTORIZATIONS
+# ============================================================
+class DenseLU:
+    """LU factors of a dense matrix (LAPACK getrf/getrs, as lu_factor)."""
+
+    def __init__(self, G: np.ndarray):
+        # Straight to LAPACK: no finiteness check, condition estimate or
+        # warning on singular matrices (reported as LinAlgError instead)
+        self._getrf, self._getrs = linalg.get_lapack_funcs(("getrf", "getrs"), (G,))
+        self.lu, self.piv, info = self._getrf(G)
+        if info != 0 or not np.all(np.isfinite(self.lu)):
+            raise linalg.LinAlgError("Matriz singular.")
+
+    def solve(self, b: np.ndarray) -> np.ndarray:
+        x, info = self._getrs(self.lu, self.piv, b)
+        if info != 0:
+            raise linalg.LinAlgError("Falha em getrs.")
+        return x
+
+
+class _PermutedLU:
+    """
+    SuperLU factors of B = Pr A Pc, where Pr/Pc are a pivot sequence
+    computed earlier. Solves A x = b as B y = Pr b, x = Pc y.
+
+    The diagonal pivots of the stored sequence may be small for this A, so
+    every solution is checked: if its normwise backward error
+    |b - A x| / (|A| |x| + |b|) exceeds max_error, A is re-pivoted by the
+    solver (repivot) and the new factors are used from then on.
+    """
+
+    def __init__(self, lu, perm_r: np.ndarray, perm_c: np.ndarray,
+                 A: sparse.csc_matrix, max_error: float, repivot):
+        self.lu = lu
+        self.perm_r = perm_r
+        self.perm_c = perm_c
+        self.A = A
+        self.max_error = max_error
+        self._repivot = repivot
+        self._a_norm: Optional[float] = None
+        self._fallback = None
+
+    def solve(self, b: np.ndarray) -> np.ndarray:
+        if self._fallback is not None:
+            return self._fallback.solve(b)
+        b_perm = np.empty_like(b, dtype=float)
+        b_perm[self.perm_r] = b
+        x = self.lu.solve(b_perm)[self.perm_c]
+        if np.all(np.isfinite(x)) and self._backward_error(x, b) <= self.max_error:
+            return x
+        # Unstable with the stored pivots: factor A from scratch
+        self._fallback = self._repivot(self.A)
+        return self._fallback.solve(b)
+
+    def _backward_error(self, x: np.ndarray, b: np.ndarray) -> float:
+        if self._a_norm is None:
+            self._a_norm = float(abs(self.A).sum(axis=1).max()) if self.A.nnz else 0.0
+        scale = self._a_norm * np.max(np.abs(x), initial=0.0) + np.max(np.abs(b), initial=0.0)
+        if scale == 0.0:
+            return 0.0
+        return float(np.max(np.abs(b - self.A @ x), initial=0.0)) / scale
+
+
+class _SuperLU:
+    """Thin wrapper so a plain SuperLU object checks its solutions."""
+
+    def __init__(self, lu):
+        self.lu = lu
+
+    def solve(self, b: np.ndarray) -> np.ndarray:
+        x = self.lu.solve(np.asarray(b, dtype=float))
+        if not np.all(np.isfinite(x)):
+            raise linalg.LinAlgError("Sparse LU produced a non-finite solution.")
+        return x
+
+
+class LinearSolver:
+    """
+    Factorizes the successive MNA matrices of one analysis.
+
+    Dense matrices are factored with LAPACK getrf. For sparse matrices the
+    COLAMD column ordering and the partial-pivoting row sequence of the
+    first factorization (analysis) are kept, and every later matrix with
+    the same sparsity pattern is factored by SuperLU in that fixed order
+    with diagonal pivots, which skips the ordering and the pivot search.
+    SuperLU has no numeric-only refactorization: its symbolic analysis
+    (elimination tree, supernodes) runs again on each matrix, so the
+    saving is modest (about 15% per factorization on large RC meshes).
+
+    Static pivots can be unstable for a matrix the pivot sequence was not
+    computed for. Instead of the pivot growth, which needs a copy of the
+    U factor, each solution's backward error is checked against
+    growth_limit * machine epsilon (pivot growth g allows errors of about
+    g * eps); past it, or if the refactorization breaks down, the matrix
+    is re-pivoted from scratch and the new permutations are kept.
+
+    The pattern is recognized from the CSC index arrays, which
+    CompiledCircuit keeps fixed across builds.
+    """
+
+    def __init__(self, growth_limit: float = 1e8):
+        self.growth_limit = growth_limit
+        self.n_factor = 0    # numeric factorizations
+        self.n_analyze = 0   # full factorizations (COLAMD ordering + pivot search)
+
+        self._indices: Optional[np.ndarray] = None
+        self._indptr: Optional[np.ndarray] = None
+        self._perm_r: Optional[np.ndarray] = None
+        self._perm_c: Optional[np.ndarray] = None
+        # B.data = A.data[_data_map] with B = Pr A Pc on the fixed pattern
+        self._data_map: Optional[np.ndarray] = None
+        self._b_indices: Optional[np.ndarray] = None
+        self._b_indptr: Optional[np.ndarray] = None
+
+    def factor(self, G: Matrix):
+        """Returns an object with .solve(b) for the matrix G."""
+        self.n_factor += 1
+        if not sparse.issparse(G):
+            return DenseLU(G)
+
+        A = G if sparse.isspmatrix_csc(G) else sparse.csc_matrix(G)
+        if self._same_pattern(A):
+            lu = self._refactor(A)
+            if lu is not None:
+                return lu
+        return self._analyze(A)
+
+    def solve(self, G: Matrix, b: np.ndarray) -> np.ndarray:
+        return self.factor(G).solve(b)
+
+    # ------------------------------------------------------------
+    def _same_pattern(self, A: sparse.csc_matrix) -> bool:
+        if self._indices is None or self._indptr is None:
+            return False
+        if A.indices is self._indices and A.indptr is self._indptr:
+            return True
+        return (np.array_equal(A.indptr, self._indptr)
+                and np.array_equal(A.indices, self._indices))
+
+    def _analyze(self, A: sparse.csc_matrix):
+        """Full SuperLU factorization; keeps its pivot sequence for reuse."""
+        self.n_analyze += 1
+        try:
+            lu = sparse_linalg.splu(A, permc_spec="COLAMD")
+        except RuntimeError as e:
+            # SuperLU reports "Factor is exactly singular" as RuntimeError
+            self._indices = None
+            raise linalg.LinAlgError(str(e)) from e
+
+        n = A.shape[0]
+        self._indices, self._indptr = A.indices, A.indptr
+        self._perm_r, self._perm_c = lu.perm_r, lu.perm_c
+
+        # Where each entry of A lands in B = Pr A Pc (pattern only)
+        tag = sparse.csc_matrix(
+            (np.arange(1, A.nnz + 1, dtype=float), A.indices, A.indptr), shape=A.shape
+        )
+        Pr = sparse.csc_matrix((np.ones(n), (lu.perm_r, np.arange(n))), shape=(n, n))
+        Pc = sparse.csc_matrix((np.ones(n), (np.arange(n), lu.perm_c)), shape=(n, n))
+        B = (Pr @ tag @ Pc).tocsc()
+        B.sort_indices()
+        self._data_map = B.data.astype(np.int64) - 1
+        self._b_indices, self._b_indptr = B.indices, B.indptr
+
+        return _SuperLU(lu)
+
+    def _refactor(self, A: sparse.csc_matrix):
+        """
+        SuperLU factorization of Pr A Pc in the stored order with diagonal
+        pivots (no ordering or pivot search; the symbolic phase still runs).
+        """
+        B = sparse.csc_matrix(
+            (A.data[self._data_map], self._b_indices, self._b_indptr), shape=A.shape
+        )
+        try:
+            lu = sparse_linalg.splu(B, permc_spec="NATURAL", diag_pivot_thresh=0.0)
+        except RuntimeError:
+            return None  # breakdown: re-pivot
+
+        return _PermutedLU(lu, self._perm_r, self._perm_c, A,
+                           self.growth_limit * np.finfo(float).eps, self._analyze)
@@ -0,0 +1,363 @@
+from __future__ import annotations
+import contextlib
+import dataclasses
+import fnmatch
+import io
+import os
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .batch import solve_batch_dc, solve_batch_tran
+from .circuit import Circuit, NetlistOOP
+from .sweep import ANALYSES
+
+DISTRIBUTIONS = ("uniform", "gauss")
+
+# Largest default chunk of runs sent to a worker: one by one / batched
+_RUN_CHUNK = 64
+_BATCH_CHUNK = 256
+
+# Summary statistics of one node waveform, usable as metric names
+STATS: Dict[str, Callable[[np.ndarray], float]] = {
+    "final": lambda v: v[-1],
+    "max": np.max,
+    "min": np.min,
+    "mean": np.mean,
+    "pp": np.ptp,
+    "rms": lambda v: np.sqrt(np.mean(v * v)),
+}
+
+
+@dataclass
+class Tolerance:
+    """
+    Random spread of one value around its nominal: "uniform" draws from
+    nominal * (1 +- rel), "gauss" from a normal with 3 sigma = rel * nominal
+    (so ~99.7% of the samples fall inside the same +-rel band).
+    """
+    rel: float
+    dist: str = "uniform"
+
+    def __post_init__(self):
+        if self.dist not in DISTRIBUTIONS:
+            raise ValueError(f"Distribuição desconhecida: {self.dist!r}. Opções: {list(DISTRIBUTIONS)}")
+        if self.rel < 0.0:
+            raise ValueError(f"Tolerância negativa: {self.rel}")
+
+    def sample(self, rng: np.random.Generator, nominal: np.ndarray) -> np.ndarray:
+        if self.dist == "uniform":
+            return nominal * (1.0 + rng.uniform(-self.rel, self.rel, np.shape(nominal)))
+        return nominal * (1.0 + rng.normal(0.0, self.rel / 3.0, np.shape(nominal)))
+
+
+@dataclass
+class MonteCarloResult:
+    """
+    Per-run outcome of a Monte Carlo analysis: metrics is (runs, metrics),
+    one column per name in names (NaN where the run failed); samples is
+    (runs, parameters), the values drawn for each entry of params.
+    waveforms ((runs, nodes, time points), or (runs, nodes) for DC) and
+    times are only kept with keep_waveforms=True.
+    """
+    names: List[str]
+    metrics: np.ndarray
+    params: List[str]
+    samples: np.ndarray
+    failed: np.ndarray
+    seed: Optional[int] = None
+    times: Optional[np.ndarray] = None
+    waveforms: Optional[np.ndarray] = None
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.metrics[:, self.names.index(name)]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Mean, standard deviation, min and max of each metric over the successful runs."""
+        ok = self.metrics[~self.failed]
+        return {name: {"mean": float(np.mean(col)) if len(col) else float("nan"),
+                       "std": float(np.std(col)) if len(col) else float("nan"),
+                       "min": float(np.min(col)) if len(col) else float("nan"),
+                       "max": float(np.max(col)) if len(col) else float("nan")}
+                for name, col in zip(self.names, ok.T)}
+
+    def passing(self, limits: Mapping[str, Tuple[Optional[float], Optional[float]]]) -> np.ndarray:
+        """Runs with every metric in limits inside its (low, high) bounds (None: open)."""
+        ok = ~self.failed
+        for name, (low, high) in limits.items():
+            col = self[name]
+            if low is not None:
+                ok &= col >= low
+            if high is not None:
+                ok &= col <= high
+        return ok
+
+    def yield_fraction(self, limits: Mapping[str, Tuple[Optional[float], Optional[float]]]) -> float:
+        """Fraction of all the runs (failed ones included) that pass the limits."""
+        return float(np.mean(self.passing(limits))) if len(self.failed) else float("nan")
+
+
+class _Plan:
+    """
+    What is perturbed, in draw order: element entries (index, field,
+    nominal, tolerance) and columnar ones (kind, rows, nominals, tolerance).
+    """
+
+    def __init__(self, data: NetlistOOP, tolerances: Mapping[str, Union[float, Tolerance]]):
+        self.elements: List[Tuple[int, str, float, Tolerance]] = []
+        self.columns: List[Tuple[str, np.ndarray, np.ndarray, Tolerance]] = []
+        self.params: List[str] = []
+        for key, tol in tolerances.items():
+            if not isinstance(tol, Tolerance):
+                tol = Tolerance(float(tol))
+            pattern, _, attr = key.partition(".")
+            found = False
+            for idx, elem in enumerate(data.elements):
+                if not fnmatch.fnmatchcase(elem.name.upper(), pattern.upper()):
+                    continue
+                field = _field(elem, attr, key)
+                if field is None:
+                    continue  # a wildcard also reaches elements without a value
+                self.elements.append((idx, field, float(getattr(elem, field)), tol))
+                self.params.append(f"{elem.name}.{field}")
+                found = True
+            if data.columns is not None:
+                for kind, table in data.columns.tables.items():
+                    rows = np.array([i for i, name in enumerate(table.names)
+                                     if fnmatch.fnmatchcase(name.upper(), pattern.upper())], dtype=int)
+                    if not len(rows):
+                        continue
+                    if attr and attr.upper() != data.columns.KINDS[kind].value_attr.upper():
+                        raise ValueError(f"Tolerância '{key}': elementos colunares só variam o valor.")
+                    self.columns.append((kind, rows, table.value[rows].copy(), tol))
+                    self.params.extend(f"{table.names[i]}.{data.columns.KINDS[kind].value_attr}"
+                                       for i in rows)
+                    found = True
+            if not found:
+                raise ValueError(f"Tolerância '{key}' não corresponde a nenhum elemento da netlist.")
+
+    def sample(self, data: NetlistOOP, seed: np.random.SeedSequence) -> Tuple[NetlistOOP, np.ndarray]:
+        """Copy of data with every planned value drawn from its tolerance, and the values drawn."""
+        rng = np.random.default_rng(seed)
+        drawn: List[np.ndarray] = []
+        elements = list(data.elements)
+        for idx, field, nominal, tol in self.elements:
+            value = float(tol.sample(rng, nominal))
+            elements[idx] = dataclasses.replace(elements[idx], **{field: value})
+            drawn.append(np.array([value]))
+        columns = data.columns
+        if self.columns:
+            columns = columns.copy()
+            for kind, rows, nominal, tol in self.columns:
+                values = tol.sample(rng, nominal)
+                columns[kind].value[rows] = values
+                drawn.append(values)
+        values = np.concatenate(drawn) if drawn else np.zeros(0)
+        return dataclasses.replace(data, elements=elements, columns=columns), values
+
+
+def _field(elem, attr: str, key: str) -> Optional[str]:
+    if not attr:
+        return elem.value_attr
+    fields = {f.name.upper(): f.name for f in dataclasses.fields(elem)}
+    if attr.upper() not in fields:
+        raise ValueError(f"Tolerância '{key}': {type(elem).__name__} não tem o atributo '{attr}'.")
+    return fields[attr.upper()]
+
+
+def _metric_functions(metrics: Union[Sequence[str], Mapping[str, Callable]],
+                      desired_nodes: Sequence[int]) -> Tuple[List[str], List[Callable]]:
+    """
+    Names and functions f(times, out) -> float of the metrics: a STATS
+    name is applied to every desired node ("max(V3)"), a mapping gives
+    named functions of the whole result (out rows in desired_nodes order).
+    """
+    if isinstance(metrics, Mapping):
+        return list(metrics), list(metrics.values())
+    names, funcs = [], []
+    for stat in metrics:
+        if stat not in STATS:
+            raise ValueError(f"Métrica desconhecida: {stat!r}. Opções: {list(STATS)}")
+        for row, node in enumerate(desired_nodes):
+            names.append(f"{stat}(V{node})")
+            funcs.append(_NodeStat(stat, row))
+    return names, funcs
+
+
+@dataclass
+class _NodeStat:
+    # Picklable (sent to the workers), unlike a lambda
+    stat: str
+    row: int
+
+    def __call__(self, times: Optional[np.ndarray], out: np.ndarray) -> float:
+        return float(STATS[self.stat](np.atleast_1d(out[self.row])))
+
+
+# Netlist, plan and settings of the analysis, sent once to each worker process
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(settings: Dict[str, Any]) -> None:
+    _WORKER.clear()
+    _WORKER.update(settings)
+
+
+def _run_chunk(indices: List[int], seeds: List[np.random.SeedSequence]) -> List[Tuple[Any, ...]]:
+    """(index, drawn values, metric values, failed, times, waveform) of each run of a chunk."""
+    w = _WORKER
+    data, plan, analysis, kwargs = w["data"], w["plan"], w["analysis"], w["kwargs"]
+    instances, drawn = zip(*(plan.sample(data, seed) for seed in seeds))
+
+    results: List[Optional[Tuple[Optional[np.ndarray], np.ndarray]]] = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        if w["batched"] and len(instances) > 1:
+            try:
+                results = list(_batch(instances, analysis, kwargs))
+            except RuntimeError:
+                results = []  # one instance did not converge: retry them one by one
+        if not results:
+            results = [_single(inst, analysis, kwargs) for inst in instances]
+
+    n_metrics = len(w["metrics"])
+    rows = []
+    for idx, values, result in zip(indices, drawn, results):
+        if result is None:
+            rows.append((idx, values, np.full(n_metrics, np.nan), True, None, None))
+            continue
+        times, out = result
+        metrics = np.array([f(times, out) for f in w["metrics"]], dtype=float)
+        rows.append((idx, values, metrics, False, times, out if w["keep_waveforms"] else None))
+    return rows
+
+
+def _single(data: NetlistOOP, analysis: str, kwargs: Dict[str, Any]):
+    try:
+        # (runs are not kept in the result cache)
+        if analysis == "dc":
+            return None, Circuit(data).run_dc(cache=False, **kwargs)
+        return Circuit(data).run_tran(cache=False, **kwargs)
+    except RuntimeError:
+        return None  # no convergence: a failed run
+
+
+def _batch(instances: Sequence[NetlistOOP], analysis: str, kwargs: Dict[str, Any]):
+    kwargs = dict(kwargs)
+    desired_nodes = kwargs.pop("desired_nodes")
+    nr_tol = kwargs.pop("nr_tol", 1e-8)
+    if analysis == "dc":
+        out = solve_batch_dc(instances, nr_tol, desired_nodes, **kwargs)
+        return [(None, row) for row in out]
+    total_time, dt, method, internal_steps = Circuit(instances[0]).tran_settings(
+        kwargs.pop("total_time", None), kwargs.pop("dt", None),
+        kwargs.pop("method", None), kwargs.pop("internal_steps", None))
+    times, out = solve_batch_tran(instances, total_time, dt, nr_tol, desired_nodes, method,
+                                  internal_steps=internal_steps, **kwargs)
+    return [(times, row) for row in out]
+
+
+def run_montecarlo(
+    data: NetlistOOP,
+    tolerances: Mapping[str, Union[float, Tolerance]],
+    runs: int,
+    analysis: Optional[str] = None,
+    metrics: Union[Sequence[str], Mapping[str, Callable]] = ("final",),
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    batched: bool = False,
+    keep_waveforms: bool = False,
+    on_result: Optional[Callable[[int, np.ndarray], None]] = None,
+    **kwargs,
+) -> MonteCarloResult:
+    """
+    Monte Carlo tolerance analysis: runs the DC or transient analysis on
+    runs copies of the netlist, each with its values drawn from
+    tolerances, and keeps a few summary metrics per run.
+
+    tolerances maps an element name pattern (fnmatch, case-insensitive:
+    "R*", "C2006"), optionally with ".attr" (default: the element
+    value_attr), to a Tolerance or a float (uniform relative tolerance).
+
+    Run i draws its values from the i-th child of SeedSequence(seed), so
+    the samples do not depend on workers or chunk_size. The runs are sent
+    to a ProcessPoolExecutor in chunks of chunk_size (default: up to 64,
+    or 256 batched); only the metrics come back unless keep_waveforms=True,
+    and on_result(run, metric values) is called as each run arrives. With
+    batched=True each chunk is solved as one batch (batch module, fixed
+    step only). Runs that fail to converge get NaN metrics and are
+    flagged in failed.
+
+    metrics are STATS names applied to every desired node, or a mapping
+    name -> f(times, out) (module-level functions, picklable). kwargs go
+    to Circuit.run_dc/run_tran (desired_nodes, method, total_time, ...).
+    """
+    if runs < 1:
+        raise ValueError(f"Monte Carlo requer ao menos uma rodada (recebido: {runs}).")
+    if analysis is None:
+        analysis = "tran" if data.transient.enabled else "dc"
+    analysis = analysis.lower()
+    if analysis not in ANALYSES:
+        raise ValueError(f"Análise de Monte Carlo desconhecida: {analysis!r}. Opções: {list(ANALYSES)}")
+
+    plan = _Plan(data, tolerances)
+    kwargs = dict(kwargs)
+    if kwargs.get("desired_nodes") is None:
+        kwargs["desired_nodes"] = list(range(1, data.max_node + 1))
+    names, funcs = _metric_functions(metrics, kwargs["desired_nodes"])
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunk_size is None:
+        # Batches gain with size; plain runs only need enough chunks to balance the pool
+        if batched:
+            chunk_size = min(_BATCH_CHUNK, -(-runs // max(workers, 1)))
+        else:
+            chunk_size = max(1, min(_RUN_CHUNK, runs // (4 * max(workers, 1))))
+    seed_seq = np.random.SeedSequence(seed)
+    seeds = seed_seq.spawn(runs)
+    chunks = [list(range(start, min(start + chunk_size, runs))) for start in range(0, runs, chunk_size)]
+
+    metric_values = np.full((runs, len(names)), np.nan)
+    samples = np.zeros((runs, len(plan.params)))
+    failed = np.zeros(runs, dtype=bool)
+    waveforms: Optional[List[Optional[np.ndarray]]] = [None] * runs if keep_waveforms else None
+    times = None
+
+    def collect(rows) -> None:
+        nonlocal times
+        for idx, values, metric_row, run_failed, run_times, out in rows:
+            samples[idx] = values
+            metric_values[idx] = metric_row
+            failed[idx] = run_failed
+            if run_times is not None:
+                times = run_times
+            if waveforms is not None:
+                waveforms[idx] = out
+            if on_result is not None:
+                on_result(idx, metric_row)
+
+    settings = dict(data=data, plan=plan, analysis=analysis, kwargs=kwargs, metrics=funcs,
+                    batched=batched, keep_waveforms=keep_waveforms)
+    workers = min(workers, len(chunks))
+    if workers <= 1:
+        _init_worker(settings)
+        for chunk in chunks:
+            collect(_run_chunk(chunk, [seeds[i] for i in chunk]))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(settings,)) as pool:
+            futures = [pool.submit(_run_chunk, chunk, [seeds[i] for i in chunk]) for chunk in chunks]
+            for future in as_completed(futures):
+                collect(future.result())
+
+    stacked = None
+    if waveforms is not None and not failed.all():
+        shape = next(w.shape for w in waveforms if w is not None)
+        stacked = np.stack([w if w is not None else np.full(shape, np.nan) for w in waveforms])
+    return MonteCarloResult(names, metric_values, plan.params, samples, failed,
+                            seed=seed_seq.entropy if seed is None else seed,
+                            times=times, waveforms=stacked)
+
@@ -0,0 +1,271 @@
+from __future__ import annotations
+import dataclasses
+import gc
+import hashlib
+import importlib
+import io
+import itertools
+import json
+import os
+import numpy as np
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from . import result_cache
+from .circuit import TransientSettings, StepSettings, DCSweepSettings, ACSettings, NetlistOOP
+from .columnar import ColumnarNetlist
+from .elements.base import Element
+
+# Version of the stored layout (part of every key: a new layout never reads an old entry)
+FORMAT = 1
+
+# Netlist entries live next to the results, in their own directory
+SUBDIR = "netlists"
+
+# NetlistOOP field -> settings dataclass stored in the header
+_SETTINGS = {"transient": TransientSettings, "step": StepSettings,
+             "dc_sweep": DCSweepSettings, "ac": ACSettings}
+
+# Element field values stored as one NumPy column (exact type shared by every row)
+_COLUMN_TYPES = (bool, int, float, str)
+
+
+@dataclasses.dataclass(frozen=True)
+class NetlistSource:
+    """
+    Contents of a netlist file and its fingerprint: resolved path, size,
+    modification time and SHA-256 of the bytes. The stat is taken before
+    the read, so an edit made while reading changes the fingerprint.
+    """
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    raw: bytes = dataclasses.field(repr=False, compare=False)
+
+    @classmethod
+    def read(cls, path) -> "NetlistSource":
+        resolved = Path(path).resolve()
+        st = os.stat(resolved)
+        raw = resolved.read_bytes()
+        return cls(str(resolved), st.st_size, st.st_mtime_ns, hashlib.sha256(raw).hexdigest(), raw)
+
+    def fingerprint(self) -> Dict[str, Any]:
+        return {"path": self.path, "size": self.size, "mtime_ns": self.mtime_ns, "sha256": self.sha256}
+
+    def open(self):
+        """The contents as a text file, read like open(path, "r")."""
+        return io.TextIOWrapper(io.BytesIO(self.raw))
+
+
+def _column_kind(values: List[Any]) -> str:
+    """How one element field is stored: "array", "ragged" (1-D arrays) or "json"."""
+    first = type(values[0])
+    if first in _COLUMN_TYPES and all(type(v) is first for v in values):
+        return "array"
+    if all(isinstance(v, np.ndarray) and v.ndim == 1 for v in values):
+        return "ragged"
+    return "json"
+
+
+def encode(data: NetlistOOP, source: NetlistSource) -> Dict[str, np.ndarray]:
+    """
+    Arrays of one entry. The elements are grouped by class; each field of
+    a class is one column (names, nodes, values...), ragged fields (PWL
+    tables) are one concatenated array plus lengths, and the rest (source
+    waveform dicts, None) goes to the JSON header with the settings. The
+    "order" column keeps the original element order.
+    """
+    groups: Dict[type, List[Element]] = {}  # in order of first appearance
+    index: Dict[type, int] = {}
+    order = np.empty(len(data.elements), dtype=np.int32)
+    for i, elem in enumerate(data.elements):
+        cls = type(elem)
+        if cls not in index:
+            index[cls] = len(index)
+            groups[cls] = []
+        order[i] = index[cls]
+        groups[cls].append(elem)
+
+    arrays: Dict[str, np.ndarray] = {"order": order}
+    layout = []
+    for k, cls in enumerate(groups):
+        kinds, extra = {}, {}
+        for f in dataclasses.fields(cls):
+            values = [getattr(elem, f.name) for elem in groups[cls]]
+            kind = kinds[f.name] = _column_kind(values)
+            if kind == "array":
+                arrays[f"{k}.{f.name}"] = np.array(values)
+            elif kind == "ragged":
+                arrays[f"{k}.{f.name}"] = np.concatenate(values)
+                arrays[f"{k}.{f.name}.len"] = np.array([len(v) for v in values], dtype=np.int64)
+            else:
+                extra[f.name] = values
+        layout.append({"module": cls.__module__, "name": cls.__qualname__,
+                       "fields": kinds, "json": extra})
+
+    if data.columns is not None:
+        for kind, table in data.columns.tables.items():
+            arrays[f"columns.{kind}.names"] = np.array(table.names, dtype=str)
+            for attr in ("a", "b", "value", "ic"):
+                arrays[f"columns.{kind}.{attr}"] = getattr(table, attr)
+
+    header = {
+        "source": source.fingerprint(),
+        "max_node": data.max_node,
+        "has_nonlinear": data.has_nonlinear_elements,
+        "columns": data.columns is not None,
+        "classes": layout,
+    }
+    for name in _SETTINGS:
+        value = getattr(data, name)
+        header[name] = None if value is None else dataclasses.asdict(value)
+    try:
+        arrays["header"] = np.array(json.dumps(header))
+    except TypeError as e:
+        raise TypeError(f"Valor sem codificação no cache de netlists: {e}") from None
+    return arrays
+
+
+def _element_class(module: str, name: str) -> type:
+    cls = getattr(importlib.import_module(module), name)
+    if not (isinstance(cls, type) and issubclass(cls, Element)):
+        raise TypeError(f"{module}.{name} não é um elemento")
+    return cls
+
+
+def decode(arrays: Dict[str, np.ndarray]) -> NetlistOOP:
+    """NetlistOOP of an entry written by encode (new element objects)."""
+    header = json.loads(str(arrays["header"]))
+    columns_of = []
+    for k, entry in enumerate(header["classes"]):
+        cls = _element_class(entry["module"], entry["name"])
+        if list(entry["fields"]) != [f.name for f in dataclasses.fields(cls)]:
+            raise TypeError(f"Campos de {entry['name']} mudaram desde a gravação")
+        columns = []
+        for name, kind in entry["fields"].items():
+            if kind == "array":
+                columns.append(arrays[f"{k}.{name}"].tolist())
+            elif kind == "ragged":
+                bounds = np.cumsum(arrays[f"{k}.{name}.len"])[:-1]
+                columns.append(np.split(arrays[f"{k}.{name}"], bounds))
+            else:
+                columns.append(entry["json"][name])
+        columns_of.append((cls, columns))
+
+    # Dataclass fields are the positional arguments of __init__. Every
+    # object built here stays alive, so the cyclic garbage collector
+    # (triggered by the allocation count) would only rescan them: it is
+    # paused while they are built.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        rows = [iter(list(itertools.starmap(cls, zip(*columns)))) for cls, columns in columns_of]
+        elements = [next(rows[k]) for k in arrays["order"].tolist()]
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    columns = None
+    if header["columns"]:
+        columns = ColumnarNetlist()
+        for kind, table in columns.tables.items():
+            table.extend(arrays[f"columns.{kind}.names"].tolist(),
+                         *(arrays[f"columns.{kind}.{attr}"] for attr in ("a", "b", "value", "ic")))
+
+    settings = {name: None if header[name] is None else cls(**header[name])
+                for name, cls in _SETTINGS.items()}
+    return NetlistOOP(elements, header["max_node"], has_nonlinear_elements=header["has_nonlinear"],
+                      columns=columns, **settings)
+
+
+class NetlistCache:
+    """
+    Persistent cache of parsed netlists (parse_netlist), so repeated runs
+    of the same file skip tokenizing it and building its elements.
+
+    There is one entry per netlist path (and columnar flag): the encoded
+    NetlistOOP (see encode) and the fingerprint of the file it came from.
+    An entry is used only while the file keeps the same size, modification
+    time and SHA-256 and the engine is unchanged; otherwise the netlist is
+    parsed again and the entry replaced. invalidate() drops entries
+    explicitly. Storage, atomic writes and the size cap are those of
+    result_cache.ResultCache.
+
+    The cache is off until enable() is called; main.py and plot.py enable
+    it by default.
+    """
+
+    def __init__(self, directory=result_cache.DEFAULT_DIR / SUBDIR,
+                 max_bytes: int = result_cache.DEFAULT_MAX_BYTES):
+        self.entries = result_cache.ResultCache(directory, max_bytes)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def directory(self) -> Path:
+        return self.entries.directory
+
+    @staticmethod
+    def _key(path: str, columnar: bool) -> str:
+        h = hashlib.sha256(result_cache.engine_version().encode())
+        h.update(f"netlist format {FORMAT} columnar={bool(columnar)};".encode())
+        h.update(str(Path(path).resolve()).encode())
+        return h.hexdigest()
+
+    def load(self, source: NetlistSource, columnar: bool = False) -> Optional[NetlistOOP]:
+        """Parsed netlist of source, or None when there is no valid entry."""
+        key = self._key(source.path, columnar)
+        arrays = self.entries.load(key)
+        data = None
+        if arrays is not None:
+            try:
+                if json.loads(str(arrays["header"]))["source"] == source.fingerprint():
+                    data = decode(arrays)
+            except (KeyError, ValueError, TypeError, AttributeError, ImportError):
+                self.entries.discard(key)  # unreadable: parse again
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def store(self, source: NetlistSource, columnar: bool, data: NetlistOOP) -> None:
+        """Saves the parsed netlist of source (replacing its previous entry)."""
+        self.entries.store(self._key(source.path, columnar), encode(data, source))
+
+    def invalidate(self, path=None) -> None:
+        """Drops the entries of path (both columnar flags), or every entry."""
+        if path is None:
+            self.entries.clear()
+            return
+        for columnar in (False, True):
+            self.entries.discard(self._key(path, columnar))
+
+
+_ACTIVE: Optional[NetlistCache] = None
+
+
+def enable(directory=None, max_bytes: int = result_cache.DEFAULT_MAX_BYTES) -> NetlistCache:
+    """
+    Turns the cache on for every parse_netlist (cache=True) of this
+    process. directory defaults to the netlists/ directory of the result
+    cache (SIMULATOR_CACHE_DIR or result_cache.DEFAULT_DIR).
+    """
+    global _ACTIVE
+    if directory is None:
+        directory = Path(os.environ.get(result_cache.CACHE_DIR_ENV) or result_cache.DEFAULT_DIR) / SUBDIR
+    _ACTIVE = NetlistCache(directory, max_bytes)
+    return _ACTIVE
+
+
+def disable() -> None:
+    """Turns the cache off (the entries stay on disk)."""
+    global _ACTIVE
+    _ACTIVE = None
+
+
+def active() -> Optional[NetlistCache]:
+    """The enabled cache, or None."""
+    return _ACTIVE
@@ -1,6 +1,135 @@
 import numpy as np
+from enum import Enum
 from scipy import linalg
-from typing import Callable, Tuple
+from typing import Callable, Tuple, Optional, List, Union
+
+from .linsolve import LinearSolver
+
+
+class NewtonStrategy(Enum):
+    FULL = "newton"     # Rebuild and refactor the Jacobian on every iteration
+    CHORD = "chord"     # Reuse a previous factorization (modified Newton)
+    BROYDEN = "broyden" # Reused factorization + rank-1 (Broyden) updates
+
+
+class JacobianCache:
+    """
+    Factorized Jacobian kept across iterations and across newton_solve
+    calls of one analysis (time steps), used by the chord and Broyden
+    strategies.
+
+    The factorization is refreshed from the current G_k when it has been
+    reused max_reuse times, or when the residual norm fails to drop by at
+    least a factor of `rate` in one iteration (convergence degraded).
+    """
+
+    def __init__(self, max_reuse: int = 8, rate: float = 0.5):
+        self.max_reuse = max_reuse
+        self.rate = rate
+        self.lu = None
+        self.age = 0
+        # Broyden steps s_j taken since the last refresh (and their |s_j|^2)
+        self.steps: List[np.ndarray] = []
+        self.norms: List[float] = []
+
+    def refresh(self, lu) -> None:
+        self.lu = lu
+        self.age = 0
+        self.reset_updates()
+
+    def reset_updates(self) -> None:
+        self.steps.clear()
+        self.norms.clear()
+
+    def invalidate(self) -> None:
+        self.lu = None
+
+
+def _broyden_step(cache: JacobianCache, z: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Applies the stored rank-1 updates to z = -B0^-1 R (Sherman-Morrison
+    form of "good" Broyden with full steps, Kelley's brsol recursion).
+    Returns None when the update is degenerate.
+    """
+    steps, norms = cache.steps, cache.norms
+    for j in range(len(steps) - 1):
+        z = z + steps[j + 1] * (steps[j] @ z) / norms[j]
+    if steps:
+        denom = 1.0 - (steps[-1] @ z) / norms[-1]
+        if abs(denom) < 1e-12:
+            return None
+        z = z / denom
+    return z
+
+
+def _reused_jacobian_step(
+    jacobian: JacobianCache,
+    linear_solver: LinearSolver,
+    strategy: NewtonStrategy,
+    G_k,
+    R_k: np.ndarray,
+    residual_norm: float,
+    prev_residual: Optional[float],
+) -> np.ndarray:
+    """Newton step for the chord/Broyden strategies (refactors G_k when due)."""
+    stale = (
+        jacobian.lu is None
+        or jacobian.age >= jacobian.max_reuse
+        or (prev_residual is not None and residual_norm > jacobian.rate * prev_residual)
+    )
+    if stale:
+        jacobian.refresh(linear_solver.factor(G_k))
+    jacobian.age += 1
+
+    delta_x = jacobian.lu.solve(-R_k)
+    if strategy == NewtonStrategy.BROYDEN:
+        updated = _broyden_step(jacobian, delta_x)
+        if updated is None:
+            # Degenerate update: fall back to a fresh Jacobian
+            jacobian.refresh(linear_solver.factor(G_k))
+            delta_x = jacobian.lu.solve(-R_k)
+        else:
+            delta_x = updated
+        jacobian.steps.append(delta_x)
+        jacobian.norms.append(float(delta_x @ delta_x))
+    return delta_x
+
+
+def _backtrack(
+    build_mna: Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]],
+    x_k: np.ndarray,
+    delta_x: np.ndarray,
+    R_k: np.ndarray,
+    max_backtracks: int,
+    is_limited: Optional[Callable[[], bool]] = None,
+) -> Tuple[np.ndarray, Optional[tuple], float, bool]:
+    """
+    Backtracking line search on the residual 2-norm (Armijo condition).
+
+    Returns (x_new, (G, I, R) built at x_new or None, alpha, decreased).
+    A trial point where an element limited its step is accepted as is.
+    If no step length decreases the residual, the full step is taken (as
+    SPICE does): creeping along a direction that does not reduce the
+    residual would only spend the iterations.
+    """
+    norm_k = np.linalg.norm(R_k)
+    alpha = 1.0
+    for _ in range(max_backtracks + 1):
+        x_new = x_k + alpha * delta_x
+        try:
+            G_new, I_new = build_mna(x_new)
+        except Exception:
+            built = None
+        else:
+            R_new = G_new @ x_new - I_new
+            built = (G_new, I_new, R_new)
+            if is_limited is not None and is_limited():
+                return x_new, built, alpha, True
+            if np.linalg.norm(R_new) <= (1.0 - 1e-4 * alpha) * norm_k:
+                return x_new, built, alpha, True
+        alpha *= 0.5
+    # Built at the last trial point, not here: the caller rebuilds
+    return x_k + delta_x, None, 1.0, False
 
 
 def newton_solve(
@@ -8,10 +137,18 @@ def newton_solve(
     x0: np.ndarray, 
     tol: float = 1e-6, 
     max_iter: int = 50, # Market default
-    max_guesses: int = 100  # Maximum number of random guesses
+    max_guesses: int = 100,  # Maximum number of random guesses
+    linear_solver: Optional[LinearSolver] = None,
+    strategy: Union[str, NewtonStrategy] = NewtonStrategy.FULL,
+    jacobian: Optional[JacobianCache] = None,
+    is_limited: Optional[Callable[[], bool]] = None,
+    reset_limiting: Optional[Callable[[], None]] = None,
+    damping: bool = True,
+    max_backtracks: int = 8,
 ) -> np.ndarray:
     """
-    Newton-Raphson Solver for Non-Linear Systems with multiple random retries.
+    Damped Newton-Raphson Solver for Non-Linear Systems, with multiple
+    random retries as a last resort.
 
     The MNA linearized system is given by: G_k * Delta_x = -R_k
     Where:
@@ -22,7 +159,8 @@ def newton_solve(
     Parameters:
     -----------
     build_mna : function
-        Builds the MNA system (G, I) given a guess vector
+        Builds the MNA system (G, I) given a guess vector. G may be a dense
+        ndarray or a scipy.sparse matrix.
     x0 : np.ndarray
         Initial guess vector
     tol : float
@@ -31,6 +169,29 @@ def newton_solve(
         Maximum iterations per guess attempt (N, normally 20-50)
     max_guesses : int
         Maximum number of random guess attempts (M, normally 100)
+    linear_solver : LinearSolver, optional
+        Factorizes G_k. Passing the same instance across calls lets sparse
+        systems reuse their ordering/pivot sequence between Newton
+        iterations and time steps. Default: a new LinearSolver
+    strategy : NewtonStrategy | str
+        "newton" (full Newton, default), "chord" (reuses the factorization
+        of an earlier G_k) or "broyden" (chord + rank-1 updates of it)
+    jacobian : JacobianCache, optional
+        Keeps the chord/Broyden factorization between calls, so a
+        transient run can reuse it across time steps. Default: per call
+    is_limited : function, optional
+        is_limited() -> True if the last build_mna call limited the step
+        of some element (e.g. CompiledCircuit.limited, diode pnjlim). A
+        limited iteration is never taken as converged
+    reset_limiting : function, optional
+        Clears the limiting history (previous linearization voltages)
+        before each random guess, e.g. CompiledCircuit.reset_limiting
+    damping : bool
+        Backtracking line search: the step is halved, up to max_backtracks
+        times, until the residual norm decreases. Random guesses are only
+        tried when an attempt still fails to converge
+    max_backtracks : int
+        Maximum step halvings per iteration (default: 8)
         
     Returns:    np.ndarray
         Converged solution vector
@@ -40,7 +201,12 @@ def newton_solve(
     """
 
     n_guess_attempts = 0
-    last_residual = None
+    last_residual = float("nan")  # stays NaN if no system could be built
+    if linear_solver is None:
+        linear_solver = LinearSolver()
+    strategy = NewtonStrategy(strategy)
+    if strategy != NewtonStrategy.FULL and jacobian is None:
+        jacobian = JacobianCache()
     
     for n_guess_attempts in range(max_guesses):
         # Use initial guess for first attempt, random for subsequent attempts
@@ -49,22 +215,34 @@ def newton_solve(
         else:
             # Generate random guess between -10V and +10V
             x_k = np.random.uniform(-10.0, 10.0, size=x0.shape)
+            if jacobian is not None:
+                jacobian.invalidate()
+            if reset_limiting is not None:
+                reset_limiting()
+        if jacobian is not None:
+            jacobian.reset_updates()
         
         converged = False
+        prev_residual = None
+        pending = None  # (G, I, R) already built at x_k by the line search
         for k in range(max_iter):
-            try:
-                G_k, I_k = build_mna(x_k)
-            except Exception as e:
-                # If build_mna fails, this guess is invalid, try next one
-                break
-            
-            R_k = G_k @ x_k - I_k
+            if pending is not None:
+                G_k, I_k, R_k = pending
+            else:
+                try:
+                    G_k, I_k = build_mna(x_k)
+                except Exception as e:
+                    # If build_mna fails, this guess is invalid, try next one
+                    break
+                
+                R_k = G_k @ x_k - I_k
+            limited = is_limited is not None and is_limited()
             
             # Check convergence. Residual should be close to zero. If it is, return 
             residual_norm = np.linalg.norm(R_k, np.inf)
             last_residual = residual_norm
             
-            if residual_norm < tol:
+            if residual_norm < tol and not limited:
                 if n_guess_attempts > 0:
                     print(f"[NR] Convergiu na tentativa {n_guess_attempts + 1} "
                           f"após {k + 1} iterações")
@@ -72,13 +250,33 @@ def newton_solve(
                 return x_k
             
             try:
-                delta_x = linalg.solve(G_k, -R_k)
+                if strategy == NewtonStrategy.FULL:
+                    delta_x = linear_solver.solve(G_k, -R_k)
+                else:
+                    delta_x = _reused_jacobian_step(
+                        jacobian, linear_solver, strategy, G_k, R_k,
+                        residual_norm, prev_residual,
+                    )
             except linalg.LinAlgError:
                 # If matrix is singular, this guess is bad, try next one
                 break
 
             # Update solution vector (New Guess)
-            x_k = x_k + delta_x
+            prev_residual = residual_norm
+            if damping:
+                x_k, pending, alpha, decreased = _backtrack(
+                    build_mna, x_k, delta_x, R_k, max_backtracks, is_limited
+                )
+                if jacobian is not None:
+                    if not decreased:
+                        # The reused Jacobian no longer gives a descent direction
+                        jacobian.invalidate()
+                    elif alpha < 1.0:
+                        # Broyden updates assume full steps
+                        jacobian.reset_updates()
+            else:
+                x_k = x_k + delta_x
+                pending = None
         
         # If converged, we already returned. If not, continue to next guess
         if not converged and n_guess_attempts < max_guesses - 1:
@@ -1,7 +1,9 @@
 from __future__ import annotations
 import numpy as np
 
-from .circuit import TransientSettings, NetlistOOP
+from .circuit import TransientSettings, StepSettings, DCSweepSettings, ACSettings, NetlistOOP
+from .columnar import ColumnarNetlist
+from . import netlist_cache
 
 from .elements.resistor import Resistor
 from .elements.capacitor import Capacitor
@@ -19,16 +21,115 @@ def _parse_ic_token(token: str) -> float:
         token = token.split("=", 1)[1]
     return float(token)
 
-def parse_netlist(path: str) -> NetlistOOP:
+def _parse_step(p) -> StepSettings:
+    """
+    .STEP <param> <start> <stop> <step>         (linear, stop included)
+    .STEP <param> LIST <v1> <v2> ...
+    .STEP <param> DEC <start> <stop> <points per decade>
+    """
+    usage = ("\033[31mInvalid .STEP:\33[0m Formatos aceitos:"
+             "\n .STEP <param> <start> <stop> <step>"
+             "\n .STEP <param> LIST <v1> <v2> ..."
+             "\n .STEP <param> DEC <start> <stop> <pontos por década>")
+    if len(p) < 4:
+        raise ValueError(usage)
+    param, mode = p[1], p[2].upper()
+    if mode == "LIST":
+        values = [float(v) for v in p[3:]]
+    elif len(p) != 5 + (mode == "DEC"):
+        raise ValueError(usage)
+    elif mode == "DEC":
+        start, stop, per_decade = float(p[3]), float(p[4]), int(p[5])
+        if start <= 0.0 or stop < start or per_decade < 1:
+            raise ValueError(usage)
+        n = int(np.floor(np.log10(stop / start) * per_decade + 1e-9)) + 1
+        values = (start * 10.0 ** (np.arange(n) / per_decade)).tolist()
+    else:
+        start, stop, step = float(p[2]), float(p[3]), float(p[4])
+        if step == 0.0 or (stop - start) / step < 0.0:
+            raise ValueError(usage)
+        n = int(np.floor((stop - start) / step + 1e-9)) + 1
+        values = (start + step * np.arange(n)).tolist()
+    if not values:
+        raise ValueError(usage)
+    return StepSettings(param=param, values=values)
+
+def _parse_dc(p) -> DCSweepSettings:
+    """.DC <source> <start> <stop> <step>   (linear, stop included)"""
+    usage = ("\033[31mInvalid .DC:\33[0m Formato aceito:"
+             "\n .DC <fonte> <início> <fim> <passo>")
+    if len(p) != 5:
+        raise ValueError(usage)
+    start, stop, step = float(p[2]), float(p[3]), float(p[4])
+    if step == 0.0 or (stop - start) / step < 0.0:
+        raise ValueError(usage)
+    return DCSweepSettings(source=p[1], start=start, stop=stop, step=step)
+
+def _parse_ac(p) -> ACSettings:
+    """.AC <DEC|OCT|LIN> <points> <fstart> <fstop>"""
+    usage = ("\033[31mInvalid .AC:\33[0m Formato aceito:"
+             "\n .AC <DEC|OCT|LIN> <pontos> <freq. inicial> <freq. final>")
+    if len(p) != 5 or p[1].upper() not in ("DEC", "OCT", "LIN"):
+        raise ValueError(usage)
+    sweep, points, fstart, fstop = p[1].upper(), int(p[2]), float(p[3]), float(p[4])
+    if points < 1 or fstop < fstart or fstart < 0.0 or (sweep != "LIN" and fstart <= 0.0):
+        raise ValueError(usage)
+    return ACSettings(sweep=sweep, points=points, fstart=fstart, fstop=fstop)
+
+def _logical_lines(f):
+    """
+    Stripped lines of f, with SPICE '+' continuation lines joined to the
+    previous statement (comments and blank lines in between are skipped).
+    """
+    pending = None
+    for raw in f:
+        line = raw.strip()
+        if not line or line.startswith("*"):
+            continue
+        if line.startswith("+") and pending is not None:
+            pending += " " + line[1:]
+            continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending is not None:
+        yield pending
+
+def parse_netlist(path: str, columnar: bool = False, cache: bool = True) -> NetlistOOP:
+    """
+    Reads a netlist file. With columnar=True the resistors and capacitors
+    go straight into a ColumnarNetlist (NetlistOOP.columns) instead of one
+    object each: faster to load and assemble for large R/C networks.
+
+    When the netlist cache is enabled (netlist_cache.enable) and cache is
+    True, a file already parsed with the same size, modification time and
+    contents is loaded from it instead of parsed again.
+    """
+    store = netlist_cache.active() if cache else None
+    if store is None:
+        return _parse_netlist(open(path, "r"), columnar)
+
+    source = netlist_cache.NetlistSource.read(path)
+    nl = store.load(source, columnar)
+    if nl is not None:
+        return nl
+    nl = _parse_netlist(source.open(), columnar)
+    store.store(source, columnar, nl)
+    return nl
+
+def _parse_netlist(f, columnar: bool) -> NetlistOOP:
     elems = []
+    columns = ColumnarNetlist() if columnar else None
     maxnode = 0
     ts = TransientSettings()
+    step = None
+    dc_sweep = None
+    ac = None
 
-    with open(path, "r") as f:
+    with f:
+        lines = _logical_lines(f)
         # --------- GET MAX NODES ---------
-        for raw in f:
-            line = raw.strip()
-
+        for line in lines:
             if not line or line.startswith("*"):
                 continue
             try:
@@ -43,17 +144,24 @@ def parse_netlist(path: str) -> NetlistOOP:
         if maxnode is None or maxnode <= 0:
             raise ValueError("\033[31mNo Netlist:\33[0m Netlist vazia ou sem linha de número de nós.")
 
-        for raw in f:
-            line = raw.strip()
-
+        for line in lines:
             if not line or line.startswith("*"):
                 continue
 
             p = line.split()
             element_type = p[0][0].upper()
             element_name = p[0]
+            # ---------------- SET PARAMETER SWEEP -----------------
+            if p[0].upper() == ".STEP":
+                step = _parse_step(p)
+            # ------------------- SET DC SWEEP -------------------
+            elif p[0].upper() == ".DC":
+                dc_sweep = _parse_dc(p)
+            # ------------------- SET AC ANALYSIS -------------------
+            elif p[0].upper() == ".AC":
+                ac = _parse_ac(p)
             # ---------------- SET TRANSIENT -----------------
-            if line.startswith("."):
+            elif line.startswith("."):
                 if len(p) < 5:
                         raise ValueError("\033[31mIncomplete Transient settings:\33[0m Linha .TRAN"
                                          " requer pelo menos 5 argumentos no seguinte formato: "
@@ -69,13 +177,19 @@ def parse_netlist(path: str) -> NetlistOOP:
             # ------------------- RESISTOR -------------------
             elif element_type == "R":
                 a = int(p[1]); b = int(p[2]); val = float(p[3])
-                elems.append(Resistor(element_name, a, b, val))
+                if columns is not None:
+                    columns.add("R", element_name, a, b, val)
+                else:
+                    elems.append(Resistor(element_name, a, b, val))
 
             # ------------------- CAPACITOR -------------------
             elif element_type == "C":
                 a = int(p[1]); b = int(p[2]); val = float(p[3])
                 ic = _parse_ic_token(p[4]) if len(p) > 4 else 0.0
-                elems.append(Capacitor(element_name, a, b, val, ic))
+                if columns is not None:
+                    columns.add("C", element_name, a, b, val, ic)
+                else:
+                    elems.append(Capacitor(element_name, a, b, val, ic))
 
             # ------------------- INDUCTOR -------------------
             elif element_type == "L":
@@ -234,16 +348,18 @@ def parse_netlist(path: str) -> NetlistOOP:
 
             # ------------------ NON LINEAR RESISTOR ------------------
             elif element_type == "N":
-                # Format: Nxxx a b V1 I1 V2 I2 V3 I3 V4 I4
+                # Format: Nxxx a b V1 I1 V2 I2 ... Vn In  (n >= 2 points)
                 a = int(p[1]); b = int(p[2]) # Nodes
-                V1 = float(p[3]); I1 = float(p[4])
-                V2 = float(p[5]); I2 = float(p[6])
-                V3 = float(p[7]); I3 = float(p[8])
-                V4 = float(p[9]); I4 = float(p[10])
+                table = [float(v) for v in p[3:]]
+                if len(table) < 4 or len(table) % 2:
+                    raise ValueError(
+                        f"\033[31mInvalid Format:\33[0m Resistor não-linear precisa de pares (V, I), "
+                        f"pelo menos 2: {p}"
+                    )
                 elems.append(NonLinearResistor(
                     element_name, a, b, 
-                    np.array([V1, V2, V3, V4]), 
-                    np.array([I1, I2, I3, I4])
+                    np.array(table[0::2]), 
+                    np.array(table[1::2])
                     ))
                 
             # ------------------- DIODE -------------------
@@ -327,7 +443,7 @@ def parse_netlist(path: str) -> NetlistOOP:
     # Detect if circuit has nonlinear elements
     has_nonlinear = any(getattr(elem, 'is_nonlinear', False) for elem in elems)
     
-    nl = NetlistOOP(elems, maxnode, ts, has_nonlinear)
+    nl = NetlistOOP(elems, maxnode, ts, has_nonlinear, columns, step, dc_sweep, ac)
     if has_nonlinear:
         print("Circuit contains NONLINEAR elements - Newton-Raphson will be used")
     else:
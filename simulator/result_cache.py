@@ -0,0 +1,209 @@
+from __future__ import annotations
+import dataclasses
+import enum
+import functools
+import hashlib
+import os
+import tempfile
+import zipfile
+import numpy as np
+import scipy
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Overrides DEFAULT_DIR in enable()
+CACHE_DIR_ENV = "SIMULATOR_CACHE_DIR"
+
+DEFAULT_DIR = Path.home() / ".cache" / "circuit-simulator"
+DEFAULT_MAX_BYTES = 256 * 2 ** 20
+
+# Package files that do not change simulation results
+_NOT_ENGINE = ("plotting", "result_cache.py", "netlist_cache.py")
+
+
+@functools.lru_cache(maxsize=None)
+def engine_version() -> str:
+    """Hash of the simulator sources (plotting excluded) and NumPy/SciPy versions."""
+    h = hashlib.sha256(f"numpy {np.__version__} scipy {scipy.__version__}".encode())
+    root = Path(__file__).resolve().parent
+    for path in sorted(root.rglob("*.py")):
+        rel = path.relative_to(root)
+        if rel.parts[0] in _NOT_ENGINE:
+            continue
+        h.update(rel.as_posix().encode())
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def _feed(h, obj: Any) -> None:
+    """Adds an unambiguous encoding of obj to the hash h."""
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        # repr keeps the type apart (1 vs 1.0 vs '1') and floats exact
+        h.update(f"{type(obj).__name__}:{obj!r};".encode())
+    elif isinstance(obj, np.ndarray):
+        h.update(f"array:{obj.dtype.str}:{obj.shape};".encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, np.generic):
+        _feed(h, obj.item())
+    elif isinstance(obj, enum.Enum):
+        h.update(f"enum:{type(obj).__qualname__}.{obj.name};".encode())
+    elif isinstance(obj, dict):
+        h.update(f"dict:{len(obj)};".encode())
+        for key in sorted(obj, key=repr):
+            _feed(h, key)
+            _feed(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}:{len(obj)};".encode())
+        for item in obj:
+            _feed(h, item)
+    elif dataclasses.is_dataclass(obj):
+        cls = type(obj)
+        h.update(f"{cls.__module__}.{cls.__qualname__};".encode())
+        for f in dataclasses.fields(obj):
+            h.update(f.name.encode())
+            _feed(h, getattr(obj, f.name))
+    elif hasattr(obj, "tables"):
+        # ColumnarNetlist (not imported: it imports the circuit module)
+        h.update(b"columns;")
+        for kind, table in sorted(obj.tables.items()):
+            _feed(h, [kind, table.names, table.a, table.b, table.value, table.ic])
+    else:
+        raise TypeError(f"Valor sem codificação para a chave do cache: {type(obj).__name__}")
+
+
+def result_key(analysis: str, data, settings: Dict[str, Any]) -> str:
+    """Key of one result: analysis name, netlist, settings and engine version."""
+    h = hashlib.sha256(engine_version().encode())
+    _feed(h, analysis)
+    _feed(h, data)
+    _feed(h, settings)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed cache of simulation results (Circuit.run_tran/run_dc).
+
+    A result is stored under the hash of everything it depends on
+    (result_key): the parsed netlist (every field of every element, the
+    columnar arrays, the analysis settings), the arguments of the analysis
+    and the engine version. Editing the netlist, changing an argument or
+    changing the engine gives a new key; stale entries are never read
+    again and age out of the size cap.
+
+    Entries are compressed NumPy archives (.npz), one per result. Reading
+    an entry refreshes its modification time and storing one evicts the
+    least recently used entries above max_bytes. load/store never raise on
+    I/O problems: a damaged entry is dropped and reported as a miss, a
+    failed write is skipped.
+
+    The cache is off until enable() is called; main.py and plot.py enable
+    it by default.
+    """
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes <= 0:
+            raise ValueError(f"Tamanho máximo do cache deve ser positivo: {max_bytes}")
+        self.directory = Path(directory)
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.npz"
+
+    def load(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """Arrays stored under key, or None (miss)."""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                arrays = {name: archive[name] for name in archive.files}
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            self.misses += 1
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)  # most recently used
+        except OSError:
+            pass
+        self.hits += 1
+        return arrays
+
+    def store(self, key: str, arrays: Dict[str, np.ndarray]) -> None:
+        """Saves arrays under key (atomically), then applies the size cap."""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez_compressed(f, **arrays)
+                os.replace(tmp, self._path(key))
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+        except OSError:
+            return
+        self._evict()
+
+    def discard(self, key: str) -> None:
+        """Removes the entry stored under key, if any."""
+        self._path(key).unlink(missing_ok=True)
+
+    def entries(self):
+        """(path, size, mtime) of every entry, least recently used first."""
+        found = []
+        for path in self.directory.glob("*.npz"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            found.append((path, st.st_size, st.st_mtime))
+        return sorted(found, key=lambda e: e[2])
+
+    def size(self) -> int:
+        """Total bytes of the entries."""
+        return sum(size for _, size, _ in self.entries())
+
+    def _evict(self) -> None:
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        """Removes every entry."""
+        for path, _, _ in self.entries():
+            path.unlink(missing_ok=True)
+
+
+_ACTIVE: Optional[ResultCache] = None
+
+
+def enable(directory=None, max_bytes: int = DEFAULT_MAX_BYTES) -> ResultCache:
+    """
+    Turns the cache on for every Circuit.run_tran/run_dc (cache=True) of
+    this process. directory defaults to SIMULATOR_CACHE_DIR or DEFAULT_DIR.
+    """
+    global _ACTIVE
+    if directory is None:
+        directory = os.environ.get(CACHE_DIR_ENV) or DEFAULT_DIR
+    _ACTIVE = ResultCache(directory, max_bytes)
+    return _ACTIVE
+
+
+def disable() -> None:
+    """Turns the cache off (the entries stay on disk)."""
+    global _ACTIVE
+    _ACTIVE = None
+
+
+def active() -> Optional[ResultCache]:
+    """The enabled cache, or None."""
+    return _ACTIVE
@@ -0,0 +1,142 @@
+from __future__ import annotations
+import numpy as np
+
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from .elements.base import Element, TimeMethod
+from .elements.capacitor import Capacitor
+
+
+class StateBlock:
+    """
+    History of all the elements of one class, struct-of-arrays: one
+    float column per state variable (block[key]), one row per element.
+
+    Also exposes what the vectorized Element.update_state needs: the
+    terminals (a, b), parameter columns (param) and, shared by the whole
+    store, the number of points already stored (n_points) and the step
+    between the last two (h_prev, None until there are two).
+    """
+
+    def __init__(self, cls: type, a: np.ndarray, b: np.ndarray, cols: Dict[str, np.ndarray],
+                 params: Optional[Dict[str, np.ndarray]] = None,
+                 elements: Sequence[Element] = (), indices: Sequence[int] = ()):
+        self.cls = cls
+        self.a = a
+        self.b = b
+        self.cols = cols
+        self.elements = list(elements)
+        self.indices = list(indices)
+        self.n_points = 0
+        self.h_prev: Optional[float] = None
+        self._params: Dict[str, np.ndarray] = dict(params or {})
+
+    @classmethod
+    def from_elements(cls, elem_cls: type, elements: Sequence[Element], indices: List[int]) -> "StateBlock":
+        """Block of element objects: terminals, initial_state() and parameters read from them."""
+        init = [e.initial_state() for e in elements]
+        cols = {key: np.array([st[key] for st in init], dtype=float) for key in elem_cls.state_vars}
+        return cls(elem_cls,
+                   np.array([getattr(e, "a", 0) for e in elements], dtype=int),
+                   np.array([getattr(e, "b", 0) for e in elements], dtype=int),
+                   cols, elements=elements, indices=indices)
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.cols[key]
+
+    def __setitem__(self, key: str, value) -> None:
+        # In place: the views and update_state keep referencing the column
+        self.cols[key][:] = value
+
+    def param(self, name: str) -> np.ndarray:
+        """Column of the element attribute name (gathered once per run from objects)."""
+        col = self._params.get(name)
+        if col is None:
+            col = self._params[name] = np.array([getattr(e, name) for e in self.elements],
+                                                dtype=float)
+        return col
+
+
+class StateView:
+    """
+    One element's row of a StateBlock, read by stamp_transient like the
+    per-element dict it replaces (state.get("v_prev", default)).
+    """
+    __slots__ = ("_block", "_row")
+
+    def __init__(self, block: StateBlock, row: int):
+        self._block = block
+        self._row = row
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "h_prev":
+            return self._block.h_prev
+        col = self._block.cols.get(key)
+        return default if col is None else col.item(self._row)
+
+    def __getitem__(self, key: str) -> Any:
+        if key != "h_prev" and key not in self._block.cols:
+            raise KeyError(key)
+        return self.get(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._block.cols or (key == "h_prev" and self._block.h_prev is not None)
+
+
+class StateStore:
+    """
+    Transient history of all the elements of a netlist, replacing the list
+    of per-element dicts: the elements that declare state_vars are grouped
+    by class into StateBlocks (the columnar capacitors form one more),
+    advanced after each accepted step by one vectorized update_state call
+    per class. Indexing the store by element
+    index gives what stamp_transient receives (a StateView, or an empty
+    dict for stateless elements).
+    """
+
+    def __init__(self, data):
+        groups: Dict[type, List[int]] = {}
+        for idx, elem in enumerate(data.elements):
+            if elem.state_vars:
+                groups.setdefault(type(elem), []).append(idx)
+
+        self.blocks: List[StateBlock] = []
+        self.class_blocks: Dict[type, StateBlock] = {}
+        self._views: List[Union[StateView, Dict[str, Any]]] = [{} for _ in data.elements]
+        for cls, indices in groups.items():
+            block = StateBlock.from_elements(cls, [data.elements[i] for i in indices], indices)
+            self.blocks.append(block)
+            self.class_blocks[cls] = block
+            for row, idx in enumerate(indices):
+                self._views[idx] = StateView(block, row)
+
+        # Capacitors stored as columns (NetlistOOP.columns): same history,
+        # read by the assembler straight from the block
+        self.column_blocks: Dict[str, StateBlock] = {}
+        columns = getattr(data, "columns", None)
+        if columns is not None and len(columns["C"]):
+            caps = columns["C"]
+            init = {"v_prev": caps.ic.copy(), "i_prev": np.zeros(len(caps)), "v_prev2": np.zeros(len(caps))}
+            block = StateBlock(Capacitor, caps.a, caps.b, init, params={"C": caps.value})
+            self.column_blocks["C"] = block
+            self.blocks.append(block)
+
+        self.n_points = 0
+        self.h_prev: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def __getitem__(self, idx: int) -> Union[StateView, Dict[str, Any]]:
+        return self._views[idx]
+
+    def update(self, x: np.ndarray, dt: float, method: TimeMethod) -> None:
+        """Stores the point x, reached with a step dt, in every block."""
+        for block in self.blocks:
+            block.cls.update_state(block, x, dt, method)
+        # dt is only a step between two points from the second one on
+        if self.n_points:
+            self.h_prev = dt
+        self.n_points += 1
+        for block in self.blocks:
+            block.n_points, block.h_prev = self.n_points, self.h_prev
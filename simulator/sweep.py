@@ -0,0 +1,161 @@
+from __future__ import annotations
+import contextlib
+import dataclasses
+import io
+import os
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from .batch import solve_batch_dc, solve_batch_tran
+from .circuit import Circuit, NetlistOOP
+from .elements.base import Element
+
+# Source waveform dicts searched when "name.attr" is not an attribute (V1.amplitude)
+_PARAM_DICTS = ("sin_params", "pulse_params")
+
+ANALYSES = ("dc", "tran")
+
+
+@dataclass
+class SweepResult:
+    """
+    Results of a parameter sweep stacked along the first axis, one row per
+    value: out is (points, nodes) for DC and (points, nodes, time points)
+    for TRAN, with times the common time grid (None for DC).
+    """
+    param: str
+    values: np.ndarray
+    out: np.ndarray
+    times: Optional[np.ndarray] = None
+
+
+def with_param(data: NetlistOOP, param: str, value: float) -> NetlistOOP:
+    """
+    Copy of data with param set to value. param is an element name (sets
+    its value_attr: R1 -> R, V1 -> dc) or "name.attr", where attr may also
+    be a key of the source's sin_params/pulse_params (V1.amplitude). Only
+    the changed element is copied; the others are shared with data.
+    """
+    name, _, attr = param.partition(".")
+    key = name.upper()
+    for idx, elem in enumerate(data.elements):
+        if elem.name.upper() == key:
+            elements = list(data.elements)
+            elements[idx] = _replace(elem, attr or elem.value_attr, value, param)
+            return dataclasses.replace(data, elements=elements)
+
+    if data.columns is not None:
+        for kind, table in data.columns.tables.items():
+            names = [n.upper() for n in table.names]
+            if key not in names:
+                continue
+            if attr and attr.upper() != data.columns.KINDS[kind].value_attr.upper():
+                raise ValueError(f"Parâmetro de varredura desconhecido: '{param}' "
+                                 f"(elementos colunares só variam o valor).")
+            columns = data.columns.copy()
+            columns[kind].value[names.index(key)] = value
+            return dataclasses.replace(data, columns=columns)
+
+    raise ValueError(f"Elemento '{name}' do parâmetro de varredura não existe na netlist.")
+
+
+def _replace(elem: Element, attr: Optional[str], value: float, param: str) -> Element:
+    if attr is None:
+        raise ValueError(f"'{param}': {type(elem).__name__} não tem valor padrão de varredura; "
+                         f"use <nome>.<atributo>.")
+    fields = {f.name.upper(): f.name for f in dataclasses.fields(elem)}
+    if attr.upper() in fields:
+        return dataclasses.replace(elem, **{fields[attr.upper()]: value})
+    for dict_name in _PARAM_DICTS:
+        params = getattr(elem, dict_name, None)
+        if params and attr in params:
+            return dataclasses.replace(elem, **{dict_name: {**params, attr: value}})
+    raise ValueError(f"Parâmetro de varredura desconhecido: '{param}'.")
+
+
+def _simulate(data: NetlistOOP, analysis: str, kwargs: Dict[str, Any]) -> Tuple[Optional[np.ndarray], np.ndarray]:
+    circuit = Circuit(data)
+    # The engine banners would be repeated once per point
+    with contextlib.redirect_stdout(io.StringIO()):
+        # (points are not kept in the result cache)
+        if analysis == "dc":
+            return None, circuit.run_dc(cache=False, **kwargs)
+        return circuit.run_tran(cache=False, **kwargs)
+
+
+# Netlist and settings of the sweep, sent once to each worker process
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(data: NetlistOOP, param: str, analysis: str, kwargs: Dict[str, Any]) -> None:
+    _WORKER.update(data=data, param=param, analysis=analysis, kwargs=kwargs)
+
+
+def _run_point(value: float) -> Tuple[Optional[np.ndarray], np.ndarray]:
+    w = _WORKER
+    return _simulate(with_param(w["data"], w["param"], value), w["analysis"], w["kwargs"])
+
+
+def _simulate_batch(data: NetlistOOP, instances: Sequence[NetlistOOP], analysis: str,
+                    kwargs: Dict[str, Any]) -> Tuple[Optional[np.ndarray], np.ndarray]:
+    with contextlib.redirect_stdout(io.StringIO()):
+        if analysis == "dc":
+            return None, solve_batch_dc(instances, **kwargs)
+        kwargs = dict(kwargs)
+        total_time, dt, method, internal_steps = Circuit(data).tran_settings(
+            kwargs.pop("total_time", None), kwargs.pop("dt", None),
+            kwargs.pop("method", None), kwargs.pop("internal_steps", None))
+        desired_nodes = kwargs.pop("desired_nodes", None)
+        if desired_nodes is None:
+            desired_nodes = list(range(1, data.max_node + 1))
+        return solve_batch_tran(instances, total_time, dt, kwargs.pop("nr_tol", 1e-8), desired_nodes,
+                                method, internal_steps=internal_steps, **kwargs)
+
+
+def run_sweep(data: NetlistOOP, param: str, values: Sequence[float], analysis: Optional[str] = None,
+              workers: Optional[int] = None, batched: bool = False, **kwargs) -> SweepResult:
+    """
+    Runs the analysis once per value of param, each on its own copy of
+    the netlist (see with_param), and stacks the results.
+
+    analysis is "dc" or "tran" (default: "tran" when the netlist has
+    .TRAN settings). kwargs go to Circuit.run_dc/run_tran. The points are
+    spread over a ProcessPoolExecutor with workers processes (default:
+    one per CPU); workers=1 runs them in this process.
+
+    With batched=True all the points are instead solved together in this
+    process, in lockstep (batch.solve_batch_dc/solve_batch_tran; fixed
+    step only). kwargs then go to those functions, plus the .TRAN
+    overrides of run_tran (total_time, dt, method, internal_steps).
+    """
+    values = np.asarray(values, dtype=float)
+    if analysis is None:
+        analysis = "tran" if data.transient.enabled else "dc"
+    analysis = analysis.lower()
+    if analysis not in ANALYSES:
+        raise ValueError(f"Análise de varredura desconhecida: {analysis!r}. Opções: {list(ANALYSES)}")
+    if not len(values):
+        raise ValueError("Varredura sem valores.")
+    # Fails on a bad param here rather than in every worker
+    with_param(data, param, values[0])
+
+    if batched:
+        instances = [with_param(data, param, v) for v in values]
+        times, out = _simulate_batch(data, instances, analysis, kwargs)
+        return SweepResult(param, values, out, times)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(values))
+    if workers <= 1:
+        results = [_simulate(with_param(data, param, v), analysis, kwargs) for v in values]
+    else:
+        chunksize = max(1, len(values) // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(data, param, analysis, kwargs)) as pool:
+            results = list(pool.map(_run_point, values.tolist(), chunksize=chunksize))
+
+    return SweepResult(param, values, np.stack([out for _, out in results]), results[0][0])
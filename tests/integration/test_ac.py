@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+import simulator.engine as engine
+from simulator.circuit import Circuit
+from simulator.columnar import to_columnar
+from simulator.parser import parse_netlist
+from simulator.sweep import with_param
+
+SERIES_RLC = """
+3
+V1 1 0 AC 2 1.0 1000 30
+R1 1 2 50
+L1 2 3 10e-3
+C1 3 0 1e-6
+.AC DEC 20 10 1e5
+"""
+
+
+def _parse(tmp_path, text):
+    p = tmp_path / "ac.net"
+    p.write_text(text, encoding="utf-8")
+    return parse_netlist(str(p))
+
+
+def _series_rlc(f):
+    w = 2 * np.pi * f
+    z_l, z_c = 1j * w * 10e-3, 1 / (1j * w * 1e-6)
+    vin = np.exp(1j * np.radians(30))
+    return np.array([np.full_like(z_l, vin), vin * (z_l + z_c) / (50 + z_l + z_c),
+                     vin * z_c / (50 + z_l + z_c)])
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"sparse": True}, {"stamping": "vectorized"}])
+def test_ac_matches_analytic_series_rlc(tmp_path, kwargs):
+    data = _parse(tmp_path, SERIES_RLC)
+    freqs, out = Circuit(data).run_ac(**kwargs)
+
+    assert len(freqs) == 81 and freqs[0] == 10.0 and freqs[-1] == pytest.approx(1e5)
+    assert out.shape == (3, 81) and np.iscomplexobj(out)
+    assert np.allclose(out, _series_rlc(freqs), atol=1e-12)
+
+    # Columnar capacitors are part of C too
+    _, out_col = Circuit(to_columnar(data)).run_ac(**kwargs)
+    assert np.allclose(out_col, out, atol=1e-12)
+
+
+def test_ac_stacks_are_split_by_size(tmp_path, monkeypatch):
+    data = _parse(tmp_path, SERIES_RLC)
+    _, ref = Circuit(data).run_ac()
+    # 5 x 5 reduced system: stacks of 4 frequencies (81 = 20 * 4 + 1)
+    monkeypatch.setattr(engine, "AC_STACK_ENTRIES", 5 * 5 * 4)
+    _, out = Circuit(data).run_ac()
+    assert np.array_equal(out, ref)
+
+
+def test_opamp_filter_bode_matches_transient():
+    c = Circuit(parse_netlist("circuits/opamp_lowpass.net"))
+    freqs, out = c.run_ac(desired_nodes=[3])
+    h = -10.0 / (1 + 2j * np.pi * freqs * 1e-4)
+    assert np.allclose(out[0] / 0.1, h, rtol=1e-3)
+
+    # Steady state of the 1 kHz transient: amplitude and phase of the phasor
+    _, v = c.run_ac("LIN", 1, 1000.0, 1000.0, desired_nodes=[3])
+    times, tran = c.run_tran(desired_nodes=[3])
+    last = times >= times[-1] - 1e-3
+    fit = np.linalg.lstsq(np.column_stack((np.cos(2e3 * np.pi * times[last]),
+                                           -np.sin(2e3 * np.pi * times[last]))),
+                          tran[0, last], rcond=None)[0]
+    assert fit[0] + 1j * fit[1] == pytest.approx(v[0, 0], rel=1e-3)
+
+
+def test_nonlinear_ac_linearizes_at_the_operating_point():
+    # Diode small-signal gain from V1: the slope of the DC transfer curve
+    data = parse_netlist("circuits/example_diode.net")
+    _, out = Circuit(data).run_ac("LIN", 3, 0.0, 1e6, source="V1")
+    hi = Circuit(with_param(data, "V1", 5.0 + 1e-4)).run_dc()
+    lo = Circuit(with_param(data, "V1", 5.0 - 1e-4)).run_dc()
+
+    assert np.allclose(out, ((hi - lo) / 2e-4)[:, None], rtol=1e-4)
+
+
+def test_ac_sweeps_and_errors(tmp_path):
+    assert engine.ac_frequencies("oct", 2, 100.0, 400.0) == pytest.approx(
+        [100.0, 100 * 2 ** 0.5, 200.0, 200 * 2 ** 0.5, 400.0])
+    assert engine.ac_frequencies("LIN", 3, 0.0, 10.0).tolist() == [0.0, 5.0, 10.0]
+    with pytest.raises(ValueError, match="desconhecida"):
+        engine.ac_frequencies("LOG", 3, 1.0, 10.0)
+    with pytest.raises(ValueError, match="inválida"):
+        engine.ac_frequencies("DEC", 3, 0.0, 10.0)
+
+    c = Circuit(parse_netlist("circuits/vdc_divider.net"))
+    with pytest.raises(ValueError, match=".AC"):
+        c.run_ac()
+    with pytest.raises(ValueError, match="sem excitação"):
+        c.run_ac("DEC", 1, 1.0, 10.0)
+    with pytest.raises(ValueError, match="não existe"):
+        c.run_ac("DEC", 1, 1.0, 10.0, source="R1")
+
+    # Excitation on another source: the netlist AC source is shorted
+    data = _parse(tmp_path, SERIES_RLC + "I1 0 3 DC 0\n")
+    freqs, out = Circuit(data).run_ac(source="I1")
+    assert np.allclose(out[0], 0.0)
+    z_c = 1 / (2j * np.pi * freqs * 1e-6)
+    z_rl = 50 + 2j * np.pi * freqs * 10e-3
+    assert np.allclose(out[2], z_c * z_rl / (z_c + z_rl))
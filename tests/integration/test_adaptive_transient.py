@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from simulator.parser import parse_netlist
+from simulator.circuit import Circuit
+from simulator.assembly import CompiledCircuit
+from simulator.engine import solve_tran, _lte_ratio, _lte_variables
+from simulator.elements.base import TimeMethod
+from simulator.elements.inductor import Inductor
+from simulator.state import StateStore
+
+
+def create_netlist_file(tmp_path, content):
+    p = tmp_path / "test.net"
+    p.write_text(content, encoding="utf-8")
+    return str(p)
+
+
+RC_STEP = "2\nV1 1 0 DC 1\nR1 1 2 1000\nC1 2 0 1e-6\n"   # tau = 1 ms
+
+
+@pytest.fixture
+def step_counter(monkeypatch):
+    """Counts accepted time steps (one element-history update each)."""
+    calls = []
+    original = StateStore.update
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(StateStore, "update", counting)
+    return calls
+
+
+@pytest.mark.parametrize("method", [TimeMethod.BACKWARD_EULER, TimeMethod.TRAPEZOIDAL])
+def test_adaptive_rc_step_follows_exponential(tmp_path, step_counter, method):
+    data = parse_netlist(create_netlist_file(tmp_path, RC_STEP))
+    t, out, _ = solve_tran(data, 10e-3, 1e-6, 1e-9, None, [2], method, adaptive=True)
+
+    # Same output grid as the fixed-step run
+    assert len(t) == int(10e-3 / 1e-6) + 1
+    late = t > 1e-3
+    assert np.allclose(out[0, late], 1.0 - np.exp(-t[late] / 1e-3), atol=1e-2)
+
+    # Far fewer internal steps than output points
+    assert len(step_counter) < len(t) / 20
+
+
+class TaggedInductor(Inductor):
+    pass
+
+
+def test_lte_variables_come_from_the_state_blocks(tmp_path):
+    data = parse_netlist(create_netlist_file(
+        tmp_path, "3\nV1 1 0 DC 1\nR1 1 2 1000\nC1 2 3 1e-6\nL1 3 0 1\nL2 2 0 1\n"))
+    data.elements[4].__class__ = TaggedInductor  # subclasses keep their parent's state
+    compiled = CompiledCircuit(data)
+    a, b, k = _lte_variables(StateStore(data), compiled)
+    assert a.tolist() == [2] and b.tolist() == [3]
+    assert sorted(k.tolist()) == sorted([compiled.mna_idx[3], compiled.mna_idx[4]])
+
+
+def test_adaptive_tracks_pulse_edges():
+    c = Circuit(parse_netlist("circuits/pulse.net"))
+    _, ref = c.run_tran()
+    _, out = c.run_tran(adaptive=True)
+    assert np.allclose(out, ref, atol=5e-2)
+
+
+def test_dt_max_bounds_the_step(tmp_path, step_counter):
+    data = parse_netlist(create_netlist_file(tmp_path, RC_STEP))
+    solve_tran(data, 10e-3, 1e-4, 1e-9, None, [2], TimeMethod.BACKWARD_EULER,
+               adaptive=True, dt_max=1e-4)
+    assert len(step_counter) >= 10e-3 / 1e-4
+
+
+def test_adaptive_nonlinear_rectifier():
+    c = Circuit(parse_netlist("circuits/dc_source.net"))
+    _, ref = c.run_tran()
+    _, out = c.run_tran(adaptive=True)
+    err = np.abs(out - ref)
+    assert np.percentile(err, 99) < 5e-2
+
+
+@pytest.mark.parametrize("method, degree", [
+    (TimeMethod.BACKWARD_EULER, 1),
+    (TimeMethod.TRAPEZOIDAL, 2),
+])
+def test_lte_vanishes_when_predictor_is_exact(method, degree):
+    # Polynomial trajectories of the method's order are predicted exactly
+    ts = [0.0, 1e-3, 2.5e-3]
+    def s(t):
+        return np.array([1.0 + 2.0 * t ** degree])
+    ratio = _lte_ratio(ts, [s(t) for t in ts], 4e-3, s(4e-3), method, 1e-3, 1e-6)
+    assert ratio == pytest.approx(0.0, abs=1e-9)
+
+    ratio = _lte_ratio(ts, [s(t) for t in ts], 4e-3, s(4e-3) + 0.1, method, 1e-3, 1e-6)
+    assert ratio > 1.0
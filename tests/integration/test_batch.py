@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+import simulator.batch as batch
+from simulator.batch import solve_batch_dc, solve_batch_tran
+from simulator.circuit import Circuit
+from simulator.elements.base import TimeMethod
+from simulator.engine import solve_dc
+from simulator.linsolve import DenseLU
+from simulator.parser import parse_netlist
+from simulator.sweep import with_param
+
+
+def _instances(netlist, param, scale):
+    data = parse_netlist(netlist)
+    elem = next(e for e in data.elements if e.name == param)
+    return [with_param(data, param, getattr(elem, elem.value_attr) * s) for s in scale]
+
+
+@pytest.mark.parametrize("netlist, param, total_time", [
+    ("circuits/opamp_rectifier.net", "R1006", 4e-4),
+    ("circuits/oscilator.net", "R1012", 5e-4),
+    ("circuits/lc.net", "L3002", 2e-4),
+])
+@pytest.mark.parametrize("method", [TimeMethod.BACKWARD_EULER, TimeMethod.TRAPEZOIDAL,
+                                    TimeMethod.GEAR2])
+def test_batched_transient_matches_one_run_per_instance(netlist, param, total_time, method):
+    instances = _instances(netlist, param, [0.5, 1.0, 2.0])
+    nodes = list(range(1, instances[0].max_node + 1))
+    times, out = solve_batch_tran(instances, total_time, instances[0].transient.dt, 1e-8,
+                                  nodes, method)
+
+    assert out.shape == (3, len(nodes), len(times))
+    for k, data in enumerate(instances):
+        ref_times, ref = Circuit(data).run_tran(total_time=total_time, method=method)
+        assert np.allclose(times, ref_times)
+        assert np.allclose(out[k], ref, atol=1e-9)
+
+
+def test_batched_transient_steps_on_every_instance_breakpoint():
+    # Different PULSE delays: each instance also steps on the others' corners
+    data = parse_netlist("circuits/pulse.net")
+    instances = [with_param(data, "V5003.delay", td) for td in (1e-3, 1.05e-3)]
+    times, out = solve_batch_tran(instances, 5e-3, 1e-5, 1e-8, [1, 2], TimeMethod.BACKWARD_EULER)
+    for k, data in enumerate(instances):
+        _, ref = Circuit(data).run_tran(total_time=5e-3)
+        assert np.allclose(out[k], ref, atol=1e-9)
+
+
+def test_linear_batch_factors_once_per_step_size(monkeypatch):
+    factored = []
+    monkeypatch.setattr(batch, "DenseLU", lambda G: factored.append(G) or DenseLU(G))
+    instances = _instances("circuits/lc.net", "L3002", [0.5, 1.0, 2.0])
+    times, out = solve_batch_tran(instances, 2e-4, instances[0].transient.dt, 1e-8,
+                                  [1, 2], TimeMethod.BACKWARD_EULER)
+    assert len(times) > 10 and len(factored) == 3  # one getrf per instance, then getrs only
+    for k, data in enumerate(instances):
+        _, ref = Circuit(data).run_tran(total_time=2e-4, desired_nodes=[1, 2])
+        assert np.allclose(out[k], ref, atol=1e-9)
+
+
+def test_batched_dc_matches_run_dc():
+    instances = _instances("circuits/oscilator.net", "R1014", [0.25, 1.0, 4.0])
+    out = solve_batch_dc(instances)
+    for k, data in enumerate(instances):
+        assert np.allclose(out[k], Circuit(data).run_dc(), atol=1e-9)
+
+    linear = _instances("circuits/example_ccvs.net", "R2", [1.0, 2.0])
+    assert np.allclose(solve_batch_dc(linear, desired_nodes=[3]),
+                       [Circuit(d).run_dc(desired_nodes=[3]) for d in linear])
+
+
+def test_batched_dc_falls_back_to_solve_dc(monkeypatch):
+    instances = _instances("circuits/opamp_rectifier.net", "R1006", [0.5, 2.0])
+    real = batch.newton_batch
+
+    def first_fails(*args, **kwargs):
+        x, done = real(*args, **kwargs)
+        done[0] = False
+        return x, done
+
+    calls = []
+    monkeypatch.setattr(batch, "newton_batch", first_fails)
+    monkeypatch.setattr(batch, "solve_dc", lambda data, *a: calls.append(data) or solve_dc(data, *a))
+
+    out = solve_batch_dc(instances)
+    assert calls == [instances[0]]
+    assert np.allclose(out[0], Circuit(instances[0]).run_dc(), atol=1e-9)
+
+
+def test_batched_sweep_matches_process_sweep():
+    c = Circuit(parse_netlist("circuits/opamp_rectifier.net"))
+    values = [500.0, 1000.0, 4000.0]
+
+    ref = c.sweep("R1006", values, workers=1, total_time=3e-4, method="TRAP")
+    result = c.sweep("R1006", values, batched=True, total_time=3e-4, method="TRAP")
+    assert np.allclose(result.times, ref.times)
+    assert np.allclose(result.out, ref.out, atol=1e-9)
+
+    dc = c.sweep("R1006", values, analysis="dc", batched=True, desired_nodes=[4, 7])
+    assert dc.times is None and dc.out.shape == (3, 2)
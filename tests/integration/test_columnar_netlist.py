@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from simulator.assembly import CompiledCircuit
+from simulator.circuit import Circuit, NetlistOOP
+from simulator.columnar import to_columnar
+from simulator.elements.capacitor import Capacitor
+from simulator.elements.diode import Diode
+from simulator.elements.resistor import Resistor
+from simulator.elements.voltage_source import VoltageSource
+
+
+def _rc_mesh(side):
+    """side x side resistor mesh with a capacitor per node, a PULSE source and a diode clamp."""
+    def node(r, c):
+        return r * side + c + 1
+
+    elems = [VoltageSource("V1", node(0, 0), 0, dc=0.0, source_type="PULSE",
+                           pulse_params={"v1": 0.0, "v2": 1.0, "delay": 1e-9, "rise_time": 1e-9,
+                                         "fall_time": 1e-9, "pulse_width": 5e-9, "period": 2e-8})]
+    for r in range(side):
+        for c in range(side):
+            if c + 1 < side:
+                elems.append(Resistor(f"RH{r}_{c}", node(r, c), node(r, c + 1), 1.0))
+            if r + 1 < side:
+                elems.append(Resistor(f"RV{r}_{c}", node(r, c), node(r + 1, c), 1.0))
+            elems.append(Capacitor(f"C{r}_{c}", node(r, c), 0, 1e-10, 0.1 * c))
+    elems.append(Resistor("RLOAD", node(side - 1, side - 1), 0, 10.0))
+    elems.append(Diode("D1", node(side - 1, 0), 0))
+    data = NetlistOOP(elems, side * side)
+    data.has_nonlinear_elements = True
+    return data
+
+
+def test_columnar_mesh_has_no_per_element_stamps():
+    data = to_columnar(_rc_mesh(4))
+    compiled = CompiledCircuit(data)
+
+    assert [type(e) for e in data.elements] == [VoltageSource, Diode]
+    assert len(data.columns["R"]) == 25 and len(data.columns["C"]) == 16
+    assert len(compiled._lin_R) == 1 and len(compiled._lin_C) == 1
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+@pytest.mark.parametrize("method", ["BE", "TRAP", "GEAR2"])
+def test_columnar_matches_element_objects(sparse, method):
+    data = _rc_mesh(4)
+    col = to_columnar(data)
+
+    _, ref = Circuit(data).run_tran(total_time=2e-8, dt=2e-10, method=method, sparse=sparse)
+    _, out = Circuit(col).run_tran(total_time=2e-8, dt=2e-10, method=method, sparse=sparse)
+    assert np.allclose(out, ref, atol=1e-12)
+
+    dc_ref = Circuit(data).run_dc(sparse=sparse)
+    dc = Circuit(col).run_dc(sparse=sparse)
+    assert np.allclose(dc, dc_ref, atol=1e-12)
+
+
+def test_columnar_adaptive_transient_matches():
+    data = _rc_mesh(3)
+    _, ref = Circuit(data).run_tran(total_time=2e-8, dt=2e-10, adaptive=True)
+    _, out = Circuit(to_columnar(data)).run_tran(total_time=2e-8, dt=2e-10, adaptive=True)
+    assert out.shape == ref.shape
+    assert np.allclose(out, ref, atol=1e-12)
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from simulator.parser import parse_netlist
+from simulator.engine import solve_dc
+
+
+def create_netlist_file(tmp_path, content):
+    p = tmp_path / "test.net"
+    p.write_text(content, encoding="utf-8")
+    return str(p)
+
+
+# 200 V into a resistive tree loaded by a tangle of diodes: with few
+# Newton iterations per attempt, plain Newton from 0 V does not converge
+DIODE_MESH = """
+8
+V1 1 0 DC 200
+R2 1 2 6.09
+R3 1 3 277
+R4 1 4 1.89
+R5 2 5 153
+R6 4 6 3.66
+R7 6 7 6.68
+R8 1 8 93.8
+D0 5 2
+D1 6 1
+D2 5 6
+D3 3 1
+D4 7 8
+D5 3 5
+D6 1 0
+D7 2 5
+D8 5 8
+D9 8 6
+D10 8 7
+D11 3 5
+D12 0 5
+D13 8 0
+D14 3 7
+D15 5 4
+"""
+
+
+@pytest.fixture
+def mesh(tmp_path):
+    return parse_netlist(create_netlist_file(tmp_path, DIODE_MESH))
+
+
+@pytest.fixture
+def reference(mesh):
+    return solve_dc(mesh, nr_tol=1e-8, v0_vector=None, desired_nodes=None)
+
+
+@pytest.mark.parametrize("homotopy", [("gmin",), ("source",), ("gmin", "source"), ("source", "gmin")])
+def test_homotopy_finds_operating_point(mesh, reference, homotopy, capsys):
+    x = solve_dc(mesh, nr_tol=1e-8, v0_vector=None, desired_nodes=None,
+                 max_nr_iter=10, max_nr_guesses=5, homotopy=homotopy)
+    out = capsys.readouterr().out
+
+    assert f"trying {homotopy[0]} stepping" in out
+    assert "random" not in out and "tentativa" not in out
+    assert np.allclose(x, reference, atol=1e-6)
+
+
+def test_without_homotopy_falls_back_to_random_guesses(mesh):
+    np.random.seed(0)
+    with pytest.raises(RuntimeError):
+        solve_dc(mesh, nr_tol=1e-8, v0_vector=None, desired_nodes=None,
+                 max_nr_iter=10, max_nr_guesses=3, homotopy=())
+
+
+def test_homotopy_is_deterministic(mesh):
+    runs = [
+        solve_dc(mesh, nr_tol=1e-8, v0_vector=None, desired_nodes=None, max_nr_iter=10)
+        for _ in range(2)
+    ]
+    assert np.array_equal(runs[0], runs[1])
+
+
+def test_easy_circuit_skips_homotopy(tmp_path, capsys):
+    path = create_netlist_file(tmp_path, "2\nV1 1 0 DC 5\nR1 1 2 1000\nD1 2 0\n")
+    result = solve_dc(parse_netlist(path), nr_tol=1e-8, v0_vector=None, desired_nodes=[2])
+    assert "stepping" not in capsys.readouterr().out
+    assert result[0] == pytest.approx(0.6368, rel=1e-3)
+
+
+def test_unknown_homotopy_method(mesh):
+    with pytest.raises(ValueError):
+        solve_dc(mesh, nr_tol=1e-8, v0_vector=None, desired_nodes=None, homotopy=("ptran",))
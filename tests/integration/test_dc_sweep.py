@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from simulator.assembly import CompiledCircuit
+from simulator.circuit import Circuit
+from simulator.parser import parse_netlist
+from simulator.sweep import with_param
+
+DIODE = """
+2
+V1 1 0 DC 0
+R1 1 2 100
+D1 2 0
+.DC V1 -1 3 0.02
+"""
+
+# Chua's diode (PWL resistor of circuits/chua.net) driven through R1
+CHUA = """
+2
+V1 1 0 DC 0
+R1 1 2 1
+N1 2 0 -2 1.1 -1 0.7 1 -0.7 2 -1.1
+.DC V1 -3 3 0.05
+"""
+
+
+def _parse(tmp_path, text):
+    p = tmp_path / "dc_sweep.net"
+    p.write_text(text, encoding="utf-8")
+    return parse_netlist(str(p))
+
+
+@pytest.fixture
+def count_builds(monkeypatch):
+    calls = []
+    build = CompiledCircuit.build
+
+    def counted(self, *args, **kwargs):
+        calls.append(1)
+        return build(self, *args, **kwargs)
+
+    monkeypatch.setattr(CompiledCircuit, "build", counted)
+    return calls
+
+
+@pytest.mark.parametrize("text", [DIODE, CHUA])
+def test_dc_sweep_matches_one_operating_point_per_value(tmp_path, text):
+    data = _parse(tmp_path, text)
+    values, out = Circuit(data).run_dc_sweep()
+
+    assert out.shape == (2, len(values))
+    assert values[0] == data.dc_sweep.start and values[-1] == pytest.approx(data.dc_sweep.stop)
+    for k in range(0, len(values), 10):
+        ref = Circuit(with_param(data, "V1", values[k])).run_dc()
+        assert np.allclose(out[:, k], ref, atol=1e-6)
+
+
+@pytest.mark.parametrize("text", [DIODE, CHUA])
+def test_dc_sweep_continuation_needs_few_newton_iterations(tmp_path, text, count_builds):
+    data = _parse(tmp_path, text)
+    values, _ = Circuit(data).run_dc_sweep()
+    extrapolated = len(count_builds)
+
+    count_builds.clear()
+    Circuit(data).run_dc_sweep(extrapolate=False)
+    previous = len(count_builds)
+
+    count_builds.clear()
+    for v in values:
+        Circuit(with_param(data, "V1", v)).run_dc()
+    cold = len(count_builds)
+
+    assert extrapolated <= previous < cold
+    assert extrapolated / len(values) < 3.0
+
+
+def test_linear_dc_sweep_and_overrides():
+    c = Circuit(parse_netlist("circuits/pulse.net"))
+    values, out = c.run_dc_sweep("v5003", 0.0, 10.0, 2.5, desired_nodes=[2])
+    assert values.tolist() == [0.0, 2.5, 5.0, 7.5, 10.0]
+    assert np.allclose(out, [values / 2.0])
+    # The PULSE source of the netlist is left untouched
+    assert c.data.elements[0].source_type == "PULSE"
+
+
+def test_dc_sweep_errors(tmp_path):
+    c = Circuit(parse_netlist("circuits/vdc_divider.net"))
+    with pytest.raises(ValueError, match=".DC"):
+        c.run_dc_sweep()
+    with pytest.raises(ValueError, match="não existe"):
+        c.run_dc_sweep("R1", 0.0, 1.0, 0.5)
+    with pytest.raises(ValueError, match="start, stop e step"):
+        c.run_dc_sweep("V1", 0.0, 1.0)
+    with pytest.raises(ValueError, match="Passo"):
+        c.run_dc_sweep("V1", 0.0, 1.0, -0.5)
+
+    # Other arguments override the .DC line
+    data = _parse(tmp_path, DIODE)
+    values, _ = Circuit(data).run_dc_sweep(stop=-0.9)
+    assert len(values) == 6
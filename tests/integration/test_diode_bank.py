@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from simulator.circuit import Circuit, NetlistOOP
+from simulator.assembly import CompiledCircuit, BANK_MIN_SIZE
+from simulator.parser import parse_netlist
+from simulator.elements.diode import Diode
+from simulator.elements.resistor import Resistor
+from simulator.elements.capacitor import Capacitor
+from simulator.elements.voltage_source import VoltageSource
+
+
+def _clamp_chain(n):
+    """SIN source into n RC sections, each clamped by antiparallel diodes."""
+    elems = [VoltageSource("V1", 1, 0, dc=2.0, source_type="SIN",
+                           sin_params={"offset": 2.0, "amplitude": 5.0, "freq": 1e3})]
+    for k in range(n):
+        node = k + 2
+        elems.append(Resistor(f"R{k}", node - 1, node, 10.0))
+        elems.append(Capacitor(f"C{k}", node, 0, 1e-8))
+        elems.append(Diode(f"DA{k}", node, 0))
+        elems.append(Diode(f"DB{k}", 0, node))
+    data = NetlistOOP(elems, n + 1)
+    data.has_nonlinear_elements = True
+    return data
+
+
+def test_diodes_are_banked_above_min_size():
+    many = CompiledCircuit(_clamp_chain(BANK_MIN_SIZE // 2))
+    assert len(many._banks) == 1
+    assert len(many._banks[0].members) == BANK_MIN_SIZE
+    assert many._nl_idx == [] and many._lim_idx == []
+
+    few = CompiledCircuit(parse_netlist("circuits/opamp_rectifier.net"))
+    assert few._banks == []
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_bank_matches_per_diode_stamps(sparse, monkeypatch):
+    data = _clamp_chain(6)
+    c = Circuit(data)
+    dc_bank = c.run_dc(sparse=sparse)
+    _, tran_bank = c.run_tran(total_time=5e-4, dt=2e-6, sparse=sparse)
+
+    monkeypatch.setattr(Diode, "bank", None)
+    assert CompiledCircuit(data)._banks == []
+    dc_ref = c.run_dc(sparse=sparse)
+    _, tran_ref = c.run_tran(total_time=5e-4, dt=2e-6, sparse=sparse)
+
+    assert np.allclose(dc_bank, dc_ref, atol=1e-9)
+    assert np.allclose(tran_bank, tran_ref, atol=1e-9)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from simulator.parser import parse_netlist
+from simulator.circuit import Circuit
+from simulator.engine import solve_tran
+from simulator.elements.base import TimeMethod
+
+
+def create_netlist_file(tmp_path, content):
+    p = tmp_path / "test.net"
+    p.write_text(content, encoding="utf-8")
+    return str(p)
+
+
+# Series RLC driven from zero initial conditions (exact at t = 0)
+RLC = """
+3
+V1 1 0 SIN 0 1 1000 0 0 0
+R1 1 2 100
+L1 2 3 10e-3
+C1 3 0 1e-6
+.TRAN 2e-3 2e-5 GEAR2 1
+"""
+
+# RC with tau = 0.1 us stepped with dt = 10 us: the trapezoidal
+# companion has a pole near -1 there
+STIFF_RC = """
+2
+V1 1 0 PULSE 0 1 1e-4 1e-9 1e-9 1 2 1
+R1 1 2 1
+C1 2 0 1e-7
+.TRAN 1e-3 1e-5 TRAP 1
+"""
+
+
+@pytest.mark.parametrize("method, order", [
+    (TimeMethod.BACKWARD_EULER, 1),
+    (TimeMethod.TRAPEZOIDAL, 2),
+    (TimeMethod.GEAR2, 2),
+])
+def test_convergence_order(tmp_path, method, order):
+    data = parse_netlist(create_netlist_file(tmp_path, RLC))
+    t_ref, ref, _ = solve_tran(data, 2e-3, 2e-5 / 64, 1e-9, None, [3], TimeMethod.TRAPEZOIDAL)
+
+    errors = []
+    for dt in (2e-5, 1e-5, 5e-6):
+        t, out, _ = solve_tran(data, 2e-3, dt, 1e-9, None, [3], method)
+        errors.append(np.max(np.abs(out[0] - np.interp(t, t_ref, ref[0]))))
+
+    # Halving dt divides the error by 2^order
+    for coarse, fine in zip(errors, errors[1:]):
+        assert coarse / fine == pytest.approx(2 ** order, rel=0.1)
+
+
+def test_gear2_does_not_ring_on_stiff_step(tmp_path):
+    data = parse_netlist(create_netlist_file(tmp_path, STIFF_RC))
+    t, trap, _ = solve_tran(data, 1e-3, 1e-5, 1e-9, None, [2], TimeMethod.TRAPEZOIDAL)
+    _, gear, _ = solve_tran(data, 1e-3, 1e-5, 1e-9, None, [2], TimeMethod.GEAR2)
+
+    # Ten steps after the edge the trapezoidal solution still alternates
+    # around the final value; Gear-2 (L-stable) has settled
+    after = t > 2e-4
+    dev_trap = trap[0, after] - 1.0
+    assert np.max(np.abs(dev_trap)) > 1e-2
+    assert np.all(dev_trap[1:] * dev_trap[:-1] < 0.0)
+    assert np.max(np.abs(gear[0, after] - 1.0)) < 1e-4
+
+
+def test_run_tran_accepts_gear2_names(tmp_path):
+    c = Circuit(parse_netlist(create_netlist_file(tmp_path, RLC)))
+    _, from_netlist = c.run_tran()
+    _, explicit = c.run_tran(method=TimeMethod.GEAR2)
+    _, alias = c.run_tran(method="bdf2")
+    _, trap = c.run_tran(method="TRAP")
+
+    assert np.array_equal(from_netlist, explicit)
+    assert np.array_equal(from_netlist, alias)
+    # A method string overrides the netlist's
+    assert not np.allclose(from_netlist, trap, atol=1e-6)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from simulator.parser import parse_netlist
+from simulator.circuit import Circuit
+from simulator.engine import solve_tran
+from simulator.elements.base import TimeMethod
+from simulator.state import StateStore
+
+
+def create_netlist_file(tmp_path, content):
+    p = tmp_path / "test.net"
+    p.write_text(content, encoding="utf-8")
+    return str(p)
+
+
+RLC = """
+3
+V1 1 0 SIN 0 1 500 0 0 0
+R1 1 2 100
+L1 2 3 10e-3
+C1 3 0 1e-6
+.TRAN 4e-3 1e-4 BE 10
+"""
+
+
+@pytest.fixture
+def step_counter(monkeypatch):
+    calls = []
+    original = StateStore.update
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(StateStore, "update", counting)
+    return calls
+
+
+def test_internal_steps_decimate_fine_run(tmp_path, step_counter):
+    data = parse_netlist(create_netlist_file(tmp_path, RLC))
+    method = TimeMethod.BACKWARD_EULER
+
+    t_fine, out_fine, cur_fine = solve_tran(data, 4e-3, 1e-5, 1e-9, None, [2, 3], method)
+    step_counter.clear()
+    t, out, cur = solve_tran(data, 4e-3, 1e-4, 1e-9, None, [2, 3], method, internal_steps=10)
+
+    # Output on the coarse grid, integrated on the fine one
+    assert len(t) == 41
+    assert len(step_counter) == 1 + 40 * 10
+    assert np.allclose(t, t_fine[::10])
+    assert np.allclose(out, out_fine[:, ::10], atol=1e-9)
+    for name in cur:
+        assert len(cur[name]) == 41
+        assert np.allclose(cur[name], cur_fine[name][::10], atol=1e-9)
+
+
+def test_run_tran_uses_netlist_internal_steps(tmp_path):
+    data = parse_netlist(create_netlist_file(tmp_path, RLC))
+    assert data.transient.intetnal_steps == 10
+
+    c = Circuit(data)
+    _, out_netlist = c.run_tran()
+    _, out_explicit = c.run_tran(internal_steps=10)
+    _, out_single = c.run_tran(internal_steps=1)
+
+    assert np.array_equal(out_netlist, out_explicit)
+    assert not np.allclose(out_netlist, out_single, atol=1e-6)
+
+
+def test_internal_steps_must_be_positive(tmp_path):
+    data = parse_netlist(create_netlist_file(tmp_path, RLC))
+    with pytest.raises(ValueError):
+        solve_tran(data, 4e-3, 1e-4, 1e-9, None, [2], TimeMethod.BACKWARD_EULER,
+                   internal_steps=0)
@@ -0,0 +1,63 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from simulator import engine
+from simulator.parser import parse_netlist
+from simulator.elements.base import TimeMethod
+from simulator.linsolve import LinearSolver
+
+
+def _run(data, method, steps=300):
+    tr = data.transient
+    v0 = np.zeros(data.max_node + 1)
+    nodes = list(range(1, data.max_node + 1))
+    return engine.solve_tran(data, steps * tr.dt, tr.dt, 1e-9, v0, nodes, method)
+
+
+@pytest.mark.parametrize("netlist", [
+    "circuits/lc.net",
+    "circuits/sinusoidal.net",
+    "circuits/rlc_sine_parallel.net",
+    "circuits/example_rl_ic.net",
+])
+@pytest.mark.parametrize("method", [TimeMethod.BACKWARD_EULER, TimeMethod.TRAPEZOIDAL,
+                                    TimeMethod.GEAR2])
+def test_linear_fast_path_matches_newton_path(netlist, method):
+    data = parse_netlist(netlist)
+    assert not data.has_nonlinear_elements
+
+    _, out_fast, cur_fast = _run(data, method)
+    # Flagging the circuit as nonlinear forces the Newton-Raphson path
+    _, out_nr, cur_nr = _run(dataclasses.replace(data, has_nonlinear_elements=True), method)
+
+    assert np.allclose(out_fast, out_nr, atol=1e-6)
+    for name in cur_nr:
+        assert np.allclose(cur_fast[name], cur_nr[name], atol=1e-6)
+
+
+def test_linear_fast_path_factors_once(monkeypatch):
+    data = parse_netlist("circuits/lc.net")
+    counts = []
+
+    class CountingSolver(LinearSolver):
+        def __init__(self):
+            super().__init__()
+            counts.append(self)
+
+    def no_newton(*args, **kwargs):
+        raise AssertionError("newton_solve called for a linear circuit")
+
+    monkeypatch.setattr(engine, "LinearSolver", CountingSolver)
+    monkeypatch.setattr(engine, "newton_solve", no_newton)
+    _run(data, TimeMethod.BACKWARD_EULER, steps=100)
+
+    assert len(counts) == 1
+    assert counts[0].n_factor == 1
+
+    # GEAR2 starts with backward Euler steps (t = 0 and the first step),
+    # then switches to the BDF2 companion G once
+    counts.clear()
+    _run(data, TimeMethod.GEAR2, steps=100)
+    assert counts[0].n_factor == 2
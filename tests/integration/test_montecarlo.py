@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+import simulator.montecarlo as montecarlo
+from simulator.circuit import Circuit
+from simulator.parser import parse_netlist
+from simulator.sweep import with_param
+
+RC = """
+2
+V1 1 0 PULSE 0 1 0 1e-6 1e-6 1e-3 2e-3
+R1 1 2 1000
+C1 2 0 1e-7
+D1 2 0
+.TRAN 3e-4 1e-5 BE 1
+"""
+
+
+@pytest.fixture
+def rc(tmp_path):
+    p = tmp_path / "rc_mc.net"
+    p.write_text(RC, encoding="utf-8")
+    return parse_netlist(str(p))
+
+
+def test_montecarlo_is_reproducible_across_workers(rc):
+    tolerances = {"R*": 0.01, "C1": montecarlo.Tolerance(0.1, "gauss")}
+    serial = Circuit(rc).montecarlo(tolerances, 6, seed=7, workers=1, metrics=("max", "final"))
+    pooled = Circuit(rc).montecarlo(tolerances, 6, seed=7, workers=2, chunk_size=2,
+                                    metrics=("max", "final"))
+    batched = Circuit(rc).montecarlo(tolerances, 6, seed=7, workers=1, batched=True,
+                                     metrics=("max", "final"))
+
+    assert serial.names == ["max(V1)", "max(V2)", "final(V1)", "final(V2)"]
+    assert serial.params == ["R1.R", "C1.C"]
+    assert np.array_equal(serial.samples, pooled.samples)
+    assert np.array_equal(serial.metrics, pooled.metrics)
+    assert np.allclose(serial.metrics, batched.metrics, atol=1e-9)
+    assert not serial.failed.any()
+    assert len(np.unique(serial["final(V2)"])) == 6
+
+
+def test_montecarlo_metrics_match_the_drawn_netlists(rc):
+    seen = []
+    result = Circuit(rc).montecarlo({"R1": 0.5, "C1": 0.5}, 3, seed=1, workers=1,
+                                    desired_nodes=[2], keep_waveforms=True,
+                                    on_result=lambda i, m: seen.append(i))
+    assert sorted(seen) == [0, 1, 2]
+    assert result.waveforms.shape == (3, 1, len(result.times))
+    for k, (r, c) in enumerate(result.samples):
+        data = with_param(with_param(rc, "R1", r), "C1", c)
+        _, ref = Circuit(data).run_tran(desired_nodes=[2])
+        assert np.allclose(result.waveforms[k], ref)
+        assert result["final(V2)"][k] == ref[0, -1]
+
+
+def test_montecarlo_flags_failed_runs(rc, monkeypatch):
+    calls = []
+    real = montecarlo._single
+
+    def fail_second(data, analysis, kwargs):
+        calls.append(data)
+        return None if len(calls) == 2 else real(data, analysis, kwargs)
+
+    monkeypatch.setattr(montecarlo, "_single", fail_second)
+    result = Circuit(rc).montecarlo({"R1": 0.1}, 3, seed=0, workers=1)
+    assert result.failed.tolist() == [False, True, False]
+    assert np.isnan(result.metrics[1]).all() and not np.isnan(result.metrics[0]).any()
+    assert result.yield_fraction({"final(V2)": (None, None)}) == pytest.approx(2 / 3)
+
+
+def test_dc_montecarlo():
+    c = Circuit(parse_netlist("circuits/vdc_divider.net"))
+    result = c.montecarlo({"R*": 0.05}, 20, seed=2, workers=1, desired_nodes=[2])
+    v = result["final(V2)"]
+    assert result.times is None
+    assert np.all((v > 10 * 0.95 / 2.05) & (v < 10 * 1.05 / 1.95))
+    r1, r2 = result.samples.T
+    assert np.allclose(v, 10 * r2 / (r1 + r2))
+
+    with pytest.raises(ValueError, match="Análise"):
+        c.montecarlo({"R*": 0.05}, 2, analysis="ac")
+    with pytest.raises(ValueError, match="rodada"):
+        c.montecarlo({"R*": 0.05}, 0)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import simulator.parser as parser
+from simulator import netlist_cache
+from simulator.circuit import Circuit
+from simulator.parser import parse_netlist
+
+
+@pytest.fixture
+def cache(tmp_path):
+    yield netlist_cache.enable(tmp_path / "cache")
+    netlist_cache.disable()
+
+
+def _no_parser(*args, **kwargs):
+    raise AssertionError("parsed again instead of loading the cached netlist")
+
+
+def test_repeated_parse_loads_the_cached_netlist(cache, monkeypatch, capsys):
+    times, out = Circuit(parse_netlist("circuits/opamp_rectifier.net")).run_tran()
+    assert "Newton-Raphson will be used" in capsys.readouterr().out
+
+    monkeypatch.setattr(parser, "_parse_netlist", _no_parser)
+    data = parse_netlist("circuits/opamp_rectifier.net")
+    assert capsys.readouterr().out == ""  # silent: main.py and plot.py report the hit
+    assert data.has_nonlinear_elements and cache.hits == 1
+
+    times_c, out_c = Circuit(data).run_tran()
+    assert np.array_equal(times_c, times) and np.array_equal(out_c, out)
+
+    with pytest.raises(AssertionError, match="parsed again"):
+        parse_netlist("circuits/opamp_rectifier.net", cache=False)
+
+
+def test_edited_or_invalidated_netlist_is_parsed_again(cache, tmp_path):
+    path = tmp_path / "div.net"
+    path.write_text("2\nV1 1 0 DC 5\nR1 1 2 1000\nR2 2 0 1000\n", encoding="utf-8")
+    assert Circuit(parse_netlist(str(path))).run_dc()[1] == pytest.approx(2.5)
+
+    path.write_text("2\nV1 1 0 DC 5\nR1 1 2 1000\nR2 2 0 3000\n", encoding="utf-8")
+    assert Circuit(parse_netlist(str(path))).run_dc()[1] == pytest.approx(3.75)
+    assert cache.hits == 0 and cache.misses == 2
+
+    parse_netlist(str(path))
+    cache.invalidate(str(path))
+    parse_netlist(str(path))
+    assert cache.hits == 1 and cache.misses == 3
+
+
+def test_cache_is_off_by_default(tmp_path, monkeypatch):
+    assert netlist_cache.active() is None
+    monkeypatch.setattr(netlist_cache.NetlistSource, "read", _no_parser)
+    assert parse_netlist("circuits/vdc_divider.net").max_node > 0
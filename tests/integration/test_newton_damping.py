@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from simulator.parser import parse_netlist
+from simulator.assembly import CompiledCircuit
+from simulator.engine import solve_dc
+from simulator.newton import newton_solve
+
+
+def create_netlist_file(tmp_path, content):
+    p = tmp_path / "test.net"
+    p.write_text(content, encoding="utf-8")
+    return str(p)
+
+
+# 1 A forced into a junction: from 0 V, plain Newton overshoots far past
+# the operating point and then walks back down the exponential
+CURRENT_DRIVEN_DIODE = """
+1
+I1 0 1 DC 1
+D1 1 0
+"""
+
+
+def _solve(path):
+    data = parse_netlist(path)
+    compiled = CompiledCircuit(data)
+    builds = []
+
+    def build(x):
+        builds.append(1)
+        return compiled.build(x, "DC")
+
+    np.random.seed(0)
+    x = newton_solve(
+        build, np.zeros(compiled.n_total - 1), tol=1e-8,
+        is_limited=compiled.limited, reset_limiting=compiled.reset_limiting,
+    )
+    return x, len(builds), data
+
+
+def test_limited_newton_matches_shockley(tmp_path, capsys):
+    path = create_netlist_file(tmp_path, CURRENT_DRIVEN_DIODE)
+    x, _, data = _solve(path)
+    assert "tentativa" not in capsys.readouterr().out
+
+    d = data.elements[1]
+    assert x[0] == pytest.approx(d.Vt * np.log(1.0 + 1.0 / d.Is), rel=1e-6)
+
+
+def test_limiting_saves_iterations(tmp_path):
+    path = create_netlist_file(tmp_path, CURRENT_DRIVEN_DIODE)
+    data = parse_netlist(path)
+
+    x_lim, builds_lim, _ = _solve(path)
+
+    # Same circuit without limiting (no lim_state handed to the diode)
+    compiled = CompiledCircuit(data)
+    compiled.lim_states = [None] * len(data.elements)
+    compiled._lim_idx = []
+    builds = []
+
+    def build(x):
+        builds.append(1)
+        return compiled.build(x, "DC")
+
+    x_ref = newton_solve(build, np.zeros(compiled.n_total - 1), tol=1e-8, damping=False)
+
+    assert np.allclose(x_lim, x_ref, atol=1e-8)
+    assert builds_lim < len(builds)
+
+
+def test_solve_dc_stiff_diode_network(tmp_path, capsys):
+    netlist = """
+    3
+    V1 1 0 DC 80
+    R1 1 2 0.5
+    D1 2 0
+    R2 2 3 10
+    D2 3 0
+    D3 0 3
+    """
+    path = create_netlist_file(tmp_path, netlist)
+    result = solve_dc(parse_netlist(path), nr_tol=1e-8, v0_vector=None, desired_nodes=[2, 3])
+    assert "tentativa" not in capsys.readouterr().out
+
+    # D1 carries ~160 A (beyond the clamp), D2 conducts what R2 lets through
+    assert result[0] == pytest.approx(0.8993, abs=1e-3)
+    assert result[1] == pytest.approx(0.6775, abs=1e-3)
+
+
+def _kinked(x):
+    # Piecewise-linear residual: the Newton step from x = -1 (slope 1)
+    # reaches the steep branch, and every step length raises the residual
+    v = x[0]
+    if v <= -1.0:
+        G, I = 1.0, 1.0           # R = v - 1
+    elif v < 0.5:
+        G, I = 1.0, v + 3.0       # R = -3
+    else:
+        G, I = 10.0, 15.0         # R = 10 (v - 1.5)
+    return np.array([[G]]), np.array([I])
+
+
+def test_full_step_when_no_step_length_decreases_the_residual(capsys):
+    np.random.seed(0)
+    x = newton_solve(_kinked, np.array([-1.0]), tol=1e-10, max_iter=10)
+    assert "tentativa" not in capsys.readouterr().out
+    assert x[0] == pytest.approx(1.5)
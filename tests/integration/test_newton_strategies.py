@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from simulator import engine
+from simulator.parser import parse_netlist
+from simulator.circuit import Circuit
+from simulator.linsolve import LinearSolver
+from simulator.newton import newton_solve, NewtonStrategy
+
+
+@pytest.fixture
+def solvers(monkeypatch):
+    """Records the LinearSolver created by each analysis (to count factorizations)."""
+    made = []
+
+    class RecordingSolver(LinearSolver):
+        def __init__(self):
+            super().__init__()
+            made.append(self)
+
+    monkeypatch.setattr(engine, "LinearSolver", RecordingSolver)
+    return made
+
+
+@pytest.mark.parametrize("strategy", ["chord", "broyden"])
+@pytest.mark.parametrize("netlist", ["circuits/example_diode.net", "circuits/example_nl_res.net"])
+def test_dc_strategies_match_full_newton(netlist, strategy):
+    c = Circuit(parse_netlist(netlist))
+    ref = c.run_dc(nr_strategy="newton")
+    assert np.allclose(c.run_dc(nr_strategy=strategy), ref, atol=1e-6)
+
+
+@pytest.mark.parametrize("strategy", ["chord", "broyden"])
+def test_tran_strategies_cut_factorizations(solvers, strategy):
+    data = parse_netlist("circuits/dc_source.net")
+    c = Circuit(data)
+    t_end = 2000 * data.transient.dt
+
+    _, ref = c.run_tran(total_time=t_end, nr_strategy="newton")
+    _, out = c.run_tran(total_time=t_end, nr_strategy=strategy)
+
+    assert np.allclose(out, ref, atol=1e-5)
+    full, reused = solvers[0].n_factor, solvers[1].n_factor
+    assert reused * 3 <= full
+
+
+def test_broyden_solves_algebraic_system():
+    # x^2 + y^2 = 4, x = y  ->  x = y = sqrt(2); "G" is the exact Jacobian
+    def build(x):
+        J = np.array([[2 * x[0], 2 * x[1]], [1.0, -1.0]])
+        F = np.array([x[0] ** 2 + x[1] ** 2 - 4.0, x[0] - x[1]])
+        return J, J @ x - F
+
+    x = newton_solve(build, np.array([1.0, 2.0]), tol=1e-12,
+                     strategy=NewtonStrategy.BROYDEN, max_guesses=1)
+    assert np.allclose(x, [np.sqrt(2.0), np.sqrt(2.0)])
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        newton_solve(lambda x: (np.eye(1), np.ones(1)), np.zeros(1), strategy="secant")
@@ -2,6 +2,12 @@ import numpy as np
 import pytest
 from simulator.parser import parse_netlist
 from simulator.engine import solve_dc
+from simulator.assembly import CompiledCircuit
+from simulator.circuit import Circuit, NetlistOOP
+from simulator.elements.capacitor import Capacitor
+from simulator.elements.nonlinear_resistor import NonLinearResistor
+from simulator.elements.resistor import Resistor
+from simulator.elements.voltage_source import VoltageSource
 
 def create_netlist_file(tmp_path, content):
     p = tmp_path / "test.net"
@@ -68,4 +74,35 @@ def test_diode_convergence_failure(tmp_path):
         res = solve_dc(data, nr_tol=1e-6, v0_vector=None, desired_nodes=[1])
         assert np.isfinite(res[0])
     except RuntimeError:
-        pass
\ No newline at end of file
+        pass
+
+
+def _nlr_ladder(stages, points):
+    """SIN source into an RC ladder shunted by NLRs with a long cubic-like table."""
+    V_points = np.linspace(-4.0, 4.0, points)
+    I_points = 0.05 * V_points**3 - 0.2 * V_points
+    elems = [VoltageSource("V1", 1, 0, dc=1.0, source_type="SIN",
+                           sin_params={"offset": 1.0, "amplitude": 3.0, "freq": 1e3})]
+    for k in range(stages):
+        node = k + 2
+        elems.append(Resistor(f"R{k}", node - 1, node, 2.0))
+        elems.append(Capacitor(f"C{k}", node, 0, 1e-5))
+        elems.append(NonLinearResistor(f"N{k}", node, 0, V_points, I_points))
+    data = NetlistOOP(elems, stages + 1)
+    data.has_nonlinear_elements = True
+    return data
+
+
+def test_nonlinear_resistor_bank_matches_per_element_stamps(monkeypatch):
+    data = _nlr_ladder(10, 201)
+    assert len(CompiledCircuit(data)._banks) == 1
+    c = Circuit(data)
+    dc_bank = c.run_dc()
+    _, tran_bank = c.run_tran(total_time=1e-3, dt=1e-5)
+
+    monkeypatch.setattr(NonLinearResistor, "bank", None)
+    dc_ref = c.run_dc()
+    _, tran_ref = c.run_tran(total_time=1e-3, dt=1e-5)
+
+    assert np.allclose(dc_bank, dc_ref, atol=1e-9)
+    assert np.allclose(tran_bank, tran_ref, atol=1e-9)
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import simulator.circuit as circuit_module
+from simulator import result_cache
+from simulator.circuit import Circuit
+from simulator.parser import parse_netlist
+
+
+@pytest.fixture
+def cache(tmp_path):
+    yield result_cache.enable(tmp_path)
+    result_cache.disable()
+
+
+def _no_solver(*args, **kwargs):
+    raise AssertionError("solved again instead of reusing the stored result")
+
+
+def test_identical_runs_reuse_the_stored_result(cache, monkeypatch):
+    times, out = Circuit(parse_netlist("circuits/lc.net")).run_tran()
+    dc = Circuit(parse_netlist("circuits/example_diode.net")).run_dc()
+    first = Circuit(parse_netlist("circuits/lc.net"))
+    first.run_tran()
+    signals = first.last_tran_signals
+    assert len(cache.entries()) == 2
+
+    monkeypatch.setattr(circuit_module, "solve_tran", _no_solver)
+    monkeypatch.setattr(circuit_module, "solve_dc", _no_solver)
+    again = Circuit(parse_netlist("circuits/lc.net"))
+    times2, out2 = again.run_tran()
+    assert np.array_equal(times2, times) and np.array_equal(out2, out)
+    # Current traces come back too
+    assert again.last_tran_signals.keys() == signals.keys()
+    assert all(np.array_equal(again.last_tran_signals[k], signals[k]) for k in signals)
+    assert np.array_equal(Circuit(parse_netlist("circuits/example_diode.net")).run_dc(), dc)
+
+    with pytest.raises(AssertionError, match="solved again"):
+        Circuit(parse_netlist("circuits/lc.net")).run_tran(cache=False)
+
+
+def test_changed_netlist_or_settings_miss(cache):
+    data = parse_netlist("circuits/pulse.net")
+    Circuit(data).run_tran()
+    Circuit(data).run_tran(desired_nodes=[2])
+    Circuit(data).run_tran(method="TRAP")
+    data.elements[1].R = 2000.0
+    _, out = Circuit(data).run_tran(desired_nodes=[2])
+    assert cache.hits == 0 and len(cache.entries()) == 4
+    assert np.allclose(out, Circuit(data).run_tran(desired_nodes=[2], cache=False)[1])
+
+
+def test_cache_is_off_unless_enabled(tmp_path):
+    assert result_cache.active() is None
+    Circuit(parse_netlist("circuits/pulse.net")).run_tran()
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from simulator import engine
+from simulator.parser import parse_netlist
+from simulator.engine import solve_tran
+from simulator.elements.base import TimeMethod
+
+
+def create_netlist_file(tmp_path, content):
+    p = tmp_path / "test.net"
+    p.write_text(content, encoding="utf-8")
+    return str(p)
+
+
+# RC (tau = 20 us) driven by a pulse whose edges fall between grid points
+PULSE_RC = """
+2
+V1 1 0 PULSE 0 1 1.05e-4 1e-9 1e-9 2.03e-4 5e-4 1
+R1 1 2 20
+C1 2 0 1e-6
+.TRAN 1e-3 1e-5 TRAP 1
+"""
+
+
+@pytest.fixture
+def accepted_times(monkeypatch):
+    """Time points accepted by the adaptive loop."""
+    seen = []
+    original = engine._adaptive_time_loop
+
+    def recording(*args, **kwargs):
+        result = original(*args, **kwargs)
+        seen.append(result[0])
+        return result
+
+    monkeypatch.setattr(engine, "_adaptive_time_loop", recording)
+    return seen
+
+
+def _reference(data, nodes):
+    return solve_tran(data, 1e-3, 1e-7, 1e-9, None, nodes, TimeMethod.TRAPEZOIDAL)
+
+
+def test_fixed_step_lands_on_breakpoints(tmp_path):
+    data = parse_netlist(create_netlist_file(tmp_path, PULSE_RC))
+    t_ref, ref, _ = _reference(data, [2])
+
+    errors = {}
+    for use_bps in (False, True):
+        t, out, _ = solve_tran(data, 1e-3, 1e-5, 1e-9, None, [2], TimeMethod.TRAPEZOIDAL,
+                               breakpoints=use_bps)
+        # The output grid does not change
+        assert len(t) == 101
+        errors[use_bps] = np.max(np.abs(out[0] - np.interp(t, t_ref, ref[0])))
+
+    assert errors[True] < 0.2 * errors[False]
+
+
+def test_adaptive_step_lands_on_breakpoints(tmp_path, accepted_times):
+    data = parse_netlist(create_netlist_file(tmp_path, PULSE_RC))
+    bps = engine._source_breakpoints(data, 1e-3)
+    assert len(bps) == 8
+
+    t, out, _ = solve_tran(data, 1e-3, 1e-5, 1e-9, None, [2], TimeMethod.TRAPEZOIDAL,
+                           adaptive=True)
+    # Every corner is an accepted time point, exactly
+    assert np.all(np.isin(bps, accepted_times[0]))
+
+    t_ref, ref, _ = _reference(data, [2])
+    assert np.max(np.abs(out[0] - np.interp(t, t_ref, ref[0]))) < 1e-2
+
+
+def test_adaptive_breakpoints_save_steps(tmp_path, accepted_times):
+    data = parse_netlist(create_netlist_file(tmp_path, PULSE_RC))
+    for use_bps in (True, False):
+        solve_tran(data, 1e-3, 1e-5, 1e-9, None, [2], TimeMethod.TRAPEZOIDAL,
+                   adaptive=True, breakpoints=use_bps)
+    with_bps, without_bps = (len(times) for times in accepted_times)
+    assert with_bps < without_bps
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from scipy import sparse
+
+from simulator.parser import parse_netlist
+from simulator.circuit import Circuit, NetlistOOP
+from simulator.engine import solve_dc
+from simulator.assembly import CompiledCircuit, use_sparse, SPARSE_NODE_THRESHOLD
+from simulator.elements.resistor import Resistor
+from simulator.elements.voltage_source import VoltageSource
+
+
+def _resistor_ladder(n):
+    elems = [VoltageSource("V1", 1, 0, dc=1.0)]
+    for k in range(1, n):
+        elems.append(Resistor(f"R{k}", k, k + 1, 1.0))
+    elems.append(Resistor("RL", n, 0, 1.0))
+    return NetlistOOP(elems, n)
+
+
+@pytest.mark.parametrize("netlist", [
+    "circuits/example_ccvs.net",
+    "circuits/example_cccs.net",
+    "circuits/example_diode.net",
+    "circuits/example_nl_res.net",
+])
+def test_sparse_dc_matches_dense(netlist):
+    c = Circuit(parse_netlist(netlist))
+    dense = c.run_dc(sparse=False)
+    sp = c.run_dc(sparse=True)
+    assert np.allclose(dense, sp, atol=1e-9)
+
+
+@pytest.mark.parametrize("netlist", ["circuits/lc.net", "circuits/opamp_rectifier.net"])
+def test_sparse_tran_matches_dense(netlist):
+    data = parse_netlist(netlist)
+    c = Circuit(data)
+    t_end = 200 * data.transient.dt
+    _, dense = c.run_tran(total_time=t_end, sparse=False)
+    _, sp = c.run_tran(total_time=t_end, sparse=True)
+    assert np.allclose(dense, sp, atol=1e-9)
+
+
+def test_sparse_build_returns_csc_matrix():
+    data = parse_netlist("circuits/example_ccvs.net")
+    compiled = CompiledCircuit(data, sparse=True)
+    G, I = compiled.build(np.zeros(compiled.n_total - 1), analysis_context="DC")
+    assert sparse.isspmatrix_csc(G)
+    assert G.shape == (compiled.n_total - 1, compiled.n_total - 1)
+
+
+def test_sparse_is_chosen_above_node_threshold():
+    small = _resistor_ladder(10)
+    large = _resistor_ladder(SPARSE_NODE_THRESHOLD + 1)
+    assert not use_sparse(small)
+    assert use_sparse(large)
+    assert use_sparse(small, sparse=True)
+
+    # Divider of N equal resistors: last node at 1/N of the source
+    n = large.max_node
+    out = solve_dc(large, 1e-9, None, [n])
+    assert out[0] == pytest.approx(1.0 / n, rel=1e-9)
+
+
+def test_sparse_singular_circuit_fails():
+    data = NetlistOOP([VoltageSource("V1", 1, 0, dc=5.0),
+                       VoltageSource("V2", 1, 0, dc=3.0)], 1)
+    with pytest.raises(RuntimeError):
+        solve_dc(data, 1e-6, None, [1], sparse=True)
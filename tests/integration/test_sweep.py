@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from simulator.circuit import Circuit
+from simulator.parser import parse_netlist
+from simulator.sweep import with_param
+
+RC = """
+2
+V1 1 0 PULSE 0 1 0 1e-6 1e-6 1e-3 2e-3
+R1 1 2 1000
+C1 2 0 1e-7
+.TRAN 5e-4 1e-5 BE 1
+.STEP R1 LIST 500 1000 2000
+"""
+
+
+@pytest.fixture
+def rc(tmp_path):
+    p = tmp_path / "rc_step.net"
+    p.write_text(RC, encoding="utf-8")
+    return parse_netlist(str(p))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sweep_matches_one_run_per_value(rc, workers):
+    result = Circuit(rc).sweep(workers=workers)
+
+    assert result.param == "R1"
+    assert result.values.tolist() == [500.0, 1000.0, 2000.0]
+    assert result.out.shape == (3, 2, len(result.times))
+    for value, out in zip(result.values, result.out):
+        times, ref = Circuit(with_param(rc, "R1", value)).run_tran()
+        assert np.allclose(times, result.times)
+        assert np.allclose(out, ref)
+    # Larger R: slower charge of C1
+    assert result.out[0, 1, -1] > result.out[1, 1, -1] > result.out[2, 1, -1]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_dc_sweep_of_a_waveform_parameter(rc, workers):
+    # DC point of a PULSE source: its initial value v1
+    result = Circuit(rc).sweep("V1.v1", [1.0, 2.0, 4.0], analysis="dc", workers=workers,
+                               desired_nodes=[2])
+    assert result.times is None
+    assert np.allclose(result.out, [[1.0], [2.0], [4.0]])
+
+
+def test_sweep_requires_a_parameter():
+    c = Circuit(parse_netlist("circuits/vdc_divider.net"))
+    with pytest.raises(ValueError, match=".STEP"):
+        c.sweep()
+    with pytest.raises(ValueError, match="Análise"):
+        c.sweep("R1", [1.0], analysis="ac")
@@ -21,3 +21,18 @@ def test_transient_rc_step():
     # Sinal AC → não é monotônico.
     # Testamos amplitude > 0.
     assert np.max(np.abs(v)) > 0.1
+
+
+RC_STEP = "2\nV1 1 0 DC 1\nR1 1 2 1000\nC1 2 0 1e-6\n"   # tau = 1 ms
+
+
+def test_trapezoidal_capacitor_converges(tmp_path):
+    p = tmp_path / "rc_step.net"
+    p.write_text(RC_STEP, encoding="utf-8")
+    data = parse_netlist(str(p))
+    errors = []
+    for dt in (1e-4, 5e-5):
+        t, out, _ = solve_tran(data, 5e-3, dt, 1e-9, None, [2], TimeMethod.TRAPEZOIDAL)
+        errors.append(abs(out[0, -1] - (1.0 - np.exp(-(t[-1] + dt) / 1e-3))))
+    assert errors[0] < 1e-3
+    assert errors[1] < errors[0]
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from simulator.circuit import Circuit
+from simulator.parser import parse_netlist
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+@pytest.mark.parametrize("method", ["BE", "TRAP", "GEAR2"])
+@pytest.mark.parametrize("netlist, total_time", [
+    ("circuits/opamp_rectifier.net", 2e-4),
+    ("circuits/oscilator.net", 1e-3),
+    ("circuits/example_rc_ic.net", 5e-3),
+])
+def test_vectorized_backend_matches_element_stamps(netlist, total_time, method, sparse):
+    data = parse_netlist(netlist)
+    c = Circuit(data)
+
+    _, ref = c.run_tran(total_time=total_time, method=method, sparse=sparse)
+    _, out = c.run_tran(total_time=total_time, method=method, sparse=sparse,
+                        stamping="vectorized")
+    assert np.allclose(out, ref, atol=1e-10)
+
+    dc_ref = c.run_dc(sparse=sparse)
+    dc = c.run_dc(sparse=sparse, stamping="vectorized")
+    assert np.allclose(dc, dc_ref, atol=1e-10)
+
+
+def test_vectorized_backend_adaptive_step():
+    c = Circuit(parse_netlist("circuits/pulse.net"))
+    _, ref = c.run_tran(adaptive=True)
+    _, out = c.run_tran(adaptive=True, stamping="vectorized")
+    assert out.shape == ref.shape
+    assert np.allclose(out, ref, atol=1e-9)
@@ -0,0 +1,242 @@
+import numpy as np
+import pytest
+
+from simulator.parser import parse_netlist
+from simulator.engine import _build_mna_system
+from simulator.assembly import CompiledCircuit, build_mna_index_map
+from simulator.elements.base import TimeMethod
+from simulator.state import StateStore
+
+
+@pytest.mark.parametrize("netlist", [
+    "circuits/opamp_rectifier.net",
+    "circuits/lc.net",
+    "circuits/example_ccvs.net",
+    "circuits/example_cccs.net",
+])
+def test_compiled_matches_reference_assembly(netlist):
+    data = parse_netlist(netlist)
+    compiled = CompiledCircuit(data)
+    x_red = np.linspace(-0.1, 0.1, compiled.n_total - 1)
+
+    G_ref, I_ref = _build_mna_system(data, x_red, analysis_context="DC")
+    G, I = compiled.build(x_red, analysis_context="DC")
+    assert np.allclose(G, G_ref) and np.allclose(I, I_ref)
+
+    kwargs = dict(analysis_context="TRAN", t=1e-4, dt=1e-6,
+                  method=TimeMethod.BACKWARD_EULER)
+    G_ref, I_ref = _build_mna_system(
+        data, x_red, states=[{} for _ in data.elements], **kwargs)
+    G, I = compiled.build(x_red, states=[{} for _ in data.elements], **kwargs)
+    assert np.allclose(G, G_ref) and np.allclose(I, I_ref)
+
+
+def test_compiled_reuses_buffers_and_index_map():
+    data = parse_netlist("circuits/example_ccvs.net")
+    compiled = CompiledCircuit(data)
+
+    G1, I1 = compiled.build(np.zeros(compiled.n_total - 1), analysis_context="DC")
+    G2, I2 = compiled.build(np.zeros(compiled.n_total - 1), analysis_context="DC")
+
+    # Same preallocated buffers, no reallocation per build
+    assert G1 is G2 and I1 is I2
+    assert compiled.mna_map == build_mna_index_map(data)
+    # CCVS receives its first (control current) index
+    ccvs_idx = [i for i, e in enumerate(data.elements) if e.__class__.__name__ == "CCVS"][0]
+    assert compiled.mna_idx[ccvs_idx] == compiled.mna_map[(ccvs_idx, "i_ctrl")]
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_only_solution_dependent_elements_are_restamped(sparse):
+    data = parse_netlist("circuits/opamp_rectifier.net")
+    compiled = CompiledCircuit(data, sparse=sparse)
+    calls = {e.name: 0 for e in data.elements}
+    for elem in data.elements:
+        original = elem.stamp_transient
+
+        def counting(*args, _orig=original, _name=elem.name, **kwargs):
+            calls[_name] += 1
+            return _orig(*args, **kwargs)
+        object.__setattr__(elem, "stamp_transient", counting)
+
+    states = [{} for _ in data.elements]
+    kwargs = dict(analysis_context="TRAN", dt=1e-6,
+                  method=TimeMethod.BACKWARD_EULER, states=states)
+    x_red = np.linspace(-0.1, 0.1, compiled.n_total - 1)
+    for t in (0.0, 1e-6):
+        for _ in range(3):  # Newton iterations of one time step
+            G, I = compiled.build(x_red, t=t, **kwargs)
+
+    ref_data = parse_netlist("circuits/opamp_rectifier.net")
+    G_ref, I_ref = _build_mna_system(ref_data, x_red, t=1e-6, **kwargs)
+    G = G.toarray() if sparse else G
+    assert np.allclose(G, G_ref) and np.allclose(I, I_ref)
+
+    assert calls["D1201"] == calls["D1202"] == 6   # every build
+    assert calls["V2000"] == calls["C2006"] == 2   # once per time step
+    assert calls["R1006"] == calls["O9901"] == 1   # once per analysis
+
+
+def test_invalidate_picks_up_changed_parameters():
+    data = parse_netlist("circuits/vdc_divider.net")
+    compiled = CompiledCircuit(data)
+    x_red = np.zeros(compiled.n_total - 1)
+    G_before = compiled.build(x_red, analysis_context="DC")[0].copy()
+
+    data.elements[1].R *= 2.0
+    assert np.allclose(compiled.build(x_red, analysis_context="DC")[0], G_before)
+    compiled.invalidate()
+    G_ref, _ = _build_mna_system(data, x_red, analysis_context="DC")
+    assert np.allclose(compiled.build(x_red, analysis_context="DC")[0], G_ref)
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_gmin_and_source_scale(sparse):
+    data = parse_netlist("circuits/example_ccvs.net")
+    compiled = CompiledCircuit(data, sparse=sparse)
+    x_red = np.zeros(compiled.n_total - 1)
+
+    def dense(G):
+        return G.toarray() if sparse else np.array(G)
+
+    G0 = dense(compiled.build(x_red, analysis_context="DC")[0])
+    I0 = compiled.build(x_red, analysis_context="DC")[1].copy()
+
+    # gmin: shunt to ground on the node rows only, not on the MNA currents
+    compiled.gmin = 1e-3
+    G, I = compiled.build(x_red, analysis_context="DC")
+    n = data.max_node
+    shunt = np.zeros(compiled.n_total - 1)
+    shunt[:n] = 1e-3
+    assert np.allclose(dense(G), G0 + np.diag(shunt))
+    assert np.allclose(I, I0)
+
+    # source_scale: only the independent sources' right-hand side
+    compiled.gmin = 0.0
+    compiled.source_scale = 0.25
+    G, I = compiled.build(x_red, analysis_context="DC")
+    assert np.allclose(dense(G), G0)
+    assert np.allclose(I, 0.25 * I0)
+
+    compiled.source_scale = 1.0
+    assert np.allclose(compiled.build(x_red, analysis_context="DC")[1], I0)
+
+
+SOURCES = """
+3
+V1 1 0 SIN 0.5 2 1000 1e-4 50 30
+I1 2 0 PULSE 0 1e-3 2e-4 1e-5 2e-5 1e-4 5e-4 3
+V2 3 2 AC 0 1.5 700 45
+R1 1 2 100
+R2 2 3 50
+R3 3 0 200
+"""
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_tabulated_sources_match_waveform_evaluation(tmp_path, sparse, monkeypatch):
+    p = tmp_path / "sources.net"
+    p.write_text(SOURCES, encoding="utf-8")
+    data = parse_netlist(str(p))
+    times = np.linspace(0.0, 1e-3, 37)
+    x_red = np.zeros(CompiledCircuit(data).n_total - 1)
+
+    def dense(G):
+        return G.toarray() if sparse else np.array(G)
+
+    def builds(compiled):
+        states = [{} for _ in data.elements]
+        return [(dense(G), I.copy()) for G, I in (
+            compiled.build(x_red, analysis_context="TRAN", t=t, dt=1e-6,
+                           method=TimeMethod.BACKWARD_EULER, states=states)
+            for t in times)]
+
+    expected = builds(CompiledCircuit(data, sparse=sparse))
+
+    compiled = CompiledCircuit(data, sparse=sparse)
+    compiled.tabulate_sources(times)
+    # Tabulated time points never evaluate a waveform point by point
+    for elem in data.elements:
+        monkeypatch.setattr(type(elem), "get_value_at", lambda self, t: pytest.fail("scalar call"),
+                            raising=False)
+    for (G, I), (G_ref, I_ref) in zip(builds(compiled), expected):
+        assert np.allclose(G, G_ref) and np.allclose(I, I_ref)
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+@pytest.mark.parametrize("method", list(TimeMethod))
+def test_vectorized_stamping_matches_element_stamps(sparse, method):
+    data = parse_netlist("circuits/opamp_rectifier.net")
+    reference = CompiledCircuit(data, sparse=sparse)
+    compiled = CompiledCircuit(data, sparse=sparse, stamping="vectorized")
+    x_red = np.linspace(-0.1, 0.1, compiled.n_total - 1)
+
+    # Resistors and capacitors left the per-element stamp lists
+    stamped = {data.elements[i].name[0] for i in compiled._const_idx + compiled._time_idx}
+    assert not stamped & {"R", "C"}
+
+    def dense(G):
+        return G.toarray() if sparse else np.array(G)
+
+    G_ref, I_ref = reference.build(x_red, analysis_context="DC")
+    G_ref, I_ref = dense(G_ref), I_ref.copy()
+    G, I = compiled.build(x_red, analysis_context="DC")
+    assert np.allclose(dense(G), G_ref) and np.allclose(I, I_ref)
+
+    # Non-trivial capacitor history (two points, so GEAR2 has h_prev)
+    states = StateStore(data)
+    for x in (x_red, 0.5 * x_red):
+        states.update(np.concatenate(([0.0], x)), 1e-6, method)
+    kwargs = dict(analysis_context="TRAN", t=2e-6, dt=2e-6, method=method, states=states)
+    G_ref, I_ref = reference.build(x_red, **kwargs)
+    G_ref, I_ref = dense(G_ref), I_ref.copy()
+    G, I = compiled.build(x_red, **kwargs)
+    assert np.allclose(dense(G), G_ref) and np.allclose(I, I_ref)
+
+
+def test_vectorized_stamping_checks_backend_and_states():
+    data = parse_netlist("circuits/opamp_rectifier.net")
+    with pytest.raises(ValueError, match="estampagem"):
+        CompiledCircuit(data, stamping="columns")
+
+    compiled = CompiledCircuit(data, stamping="vectorized")
+    x_red = np.zeros(compiled.n_total - 1)
+    with pytest.raises(ValueError, match="StateStore"):
+        compiled.build(x_red, analysis_context="TRAN", dt=1e-6,
+                       method=TimeMethod.BACKWARD_EULER, states=[{} for _ in data.elements])
+
+    # Parameter changes are picked up on invalidate(), as per element
+    G_before = compiled.build(x_red, analysis_context="DC")[0].copy()
+    data.elements[[e.name[0] for e in data.elements].index("R")].R *= 2.0
+    compiled.invalidate()
+    G_ref = CompiledCircuit(data).build(x_red, analysis_context="DC")[0]
+    assert not np.allclose(G_before, G_ref)
+    assert np.allclose(compiled.build(x_red, analysis_context="DC")[0], G_ref)
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+@pytest.mark.parametrize("netlist", [
+    "circuits/opamp_rectifier.net",
+    "circuits/lc.net",
+    "circuits/rlc_sine_parallel.net",
+])
+def test_small_signal_model_matches_backward_euler_companion(netlist, sparse):
+    # The BE companion of each reactive element is its j*omega term with
+    # j*omega -> 1/dt: G_tran = G + C/dt, linearized at the same x
+    data = parse_netlist(netlist)
+    compiled = CompiledCircuit(data, sparse=sparse)
+    x_red = np.linspace(-0.1, 0.6, compiled.n_total - 1)
+    dense = (lambda M: M.toarray()) if sparse else np.asarray
+
+    G, C, b = compiled.build_ac(x_red)
+    G, C = dense(G), dense(C)
+    dt = 1e-6
+    G_tran, _ = compiled.build(x_red, analysis_context="TRAN", dt=dt,
+                               method=TimeMethod.BACKWARD_EULER, states=StateStore(data))
+    assert np.allclose(G + C / dt, dense(G_tran))
+
+    sources = [e for e in data.elements if getattr(e, "is_ac", False)]
+    assert np.count_nonzero(b) == len(sources)
+    for elem in sources:
+        k = compiled.mna_idx[data.elements.index(elem)]
+        assert b[k - 1] == pytest.approx(elem.amp * np.exp(1j * np.radians(elem.phase_deg)))
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from simulator.assembly import CompiledCircuit
+from simulator.batch import BatchedCircuit, merge_instances, newton_batch
+from simulator.columnar import to_columnar
+from simulator.elements.base import TimeMethod
+from simulator.parser import parse_netlist
+from simulator.state import StateStore
+from simulator.sweep import with_param
+
+
+def _instances(netlist, param, values):
+    data = parse_netlist(netlist)
+    return [with_param(data, param, v) for v in values]
+
+
+def test_merge_instances_renumbers_nodes_per_instance():
+    instances = _instances("circuits/example_ccvs.net", "R1", [1e3, 2e3, 3e3])
+    merged = merge_instances(instances)
+
+    n = instances[0].max_node
+    assert merged.max_node == 3 * n
+    assert len(merged.elements) == 3 * len(instances[0].elements)
+    h1 = [e for e in merged.elements if e.name == "H1"]
+    assert [(e.a, e.b, e.c, e.d) for e in h1] == [(3, 0, 2, 0), (6, 0, 5, 0), (9, 0, 8, 0)]
+    assert [e.R for e in merged.elements if e.name == "R1"] == [1e3, 2e3, 3e3]
+
+
+def test_merge_instances_shifts_columnar_rows():
+    instances = [to_columnar(d) for d in _instances("circuits/pulse.net", "R1002", [1e3, 2e3])]
+    merged = merge_instances(instances)
+
+    R = merged.columns["R"]
+    assert R.a.tolist() == [1, 2, 3, 4] and R.b.tolist() == [2, 0, 4, 0]
+    assert R.value.tolist() == [1e3, 1e3, 2e3, 1e3]
+
+
+def test_merge_instances_rejects_other_topologies():
+    rc = parse_netlist("circuits/pulse.net")
+    with pytest.raises(ValueError, match="instância 1"):
+        merge_instances([rc, parse_netlist("circuits/example_ccvs.net")])
+    with pytest.raises(ValueError, match="instância 1"):
+        merge_instances([rc, to_columnar(rc)])
+    with pytest.raises(ValueError, match="sem instâncias"):
+        BatchedCircuit([])
+
+
+@pytest.mark.parametrize("netlist, param", [
+    ("circuits/opamp_rectifier.net", "R1006"),
+    ("circuits/example_ccvs.net", "H1"),
+    ("circuits/lc.net", "L3002"),
+])
+def test_batched_stack_matches_each_instance(netlist, param):
+    base = parse_netlist(netlist)
+    elem = next(e for e in base.elements if e.name == param)
+    values = getattr(elem, elem.value_attr) * np.array([0.5, 1.0, 3.0])
+    instances = [with_param(base, param, v) for v in values]
+    batch = BatchedCircuit(instances)
+    n = batch.n_total - 1
+    x = np.linspace(-0.2, 0.3, 3 * n).reshape(3, n)
+
+    G, I = batch.build(x, "DC")
+    assert G.shape == (3, n, n) and I.shape == (3, n)
+    for k, data in enumerate(instances):
+        G_k, I_k = CompiledCircuit(data).build(x[k], analysis_context="DC")
+        assert np.allclose(G[k], G_k) and np.allclose(I[k], I_k)
+
+    states = StateStore(batch.data)
+    kwargs = dict(t=1e-4, dt=1e-6, method=TimeMethod.TRAPEZOIDAL)
+    G, I = batch.build(x, "TRAN", states=states, **kwargs)
+    for k, data in enumerate(instances):
+        G_k, I_k = CompiledCircuit(data).build(x[k], analysis_context="TRAN",
+                                               states=StateStore(data), **kwargs)
+        assert np.allclose(G[k], G_k) and np.allclose(I[k], I_k)
+    assert np.allclose(batch.build_rhs(x, "TRAN", states=states, **kwargs), I)
+
+
+def test_newton_batch_masks_converged_instances():
+    # x^2 = a per instance: G = diag(2 x), I = x^2 + a (Newton linearization)
+    a = np.array([[4.0], [9.0], [1.0]])
+    builds = []
+
+    def build(x):
+        builds.append(x.copy())
+        return (2.0 * x)[:, :, None], x ** 2 + a
+
+    x0 = np.array([[1.0], [1.0], [1.0]])
+    x, done = newton_batch(build, x0, tol=1e-10, damping=False)
+    assert done.all()
+    assert np.allclose(x[:, 0], [2.0, 3.0, 1.0])
+    # The instance converged from the start is never moved
+    assert all(b[2, 0] == 1.0 for b in builds)
+
+    x, done = newton_batch(build, x0, tol=1e-10, max_iter=1)
+    assert done.tolist() == [False, False, True]
+
+
+def test_newton_batch_takes_the_full_step_without_decrease():
+    # Piecewise-linear residual per instance (see test_newton_damping):
+    # from -1 every shorter step raises it, the full step leads to 1.5
+    def build(x):
+        v = x[:, 0]
+        G = np.where(v <= -1.0, 1.0, np.where(v < 0.5, 1.0, 10.0))
+        I = np.where(v <= -1.0, 1.0, np.where(v < 0.5, v + 3.0, 15.0))
+        return G[:, None, None], I[:, None]
+
+    x, done = newton_batch(build, np.array([[-1.0], [2.0]]), tol=1e-10, max_iter=10)
+    assert done.all() and np.allclose(x[:, 0], 1.5)
@@ -0,0 +1,101 @@
+import numpy as np
+
+from simulator.assembly import TripletMatrix
+from simulator.builder import CircuitBuilder
+from simulator.circuit import NetlistOOP
+from simulator.columnar import ColumnarNetlist, to_columnar, to_elements
+from simulator.elements.capacitor import Capacitor
+from simulator.elements.inductor import Inductor
+from simulator.elements.resistor import Resistor
+from simulator.parser import parse_netlist
+
+
+class _TunedResistor(Resistor):
+    pass
+
+
+def test_columns_collect_rows_appended_one_by_one_and_in_bulk():
+    columns = ColumnarNetlist()
+    columns.add("R", "R1", 1, 2, 10.0)
+    columns["R"].extend(["R2", "R3"], [2, 3], [0, 0], [20.0, 30.0])
+    columns.add("R", "R4", 4, 3, 40.0)
+    columns.add("C", "C1", 3, 0, 1e-6, 0.5)
+
+    R = columns["R"]
+    assert R.names == ["R1", "R2", "R3", "R4"]
+    assert R.a.tolist() == [1, 2, 3, 4]
+    assert R.b.tolist() == [2, 0, 0, 3]
+    assert R.value.tolist() == [10.0, 20.0, 30.0, 40.0]
+    assert columns["C"].ic.tolist() == [0.5]
+    assert len(columns) == 5
+    assert columns.max_node() == 4
+
+
+def test_round_trip_between_objects_and_columns():
+    data = NetlistOOP([
+        Resistor("R1", 1, 2, 10.0),
+        Capacitor("C1", 2, 0, 1e-6, v0=0.5),
+        Inductor("L1", 1, 0, 1e-3),
+        _TunedResistor("RT", 2, 0, 5.0),
+    ], 2)
+
+    col = to_columnar(data)
+    # Subclasses keep their object (they may change the model)
+    assert [e.name for e in col.elements] == ["L1", "RT"]
+    assert col.columns["R"].names == ["R1"]
+    assert col.columns["C"].value.tolist() == [1e-6]
+    assert data.columns is None and len(data.elements) == 4
+
+    back = to_elements(col)
+    assert back.columns is None
+    assert {e.name: e for e in back.elements}["C1"] == Capacitor("C1", 2, 0, 1e-6, v0=0.5)
+    assert sorted(e.name for e in back.elements) == ["C1", "L1", "R1", "RT"]
+
+
+def test_parser_fills_columns_directly():
+    data = parse_netlist("circuits/rc_sine_parallel.net", columnar=True)
+    ref = parse_netlist("circuits/rc_sine_parallel.net")
+
+    assert not any(type(e) in (Resistor, Capacitor) for e in data.elements)
+    col = to_columnar(ref)
+    for kind in ("R", "C"):
+        assert data.columns[kind].names == col.columns[kind].names
+        assert np.array_equal(data.columns[kind].value, col.columns[kind].value)
+
+
+def test_builder_bulk_adders_save_and_reload(tmp_path):
+    builder = CircuitBuilder()
+    builder.add_voltage_source_dc(1, 0, 1.0)
+    builder.add_resistors([1, 2, 3], [2, 3, 0], [1.0, 2.0, 3.0])
+    builder.add_capacitors([2, 3], [0, 0], [1e-9, 2e-9], ic=[0.0, 0.25])
+    builder.add_resistor(3, 4, 4.0)
+
+    data = builder.to_netlist_oop()
+    assert builder.max_node == 4
+    assert data.columns["R"].names == ["R1", "R2", "R3"]
+    assert [e.name for e in data.elements] == ["V1", "R4"]
+
+    path = tmp_path / "bulk.net"
+    builder.save_netlist(str(path))
+    loaded = parse_netlist(str(path), columnar=True)
+    assert sorted(loaded.columns["R"].names) == ["R1", "R2", "R3", "R4"]
+    assert loaded.columns["C"].ic.tolist() == [0.0, 0.25]
+
+
+def test_triplet_blocks_mix_with_scalar_stamps():
+    T = TripletMatrix(4)
+    T[1, 1] += 1.0
+    T.add_block(np.array([1, 2]), np.array([2, 3]), np.array([5.0, 7.0]))
+    n = len(T)
+    T[3, 3] += 2.0
+    T.add_block(np.array([0, 3]), np.array([3, 3]), np.array([9.0, 1.0]))
+    assert len(T) == 6
+
+    expected = np.zeros((3, 3))
+    expected[0, 0], expected[0, 1], expected[1, 2], expected[2, 2] = 1.0, 5.0, 7.0, 3.0
+    assert np.array_equal(T.to_csc().toarray(), expected)
+
+    T.truncate(n)
+    assert len(T) == 3
+    expected[2, 2] = 0.0
+    assert np.array_equal(T.to_csc().toarray(), expected)
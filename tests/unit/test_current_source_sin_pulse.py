@@ -92,3 +92,22 @@ def test_current_source_stamp_dc():
     assert I_new[2] == pytest.approx(-3.0)
     assert I_new[1] == pytest.approx(3.0)
     assert np.array_equal(G_new, G)
+
+
+def test_current_source_pulse_breakpoints():
+    pulse_params = {"i1": 0.0, "i2": 1e-3, "delay": 1e-3, "rise_time": 1e-4,
+                    "fall_time": 1e-4, "pulse_width": 3e-4, "period": 1e-3}
+    cs = CurrentSource("I1", 1, 0, source_type="PULSE", pulse_params=pulse_params)
+
+    assert np.allclose(cs.breakpoints(2.5e-3),
+                       [1e-3, 1.1e-3, 1.4e-3, 1.5e-3, 2e-3, 2.1e-3, 2.4e-3])
+
+
+def test_current_source_get_values_at():
+    pulse_params = {"i1": 1e-3, "i2": -2e-3, "delay": 1e-4, "rise_time": 1e-5,
+                    "fall_time": 3e-5, "pulse_width": 2e-4, "period": 4e-4}
+    cs = CurrentSource("I1", 1, 0, source_type="PULSE", pulse_params=pulse_params)
+    times = np.linspace(0.0, 2e-3, 1001)
+
+    assert np.allclose(cs.get_values_at(times), [cs.get_value_at(t) for t in times],
+                       rtol=0.0, atol=1e-15)
@@ -57,3 +57,29 @@ def test_capacitor_be_initial_condition_voltage():
     assert I2[1] == pytest.approx(Gc * 5.0)   # +5e-3 A
     assert I2[2] == pytest.approx(-Gc * 5.0)  # -5e-3 A
 
+
+def test_capacitor_gear2_stamp():
+    c = Capacitor("C1", 1, 2, 1e-6)
+    C, h = 1e-6, 1e-3
+
+    # First step (no second point of history): same as backward Euler
+    G2, I2, _ = c.stamp_transient(np.zeros((3,3)), np.zeros(3), {'v_prev': 0.25},
+                                  t=0.0, dt=h, method=TimeMethod.GEAR2)
+    assert G2[1,1] == pytest.approx(C/h)
+    assert I2[1] == pytest.approx(C/h*0.25)
+
+    # Constant step: i = C (3 v - 4 v_prev + v_prev2) / (2h)
+    state = {'v_prev': 0.25, 'v_prev2': 0.1, 'h_prev': h}
+    G2, I2, _ = c.stamp_transient(np.zeros((3,3)), np.zeros(3), state,
+                                  t=0.0, dt=h, method=TimeMethod.GEAR2)
+    assert G2[1,1] == pytest.approx(1.5*C/h)
+    assert G2[1,2] == pytest.approx(-1.5*C/h)
+    assert I2[1] == pytest.approx(C*(4*0.25 - 0.1)/(2*h))
+    assert I2[2] == pytest.approx(-C*(4*0.25 - 0.1)/(2*h))
+
+def test_gear2_coefficients_exact_for_quadratics():
+    from simulator.elements.base import gear2_coefficients
+    x = lambda t: 3.0 - 2.0*t + 5.0*t**2
+    # Variable step: t_(n-2) = 0, t_(n-1) = 0.3, t_n = 0.4
+    a0, a1, a2 = gear2_coefficients(0.1, 0.3)
+    assert a0*x(0.4) + a1*x(0.3) + a2*x(0.0) == pytest.approx(-2.0 + 10.0*0.4)
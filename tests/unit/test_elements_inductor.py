@@ -53,3 +53,16 @@ def test_inductor_be_initial_condition_current():
     assert G2[k, k] == pytest.approx(-R_eq, rel=1e-3)
     assert I2[k] == pytest.approx(-R_eq * 0.02, rel=1e-3)  
 
+def test_inductor_gear2_stamp():
+    L_value = 1e-3
+    h = 1e-5
+    L = Inductor("L1", 1, 0, L_value)
+    state = {"i_prev": 0.02, "i_prev2": 0.01, "h_prev": h}
+
+    G2, I2, _ = L.stamp_transient(np.zeros((2, 2)), np.zeros(2), state,
+                                  t=0.0, dt=h, method=TimeMethod.GEAR2)
+
+    # v = L (3 i - 4 i_prev + i_prev2) / (2h)
+    k = 2
+    assert G2[k, k] == pytest.approx(-1.5 * L_value / h)
+    assert I2[k] == pytest.approx(-L_value * (4 * 0.02 - 0.01) / (2 * h))
@@ -1,7 +1,7 @@
 import numpy as np
 import pytest
-from simulator.elements.diode import Diode
-from simulator.elements.nonlinear_resistor import NonLinearResistor
+from simulator.elements.diode import Diode, DiodeBank, pnjlim
+from simulator.elements.nonlinear_resistor import NonLinearResistor, NonLinearResistorBank
 
 def test_diode_shockley_math():
 
@@ -49,4 +49,106 @@ def test_nonlinear_resistor_segment_selection():
     
     I_nr, G_eq = nlr._get_current_and_conductance(1.5)
     assert G_eq == 2.0
-    assert I_nr == -1.0
\ No newline at end of file
+    assert I_nr == -1.0
+
+def test_pnjlim_limits_large_forward_steps():
+    d = Diode("D1", 1, 0)
+
+    # Large forward jump from a conducting junction: logarithmic step
+    v = pnjlim(5.0, 0.6, d.Vt, d.v_crit)
+    assert 0.6 < v < 0.8
+    assert v == pytest.approx(0.6 + d.Vt * np.log(1.0 + 4.4 / d.Vt))
+
+    # Small steps, and steps below v_crit, are left untouched
+    assert pnjlim(0.61, 0.6, d.Vt, d.v_crit) == 0.61
+    assert pnjlim(-5.0, 0.6, d.Vt, d.v_crit) == -5.0
+
+def test_diode_records_limiting_in_lim_state():
+    d = Diode("D1", 1, 0)
+    G, I = np.zeros((2, 2)), np.zeros(2)
+    lim_state = {"limited": False}
+
+    # First linearization: nothing to compare against
+    d.stamp_dc(G.copy(), I.copy(), np.array([0.0, 0.6]), lim_state)
+    assert lim_state["limited"] is False
+    assert lim_state["v_d"] == 0.6
+
+    # Big jump: the diode is linearized at the limited voltage
+    G_lim, I_lim = d.stamp_dc(G.copy(), I.copy(), np.array([0.0, 5.0]), lim_state)
+    assert lim_state["limited"] is True
+    assert 0.6 < lim_state["v_d"] < 0.8
+
+    I_eq, Gd = d._get_norton_equivalent(lim_state["v_d"])
+    assert G_lim[1, 1] == pytest.approx(Gd)
+
+def test_diode_clamp_is_silent(capsys):
+    d = Diode("D1", 1, 0)
+    d._get_norton_equivalent(5.0)
+    assert capsys.readouterr().out == ""
+
+def test_diode_bank_matches_scalar_diodes():
+    diodes = [Diode("D1", 1, 0), Diode("D2", 0, 1), Diode("D3", 1, 2, Is=1e-12), Diode("D4", 2, 0)]
+    bank = DiodeBank(diodes)
+    lim_states = [{"limited": False} for _ in diodes]
+
+    # Reverse bias, a forward jump from zero, a jump from conduction, a small step
+    for x in ([0.0, -1.0, 0.2], [0.0, 0.6, 5.0], [0.0, 4.0, -3.0], [0.0, 4.01, -3.0]):
+        x = np.array(x)
+        Gd, I_eq = bank.linearize(x)
+        for k, d in enumerate(diodes):
+            G, I = np.zeros((3, 3)), np.zeros(3)
+            d.stamp_dc(G, I, x, lim_states[k])
+            I_ref, G_ref = d._get_norton_equivalent(lim_states[k]["v_d"])
+            assert Gd[k] == pytest.approx(G_ref, rel=1e-12)
+            assert I_eq[k] == pytest.approx(I_ref, rel=1e-12, abs=1e-30)
+        assert bank.limited == any(st["limited"] for st in lim_states)
+        for st in lim_states:
+            st["limited"] = False
+
+def test_diode_bank_reset_forgets_history():
+    bank = DiodeBank([Diode("D1", 1, 0)])
+    bank.linearize(np.array([0.0, 0.6]))
+    bank.linearize(np.array([0.0, 5.0]))
+    assert bank.limited
+
+    bank.reset_limiting()
+    Gd, _ = bank.linearize(np.array([0.0, 0.7]))
+    assert not bank.limited
+    assert bank.v_old[0] == 0.7
+
+def test_nonlinear_resistor_long_table_is_piecewise_linear():
+    V_points = np.linspace(-3.0, 3.0, 301)
+    I_points = np.tanh(V_points) + 0.1 * V_points**3
+    nlr = NonLinearResistor("N1", 1, 0, V_points, I_points)
+
+    for v in (-2.999, -0.5, 0.0, 0.013, 1.5, 3.0):
+        I_nr, G_eq = nlr._get_current_and_conductance(v)
+        assert I_nr + G_eq * v == pytest.approx(np.interp(v, V_points, I_points), abs=1e-12)
+
+    # Outside the table the end segments are extended
+    I_nr, G_eq = nlr._get_current_and_conductance(4.2)
+    assert G_eq == pytest.approx((I_points[-1] - I_points[-2]) / (V_points[-1] - V_points[-2]))
+
+def test_nonlinear_resistor_rejects_bad_tables():
+    with pytest.raises(ValueError):
+        NonLinearResistor("N1", 1, 0, np.array([0.0]), np.array([0.0]))
+    with pytest.raises(ValueError):
+        NonLinearResistor("N1", 1, 0, np.array([0.0, 2.0, 1.0]), np.array([0.0, 1.0, 2.0]))
+
+def test_nonlinear_resistor_bank_matches_scalar_resistors():
+    resistors = [
+        NonLinearResistor("N1", 1, 0, np.array([0.0, 1.0]), np.array([0.0, 2.0])),
+        NonLinearResistor("N2", 1, 2, np.array([-2, -1, 1, 2.0]), np.array([1.1, 0.7, -0.7, -1.1])),
+        NonLinearResistor("N3", 2, 0, np.linspace(-1, 1, 50), np.linspace(-1, 1, 50)**3),
+        NonLinearResistor("N4", 0, 2, np.array([0.0, 1.0, 1.0, 2.0]), np.array([0.0, 1.0, 3.0, 4.0])),
+    ]
+    bank = NonLinearResistorBank(resistors)
+
+    for x in ([0.0, 0.3, -0.2], [0.0, -3.0, 5.0], [0.0, 1.0, 1.0], [0.0, 0.5, -0.9]):
+        x = np.array(x)
+        G_eq, I_nr = bank.linearize(x)
+        for k, r in enumerate(resistors):
+            I_ref, G_ref = r._get_current_and_conductance(x[r.a] - x[r.b])
+            assert G_eq[k] == G_ref
+            assert I_nr[k] == I_ref
+    assert not bank.limited
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from scipy import linalg, sparse
+
+from simulator.linsolve import LinearSolver, solve
+
+
+def _grid_laplacian(side, shift=1.0):
+    n = side * side
+    main = np.full(n, 4.0 + shift)
+    off = -np.ones(n - 1)
+    off[np.arange(1, n) % side == 0] = 0.0
+    far = -np.ones(n - side)
+    return sparse.diags([main, off, off, far, far], [0, 1, -1, side, -side], format="csc")
+
+
+def test_sparse_refactor_reuses_ordering_and_matches_direct_solve():
+    A = _grid_laplacian(8)
+    b = np.arange(A.shape[0], dtype=float)
+    solver = LinearSolver()
+
+    for k in range(5):
+        A_k = A.copy()
+        A_k.data = A.data * (1.0 + 0.1 * k)
+        x = solver.solve(A_k, b)
+        assert np.allclose(A_k @ x, b)
+        assert np.allclose(x, solve(A_k, b))
+
+    assert solver.n_factor == 5
+    assert solver.n_analyze == 1
+
+
+def test_sparse_new_pattern_triggers_analysis():
+    solver = LinearSolver()
+    b = np.ones(16)
+    solver.solve(_grid_laplacian(4), b)
+    solver.solve(sparse.identity(16, format="csc") * 2.0, b)
+    assert solver.n_analyze == 2
+
+
+def test_sparse_repivots_on_unstable_pivots():
+    # First matrix is diagonally dominant; the second has a tiny diagonal
+    # pivot that the stored (diagonal) pivot order would divide by
+    A = sparse.csc_matrix(np.array([[4.0, 1.0], [1.0, 4.0]]))
+    B = sparse.csc_matrix(np.array([[1e-14, 1.0], [1.0, 4.0]]))
+    solver = LinearSolver(growth_limit=1e6)
+    solver.solve(A, np.ones(2))
+    lu = solver.factor(B)
+    x = lu.solve(np.array([1.0, 2.0]))
+    assert np.allclose(B @ x, [1.0, 2.0])
+    assert solver.n_analyze == 2
+
+    # The re-pivoted factors serve the later solves of the same matrix
+    assert np.allclose(B @ lu.solve(np.array([3.0, -1.0])), [3.0, -1.0])
+    assert solver.n_analyze == 2
+
+
+@pytest.mark.parametrize("as_sparse", [False, True])
+def test_singular_matrix_raises_linalg_error(as_sparse):
+    G = np.array([[1.0, 1.0], [1.0, 1.0]])
+    if as_sparse:
+        G = sparse.csc_matrix(G)
+    with pytest.raises(linalg.LinAlgError):
+        LinearSolver().solve(G, np.ones(2))
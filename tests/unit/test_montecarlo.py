@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from simulator.circuit import NetlistOOP
+from simulator.columnar import to_columnar
+from simulator.elements.capacitor import Capacitor
+from simulator.elements.diode import Diode
+from simulator.elements.resistor import Resistor
+from simulator.elements.voltage_source import VoltageSource
+from simulator.montecarlo import MonteCarloResult, Tolerance, _Plan, _metric_functions
+
+
+def _netlist():
+    return NetlistOOP([
+        VoltageSource("V1", 1, 0, dc=1.0),
+        Resistor("R1", 1, 2, 1000.0),
+        Resistor("R2", 2, 0, 2000.0),
+        Capacitor("C1", 2, 0, 1e-6),
+        Diode("D1", 2, 0),
+    ], 2)
+
+
+def test_tolerance_bounds_and_validation():
+    rng = np.random.default_rng(0)
+    values = Tolerance(0.05).sample(rng, np.full(10000, 100.0))
+    assert values.min() >= 95.0 and values.max() <= 105.0
+
+    values = Tolerance(0.3, "gauss").sample(rng, np.full(10000, 1.0))
+    assert abs(np.std(values) - 0.1) < 0.005
+
+    with pytest.raises(ValueError, match="Distribuição"):
+        Tolerance(0.1, "lognormal")
+    with pytest.raises(ValueError, match="negativa"):
+        Tolerance(-0.1)
+
+
+def test_plan_matches_patterns_and_attributes():
+    data = _netlist()
+    plan = _Plan(data, {"r*": 0.01, "C1": Tolerance(0.1, "gauss"), "D1.vt": 0.02})
+    assert plan.params == ["R1.R", "R2.R", "C1.C", "D1.Vt"]
+
+    new, drawn = plan.sample(data, np.random.SeedSequence(3))
+    assert [new.elements[1].R, new.elements[2].R, new.elements[3].C, new.elements[4].Vt] == drawn.tolist()
+    assert data.elements[1].R == 1000.0 and new.elements[0] is data.elements[0]
+    assert abs(drawn[0] / 1000.0 - 1.0) <= 0.01
+
+    # Same seed, same draws
+    assert np.array_equal(plan.sample(data, np.random.SeedSequence(3))[1], drawn)
+    assert not np.array_equal(plan.sample(data, np.random.SeedSequence(4))[1], drawn)
+
+
+def test_plan_perturbs_columnar_rows():
+    data = to_columnar(_netlist())
+    plan = _Plan(data, {"R*": 0.01, "C1": 0.1})
+    assert plan.params == ["R1.R", "R2.R", "C1.C"]
+
+    new, drawn = plan.sample(data, np.random.SeedSequence(0))
+    assert new.columns["R"].value.tolist() == drawn[:2].tolist()
+    assert data.columns["R"].value.tolist() == [1000.0, 2000.0]
+
+
+def test_plan_errors():
+    data = _netlist()
+    with pytest.raises(ValueError, match="nenhum elemento"):
+        _Plan(data, {"L*": 0.1})
+    with pytest.raises(ValueError, match="atributo"):
+        _Plan(data, {"R1.foo": 0.1})
+    with pytest.raises(ValueError, match="colunares"):
+        _Plan(to_columnar(data), {"R1.a": 0.1})
+
+
+def test_metric_names_and_values():
+    names, funcs = _metric_functions(("max", "final"), [2, 5])
+    assert names == ["max(V2)", "max(V5)", "final(V2)", "final(V5)"]
+    out = np.array([[0.0, 3.0, 1.0], [2.0, 2.0, -1.0]])
+    assert [f(None, out) for f in funcs] == [3.0, 2.0, 1.0, -1.0]
+
+    with pytest.raises(ValueError, match="Métrica"):
+        _metric_functions(("median",), [1])
+
+
+def test_result_summary_and_yield():
+    result = MonteCarloResult(
+        names=["a", "b"],
+        metrics=np.array([[1.0, 10.0], [2.0, 20.0], [3.0, 30.0], [np.nan, np.nan]]),
+        params=["R1.R"], samples=np.zeros((4, 1)),
+        failed=np.array([False, False, False, True]),
+    )
+    assert result.summary()["a"] == {"mean": 2.0, "std": pytest.approx(np.std([1, 2, 3])),
+                                     "min": 1.0, "max": 3.0}
+    assert result.passing({"a": (1.5, None), "b": (None, 25.0)}).tolist() == [False, True, False, False]
+    assert result.yield_fraction({"a": (None, None)}) == 0.75
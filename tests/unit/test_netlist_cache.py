@@ -0,0 +1,105 @@
+import glob
+import os
+
+import numpy as np
+import pytest
+
+from simulator import netlist_cache
+from simulator.netlist_cache import NetlistCache, NetlistSource, decode, encode
+from simulator.parser import parse_netlist
+from simulator.result_cache import result_key
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+@pytest.mark.parametrize("path", sorted(glob.glob("circuits/*.net")))
+def test_encode_decode_round_trip(path, columnar):
+    data = parse_netlist(path, columnar=columnar, cache=False)
+    copy = decode(encode(data, NetlistSource.read(path)))
+
+    # Every field of every element, the columns and the settings, types included
+    assert result_key("netlist", copy, {}) == result_key("netlist", data, {})
+    assert [e.name for e in copy.elements] == [e.name for e in data.elements]
+    assert all(a is not b for a, b in zip(copy.elements, data.elements))
+
+
+def test_mixed_fields_are_kept_exactly():
+    data = parse_netlist("circuits/example_nl_res.net", cache=False)
+    nl = next(e for e in data.elements if type(e).__name__ == "NonLinearResistor")
+    copy = decode(encode(data, NetlistSource.read("circuits/example_nl_res.net")))
+    nl_copy = next(e for e in copy.elements if e.name == nl.name)
+    assert np.array_equal(nl_copy.V_points, nl.V_points)
+    assert np.array_equal(nl_copy.I_points, nl.I_points)
+    assert nl_copy._G == nl._G  # __post_init__ ran again
+
+    pulse = parse_netlist("circuits/pulse.net", cache=False)
+    copy = decode(encode(pulse, NetlistSource.read("circuits/pulse.net")))
+    sources = [(e.source_type, e.pulse_params, e.sin_params) for e in pulse.elements if hasattr(e, "pulse_params")]
+    assert sources and sources == [(e.source_type, e.pulse_params, e.sin_params)
+                                   for e in copy.elements if hasattr(e, "pulse_params")]
+
+
+def _netlist(tmp_path, text="2\nV1 1 0 DC 5\nR1 1 2 1000\nR2 2 0 1000\n"):
+    path = tmp_path / "div.net"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_entry_is_used_only_for_the_same_file(tmp_path):
+    path = _netlist(tmp_path)
+    cache = NetlistCache(tmp_path / "cache")
+    source = NetlistSource.read(path)
+    assert cache.load(source) is None and cache.misses == 1
+
+    cache.store(source, False, parse_netlist(path, cache=False))
+    assert cache.load(NetlistSource.read(path)).elements[2].R == 1000
+    assert cache.load(NetlistSource.read(path), columnar=True) is None
+    assert cache.hits == 1 and cache.misses == 2
+
+    # Same size and contents, new modification time
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert cache.load(NetlistSource.read(path)) is None
+
+    # Same size and modification time, new contents
+    cache.store(NetlistSource.read(path), False, parse_netlist(path, cache=False))
+    st = os.stat(path)
+    _netlist(tmp_path, "2\nV1 1 0 DC 5\nR1 1 2 1000\nR2 2 0 2000\n")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert cache.load(NetlistSource.read(path)) is None
+
+
+def test_invalidate_and_damaged_entries(tmp_path):
+    path = _netlist(tmp_path)
+    other = str(tmp_path / "other.net")
+    with open(other, "w") as f:
+        f.write("1\nR1 1 0 10\n")
+    cache = NetlistCache(tmp_path / "cache")
+    for p in (path, other):
+        for columnar in (False, True):
+            cache.store(NetlistSource.read(p), columnar, parse_netlist(p, columnar, cache=False))
+    assert len(cache.entries.entries()) == 4
+
+    cache.invalidate(path)
+    assert len(cache.entries.entries()) == 2
+    assert cache.load(NetlistSource.read(path)) is None
+    assert cache.load(NetlistSource.read(other), columnar=True) is not None
+    cache.invalidate()
+    assert cache.entries.entries() == []
+
+    # An entry that does not decode is dropped and parsed again
+    source = NetlistSource.read(path)
+    arrays = encode(parse_netlist(path, cache=False), source)
+    del arrays["order"]
+    cache.entries.store(cache._key(path, False), arrays)
+    assert cache.load(source) is None
+    assert cache.entries.entries() == []
+
+
+def test_enable_defaults_to_the_result_cache_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("SIMULATOR_CACHE_DIR", str(tmp_path))
+    try:
+        assert netlist_cache.enable().directory == tmp_path / "netlists"
+        assert netlist_cache.active() is not None
+    finally:
+        netlist_cache.disable()
+    assert netlist_cache.active() is None
@@ -1,3 +1,4 @@
+import pytest
 from simulator.parser import parse_netlist
 
 def test_parser_reads_all_supported_elements(tmp_path):
@@ -15,3 +16,88 @@ V1 2 0 AC 1.0 1000 0
 
     assert len(data.elements) == 5
     assert data.max_node == 2
+
+def test_parser_reads_pwl_tables_of_any_length(tmp_path):
+    net = tmp_path / "pwl.net"
+    net.write_text("""
+2
+N1 1 0 0 0 1 1
+N2 2 0 -2 1 -1 0.5 0 0 1 -0.5
+* measured curve, continued on the next lines
++ 2 -1 3 2
+""")
+
+    data = parse_netlist(str(net))
+
+    n1, n2 = data.elements
+    assert list(n1.V_points) == [0, 1] and list(n1.I_points) == [0, 1]
+    assert list(n2.V_points) == [-2, -1, 0, 1, 2, 3]
+    assert list(n2.I_points) == [1, 0.5, 0, -0.5, -1, 2]
+
+def test_parser_rejects_incomplete_pwl_table(tmp_path):
+    net = tmp_path / "pwl_bad.net"
+    net.write_text("2\nN1 1 0 0 0 1\n")
+
+    with pytest.raises(ValueError):
+        parse_netlist(str(net))
+
+@pytest.mark.parametrize("line, values", [
+    (".STEP R1 100 400 100", [100.0, 200.0, 300.0, 400.0]),
+    (".step R1 1 0 -0.5", [1.0, 0.5, 0.0]),
+    (".STEP V1.amp LIST 1 2.5 4", [1.0, 2.5, 4.0]),
+    (".STEP C1 DEC 1e-9 1e-7 2", pytest.approx([1e-9, 10**-8.5, 1e-8, 10**-7.5, 1e-7])),
+])
+def test_parser_reads_step_sweep(tmp_path, line, values):
+    net = tmp_path / "step.net"
+    net.write_text(f"1\nV1 1 0 DC 1\nR1 1 0 100\n{line}\n")
+
+    data = parse_netlist(str(net))
+
+    assert data.step.param == line.split()[1]
+    assert data.step.values == values
+    assert len(data.elements) == 2 and not data.transient.enabled
+
+@pytest.mark.parametrize("line", [".STEP R1 1 10", ".STEP R1 1 10 -1", ".STEP R1 LIST",
+                                  ".STEP R1 DEC 0 10 5"])
+def test_parser_rejects_malformed_step(tmp_path, line):
+    net = tmp_path / "step_bad.net"
+    net.write_text(f"1\nR1 1 0 100\n{line}\n")
+
+    with pytest.raises(ValueError, match=".STEP"):
+        parse_netlist(str(net))
+
+def test_parser_reads_dc_sweep(tmp_path):
+    net = tmp_path / "dc.net"
+    net.write_text("1\nV1 1 0 DC 1\nR1 1 0 100\n.dc V1 -1 2 0.5\n")
+
+    data = parse_netlist(str(net))
+
+    assert (data.dc_sweep.source, data.dc_sweep.start, data.dc_sweep.stop,
+            data.dc_sweep.step) == ("V1", -1.0, 2.0, 0.5)
+    assert len(data.elements) == 2 and not data.transient.enabled
+
+@pytest.mark.parametrize("line", [".DC V1 0 1", ".DC V1 0 1 -0.1", ".DC V1 0 1 0"])
+def test_parser_rejects_malformed_dc_sweep(tmp_path, line):
+    net = tmp_path / "dc_bad.net"
+    net.write_text(f"1\nV1 1 0 DC 1\nR1 1 0 100\n{line}\n")
+
+    with pytest.raises(ValueError, match=".DC"):
+        parse_netlist(str(net))
+
+def test_parser_reads_ac_analysis(tmp_path):
+    net = tmp_path / "ac.net"
+    net.write_text("1\nV1 1 0 AC 0 1 1000 0\nR1 1 0 100\n.ac oct 5 100 1e4\n")
+
+    data = parse_netlist(str(net))
+
+    assert (data.ac.sweep, data.ac.points, data.ac.fstart, data.ac.fstop) == ("OCT", 5, 100.0, 1e4)
+    assert len(data.elements) == 2 and not data.transient.enabled
+
+@pytest.mark.parametrize("line", [".AC DEC 10 1", ".AC LOG 10 1 100", ".AC DEC 0 1 100",
+                                  ".AC DEC 10 0 100", ".AC LIN 10 100 1"])
+def test_parser_rejects_malformed_ac_analysis(tmp_path, line):
+    net = tmp_path / "ac_bad.net"
+    net.write_text(f"1\nV1 1 0 AC 0 1 1000 0\nR1 1 0 100\n{line}\n")
+
+    with pytest.raises(ValueError, match=".AC"):
+        parse_netlist(str(net))
@@ -1,5 +1,6 @@
 import pytest
 import math
+import numpy as np
 from simulator.parser import parse_netlist
 from simulator.elements.voltage_source import VoltageSource
 
@@ -116,3 +117,62 @@ def test_old_dc_and_ac_sources():
     ac = VoltageSource("V1", a=1, b=0, dc=0.0, amp=1.0, freq=1.0, 
                       phase_deg=0.0, is_ac=True, source_type="AC")
     assert abs(ac._value(0.0) - 1.0) < 1e-10
+
+
+# Breakpoints (corners where the transient loop must end a step)
+def test_pulse_breakpoints_every_period():
+    pulse_params = {"v1": 0.0, "v2": 5.0, "delay": 1.0, "rise_time": 0.1,
+                    "fall_time": 0.2, "pulse_width": 0.5, "period": 2.0}
+    v = VoltageSource("V1", a=1, b=0, source_type="PULSE", pulse_params=pulse_params)
+
+    bps = v.breakpoints(4.0)
+    expected = [1.0, 1.1, 1.6, 1.8, 3.0, 3.1, 3.6, 3.8]
+    assert bps == pytest.approx(expected)
+    # The waveform has a corner at each of them
+    for t in bps:
+        slope_before = (v.get_value_at(t) - v.get_value_at(t - 1e-3)) / 1e-3
+        slope_after = (v.get_value_at(t + 1e-3) - v.get_value_at(t)) / 1e-3
+        assert slope_before != pytest.approx(slope_after)
+
+
+def test_pulse_breakpoints_without_period_and_clipped():
+    pulse_params = {"v1": 0.0, "v2": 1.0, "delay": 0.0, "rise_time": 0.0,
+                    "fall_time": 0.0, "pulse_width": 0.5, "period": 0.0}
+    v = VoltageSource("V1", a=1, b=0, source_type="PULSE", pulse_params=pulse_params)
+
+    # t = 0 and t_stop are never breakpoints
+    assert v.breakpoints(10.0) == [0.5]
+    assert v.breakpoints(0.5) == []
+
+
+def test_sin_and_dc_breakpoints():
+    sin_params = {"offset": 0.0, "amplitude": 1.0, "freq": 1.0,
+                  "delay": 0.5, "damping": 0.0, "phase": 0.0}
+    v = VoltageSource("V1", a=1, b=0, source_type="SIN", sin_params=sin_params)
+    assert v.breakpoints(2.0) == [0.5]
+    assert v.breakpoints(0.4) == []
+
+    dc = VoltageSource("V1", a=1, b=0, dc=10.0, source_type="DC")
+    assert dc.breakpoints(1.0) == []
+
+
+# Vectorized evaluation over a time array
+@pytest.mark.parametrize("kwargs", [
+    dict(source_type="DC", dc=2.0),
+    dict(source_type="AC", dc=0.5, amp=1.0, freq=3.0, phase_deg=30.0, is_ac=True),
+    dict(source_type="SIN", sin_params={"offset": 1.0, "amplitude": 2.0, "freq": 2.0,
+                                        "delay": 0.3, "damping": 1.5, "phase": 45.0}),
+    dict(source_type="PULSE", pulse_params={"v1": -1.0, "v2": 4.0, "delay": 0.1,
+                                            "rise_time": 0.05, "fall_time": 0.1,
+                                            "pulse_width": 0.2, "period": 0.5}),
+    dict(source_type="PULSE", pulse_params={"v1": 0.0, "v2": 1.0, "delay": 0.0,
+                                            "rise_time": 0.0, "fall_time": 0.0,
+                                            "pulse_width": 0.25, "period": 0.0}),
+])
+def test_get_values_at_matches_get_value_at(kwargs):
+    v = VoltageSource("V1", a=1, b=0, **kwargs)
+    times = np.linspace(0.0, 2.0, 401)
+
+    values = v.get_values_at(times)
+    assert values.shape == times.shape
+    assert values == pytest.approx([v.get_value_at(t) for t in times], abs=1e-12)
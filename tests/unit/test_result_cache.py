@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pytest
+
+from simulator import result_cache
+from simulator.columnar import to_columnar
+from simulator.elements.base import TimeMethod
+from simulator.parser import parse_netlist
+from simulator.result_cache import ResultCache, result_key
+from simulator.sweep import with_param
+
+
+def test_key_changes_with_netlist_settings_and_engine(monkeypatch):
+    data = parse_netlist("circuits/pulse.net")
+    settings = dict(desired_nodes=[1, 2], dt=1e-5, method=TimeMethod.TRAPEZOIDAL, nr_tol=1e-8)
+    key = result_key("tran", data, settings)
+
+    assert key == result_key("tran", parse_netlist("circuits/pulse.net"), dict(settings))
+    assert key != result_key("dc", data, settings)
+    assert key != result_key("tran", with_param(data, "R1002", 1000.5), settings)
+    assert key != result_key("tran", with_param(data, "V5003.delay", 2.5e-3), settings)
+    assert key != result_key("tran", to_columnar(data), settings)
+    for change in (dict(desired_nodes=[2]), dict(dt=1e-6), dict(nr_tol=1e-9),
+                   dict(method=TimeMethod.BACKWARD_EULER)):
+        assert key != result_key("tran", data, {**settings, **change})
+    # An int is not the float of the same value
+    assert result_key("dc", data, dict(x=1)) != result_key("dc", data, dict(x=1.0))
+
+    monkeypatch.setattr(result_cache, "engine_version", lambda: "another engine")
+    assert key != result_key("tran", data, settings)
+
+
+def test_store_and_load_round_trip(tmp_path):
+    cache = ResultCache(tmp_path)
+    assert cache.load("k") is None and cache.misses == 1
+
+    cache.store("k", {"out": np.arange(6.0).reshape(2, 3), "names": np.array(["I(L1)", "V1"])})
+    stored = cache.load("k")
+    assert np.array_equal(stored["out"], np.arange(6.0).reshape(2, 3))
+    assert stored["names"].tolist() == ["I(L1)", "V1"]
+    assert cache.hits == 1 and [p.name for p, _, _ in cache.entries()] == ["k.npz"]
+
+    # A damaged entry is a miss and is removed
+    (tmp_path / "k.npz").write_bytes(b"not an archive")
+    assert cache.load("k") is None and not cache.entries()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    noise = np.random.default_rng(0).random(2000)
+    probe = ResultCache(tmp_path / "probe")
+    probe.store("x", {"out": noise})
+    size = probe.size()
+    # Room for three entries
+    cache = ResultCache(tmp_path, max_bytes=3 * size + size // 2)
+    for k, key in enumerate("abc"):
+        cache.store(key, {"out": noise})
+        os.utime(tmp_path / f"{key}.npz", (k, k))
+    cache.load("a")  # a becomes the most recently used
+
+    cache.store("d", {"out": noise})
+    assert sorted(p.stem for p, _, _ in cache.entries()) == ["a", "c", "d"]
+    assert cache.size() <= cache.max_bytes
+
+    cache.clear()
+    assert cache.size() == 0
+    with pytest.raises(ValueError, match="positivo"):
+        ResultCache(tmp_path, max_bytes=0)
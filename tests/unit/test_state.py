@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from typing import ClassVar, Tuple
+
+import numpy as np
+import pytest
+
+from simulator.circuit import NetlistOOP
+from simulator.elements.base import Element, TimeMethod, gear2_coefficients
+from simulator.elements.capacitor import Capacitor
+from simulator.elements.inductor import Inductor
+from simulator.elements.resistor import Resistor
+from simulator.state import StateStore, StateView
+
+
+def _rlc():
+    return NetlistOOP([
+        Resistor("R1", 1, 2, 10.0),
+        Capacitor("C1", 2, 0, 1e-6, v0=0.5),
+        Inductor("L1", 1, 0, 1e-3, i0=0.01),
+        Capacitor("C2", 1, 2, 2e-6),
+    ], 2)
+
+
+def test_store_starts_from_initial_conditions():
+    states = StateStore(_rlc())
+
+    assert len(states) == 4
+    assert states[0] == {}
+    assert isinstance(states[1], StateView)
+    assert states[1].get("v_prev", 0.0) == 0.5
+    assert states[2].get("i_prev", 0.0) == 0.01
+    assert states[3]["i_prev"] == 0.0
+    assert states[1].get("h_prev") is None
+    assert "h_prev" not in states[1]
+    with pytest.raises(KeyError):
+        states[1]["i_L"]
+    assert [b.cls for b in states.blocks] == [Capacitor, Inductor]
+
+
+@pytest.mark.parametrize("method", [TimeMethod.BACKWARD_EULER, TimeMethod.TRAPEZOIDAL, TimeMethod.GEAR2])
+def test_store_update_matches_scalar_history(method):
+    data = _rlc()
+    states = StateStore(data)
+    C1, L1 = data.elements[1], data.elements[2]
+
+    # Scalar reference of the capacitor C1 and inductor L1 histories
+    v_prev, i_c, v_prev2 = C1.v0, 0.0, 0.0
+    i_prev, v_l, i_prev2 = L1.i0, 0.0, 0.0
+    h_prev = None
+
+    rng = np.random.default_rng(1)
+    for n, dt in enumerate([1e-6, 1e-6, 2e-6, 5e-7]):
+        x = np.concatenate(([0.0], rng.uniform(-1.0, 1.0, 2)))
+        states.update(x, dt, method)
+
+        v = x[2]
+        if method == TimeMethod.TRAPEZOIDAL:
+            i_c = 2.0 * C1.C / dt * (v - v_prev) - i_c
+        elif method == TimeMethod.GEAR2 and n:
+            v_prev2 = v_prev
+        v_prev = v
+
+        v = x[1]
+        if method == TimeMethod.BACKWARD_EULER:
+            i_prev = i_prev + dt / L1.L * v
+        elif method == TimeMethod.TRAPEZOIDAL:
+            i_prev, v_l = i_prev + dt / (2 * L1.L) * (v + v_l), v
+        else:
+            a0, a1, a2 = gear2_coefficients(dt, h_prev)
+            i_new = (v / L1.L - a1 * i_prev - a2 * i_prev2) / a0
+            if n:
+                i_prev2 = i_prev
+            i_prev = i_new
+        h_prev = dt if n else None
+
+        assert states[1].get("v_prev") == pytest.approx(v_prev, rel=1e-14)
+        assert states[1].get("i_prev") == pytest.approx(i_c, rel=1e-14)
+        assert states[1].get("v_prev2") == pytest.approx(v_prev2, rel=1e-14)
+        assert states[2].get("i_prev") == pytest.approx(i_prev, rel=1e-14)
+        assert states[2].get("i_prev2") == pytest.approx(i_prev2, rel=1e-14)
+        assert states[1].get("h_prev") == states.h_prev == h_prev
+
+
+@dataclass
+class _Integrator(Element):
+    """Toy element that accumulates the node voltage: exercises the interface."""
+    a: int
+    b: int
+    gain: float = 1.0
+    state_vars: ClassVar[Tuple[str, ...]] = ("total",)
+
+    def max_node(self) -> int:
+        return max(self.a, self.b)
+
+    @classmethod
+    def update_state(cls, block, x, dt, method):
+        block["total"] += block.param("gain") * (x[block.a] - x[block.b]) * dt
+
+
+def test_store_uses_element_state_interface():
+    data = NetlistOOP([_Integrator("X1", 1, 0), _Integrator("X2", 0, 1, gain=3.0)], 1)
+    states = StateStore(data)
+
+    for _ in range(4):
+        states.update(np.array([0.0, 2.0]), 0.5, TimeMethod.BACKWARD_EULER)
+
+    assert states[0]["total"] == pytest.approx(4.0)
+    assert states[1]["total"] == pytest.approx(-12.0)
+    assert states.n_points == 4
@@ -0,0 +1,56 @@
+import pytest
+
+from simulator.circuit import NetlistOOP
+from simulator.columnar import to_columnar
+from simulator.elements.diode import Diode
+from simulator.elements.resistor import Resistor
+from simulator.elements.voltage_source import VoltageSource
+from simulator.sweep import with_param
+
+
+def _netlist():
+    return NetlistOOP([
+        VoltageSource("V1", 1, 0, dc=0.5, source_type="SIN",
+                      sin_params={"offset": 0.5, "amplitude": 1.0, "freq": 50.0}),
+        Resistor("R1", 1, 2, 100.0),
+        Diode("D1", 2, 0),
+    ], 2)
+
+
+def test_with_param_copies_only_the_changed_element():
+    data = _netlist()
+
+    new = with_param(data, "r1", 250.0)
+    assert new.elements[1].R == 250.0 and data.elements[1].R == 100.0
+    assert new.elements[0] is data.elements[0] and new.elements[2] is data.elements[2]
+
+    assert with_param(data, "V1", 2.0).elements[0].dc == 2.0
+    assert with_param(data, "D1", 1e-12).elements[2].Is == 1e-12
+    assert with_param(data, "D1.vt", 0.03).elements[2].Vt == 0.03
+
+
+def test_with_param_reaches_waveform_parameters():
+    data = _netlist()
+
+    new = with_param(data, "V1.amplitude", 3.0)
+    assert new.elements[0].sin_params == {"offset": 0.5, "amplitude": 3.0, "freq": 50.0}
+    assert data.elements[0].sin_params["amplitude"] == 1.0
+
+
+def test_with_param_sets_columnar_values():
+    data = to_columnar(_netlist())
+
+    new = with_param(data, "R1", 47.0)
+    assert new.columns["R"].value.tolist() == [47.0]
+    assert data.columns["R"].value.tolist() == [100.0]
+    assert with_param(data, "R1.R", 10.0).columns["R"].value.tolist() == [10.0]
+
+
+@pytest.mark.parametrize("param, match", [
+    ("R9", "não existe"),
+    ("R1.X", "desconhecido"),
+    ("V1.rise_time", "desconhecido"),
+])
+def test_with_param_rejects_unknown_parameters(param, match):
+    with pytest.raises(ValueError, match=match):
+        with_param(_netlist(), param, 1.0)